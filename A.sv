@@ -0,0 +1,27 @@
+//-------------------------------------------------------------------------
+// A.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component A
+// File: /root/package/pymtl3/passes/sverilog/translation/behavioral/test/SVBehavioralTranslatorL1_test.py, Line: 36
+module A
+(
+  input  logic [0:0]    clk,
+  input  logic [31:0]   in_,
+  output logic [63:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/passes/sverilog/translation/behavioral/test/SVBehavioralTranslatorL1_test.py, line 221
+  // @s.update
+  // def upblk():
+  //   s.out = zext( s.in_, 64 )
+  
+  always_comb begin : upblk
+    out = { { 32 { 1'b0 } }, in_ };
+  end
+
+endmodule
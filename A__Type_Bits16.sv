@@ -0,0 +1,28 @@
+//-------------------------------------------------------------------------
+// A__Type_Bits16.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component A
+// File: /root/package/pymtl3/passes/sverilog/test/TranslationImport_closed_loop_component_input_test.py, Line: 30
+module A__Type_Bits16
+(
+  input  logic [0:0]    clk,
+  input  logic [15:0]   in_1,
+  input  logic [15:0]   in_2,
+  output logic [15:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/passes/sverilog/test/TranslationImport_closed_loop_component_input_test.py, line 35
+  // @s.update
+  // def add_upblk():
+  //   s.out = s.in_1 + s.in_2
+  
+  always_comb begin : add_upblk
+    out = in_1 + in_2;
+  end
+
+endmodule
@@ -0,0 +1,35 @@
+//-------------------------------------------------------------------------
+// A__Type_Bits16__n_ports_2.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component A
+// File: /root/package/pymtl3/passes/sverilog/test/TranslationImport_closed_loop_component_input_test.py, Line: 30
+module A__Type_Bits16__n_ports_2
+(
+  input  logic [0:0]    clk,
+  input  logic [15:0]   in___0,
+  input  logic [15:0]   in___1,
+  output logic [15:0]   out,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    sel
+);
+  // Struct/Array ports in the form of wires
+  logic [15:0]   in_ [0:1];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/passes/sverilog/test/TranslationImport_closed_loop_component_input_test.py, line 58
+  // @s.update
+  // def add_upblk():
+  //   s.out = s.in_[ s.sel ]
+  
+  always_comb begin : add_upblk
+    out = in_[sel];
+  end
+
+  // Connections
+  assign in_[0] = in___0;
+  assign in_[1] = in___1;
+
+endmodule
@@ -0,0 +1,180 @@
+//-------------------------------------------------------------------------
+// BypassQueue1RTL__Type_Bits32.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component RegEn
+// File: /root/package/pymtl3/stdlib/rtl/registers.py, Line: 17
+module RegEn__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    en,
+  input  logic [31:0]   in_,
+  output logic [31:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/registers.py, line 25
+  // @s.update_ff
+  // def up_regen():
+  //   if s.en:
+  //     s.out <<= s.in_
+  
+  always_ff @(posedge clk) begin : up_regen
+    if ( en ) begin
+      out <= in_;
+    end
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component Mux
+// File: /root/package/pymtl3/stdlib/rtl/arithmetics.py, Line: 5
+module Mux__Type_Bits32__ninputs_2
+(
+  input  logic [0:0]    clk,
+  input  logic [31:0]   in___0,
+  input  logic [31:0]   in___1,
+  output logic [31:0]   out,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    sel
+);
+  // Struct/Array ports in the form of wires
+  logic [31:0]   in_ [0:1];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arithmetics.py, line 12
+  // @s.update
+  // def up_mux():
+  //   s.out = s.in_[ s.sel ]
+  
+  always_comb begin : up_mux
+    out = in_[sel];
+  end
+
+  // Connections
+  assign in_[0] = in___0;
+  assign in_[1] = in___1;
+
+endmodule
+
+
+// Definition of PyMTL Component BypassQueue1RTL
+// File: /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, Line: 36
+module BypassQueue1RTL__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  output logic [31:0]   deq__msg,
+  input  logic [0:0]    deq__rdy,
+  output logic [0:0]    deq__val,
+  input  logic [31:0]   enq__msg,
+  output logic [0:0]    enq__rdy,
+  input  logic [0:0]    enq__val
+);
+  // Wire declarations
+  logic [0:0]    full;
+  logic [0:0]    next_full;
+
+  // Struct/Array ports of sub-components in the form of wires
+  logic [31:0]   byp_mux__in_ [0:1];
+
+  // Sub-component declarations
+  logic [0:0]    buffer__clk;
+  logic [0:0]    buffer__en;
+  logic [31:0]   buffer__in_;
+  logic [31:0]   buffer__out;
+  logic [0:0]    buffer__reset;
+
+  RegEn__Type_Bits32 buffer
+  (
+    .clk            (        buffer__clk        ),
+    .en             (         buffer__en        ),
+    .in_            (        buffer__in_        ),
+    .out            (        buffer__out        ),
+    .reset          (       buffer__reset       )
+  );
+
+  logic [0:0]    byp_mux__clk;
+  logic [31:0]   byp_mux__in___0;
+  logic [31:0]   byp_mux__in___1;
+  logic [31:0]   byp_mux__out;
+  logic [0:0]    byp_mux__reset;
+  logic [0:0]    byp_mux__sel;
+
+  Mux__Type_Bits32__ninputs_2 byp_mux
+  (
+    .clk            (        byp_mux__clk       ),
+    .in___0         (      byp_mux__in___0      ),
+    .in___1         (      byp_mux__in___1      ),
+    .out            (        byp_mux__out       ),
+    .reset          (       byp_mux__reset      ),
+    .sel            (        byp_mux__sel       )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign byp_mux__in___0 = byp_mux__in_[0];
+  assign byp_mux__in___1 = byp_mux__in_[1];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 62
+  // @s.update
+  // def up_bypq_internal():
+  //   s.buffer.en = (~s.deq.rdy) & (s.enq.val & s.enq.rdy)
+  //   s.next_full = (~s.deq.rdy) & s.deq.val
+  
+  always_comb begin : up_bypq_internal
+    buffer__en = ( ~deq__rdy ) & ( enq__val & enq__rdy );
+    next_full = ( ~deq__rdy ) & deq__val;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 68
+  // @s.update
+  // def up_bypq_set_deq_val():
+  //   s.deq.val = s.full | s.enq.val
+  
+  always_comb begin : up_bypq_set_deq_val
+    deq__val = full | enq__val;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 58
+  // @s.update
+  // def up_bypq_set_enq_rdy():
+  //   s.enq.rdy = ~s.full
+  
+  always_comb begin : up_bypq_set_enq_rdy
+    enq__rdy = ~full;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 54
+  // @s.update_ff
+  // def up_full():
+  //   s.full <<= s.next_full
+  
+  always_ff @(posedge clk) begin : up_full
+    full <= next_full;
+  end
+
+  // Connections
+  assign buffer__clk = clk;
+  assign buffer__reset = reset;
+  assign buffer__in_ = enq__msg;
+  assign byp_mux__clk = clk;
+  assign byp_mux__reset = reset;
+  assign deq__msg = byp_mux__out;
+  assign byp_mux__in_[0] = enq__msg;
+  assign byp_mux__in_[1] = buffer__out;
+  assign byp_mux__sel = full;
+
+endmodule
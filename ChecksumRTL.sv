@@ -0,0 +1,515 @@
+//-------------------------------------------------------------------------
+// ChecksumRTL.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component PipeQueue1EntryRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 516
+module PipeQueue1EntryRTL__EntryType_Bits128
+(
+  input  logic [0:0]    clk,
+  output logic [0:0]    count,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    deq__en,
+  output logic [127:0]  deq__msg,
+  output logic [0:0]    deq__rdy,
+  input  logic [0:0]    enq__en,
+  input  logic [127:0]  enq__msg,
+  output logic [0:0]    enq__rdy
+);
+  // Wire declarations
+  logic [127:0]  entry;
+  logic [0:0]    full;
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 551
+  // @s.update
+  // def up_deq_rdy():
+  //   s.deq.rdy = s.full & ~s.reset
+  
+  always_comb begin : up_deq_rdy
+    deq__rdy = full & ( ~reset );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 547
+  // @s.update
+  // def up_enq_rdy():
+  //   s.enq.rdy = ( ~s.full | s.deq.en ) & ~s.reset
+  
+  always_comb begin : up_enq_rdy
+    enq__rdy = ( ( ~full ) | deq__en ) & ( ~reset );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 542
+  // @s.update_ff
+  // def up_entry():
+  //   if s.enq.en:
+  //     s.entry <<= s.enq.msg
+  
+  always_ff @(posedge clk) begin : up_entry
+    if ( enq__en ) begin
+      entry <= enq__msg;
+    end
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 535
+  // @s.update_ff
+  // def up_full():
+  //   if s.reset:
+  //     s.full <<= b1(0)
+  //   else:
+  //     s.full <<= s.enq.en | s.full & ~s.deq.en
+  
+  always_ff @(posedge clk) begin : up_full
+    if ( reset ) begin
+      full <= 1'd0;
+    end
+    else
+      full <= enq__en | ( full & ( ~deq__en ) );
+  end
+
+  // Connections
+  assign count = full;
+  assign deq__msg = entry;
+
+endmodule
+
+
+// Definition of PyMTL Component PipeQueueRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 251
+module PipeQueueRTL__EntryType_Bits128__num_entries_1
+(
+  input  logic [0:0]    clk,
+  output logic [0:0]    count,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    deq__en,
+  output logic [127:0]  deq__msg,
+  output logic [0:0]    deq__rdy,
+  input  logic [0:0]    enq__en,
+  input  logic [127:0]  enq__msg,
+  output logic [0:0]    enq__rdy
+);
+  // Sub-component declarations
+  logic [0:0]    q__clk;
+  logic [0:0]    q__count;
+  logic [0:0]    q__reset;
+  logic [0:0]    q__deq__en;
+  logic [127:0]  q__deq__msg;
+  logic [0:0]    q__deq__rdy;
+  logic [0:0]    q__enq__en;
+  logic [127:0]  q__enq__msg;
+  logic [0:0]    q__enq__rdy;
+
+  PipeQueue1EntryRTL__EntryType_Bits128 q
+  (
+    .clk            (           q__clk          ),
+    .count          (          q__count         ),
+    .reset          (          q__reset         ),
+    .deq__en        (         q__deq__en        ),
+    .deq__msg       (        q__deq__msg        ),
+    .deq__rdy       (        q__deq__rdy        ),
+    .enq__en        (         q__enq__en        ),
+    .enq__msg       (        q__enq__msg        ),
+    .enq__rdy       (        q__enq__rdy        )
+  );
+
+  // Connections
+  assign q__clk = clk;
+  assign q__reset = reset;
+  assign q__enq__en = enq__en;
+  assign q__enq__msg = enq__msg;
+  assign enq__rdy = q__enq__rdy;
+  assign q__deq__en = deq__en;
+  assign deq__msg = q__deq__msg;
+  assign deq__rdy = q__deq__rdy;
+  assign count = q__count;
+
+endmodule
+
+
+// Definition of PyMTL Component StepUnit
+// File: /root/package/examples/ex02_cksum/ChecksumRTL.py, Line: 26
+module StepUnit
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  input  logic [31:0]   sum1_in,
+  output logic [31:0]   sum1_out,
+  input  logic [31:0]   sum2_in,
+  output logic [31:0]   sum2_out,
+  input  logic [15:0]   word_in
+);
+  // Temporary wire definitions
+  logic [31:0]   __tmpvar__up_step_temp1;
+  logic [31:0]   __tmpvar__up_step_temp2;
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex02_cksum/ChecksumRTL.py, line 39
+  // @s.update
+  // def up_step():
+  //   temp1 = b32(s.word_in) + s.sum1_in
+  //   s.sum1_out = temp1 & b32(0xffff)
+  //   temp2 = s.sum1_out + s.sum2_in
+  //   s.sum2_out = temp2 & b32(0xffff)
+  
+  always_comb begin : up_step
+    __tmpvar__up_step_temp1 = { { 16 { 1'b0 } }, word_in } + sum1_in;
+    sum1_out = __tmpvar__up_step_temp1 & 32'd65535;
+    __tmpvar__up_step_temp2 = sum1_out + sum2_in;
+    sum2_out = __tmpvar__up_step_temp2 & 32'd65535;
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component ChecksumRTL
+// File: /root/package/examples/ex02_cksum/ChecksumRTL.py, Line: 52
+module ChecksumRTL
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    recv__en,
+  input  logic [127:0]  recv__msg,
+  output logic [0:0]    recv__rdy,
+  output logic [0:0]    send__en,
+  output logic [31:0]   send__msg,
+  input  logic [0:0]    send__rdy
+);
+  // Wire declarations
+  logic [31:0]   sum1;
+  logic [31:0]   sum2;
+  logic [15:0]   words [0:7];
+
+  // Struct/Array ports of sub-components in the form of wires
+  logic [0:0]    steps__clk [0:7];
+  logic [0:0]    steps__reset [0:7];
+  logic [31:0]   steps__sum1_in [0:7];
+  logic [31:0]   steps__sum1_out [0:7];
+  logic [31:0]   steps__sum2_in [0:7];
+  logic [31:0]   steps__sum2_out [0:7];
+  logic [15:0]   steps__word_in [0:7];
+
+  // Sub-component declarations
+  logic [0:0]    in_q__clk;
+  logic [0:0]    in_q__count;
+  logic [0:0]    in_q__reset;
+  logic [0:0]    in_q__deq__en;
+  logic [127:0]  in_q__deq__msg;
+  logic [0:0]    in_q__deq__rdy;
+  logic [0:0]    in_q__enq__en;
+  logic [127:0]  in_q__enq__msg;
+  logic [0:0]    in_q__enq__rdy;
+
+  PipeQueueRTL__EntryType_Bits128__num_entries_1 in_q
+  (
+    .clk            (         in_q__clk         ),
+    .count          (        in_q__count        ),
+    .reset          (        in_q__reset        ),
+    .deq__en        (       in_q__deq__en       ),
+    .deq__msg       (       in_q__deq__msg      ),
+    .deq__rdy       (       in_q__deq__rdy      ),
+    .enq__en        (       in_q__enq__en       ),
+    .enq__msg       (       in_q__enq__msg      ),
+    .enq__rdy       (       in_q__enq__rdy      )
+  );
+
+  logic [0:0]    steps__0__clk;
+  logic [0:0]    steps__0__reset;
+  logic [31:0]   steps__0__sum1_in;
+  logic [31:0]   steps__0__sum1_out;
+  logic [31:0]   steps__0__sum2_in;
+  logic [31:0]   steps__0__sum2_out;
+  logic [15:0]   steps__0__word_in;
+
+  StepUnit steps__0
+  (
+    .clk            (       steps__0__clk       ),
+    .reset          (      steps__0__reset      ),
+    .sum1_in        (     steps__0__sum1_in     ),
+    .sum1_out       (     steps__0__sum1_out    ),
+    .sum2_in        (     steps__0__sum2_in     ),
+    .sum2_out       (     steps__0__sum2_out    ),
+    .word_in        (     steps__0__word_in     )
+  );
+
+  logic [0:0]    steps__1__clk;
+  logic [0:0]    steps__1__reset;
+  logic [31:0]   steps__1__sum1_in;
+  logic [31:0]   steps__1__sum1_out;
+  logic [31:0]   steps__1__sum2_in;
+  logic [31:0]   steps__1__sum2_out;
+  logic [15:0]   steps__1__word_in;
+
+  StepUnit steps__1
+  (
+    .clk            (       steps__1__clk       ),
+    .reset          (      steps__1__reset      ),
+    .sum1_in        (     steps__1__sum1_in     ),
+    .sum1_out       (     steps__1__sum1_out    ),
+    .sum2_in        (     steps__1__sum2_in     ),
+    .sum2_out       (     steps__1__sum2_out    ),
+    .word_in        (     steps__1__word_in     )
+  );
+
+  logic [0:0]    steps__2__clk;
+  logic [0:0]    steps__2__reset;
+  logic [31:0]   steps__2__sum1_in;
+  logic [31:0]   steps__2__sum1_out;
+  logic [31:0]   steps__2__sum2_in;
+  logic [31:0]   steps__2__sum2_out;
+  logic [15:0]   steps__2__word_in;
+
+  StepUnit steps__2
+  (
+    .clk            (       steps__2__clk       ),
+    .reset          (      steps__2__reset      ),
+    .sum1_in        (     steps__2__sum1_in     ),
+    .sum1_out       (     steps__2__sum1_out    ),
+    .sum2_in        (     steps__2__sum2_in     ),
+    .sum2_out       (     steps__2__sum2_out    ),
+    .word_in        (     steps__2__word_in     )
+  );
+
+  logic [0:0]    steps__3__clk;
+  logic [0:0]    steps__3__reset;
+  logic [31:0]   steps__3__sum1_in;
+  logic [31:0]   steps__3__sum1_out;
+  logic [31:0]   steps__3__sum2_in;
+  logic [31:0]   steps__3__sum2_out;
+  logic [15:0]   steps__3__word_in;
+
+  StepUnit steps__3
+  (
+    .clk            (       steps__3__clk       ),
+    .reset          (      steps__3__reset      ),
+    .sum1_in        (     steps__3__sum1_in     ),
+    .sum1_out       (     steps__3__sum1_out    ),
+    .sum2_in        (     steps__3__sum2_in     ),
+    .sum2_out       (     steps__3__sum2_out    ),
+    .word_in        (     steps__3__word_in     )
+  );
+
+  logic [0:0]    steps__4__clk;
+  logic [0:0]    steps__4__reset;
+  logic [31:0]   steps__4__sum1_in;
+  logic [31:0]   steps__4__sum1_out;
+  logic [31:0]   steps__4__sum2_in;
+  logic [31:0]   steps__4__sum2_out;
+  logic [15:0]   steps__4__word_in;
+
+  StepUnit steps__4
+  (
+    .clk            (       steps__4__clk       ),
+    .reset          (      steps__4__reset      ),
+    .sum1_in        (     steps__4__sum1_in     ),
+    .sum1_out       (     steps__4__sum1_out    ),
+    .sum2_in        (     steps__4__sum2_in     ),
+    .sum2_out       (     steps__4__sum2_out    ),
+    .word_in        (     steps__4__word_in     )
+  );
+
+  logic [0:0]    steps__5__clk;
+  logic [0:0]    steps__5__reset;
+  logic [31:0]   steps__5__sum1_in;
+  logic [31:0]   steps__5__sum1_out;
+  logic [31:0]   steps__5__sum2_in;
+  logic [31:0]   steps__5__sum2_out;
+  logic [15:0]   steps__5__word_in;
+
+  StepUnit steps__5
+  (
+    .clk            (       steps__5__clk       ),
+    .reset          (      steps__5__reset      ),
+    .sum1_in        (     steps__5__sum1_in     ),
+    .sum1_out       (     steps__5__sum1_out    ),
+    .sum2_in        (     steps__5__sum2_in     ),
+    .sum2_out       (     steps__5__sum2_out    ),
+    .word_in        (     steps__5__word_in     )
+  );
+
+  logic [0:0]    steps__6__clk;
+  logic [0:0]    steps__6__reset;
+  logic [31:0]   steps__6__sum1_in;
+  logic [31:0]   steps__6__sum1_out;
+  logic [31:0]   steps__6__sum2_in;
+  logic [31:0]   steps__6__sum2_out;
+  logic [15:0]   steps__6__word_in;
+
+  StepUnit steps__6
+  (
+    .clk            (       steps__6__clk       ),
+    .reset          (      steps__6__reset      ),
+    .sum1_in        (     steps__6__sum1_in     ),
+    .sum1_out       (     steps__6__sum1_out    ),
+    .sum2_in        (     steps__6__sum2_in     ),
+    .sum2_out       (     steps__6__sum2_out    ),
+    .word_in        (     steps__6__word_in     )
+  );
+
+  logic [0:0]    steps__7__clk;
+  logic [0:0]    steps__7__reset;
+  logic [31:0]   steps__7__sum1_in;
+  logic [31:0]   steps__7__sum1_out;
+  logic [31:0]   steps__7__sum2_in;
+  logic [31:0]   steps__7__sum2_out;
+  logic [15:0]   steps__7__word_in;
+
+  StepUnit steps__7
+  (
+    .clk            (       steps__7__clk       ),
+    .reset          (      steps__7__reset      ),
+    .sum1_in        (     steps__7__sum1_in     ),
+    .sum1_out       (     steps__7__sum1_out    ),
+    .sum2_in        (     steps__7__sum2_in     ),
+    .sum2_out       (     steps__7__sum2_out    ),
+    .word_in        (     steps__7__word_in     )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign steps__0__clk = steps__clk[0];
+  assign steps__1__clk = steps__clk[1];
+  assign steps__2__clk = steps__clk[2];
+  assign steps__3__clk = steps__clk[3];
+  assign steps__4__clk = steps__clk[4];
+  assign steps__5__clk = steps__clk[5];
+  assign steps__6__clk = steps__clk[6];
+  assign steps__7__clk = steps__clk[7];
+  assign steps__0__reset = steps__reset[0];
+  assign steps__1__reset = steps__reset[1];
+  assign steps__2__reset = steps__reset[2];
+  assign steps__3__reset = steps__reset[3];
+  assign steps__4__reset = steps__reset[4];
+  assign steps__5__reset = steps__reset[5];
+  assign steps__6__reset = steps__reset[6];
+  assign steps__7__reset = steps__reset[7];
+  assign steps__0__sum1_in = steps__sum1_in[0];
+  assign steps__1__sum1_in = steps__sum1_in[1];
+  assign steps__2__sum1_in = steps__sum1_in[2];
+  assign steps__3__sum1_in = steps__sum1_in[3];
+  assign steps__4__sum1_in = steps__sum1_in[4];
+  assign steps__5__sum1_in = steps__sum1_in[5];
+  assign steps__6__sum1_in = steps__sum1_in[6];
+  assign steps__7__sum1_in = steps__sum1_in[7];
+  assign steps__sum1_out[0] = steps__0__sum1_out;
+  assign steps__sum1_out[1] = steps__1__sum1_out;
+  assign steps__sum1_out[2] = steps__2__sum1_out;
+  assign steps__sum1_out[3] = steps__3__sum1_out;
+  assign steps__sum1_out[4] = steps__4__sum1_out;
+  assign steps__sum1_out[5] = steps__5__sum1_out;
+  assign steps__sum1_out[6] = steps__6__sum1_out;
+  assign steps__sum1_out[7] = steps__7__sum1_out;
+  assign steps__0__sum2_in = steps__sum2_in[0];
+  assign steps__1__sum2_in = steps__sum2_in[1];
+  assign steps__2__sum2_in = steps__sum2_in[2];
+  assign steps__3__sum2_in = steps__sum2_in[3];
+  assign steps__4__sum2_in = steps__sum2_in[4];
+  assign steps__5__sum2_in = steps__sum2_in[5];
+  assign steps__6__sum2_in = steps__sum2_in[6];
+  assign steps__7__sum2_in = steps__sum2_in[7];
+  assign steps__sum2_out[0] = steps__0__sum2_out;
+  assign steps__sum2_out[1] = steps__1__sum2_out;
+  assign steps__sum2_out[2] = steps__2__sum2_out;
+  assign steps__sum2_out[3] = steps__3__sum2_out;
+  assign steps__sum2_out[4] = steps__4__sum2_out;
+  assign steps__sum2_out[5] = steps__5__sum2_out;
+  assign steps__sum2_out[6] = steps__6__sum2_out;
+  assign steps__sum2_out[7] = steps__7__sum2_out;
+  assign steps__0__word_in = steps__word_in[0];
+  assign steps__1__word_in = steps__word_in[1];
+  assign steps__2__word_in = steps__word_in[2];
+  assign steps__3__word_in = steps__word_in[3];
+  assign steps__4__word_in = steps__word_in[4];
+  assign steps__5__word_in = steps__word_in[5];
+  assign steps__6__word_in = steps__word_in[6];
+  assign steps__7__word_in = steps__word_in[7];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex02_cksum/ChecksumRTL.py, line 93
+  // @s.update
+  // def up_rtl_send():
+  //   s.send.en  = s.in_q.deq.rdy & s.send.rdy
+  //   s.in_q.deq.en = s.in_q.deq.rdy & s.send.rdy
+  
+  always_comb begin : up_rtl_send
+    send__en = in_q__deq__rdy & send__rdy;
+    in_q__deq__en = in_q__deq__rdy & send__rdy;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex02_cksum/ChecksumRTL.py, line 98
+  // @s.update
+  // def up_rtl_sum():
+  //   s.send.msg = ( s.sum2 << 16 ) | s.sum1
+  
+  always_comb begin : up_rtl_sum
+    send__msg = ( sum2 << 16 ) | sum1;
+  end
+
+  // Connections
+  assign in_q__clk = clk;
+  assign in_q__reset = reset;
+  assign steps__clk[0] = clk;
+  assign steps__reset[0] = reset;
+  assign steps__clk[1] = clk;
+  assign steps__reset[1] = reset;
+  assign steps__clk[2] = clk;
+  assign steps__reset[2] = reset;
+  assign steps__clk[3] = clk;
+  assign steps__reset[3] = reset;
+  assign steps__clk[4] = clk;
+  assign steps__reset[4] = reset;
+  assign steps__clk[5] = clk;
+  assign steps__reset[5] = reset;
+  assign steps__clk[6] = clk;
+  assign steps__reset[6] = reset;
+  assign steps__clk[7] = clk;
+  assign steps__reset[7] = reset;
+  assign in_q__enq__en = recv__en;
+  assign in_q__enq__msg = recv__msg;
+  assign recv__rdy = in_q__enq__rdy;
+  assign words[0] = in_q__deq__msg[15:0];
+  assign words[1] = in_q__deq__msg[31:16];
+  assign words[2] = in_q__deq__msg[47:32];
+  assign words[3] = in_q__deq__msg[63:48];
+  assign words[4] = in_q__deq__msg[79:64];
+  assign words[5] = in_q__deq__msg[95:80];
+  assign words[6] = in_q__deq__msg[111:96];
+  assign words[7] = in_q__deq__msg[127:112];
+  assign steps__word_in[0] = words[0];
+  assign steps__sum1_in[0] = 32'd0;
+  assign steps__sum2_in[0] = 32'd0;
+  assign steps__word_in[1] = words[1];
+  assign steps__sum1_in[1] = steps__sum1_out[0];
+  assign steps__sum2_in[1] = steps__sum2_out[0];
+  assign steps__word_in[2] = words[2];
+  assign steps__sum1_in[2] = steps__sum1_out[1];
+  assign steps__sum2_in[2] = steps__sum2_out[1];
+  assign steps__word_in[3] = words[3];
+  assign steps__sum1_in[3] = steps__sum1_out[2];
+  assign steps__sum2_in[3] = steps__sum2_out[2];
+  assign steps__word_in[4] = words[4];
+  assign steps__sum1_in[4] = steps__sum1_out[3];
+  assign steps__sum2_in[4] = steps__sum2_out[3];
+  assign steps__word_in[5] = words[5];
+  assign steps__sum1_in[5] = steps__sum1_out[4];
+  assign steps__sum2_in[5] = steps__sum2_out[4];
+  assign steps__word_in[6] = words[6];
+  assign steps__sum1_in[6] = steps__sum1_out[5];
+  assign steps__sum2_in[6] = steps__sum2_out[5];
+  assign steps__word_in[7] = words[7];
+  assign steps__sum1_in[7] = steps__sum1_out[6];
+  assign steps__sum2_in[7] = steps__sum2_out[6];
+  assign sum1 = steps__sum1_out[7];
+  assign sum2 = steps__sum2_out[7];
+
+endmodule
@@ -0,0 +1,1322 @@
+//-------------------------------------------------------------------------
+// ChecksumXcelRTL.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component PipeQueue1EntryRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 516
+module PipeQueue1EntryRTL__EntryType_Bits128
+(
+  input  logic [0:0]    clk,
+  output logic [0:0]    count,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    deq__en,
+  output logic [127:0]  deq__msg,
+  output logic [0:0]    deq__rdy,
+  input  logic [0:0]    enq__en,
+  input  logic [127:0]  enq__msg,
+  output logic [0:0]    enq__rdy
+);
+  // Wire declarations
+  logic [127:0]  entry;
+  logic [0:0]    full;
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 551
+  // @s.update
+  // def up_deq_rdy():
+  //   s.deq.rdy = s.full & ~s.reset
+  
+  always_comb begin : up_deq_rdy
+    deq__rdy = full & ( ~reset );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 547
+  // @s.update
+  // def up_enq_rdy():
+  //   s.enq.rdy = ( ~s.full | s.deq.en ) & ~s.reset
+  
+  always_comb begin : up_enq_rdy
+    enq__rdy = ( ( ~full ) | deq__en ) & ( ~reset );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 542
+  // @s.update_ff
+  // def up_entry():
+  //   if s.enq.en:
+  //     s.entry <<= s.enq.msg
+  
+  always_ff @(posedge clk) begin : up_entry
+    if ( enq__en ) begin
+      entry <= enq__msg;
+    end
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 535
+  // @s.update_ff
+  // def up_full():
+  //   if s.reset:
+  //     s.full <<= b1(0)
+  //   else:
+  //     s.full <<= s.enq.en | s.full & ~s.deq.en
+  
+  always_ff @(posedge clk) begin : up_full
+    if ( reset ) begin
+      full <= 1'd0;
+    end
+    else
+      full <= enq__en | ( full & ( ~deq__en ) );
+  end
+
+  // Connections
+  assign count = full;
+  assign deq__msg = entry;
+
+endmodule
+
+
+// Definition of PyMTL Component PipeQueueRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 251
+module PipeQueueRTL__EntryType_Bits128__num_entries_1
+(
+  input  logic [0:0]    clk,
+  output logic [0:0]    count,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    deq__en,
+  output logic [127:0]  deq__msg,
+  output logic [0:0]    deq__rdy,
+  input  logic [0:0]    enq__en,
+  input  logic [127:0]  enq__msg,
+  output logic [0:0]    enq__rdy
+);
+  // Sub-component declarations
+  logic [0:0]    q__clk;
+  logic [0:0]    q__count;
+  logic [0:0]    q__reset;
+  logic [0:0]    q__deq__en;
+  logic [127:0]  q__deq__msg;
+  logic [0:0]    q__deq__rdy;
+  logic [0:0]    q__enq__en;
+  logic [127:0]  q__enq__msg;
+  logic [0:0]    q__enq__rdy;
+
+  PipeQueue1EntryRTL__EntryType_Bits128 q
+  (
+    .clk            (           q__clk          ),
+    .count          (          q__count         ),
+    .reset          (          q__reset         ),
+    .deq__en        (         q__deq__en        ),
+    .deq__msg       (        q__deq__msg        ),
+    .deq__rdy       (        q__deq__rdy        ),
+    .enq__en        (         q__enq__en        ),
+    .enq__msg       (        q__enq__msg        ),
+    .enq__rdy       (        q__enq__rdy        )
+  );
+
+  // Connections
+  assign q__clk = clk;
+  assign q__reset = reset;
+  assign q__enq__en = enq__en;
+  assign q__enq__msg = enq__msg;
+  assign enq__rdy = q__enq__rdy;
+  assign q__deq__en = deq__en;
+  assign deq__msg = q__deq__msg;
+  assign deq__rdy = q__deq__rdy;
+  assign count = q__count;
+
+endmodule
+
+
+// Definition of PyMTL Component StepUnit
+// File: /root/package/examples/ex02_cksum/ChecksumRTL.py, Line: 26
+module StepUnit
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  input  logic [31:0]   sum1_in,
+  output logic [31:0]   sum1_out,
+  input  logic [31:0]   sum2_in,
+  output logic [31:0]   sum2_out,
+  input  logic [15:0]   word_in
+);
+  // Temporary wire definitions
+  logic [31:0]   __tmpvar__up_step_temp1;
+  logic [31:0]   __tmpvar__up_step_temp2;
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex02_cksum/ChecksumRTL.py, line 39
+  // @s.update
+  // def up_step():
+  //   temp1 = b32(s.word_in) + s.sum1_in
+  //   s.sum1_out = temp1 & b32(0xffff)
+  //   temp2 = s.sum1_out + s.sum2_in
+  //   s.sum2_out = temp2 & b32(0xffff)
+  
+  always_comb begin : up_step
+    __tmpvar__up_step_temp1 = { { 16 { 1'b0 } }, word_in } + sum1_in;
+    sum1_out = __tmpvar__up_step_temp1 & 32'd65535;
+    __tmpvar__up_step_temp2 = sum1_out + sum2_in;
+    sum2_out = __tmpvar__up_step_temp2 & 32'd65535;
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component ChecksumRTL
+// File: /root/package/examples/ex02_cksum/ChecksumRTL.py, Line: 52
+module ChecksumRTL
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    recv__en,
+  input  logic [127:0]  recv__msg,
+  output logic [0:0]    recv__rdy,
+  output logic [0:0]    send__en,
+  output logic [31:0]   send__msg,
+  input  logic [0:0]    send__rdy
+);
+  // Wire declarations
+  logic [31:0]   sum1;
+  logic [31:0]   sum2;
+  logic [15:0]   words [0:7];
+
+  // Struct/Array ports of sub-components in the form of wires
+  logic [0:0]    steps__clk [0:7];
+  logic [0:0]    steps__reset [0:7];
+  logic [31:0]   steps__sum1_in [0:7];
+  logic [31:0]   steps__sum1_out [0:7];
+  logic [31:0]   steps__sum2_in [0:7];
+  logic [31:0]   steps__sum2_out [0:7];
+  logic [15:0]   steps__word_in [0:7];
+
+  // Sub-component declarations
+  logic [0:0]    in_q__clk;
+  logic [0:0]    in_q__count;
+  logic [0:0]    in_q__reset;
+  logic [0:0]    in_q__deq__en;
+  logic [127:0]  in_q__deq__msg;
+  logic [0:0]    in_q__deq__rdy;
+  logic [0:0]    in_q__enq__en;
+  logic [127:0]  in_q__enq__msg;
+  logic [0:0]    in_q__enq__rdy;
+
+  PipeQueueRTL__EntryType_Bits128__num_entries_1 in_q
+  (
+    .clk            (         in_q__clk         ),
+    .count          (        in_q__count        ),
+    .reset          (        in_q__reset        ),
+    .deq__en        (       in_q__deq__en       ),
+    .deq__msg       (       in_q__deq__msg      ),
+    .deq__rdy       (       in_q__deq__rdy      ),
+    .enq__en        (       in_q__enq__en       ),
+    .enq__msg       (       in_q__enq__msg      ),
+    .enq__rdy       (       in_q__enq__rdy      )
+  );
+
+  logic [0:0]    steps__0__clk;
+  logic [0:0]    steps__0__reset;
+  logic [31:0]   steps__0__sum1_in;
+  logic [31:0]   steps__0__sum1_out;
+  logic [31:0]   steps__0__sum2_in;
+  logic [31:0]   steps__0__sum2_out;
+  logic [15:0]   steps__0__word_in;
+
+  StepUnit steps__0
+  (
+    .clk            (       steps__0__clk       ),
+    .reset          (      steps__0__reset      ),
+    .sum1_in        (     steps__0__sum1_in     ),
+    .sum1_out       (     steps__0__sum1_out    ),
+    .sum2_in        (     steps__0__sum2_in     ),
+    .sum2_out       (     steps__0__sum2_out    ),
+    .word_in        (     steps__0__word_in     )
+  );
+
+  logic [0:0]    steps__1__clk;
+  logic [0:0]    steps__1__reset;
+  logic [31:0]   steps__1__sum1_in;
+  logic [31:0]   steps__1__sum1_out;
+  logic [31:0]   steps__1__sum2_in;
+  logic [31:0]   steps__1__sum2_out;
+  logic [15:0]   steps__1__word_in;
+
+  StepUnit steps__1
+  (
+    .clk            (       steps__1__clk       ),
+    .reset          (      steps__1__reset      ),
+    .sum1_in        (     steps__1__sum1_in     ),
+    .sum1_out       (     steps__1__sum1_out    ),
+    .sum2_in        (     steps__1__sum2_in     ),
+    .sum2_out       (     steps__1__sum2_out    ),
+    .word_in        (     steps__1__word_in     )
+  );
+
+  logic [0:0]    steps__2__clk;
+  logic [0:0]    steps__2__reset;
+  logic [31:0]   steps__2__sum1_in;
+  logic [31:0]   steps__2__sum1_out;
+  logic [31:0]   steps__2__sum2_in;
+  logic [31:0]   steps__2__sum2_out;
+  logic [15:0]   steps__2__word_in;
+
+  StepUnit steps__2
+  (
+    .clk            (       steps__2__clk       ),
+    .reset          (      steps__2__reset      ),
+    .sum1_in        (     steps__2__sum1_in     ),
+    .sum1_out       (     steps__2__sum1_out    ),
+    .sum2_in        (     steps__2__sum2_in     ),
+    .sum2_out       (     steps__2__sum2_out    ),
+    .word_in        (     steps__2__word_in     )
+  );
+
+  logic [0:0]    steps__3__clk;
+  logic [0:0]    steps__3__reset;
+  logic [31:0]   steps__3__sum1_in;
+  logic [31:0]   steps__3__sum1_out;
+  logic [31:0]   steps__3__sum2_in;
+  logic [31:0]   steps__3__sum2_out;
+  logic [15:0]   steps__3__word_in;
+
+  StepUnit steps__3
+  (
+    .clk            (       steps__3__clk       ),
+    .reset          (      steps__3__reset      ),
+    .sum1_in        (     steps__3__sum1_in     ),
+    .sum1_out       (     steps__3__sum1_out    ),
+    .sum2_in        (     steps__3__sum2_in     ),
+    .sum2_out       (     steps__3__sum2_out    ),
+    .word_in        (     steps__3__word_in     )
+  );
+
+  logic [0:0]    steps__4__clk;
+  logic [0:0]    steps__4__reset;
+  logic [31:0]   steps__4__sum1_in;
+  logic [31:0]   steps__4__sum1_out;
+  logic [31:0]   steps__4__sum2_in;
+  logic [31:0]   steps__4__sum2_out;
+  logic [15:0]   steps__4__word_in;
+
+  StepUnit steps__4
+  (
+    .clk            (       steps__4__clk       ),
+    .reset          (      steps__4__reset      ),
+    .sum1_in        (     steps__4__sum1_in     ),
+    .sum1_out       (     steps__4__sum1_out    ),
+    .sum2_in        (     steps__4__sum2_in     ),
+    .sum2_out       (     steps__4__sum2_out    ),
+    .word_in        (     steps__4__word_in     )
+  );
+
+  logic [0:0]    steps__5__clk;
+  logic [0:0]    steps__5__reset;
+  logic [31:0]   steps__5__sum1_in;
+  logic [31:0]   steps__5__sum1_out;
+  logic [31:0]   steps__5__sum2_in;
+  logic [31:0]   steps__5__sum2_out;
+  logic [15:0]   steps__5__word_in;
+
+  StepUnit steps__5
+  (
+    .clk            (       steps__5__clk       ),
+    .reset          (      steps__5__reset      ),
+    .sum1_in        (     steps__5__sum1_in     ),
+    .sum1_out       (     steps__5__sum1_out    ),
+    .sum2_in        (     steps__5__sum2_in     ),
+    .sum2_out       (     steps__5__sum2_out    ),
+    .word_in        (     steps__5__word_in     )
+  );
+
+  logic [0:0]    steps__6__clk;
+  logic [0:0]    steps__6__reset;
+  logic [31:0]   steps__6__sum1_in;
+  logic [31:0]   steps__6__sum1_out;
+  logic [31:0]   steps__6__sum2_in;
+  logic [31:0]   steps__6__sum2_out;
+  logic [15:0]   steps__6__word_in;
+
+  StepUnit steps__6
+  (
+    .clk            (       steps__6__clk       ),
+    .reset          (      steps__6__reset      ),
+    .sum1_in        (     steps__6__sum1_in     ),
+    .sum1_out       (     steps__6__sum1_out    ),
+    .sum2_in        (     steps__6__sum2_in     ),
+    .sum2_out       (     steps__6__sum2_out    ),
+    .word_in        (     steps__6__word_in     )
+  );
+
+  logic [0:0]    steps__7__clk;
+  logic [0:0]    steps__7__reset;
+  logic [31:0]   steps__7__sum1_in;
+  logic [31:0]   steps__7__sum1_out;
+  logic [31:0]   steps__7__sum2_in;
+  logic [31:0]   steps__7__sum2_out;
+  logic [15:0]   steps__7__word_in;
+
+  StepUnit steps__7
+  (
+    .clk            (       steps__7__clk       ),
+    .reset          (      steps__7__reset      ),
+    .sum1_in        (     steps__7__sum1_in     ),
+    .sum1_out       (     steps__7__sum1_out    ),
+    .sum2_in        (     steps__7__sum2_in     ),
+    .sum2_out       (     steps__7__sum2_out    ),
+    .word_in        (     steps__7__word_in     )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign steps__0__clk = steps__clk[0];
+  assign steps__1__clk = steps__clk[1];
+  assign steps__2__clk = steps__clk[2];
+  assign steps__3__clk = steps__clk[3];
+  assign steps__4__clk = steps__clk[4];
+  assign steps__5__clk = steps__clk[5];
+  assign steps__6__clk = steps__clk[6];
+  assign steps__7__clk = steps__clk[7];
+  assign steps__0__reset = steps__reset[0];
+  assign steps__1__reset = steps__reset[1];
+  assign steps__2__reset = steps__reset[2];
+  assign steps__3__reset = steps__reset[3];
+  assign steps__4__reset = steps__reset[4];
+  assign steps__5__reset = steps__reset[5];
+  assign steps__6__reset = steps__reset[6];
+  assign steps__7__reset = steps__reset[7];
+  assign steps__0__sum1_in = steps__sum1_in[0];
+  assign steps__1__sum1_in = steps__sum1_in[1];
+  assign steps__2__sum1_in = steps__sum1_in[2];
+  assign steps__3__sum1_in = steps__sum1_in[3];
+  assign steps__4__sum1_in = steps__sum1_in[4];
+  assign steps__5__sum1_in = steps__sum1_in[5];
+  assign steps__6__sum1_in = steps__sum1_in[6];
+  assign steps__7__sum1_in = steps__sum1_in[7];
+  assign steps__sum1_out[0] = steps__0__sum1_out;
+  assign steps__sum1_out[1] = steps__1__sum1_out;
+  assign steps__sum1_out[2] = steps__2__sum1_out;
+  assign steps__sum1_out[3] = steps__3__sum1_out;
+  assign steps__sum1_out[4] = steps__4__sum1_out;
+  assign steps__sum1_out[5] = steps__5__sum1_out;
+  assign steps__sum1_out[6] = steps__6__sum1_out;
+  assign steps__sum1_out[7] = steps__7__sum1_out;
+  assign steps__0__sum2_in = steps__sum2_in[0];
+  assign steps__1__sum2_in = steps__sum2_in[1];
+  assign steps__2__sum2_in = steps__sum2_in[2];
+  assign steps__3__sum2_in = steps__sum2_in[3];
+  assign steps__4__sum2_in = steps__sum2_in[4];
+  assign steps__5__sum2_in = steps__sum2_in[5];
+  assign steps__6__sum2_in = steps__sum2_in[6];
+  assign steps__7__sum2_in = steps__sum2_in[7];
+  assign steps__sum2_out[0] = steps__0__sum2_out;
+  assign steps__sum2_out[1] = steps__1__sum2_out;
+  assign steps__sum2_out[2] = steps__2__sum2_out;
+  assign steps__sum2_out[3] = steps__3__sum2_out;
+  assign steps__sum2_out[4] = steps__4__sum2_out;
+  assign steps__sum2_out[5] = steps__5__sum2_out;
+  assign steps__sum2_out[6] = steps__6__sum2_out;
+  assign steps__sum2_out[7] = steps__7__sum2_out;
+  assign steps__0__word_in = steps__word_in[0];
+  assign steps__1__word_in = steps__word_in[1];
+  assign steps__2__word_in = steps__word_in[2];
+  assign steps__3__word_in = steps__word_in[3];
+  assign steps__4__word_in = steps__word_in[4];
+  assign steps__5__word_in = steps__word_in[5];
+  assign steps__6__word_in = steps__word_in[6];
+  assign steps__7__word_in = steps__word_in[7];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex02_cksum/ChecksumRTL.py, line 93
+  // @s.update
+  // def up_rtl_send():
+  //   s.send.en  = s.in_q.deq.rdy & s.send.rdy
+  //   s.in_q.deq.en = s.in_q.deq.rdy & s.send.rdy
+  
+  always_comb begin : up_rtl_send
+    send__en = in_q__deq__rdy & send__rdy;
+    in_q__deq__en = in_q__deq__rdy & send__rdy;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex02_cksum/ChecksumRTL.py, line 98
+  // @s.update
+  // def up_rtl_sum():
+  //   s.send.msg = ( s.sum2 << 16 ) | s.sum1
+  
+  always_comb begin : up_rtl_sum
+    send__msg = ( sum2 << 16 ) | sum1;
+  end
+
+  // Connections
+  assign in_q__clk = clk;
+  assign in_q__reset = reset;
+  assign steps__clk[0] = clk;
+  assign steps__reset[0] = reset;
+  assign steps__clk[1] = clk;
+  assign steps__reset[1] = reset;
+  assign steps__clk[2] = clk;
+  assign steps__reset[2] = reset;
+  assign steps__clk[3] = clk;
+  assign steps__reset[3] = reset;
+  assign steps__clk[4] = clk;
+  assign steps__reset[4] = reset;
+  assign steps__clk[5] = clk;
+  assign steps__reset[5] = reset;
+  assign steps__clk[6] = clk;
+  assign steps__reset[6] = reset;
+  assign steps__clk[7] = clk;
+  assign steps__reset[7] = reset;
+  assign in_q__enq__en = recv__en;
+  assign in_q__enq__msg = recv__msg;
+  assign recv__rdy = in_q__enq__rdy;
+  assign words[0] = in_q__deq__msg[15:0];
+  assign words[1] = in_q__deq__msg[31:16];
+  assign words[2] = in_q__deq__msg[47:32];
+  assign words[3] = in_q__deq__msg[63:48];
+  assign words[4] = in_q__deq__msg[79:64];
+  assign words[5] = in_q__deq__msg[95:80];
+  assign words[6] = in_q__deq__msg[111:96];
+  assign words[7] = in_q__deq__msg[127:112];
+  assign steps__word_in[0] = words[0];
+  assign steps__sum1_in[0] = 32'd0;
+  assign steps__sum2_in[0] = 32'd0;
+  assign steps__word_in[1] = words[1];
+  assign steps__sum1_in[1] = steps__sum1_out[0];
+  assign steps__sum2_in[1] = steps__sum2_out[0];
+  assign steps__word_in[2] = words[2];
+  assign steps__sum1_in[2] = steps__sum1_out[1];
+  assign steps__sum2_in[2] = steps__sum2_out[1];
+  assign steps__word_in[3] = words[3];
+  assign steps__sum1_in[3] = steps__sum1_out[2];
+  assign steps__sum2_in[3] = steps__sum2_out[2];
+  assign steps__word_in[4] = words[4];
+  assign steps__sum1_in[4] = steps__sum1_out[3];
+  assign steps__sum2_in[4] = steps__sum2_out[3];
+  assign steps__word_in[5] = words[5];
+  assign steps__sum1_in[5] = steps__sum1_out[4];
+  assign steps__sum2_in[5] = steps__sum2_out[4];
+  assign steps__word_in[6] = words[6];
+  assign steps__sum1_in[6] = steps__sum1_out[5];
+  assign steps__sum2_in[6] = steps__sum2_out[5];
+  assign steps__word_in[7] = words[7];
+  assign steps__sum1_in[7] = steps__sum1_out[6];
+  assign steps__sum2_in[7] = steps__sum2_out[6];
+  assign sum1 = steps__sum1_out[7];
+  assign sum2 = steps__sum2_out[7];
+
+endmodule
+
+
+// Definition of PyMTL Component NormalQueueCtrlRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 42
+module NormalQueueCtrlRTL__num_entries_2
+(
+  input  logic [0:0]    clk,
+  output logic [1:0]    count,
+  input  logic [0:0]    deq_en,
+  output logic [0:0]    deq_rdy,
+  input  logic [0:0]    enq_en,
+  output logic [0:0]    enq_rdy,
+  output logic [0:0]    raddr,
+  input  logic [0:0]    reset,
+  output logic [0:0]    waddr,
+  output logic [0:0]    wen
+);
+  // Wire declarations
+  logic [0:0]    deq_xfer;
+  logic [0:0]    enq_xfer;
+  logic [0:0]    head;
+  logic [0:0]    head_next;
+  logic [0:0]    tail;
+  logic [0:0]    tail_next;
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 95
+  // @s.update
+  // def up_next():
+  //   s.head_next = s.head + PtrType(1) if s.head < s.last_idx else PtrType(0)
+  //   s.tail_next = s.tail + PtrType(1) if s.tail < s.last_idx else PtrType(0)
+  
+  always_comb begin : up_next
+    head_next = ( head < 1'd1 ) ? head + 1'd1 : 1'd0;
+    tail_next = ( tail < 1'd1 ) ? tail + 1'd1 : 1'd0;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 85
+  // @s.update
+  // def up_rdy_signals():
+  //     s.enq_rdy = ( s.count < s.num_entries ) & ~s.reset
+  //     s.deq_rdy = ( s.count > CountType(0) ) & ~s.reset
+  
+  always_comb begin : up_rdy_signals
+    enq_rdy = ( count < 2'd2 ) & ( ~reset );
+    deq_rdy = ( count > 2'd0 ) & ( ~reset );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 90
+  // @s.update
+  // def up_xfer_signals():
+  //   s.enq_xfer = s.enq_en & s.enq_rdy
+  //   s.deq_xfer = s.deq_en & s.deq_rdy
+  
+  always_comb begin : up_xfer_signals
+    enq_xfer = enq_en & enq_rdy;
+    deq_xfer = deq_en & deq_rdy;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/queues.py, line 100
+  // @s.update_ff
+  // def up_reg():
+  // 
+  //   if s.reset:
+  //     s.head  <<= PtrType(0)
+  //     s.tail  <<= PtrType(0)
+  //     s.count <<= CountType(0)
+  // 
+  //   else:
+  //     s.head  <<= s.head_next if s.deq_xfer else s.head
+  //     s.tail  <<= s.tail_next if s.enq_xfer else s.tail
+  //     s.count <<= s.count + CountType(1) if s.enq_xfer & ~s.deq_xfer else \
+  //                 s.count - CountType(1) if s.deq_xfer & ~s.enq_xfer else \
+  //                 s.count
+  
+  always_ff @(posedge clk) begin : up_reg
+    if ( reset ) begin
+      head <= 1'd0;
+      tail <= 1'd0;
+      count <= 2'd0;
+    end
+    else begin
+      head <= deq_xfer ? head_next : head;
+      tail <= enq_xfer ? tail_next : tail;
+      count <= ( enq_xfer & ( ~deq_xfer ) ) ? count + 2'd1 : ( deq_xfer & ( ~enq_xfer ) ) ? count - 2'd1 : count;
+    end
+  end
+
+  // Connections
+  assign wen = enq_xfer;
+  assign waddr = tail;
+  assign raddr = head;
+
+endmodule
+
+
+// Definition of PyMTL Component RegisterFile
+// File: /root/package/pymtl3/stdlib/rtl/RegisterFile.py, Line: 4
+// Full name: RegisterFile__Type_XcelReqMsg_5_32__nregs_2__rd_ports_1__wr_ports_1__const_zero_False
+module RegisterFile__a1c63a028f9f43b9
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    raddr__0,
+  output logic [0:0]    rdata__0__type_,
+  output logic [4:0]    rdata__0__addr,
+  output logic [31:0]   rdata__0__data,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    waddr__0,
+  input  logic [0:0]    wdata__0__type_,
+  input  logic [4:0]    wdata__0__addr,
+  input  logic [31:0]   wdata__0__data,
+  input  logic [0:0]    wen__0
+);
+  // Struct/Array ports in the form of wires
+  logic [0:0]    raddr [0:0];
+  logic [0:0]    rdata__type_ [0:0];
+  logic [4:0]    rdata__addr [0:0];
+  logic [31:0]   rdata__data [0:0];
+  logic [37:0]   rdata [0:0];
+  logic [0:0]    waddr [0:0];
+  logic [0:0]    wdata__type_ [0:0];
+  logic [4:0]    wdata__addr [0:0];
+  logic [31:0]   wdata__data [0:0];
+  logic [37:0]   wdata [0:0];
+  logic [0:0]    wen [0:0];
+
+  // Wire declarations
+  logic [0:0]    regs__type_ [0:1];
+  logic [4:0]    regs__addr [0:1];
+  logic [31:0]   regs__data [0:1];
+  logic [37:0]   regs [0:1];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/RegisterFile.py, line 20
+  // @s.update
+  // def up_rf_read():
+  //   for i in range( rd_ports ):
+  //     s.rdata[i] = s.regs[ s.raddr[i] ]
+  
+  integer __loopvar__up_rf_read_i;
+  
+  always_comb begin : up_rf_read
+    for ( __loopvar__up_rf_read_i = 0; __loopvar__up_rf_read_i < 32'd1; __loopvar__up_rf_read_i = __loopvar__up_rf_read_i + 1 )
+      rdata[__loopvar__up_rf_read_i] = regs[raddr[__loopvar__up_rf_read_i]];
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/RegisterFile.py, line 32
+  // @s.update_ff
+  // def up_rf_write():
+  //   for i in range( wr_ports ):
+  //     if s.wen[i]:
+  //       s.regs[ s.waddr[i] ] <<= s.wdata[i]
+  
+  integer __loopvar__up_rf_write_i;
+  
+  always_ff @(posedge clk) begin : up_rf_write
+    for ( __loopvar__up_rf_write_i = 0; __loopvar__up_rf_write_i < 32'd1; __loopvar__up_rf_write_i = __loopvar__up_rf_write_i + 1 )
+      if ( wen[__loopvar__up_rf_write_i] ) begin
+        regs[waddr[__loopvar__up_rf_write_i]] <= wdata[__loopvar__up_rf_write_i];
+      end
+  end
+
+  // Connections
+  assign raddr[0] = raddr__0;
+  assign rdata__0__type_ = rdata__type_[0];
+  assign rdata__0__addr = rdata__addr[0];
+  assign rdata__0__data = rdata__data[0];
+  assign rdata__0__type_ = rdata[0][37:37];
+  assign rdata__0__addr = rdata[0][36:32];
+  assign rdata__0__data = rdata[0][31:0];
+  assign waddr[0] = waddr__0;
+  assign wdata__type_[0] = wdata__0__type_;
+  assign wdata__addr[0] = wdata__0__addr;
+  assign wdata__data[0] = wdata__0__data;
+  assign wdata[0][37:37] = wdata__0__type_;
+  assign wdata[0][36:32] = wdata__0__addr;
+  assign wdata[0][31:0] = wdata__0__data;
+  assign wen[0] = wen__0;
+
+endmodule
+
+
+// Definition of PyMTL Component NormalQueueDpathRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 19
+module NormalQueueDpathRTL__EntryType_XcelReqMsg_5_32__num_entries_2
+(
+  input  logic [0:0]    clk,
+  output logic [0:0]    deq_msg__type_,
+  output logic [4:0]    deq_msg__addr,
+  output logic [31:0]   deq_msg__data,
+  input  logic [0:0]    enq_msg__type_,
+  input  logic [4:0]    enq_msg__addr,
+  input  logic [31:0]   enq_msg__data,
+  input  logic [0:0]    raddr,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    waddr,
+  input  logic [0:0]    wen
+);
+  // Struct/Array ports in the form of wires
+  logic [37:0]   deq_msg;
+  logic [37:0]   enq_msg;
+
+  // Struct/Array ports of sub-components in the form of wires
+  logic [0:0]    queue__raddr [0:0];
+  logic [0:0]    queue__rdata__type_ [0:0];
+  logic [4:0]    queue__rdata__addr [0:0];
+  logic [31:0]   queue__rdata__data [0:0];
+  logic [37:0]   queue__rdata [0:0];
+  logic [0:0]    queue__waddr [0:0];
+  logic [0:0]    queue__wdata__type_ [0:0];
+  logic [4:0]    queue__wdata__addr [0:0];
+  logic [31:0]   queue__wdata__data [0:0];
+  logic [37:0]   queue__wdata [0:0];
+  logic [0:0]    queue__wen [0:0];
+
+  // Sub-component declarations
+  logic [0:0]    queue__clk;
+  logic [0:0]    queue__raddr__0;
+  logic [0:0]    queue__rdata__0__type_;
+  logic [4:0]    queue__rdata__0__addr;
+  logic [31:0]   queue__rdata__0__data;
+  logic [0:0]    queue__reset;
+  logic [0:0]    queue__waddr__0;
+  logic [0:0]    queue__wdata__0__type_;
+  logic [4:0]    queue__wdata__0__addr;
+  logic [31:0]   queue__wdata__0__data;
+  logic [0:0]    queue__wen__0;
+
+  RegisterFile__a1c63a028f9f43b9 queue
+  (
+    .clk            (         queue__clk        ),
+    .raddr__0       (      queue__raddr__0      ),
+    .rdata__0__type_(   queue__rdata__0__type_  ),
+    .rdata__0__addr (   queue__rdata__0__addr   ),
+    .rdata__0__data (   queue__rdata__0__data   ),
+    .reset          (        queue__reset       ),
+    .waddr__0       (      queue__waddr__0      ),
+    .wdata__0__type_(   queue__wdata__0__type_  ),
+    .wdata__0__addr (   queue__wdata__0__addr   ),
+    .wdata__0__data (   queue__wdata__0__data   ),
+    .wen__0         (       queue__wen__0       )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign queue__raddr__0 = queue__raddr[0];
+  assign queue__rdata__type_[0] = queue__rdata__0__type_;
+  assign queue__rdata__addr[0] = queue__rdata__0__addr;
+  assign queue__rdata__data[0] = queue__rdata__0__data;
+  assign queue__rdata[0][37:37] = queue__rdata__0__type_;
+  assign queue__rdata[0][36:32] = queue__rdata__0__addr;
+  assign queue__rdata[0][31:0] = queue__rdata__0__data;
+  assign queue__waddr__0 = queue__waddr[0];
+  assign queue__wdata__0__type_ = queue__wdata__type_[0];
+  assign queue__wdata__0__addr = queue__wdata__addr[0];
+  assign queue__wdata__0__data = queue__wdata__data[0];
+  assign queue__wdata__0__type_ = queue__wdata[0][37:37];
+  assign queue__wdata__0__addr = queue__wdata[0][36:32];
+  assign queue__wdata__0__data = queue__wdata[0][31:0];
+  assign queue__wen__0 = queue__wen[0];
+
+  // Connections
+  assign deq_msg__type_ = deq_msg[37:37];
+  assign deq_msg__addr = deq_msg[36:32];
+  assign deq_msg__data = deq_msg[31:0];
+  assign enq_msg[37:37] = enq_msg__type_;
+  assign enq_msg[36:32] = enq_msg__addr;
+  assign enq_msg[31:0] = enq_msg__data;
+  assign queue__clk = clk;
+  assign queue__reset = reset;
+  assign queue__raddr[0] = raddr;
+  assign deq_msg = queue__rdata[0];
+  assign queue__wen[0] = wen;
+  assign queue__waddr[0] = waddr;
+  assign queue__wdata[0] = enq_msg;
+
+endmodule
+
+
+// Definition of PyMTL Component NormalQueueRTL
+// File: /root/package/pymtl3/stdlib/rtl/queues.py, Line: 119
+module NormalQueueRTL__EntryType_XcelReqMsg_5_32__num_entries_2
+(
+  input  logic [0:0]    clk,
+  output logic [1:0]    count,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    deq__en,
+  output logic [0:0]    deq__msg__type_,
+  output logic [4:0]    deq__msg__addr,
+  output logic [31:0]   deq__msg__data,
+  output logic [0:0]    deq__rdy,
+  input  logic [0:0]    enq__en,
+  input  logic [0:0]    enq__msg__type_,
+  input  logic [4:0]    enq__msg__addr,
+  input  logic [31:0]   enq__msg__data,
+  output logic [0:0]    enq__rdy
+);
+  // Struct/Array ports in the form of wires
+  logic [37:0]   deq__msg;
+  logic [37:0]   enq__msg;
+
+  // Struct/Array ports of sub-components in the form of wires
+  logic [37:0]   dpath__deq_msg;
+  logic [37:0]   dpath__enq_msg;
+
+  // Sub-component declarations
+  logic [0:0]    ctrl__clk;
+  logic [1:0]    ctrl__count;
+  logic [0:0]    ctrl__deq_en;
+  logic [0:0]    ctrl__deq_rdy;
+  logic [0:0]    ctrl__enq_en;
+  logic [0:0]    ctrl__enq_rdy;
+  logic [0:0]    ctrl__raddr;
+  logic [0:0]    ctrl__reset;
+  logic [0:0]    ctrl__waddr;
+  logic [0:0]    ctrl__wen;
+
+  NormalQueueCtrlRTL__num_entries_2 ctrl
+  (
+    .clk            (         ctrl__clk         ),
+    .count          (        ctrl__count        ),
+    .deq_en         (        ctrl__deq_en       ),
+    .deq_rdy        (       ctrl__deq_rdy       ),
+    .enq_en         (        ctrl__enq_en       ),
+    .enq_rdy        (       ctrl__enq_rdy       ),
+    .raddr          (        ctrl__raddr        ),
+    .reset          (        ctrl__reset        ),
+    .waddr          (        ctrl__waddr        ),
+    .wen            (         ctrl__wen         )
+  );
+
+  logic [0:0]    dpath__clk;
+  logic [0:0]    dpath__deq_msg__type_;
+  logic [4:0]    dpath__deq_msg__addr;
+  logic [31:0]   dpath__deq_msg__data;
+  logic [0:0]    dpath__enq_msg__type_;
+  logic [4:0]    dpath__enq_msg__addr;
+  logic [31:0]   dpath__enq_msg__data;
+  logic [0:0]    dpath__raddr;
+  logic [0:0]    dpath__reset;
+  logic [0:0]    dpath__waddr;
+  logic [0:0]    dpath__wen;
+
+  NormalQueueDpathRTL__EntryType_XcelReqMsg_5_32__num_entries_2 dpath
+  (
+    .clk            (         dpath__clk        ),
+    .deq_msg__type_ (   dpath__deq_msg__type_   ),
+    .deq_msg__addr  (    dpath__deq_msg__addr   ),
+    .deq_msg__data  (    dpath__deq_msg__data   ),
+    .enq_msg__type_ (   dpath__enq_msg__type_   ),
+    .enq_msg__addr  (    dpath__enq_msg__addr   ),
+    .enq_msg__data  (    dpath__enq_msg__data   ),
+    .raddr          (        dpath__raddr       ),
+    .reset          (        dpath__reset       ),
+    .waddr          (        dpath__waddr       ),
+    .wen            (         dpath__wen        )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign dpath__deq_msg[37:37] = dpath__deq_msg__type_;
+  assign dpath__deq_msg[36:32] = dpath__deq_msg__addr;
+  assign dpath__deq_msg[31:0] = dpath__deq_msg__data;
+  assign dpath__enq_msg__type_ = dpath__enq_msg[37:37];
+  assign dpath__enq_msg__addr = dpath__enq_msg[36:32];
+  assign dpath__enq_msg__data = dpath__enq_msg[31:0];
+
+  // Connections
+  assign deq__msg__type_ = deq__msg[37:37];
+  assign deq__msg__addr = deq__msg[36:32];
+  assign deq__msg__data = deq__msg[31:0];
+  assign enq__msg[37:37] = enq__msg__type_;
+  assign enq__msg[36:32] = enq__msg__addr;
+  assign enq__msg[31:0] = enq__msg__data;
+  assign ctrl__clk = clk;
+  assign ctrl__reset = reset;
+  assign dpath__clk = clk;
+  assign dpath__reset = reset;
+  assign dpath__wen = ctrl__wen;
+  assign dpath__waddr = ctrl__waddr;
+  assign dpath__raddr = ctrl__raddr;
+  assign ctrl__enq_en = enq__en;
+  assign enq__rdy = ctrl__enq_rdy;
+  assign ctrl__deq_en = deq__en;
+  assign deq__rdy = ctrl__deq_rdy;
+  assign count = ctrl__count;
+  assign dpath__enq_msg = enq__msg;
+  assign deq__msg = dpath__deq_msg;
+
+endmodule
+
+
+// Definition of PyMTL Component Reg
+// File: /root/package/pymtl3/stdlib/rtl/registers.py, Line: 4
+module Reg__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [31:0]   in_,
+  output logic [31:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/registers.py, line 10
+  // @s.update_ff
+  // def up_reg():
+  //   s.out <<= s.in_
+  
+  always_ff @(posedge clk) begin : up_reg
+    out <= in_;
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component ChecksumXcelRTL
+// File: /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, Line: 19
+module ChecksumXcelRTL
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  input  logic [0:0]    xcel__req__en,
+  input  logic [0:0]    xcel__req__msg__type_,
+  input  logic [4:0]    xcel__req__msg__addr,
+  input  logic [31:0]   xcel__req__msg__data,
+  output logic [0:0]    xcel__req__rdy,
+  output logic [0:0]    xcel__resp__en,
+  output logic [0:0]    xcel__resp__msg__type_,
+  output logic [31:0]   xcel__resp__msg__data,
+  input  logic [0:0]    xcel__resp__rdy
+);
+  // Struct/Array ports in the form of wires
+  logic [37:0]   xcel__req__msg;
+  logic [32:0]   xcel__resp__msg;
+
+  // Wire declarations
+  logic [0:0]    start_pulse;
+  logic [1:0]    state;
+  logic [1:0]    state_next;
+
+  // Struct/Array ports of sub-components in the form of wires
+  logic [37:0]   in_q__deq__msg;
+  logic [37:0]   in_q__enq__msg;
+  logic [0:0]    reg_file__clk [0:5];
+  logic [31:0]   reg_file__in_ [0:5];
+  logic [31:0]   reg_file__out [0:5];
+  logic [0:0]    reg_file__reset [0:5];
+
+  // Sub-component declarations
+  logic [0:0]    checksum_unit__clk;
+  logic [0:0]    checksum_unit__reset;
+  logic [0:0]    checksum_unit__recv__en;
+  logic [127:0]  checksum_unit__recv__msg;
+  logic [0:0]    checksum_unit__recv__rdy;
+  logic [0:0]    checksum_unit__send__en;
+  logic [31:0]   checksum_unit__send__msg;
+  logic [0:0]    checksum_unit__send__rdy;
+
+  ChecksumRTL checksum_unit
+  (
+    .clk            (     checksum_unit__clk    ),
+    .reset          (    checksum_unit__reset   ),
+    .recv__en       (  checksum_unit__recv__en  ),
+    .recv__msg      (  checksum_unit__recv__msg ),
+    .recv__rdy      (  checksum_unit__recv__rdy ),
+    .send__en       (  checksum_unit__send__en  ),
+    .send__msg      (  checksum_unit__send__msg ),
+    .send__rdy      (  checksum_unit__send__rdy )
+  );
+
+  logic [0:0]    in_q__clk;
+  logic [1:0]    in_q__count;
+  logic [0:0]    in_q__reset;
+  logic [0:0]    in_q__deq__en;
+  logic [0:0]    in_q__deq__msg__type_;
+  logic [4:0]    in_q__deq__msg__addr;
+  logic [31:0]   in_q__deq__msg__data;
+  logic [0:0]    in_q__deq__rdy;
+  logic [0:0]    in_q__enq__en;
+  logic [0:0]    in_q__enq__msg__type_;
+  logic [4:0]    in_q__enq__msg__addr;
+  logic [31:0]   in_q__enq__msg__data;
+  logic [0:0]    in_q__enq__rdy;
+
+  NormalQueueRTL__EntryType_XcelReqMsg_5_32__num_entries_2 in_q
+  (
+    .clk            (         in_q__clk         ),
+    .count          (        in_q__count        ),
+    .reset          (        in_q__reset        ),
+    .deq__en        (       in_q__deq__en       ),
+    .deq__msg__type_(   in_q__deq__msg__type_   ),
+    .deq__msg__addr (    in_q__deq__msg__addr   ),
+    .deq__msg__data (    in_q__deq__msg__data   ),
+    .deq__rdy       (       in_q__deq__rdy      ),
+    .enq__en        (       in_q__enq__en       ),
+    .enq__msg__type_(   in_q__enq__msg__type_   ),
+    .enq__msg__addr (    in_q__enq__msg__addr   ),
+    .enq__msg__data (    in_q__enq__msg__data   ),
+    .enq__rdy       (       in_q__enq__rdy      )
+  );
+
+  logic [0:0]    reg_file__0__clk;
+  logic [31:0]   reg_file__0__in_;
+  logic [31:0]   reg_file__0__out;
+  logic [0:0]    reg_file__0__reset;
+
+  Reg__Type_Bits32 reg_file__0
+  (
+    .clk            (      reg_file__0__clk     ),
+    .in_            (      reg_file__0__in_     ),
+    .out            (      reg_file__0__out     ),
+    .reset          (     reg_file__0__reset    )
+  );
+
+  logic [0:0]    reg_file__1__clk;
+  logic [31:0]   reg_file__1__in_;
+  logic [31:0]   reg_file__1__out;
+  logic [0:0]    reg_file__1__reset;
+
+  Reg__Type_Bits32 reg_file__1
+  (
+    .clk            (      reg_file__1__clk     ),
+    .in_            (      reg_file__1__in_     ),
+    .out            (      reg_file__1__out     ),
+    .reset          (     reg_file__1__reset    )
+  );
+
+  logic [0:0]    reg_file__2__clk;
+  logic [31:0]   reg_file__2__in_;
+  logic [31:0]   reg_file__2__out;
+  logic [0:0]    reg_file__2__reset;
+
+  Reg__Type_Bits32 reg_file__2
+  (
+    .clk            (      reg_file__2__clk     ),
+    .in_            (      reg_file__2__in_     ),
+    .out            (      reg_file__2__out     ),
+    .reset          (     reg_file__2__reset    )
+  );
+
+  logic [0:0]    reg_file__3__clk;
+  logic [31:0]   reg_file__3__in_;
+  logic [31:0]   reg_file__3__out;
+  logic [0:0]    reg_file__3__reset;
+
+  Reg__Type_Bits32 reg_file__3
+  (
+    .clk            (      reg_file__3__clk     ),
+    .in_            (      reg_file__3__in_     ),
+    .out            (      reg_file__3__out     ),
+    .reset          (     reg_file__3__reset    )
+  );
+
+  logic [0:0]    reg_file__4__clk;
+  logic [31:0]   reg_file__4__in_;
+  logic [31:0]   reg_file__4__out;
+  logic [0:0]    reg_file__4__reset;
+
+  Reg__Type_Bits32 reg_file__4
+  (
+    .clk            (      reg_file__4__clk     ),
+    .in_            (      reg_file__4__in_     ),
+    .out            (      reg_file__4__out     ),
+    .reset          (     reg_file__4__reset    )
+  );
+
+  logic [0:0]    reg_file__5__clk;
+  logic [31:0]   reg_file__5__in_;
+  logic [31:0]   reg_file__5__out;
+  logic [0:0]    reg_file__5__reset;
+
+  Reg__Type_Bits32 reg_file__5
+  (
+    .clk            (      reg_file__5__clk     ),
+    .in_            (      reg_file__5__in_     ),
+    .out            (      reg_file__5__out     ),
+    .reset          (     reg_file__5__reset    )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign in_q__deq__msg[37:37] = in_q__deq__msg__type_;
+  assign in_q__deq__msg[36:32] = in_q__deq__msg__addr;
+  assign in_q__deq__msg[31:0] = in_q__deq__msg__data;
+  assign in_q__enq__msg__type_ = in_q__enq__msg[37:37];
+  assign in_q__enq__msg__addr = in_q__enq__msg[36:32];
+  assign in_q__enq__msg__data = in_q__enq__msg[31:0];
+  assign reg_file__0__clk = reg_file__clk[0];
+  assign reg_file__1__clk = reg_file__clk[1];
+  assign reg_file__2__clk = reg_file__clk[2];
+  assign reg_file__3__clk = reg_file__clk[3];
+  assign reg_file__4__clk = reg_file__clk[4];
+  assign reg_file__5__clk = reg_file__clk[5];
+  assign reg_file__0__in_ = reg_file__in_[0];
+  assign reg_file__1__in_ = reg_file__in_[1];
+  assign reg_file__2__in_ = reg_file__in_[2];
+  assign reg_file__3__in_ = reg_file__in_[3];
+  assign reg_file__4__in_ = reg_file__in_[4];
+  assign reg_file__5__in_ = reg_file__in_[5];
+  assign reg_file__out[0] = reg_file__0__out;
+  assign reg_file__out[1] = reg_file__1__out;
+  assign reg_file__out[2] = reg_file__2__out;
+  assign reg_file__out[3] = reg_file__3__out;
+  assign reg_file__out[4] = reg_file__4__out;
+  assign reg_file__out[5] = reg_file__5__out;
+  assign reg_file__0__reset = reg_file__reset[0];
+  assign reg_file__1__reset = reg_file__reset[1];
+  assign reg_file__2__reset = reg_file__reset[2];
+  assign reg_file__3__reset = reg_file__reset[3];
+  assign reg_file__4__reset = reg_file__reset[4];
+  assign reg_file__5__reset = reg_file__reset[5];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, line 91
+  // @s.update
+  // def up_fsm_output():
+  //   if s.state == s.XCFG:
+  //     s.in_q.deq.en  = s.in_q.deq.rdy
+  //     s.xcel.resp.en = s.in_q.deq.rdy
+  //     s.checksum_unit.recv.en  = s.start_pulse & s.checksum_unit.recv.rdy
+  //     s.checksum_unit.send.rdy = b1(1)
+  // 
+  //   elif s.state == s.WAIT:
+  //     s.in_q.deq.en  = b1(0)
+  //     s.xcel.resp.en = b1(0)
+  //     s.checksum_unit.recv.en  = s.checksum_unit.recv.rdy
+  //     s.checksum_unit.send.rdy = b1(1)
+  // 
+  //   else: # s.state == s.BUSY:
+  //     s.in_q.deq.en = b1(0)
+  //     s.xcel.resp.en = b1(0)
+  //     s.checksum_unit.recv.en  = b1(0)
+  //     s.checksum_unit.send.rdy = b1(1)
+  
+  always_comb begin : up_fsm_output
+    if ( state == 2'd0 ) begin
+      in_q__deq__en = in_q__deq__rdy;
+      xcel__resp__en = in_q__deq__rdy;
+      checksum_unit__recv__en = start_pulse & checksum_unit__recv__rdy;
+      checksum_unit__send__rdy = 1'd1;
+    end
+    else if ( state == 2'd1 ) begin
+      in_q__deq__en = 1'd0;
+      xcel__resp__en = 1'd0;
+      checksum_unit__recv__en = checksum_unit__recv__rdy;
+      checksum_unit__send__rdy = 1'd1;
+    end
+    else begin
+      in_q__deq__en = 1'd0;
+      xcel__resp__en = 1'd0;
+      checksum_unit__recv__en = 1'd0;
+      checksum_unit__send__rdy = 1'd1;
+    end
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, line 111
+  // @s.update
+  // def up_resp_msg():
+  //   s.xcel.resp.msg.type_ = s.in_q.deq.msg.type_
+  //   s.xcel.resp.msg.data  = b32(0)
+  //   if s.in_q.deq.msg.type_ == s.RD:
+  //     s.xcel.resp.msg.data = s.reg_file[ s.in_q.deq.msg.addr[0:3] ].out
+  
+  always_comb begin : up_resp_msg
+    xcel__resp__msg__type_ = in_q__deq__msg__type_;
+    xcel__resp__msg__data = 32'd0;
+    if ( in_q__deq__msg__type_ == 1'd0 ) begin
+      xcel__resp__msg__data = reg_file__out[in_q__deq__msg__addr[2:0]];
+    end
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, line 61
+  // @s.update
+  // def up_start_pulse():
+  //   s.start_pulse = (
+  //     s.xcel.resp.en and
+  //     s.in_q.deq.msg.type_ == s.WR and
+  //     s.in_q.deq.msg.addr == b5(4)
+  //   )
+  
+  always_comb begin : up_start_pulse
+    start_pulse = xcel__resp__en && ( in_q__deq__msg__type_ == 1'd1 ) && ( in_q__deq__msg__addr == 5'd4 );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, line 69
+  // @s.update
+  // def up_state_next():
+  //   if s.state == s.XCFG:
+  //     s.state_next = (
+  //       s.WAIT if s.start_pulse & ~s.checksum_unit.recv.rdy else
+  //       s.BUSY if s.start_pulse &  s.checksum_unit.recv.rdy else
+  //       s.XCFG
+  //     )
+  // 
+  //   elif s.state == s.WAIT:
+  //     s.state_next = s.BUSY if s.checksum_unit.recv.rdy else s.WAIT
+  // 
+  //   else: # s.state == s.BUSY
+  //     s.state_next = s.XCFG if s.checksum_unit.send.en else s.BUSY
+  
+  always_comb begin : up_state_next
+    if ( state == 2'd0 ) begin
+      state_next = ( start_pulse & ( ~checksum_unit__recv__rdy ) ) ? 2'd1 : ( start_pulse & checksum_unit__recv__rdy ) ? 2'd2 : 2'd0;
+    end
+    else if ( state == 2'd1 ) begin
+      state_next = checksum_unit__recv__rdy ? 2'd2 : 2'd1;
+    end
+    else
+      state_next = checksum_unit__send__en ? 2'd0 : 2'd2;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, line 118
+  // @s.update
+  // def up_wr_regfile():
+  //   for i in range(6):
+  //     s.reg_file[i].in_ = s.reg_file[i].out
+  // 
+  //   if s.in_q.deq.en and s.in_q.deq.msg.type_ == s.WR:
+  //     for i in range(6):
+  //       s.reg_file[i].in_ = (
+  //         s.in_q.deq.msg.data if b5(i) == s.in_q.deq.msg.addr else
+  //         s.reg_file[i].out
+  //       )
+  // 
+  //   if s.checksum_unit.send.en:
+  //     s.reg_file[5].in_ = s.checksum_unit.send.msg
+  
+  integer __loopvar__up_wr_regfile_i;
+  
+  always_comb begin : up_wr_regfile
+    for ( __loopvar__up_wr_regfile_i = 0; __loopvar__up_wr_regfile_i < 6; __loopvar__up_wr_regfile_i = __loopvar__up_wr_regfile_i + 1 )
+      reg_file__in_[__loopvar__up_wr_regfile_i] = reg_file__out[__loopvar__up_wr_regfile_i];
+    if ( in_q__deq__en && ( in_q__deq__msg__type_ == 1'd1 ) ) begin
+      for ( __loopvar__up_wr_regfile_i = 0; __loopvar__up_wr_regfile_i < 6; __loopvar__up_wr_regfile_i = __loopvar__up_wr_regfile_i + 1 )
+        reg_file__in_[__loopvar__up_wr_regfile_i] = ( __loopvar__up_wr_regfile_i[4:0] == in_q__deq__msg__addr ) ? in_q__deq__msg__data : reg_file__out[__loopvar__up_wr_regfile_i];
+    end
+    if ( checksum_unit__send__en ) begin
+      reg_file__in_[5] = checksum_unit__send__msg;
+    end
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/examples/ex04_xcel/ChecksumXcelRTL.py, line 84
+  // @s.update_ff
+  // def up_state():
+  //   if s.reset:
+  //     s.state <<= s.XCFG
+  //   else:
+  //     s.state <<= s.state_next
+  
+  always_ff @(posedge clk) begin : up_state
+    if ( reset ) begin
+      state <= 2'd0;
+    end
+    else
+      state <= state_next;
+  end
+
+  // Connections
+  assign xcel__req__msg[37:37] = xcel__req__msg__type_;
+  assign xcel__req__msg[36:32] = xcel__req__msg__addr;
+  assign xcel__req__msg[31:0] = xcel__req__msg__data;
+  assign xcel__resp__msg__type_ = xcel__resp__msg[32:32];
+  assign xcel__resp__msg__data = xcel__resp__msg[31:0];
+  assign in_q__clk = clk;
+  assign in_q__reset = reset;
+  assign reg_file__clk[0] = clk;
+  assign reg_file__reset[0] = reset;
+  assign reg_file__clk[1] = clk;
+  assign reg_file__reset[1] = reset;
+  assign reg_file__clk[2] = clk;
+  assign reg_file__reset[2] = reset;
+  assign reg_file__clk[3] = clk;
+  assign reg_file__reset[3] = reset;
+  assign reg_file__clk[4] = clk;
+  assign reg_file__reset[4] = reset;
+  assign reg_file__clk[5] = clk;
+  assign reg_file__reset[5] = reset;
+  assign checksum_unit__clk = clk;
+  assign checksum_unit__reset = reset;
+  assign in_q__enq__en = xcel__req__en;
+  assign in_q__enq__msg = xcel__req__msg;
+  assign xcel__req__rdy = in_q__enq__rdy;
+  assign checksum_unit__recv__msg[31:0] = reg_file__out[0];
+  assign checksum_unit__recv__msg[63:32] = reg_file__out[1];
+  assign checksum_unit__recv__msg[95:64] = reg_file__out[2];
+  assign checksum_unit__recv__msg[127:96] = reg_file__out[3];
+
+endmodule
@@ -0,0 +1,54 @@
+//-------------------------------------------------------------------------
+// Crossbar__nports_3__dtype_Bits16.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component Crossbar
+// File: /root/package/pymtl3/stdlib/rtl/Crossbar.py, Line: 10
+module Crossbar__nports_3__dtype_Bits16
+(
+  input  logic [0:0]    clk,
+  input  logic [15:0]   in___0,
+  input  logic [15:0]   in___1,
+  input  logic [15:0]   in___2,
+  output logic [15:0]   out__0,
+  output logic [15:0]   out__1,
+  output logic [15:0]   out__2,
+  input  logic [0:0]    reset,
+  input  logic [1:0]    sel__0,
+  input  logic [1:0]    sel__1,
+  input  logic [1:0]    sel__2
+);
+  // Struct/Array ports in the form of wires
+  logic [15:0]   in_ [0:2];
+  logic [15:0]   out [0:2];
+  logic [1:0]    sel [0:2];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/Crossbar.py, line 20
+  // @s.update
+  // def comb_logic():
+  // 
+  //   for i in range( nports ):
+  //     s.out[i] = s.in_[ s.sel[ i ] ]
+  
+  integer __loopvar__comb_logic_i;
+  
+  always_comb begin : comb_logic
+    for ( __loopvar__comb_logic_i = 0; __loopvar__comb_logic_i < 32'd3; __loopvar__comb_logic_i = __loopvar__comb_logic_i + 1 )
+      out[__loopvar__comb_logic_i] = in_[sel[__loopvar__comb_logic_i]];
+  end
+
+  // Connections
+  assign in_[0] = in___0;
+  assign in_[1] = in___1;
+  assign in_[2] = in___2;
+  assign out__0 = out[0];
+  assign out__1 = out[1];
+  assign out__2 = out[2];
+  assign sel[0] = sel__0;
+  assign sel[1] = sel__1;
+  assign sel[2] = sel__2;
+
+endmodule
@@ -0,0 +1,36 @@
+//-------------------------------------------------------------------------
+// Encoder__in_nbits_5__out_nbits_3.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component Encoder
+// File: /root/package/pymtl3/stdlib/rtl/Encoder.py, Line: 13
+module Encoder__in_nbits_5__out_nbits_3
+(
+  input  logic [0:0]    clk,
+  input  logic [4:0]    in_,
+  output logic [2:0]    out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/Encoder.py, line 31
+  // @s.update
+  // def encode():
+  //   s.out = OutType( 0 )
+  //   for i in range( s.in_nbits ):
+  //     if s.in_[i]:
+  //       s.out = OutType( i )
+  
+  integer __loopvar__encode_i;
+  
+  always_comb begin : encode
+    out = 3'd0;
+    for ( __loopvar__encode_i = 0; __loopvar__encode_i < 32'd5; __loopvar__encode_i = __loopvar__encode_i + 1 )
+      if ( in_[__loopvar__encode_i] ) begin
+        out = __loopvar__encode_i[2:0];
+      end
+  end
+
+endmodule
@@ -0,0 +1,109 @@
+//-------------------------------------------------------------------------
+// NormalQueue1RTL__Type_Bits32.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component RegEn
+// File: /root/package/pymtl3/stdlib/rtl/registers.py, Line: 17
+module RegEn__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    en,
+  input  logic [31:0]   in_,
+  output logic [31:0]   out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/registers.py, line 25
+  // @s.update_ff
+  // def up_regen():
+  //   if s.en:
+  //     s.out <<= s.in_
+  
+  always_ff @(posedge clk) begin : up_regen
+    if ( en ) begin
+      out <= in_;
+    end
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component NormalQueue1RTL
+// File: /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, Line: 77
+module NormalQueue1RTL__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    reset,
+  output logic [31:0]   deq__msg,
+  input  logic [0:0]    deq__rdy,
+  output logic [0:0]    deq__val,
+  input  logic [31:0]   enq__msg,
+  output logic [0:0]    enq__rdy,
+  input  logic [0:0]    enq__val
+);
+  // Wire declarations
+  logic [0:0]    full;
+  logic [0:0]    next_full;
+
+  // Sub-component declarations
+  logic [0:0]    buffer__clk;
+  logic [0:0]    buffer__en;
+  logic [31:0]   buffer__in_;
+  logic [31:0]   buffer__out;
+  logic [0:0]    buffer__reset;
+
+  RegEn__Type_Bits32 buffer
+  (
+    .clk            (        buffer__clk        ),
+    .en             (         buffer__en        ),
+    .in_            (        buffer__in_        ),
+    .out            (        buffer__out        ),
+    .reset          (       buffer__reset       )
+  );
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 97
+  // @s.update
+  // def up_normq_internal():
+  //   s.buffer.en = s.enq.val & s.enq.rdy
+  //   s.next_full = (s.full & ~s.deq.rdy) | s.buffer.en
+  
+  always_comb begin : up_normq_internal
+    buffer__en = enq__val & enq__rdy;
+    next_full = ( full & ( ~deq__rdy ) ) | buffer__en;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 93
+  // @s.update
+  // def up_normq_set_enq_rdy():
+  //   s.enq.rdy = ~s.full
+  
+  always_comb begin : up_normq_set_enq_rdy
+    enq__rdy = ~full;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 89
+  // @s.update_ff
+  // def up_full():
+  //   s.full <<= s.next_full
+  
+  always_ff @(posedge clk) begin : up_full
+    full <= next_full;
+  end
+
+  // Connections
+  assign buffer__clk = clk;
+  assign buffer__reset = reset;
+  assign deq__msg = buffer__out;
+  assign buffer__in_ = enq__msg;
+  assign deq__val = full;
+
+endmodule
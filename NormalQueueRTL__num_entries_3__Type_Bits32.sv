@@ -0,0 +1,393 @@
+//-------------------------------------------------------------------------
+// NormalQueueRTL__num_entries_3__Type_Bits32.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component NormalQueueRTLCtrl
+// File: /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, Line: 177
+module NormalQueueRTLCtrl__num_entries_3
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    deq_rdy,
+  output logic [0:0]    deq_val,
+  output logic [0:0]    enq_rdy,
+  input  logic [0:0]    enq_val,
+  output logic [1:0]    num_free_entries,
+  output logic [1:0]    raddr,
+  input  logic [0:0]    reset,
+  output logic [1:0]    waddr,
+  output logic [0:0]    wen
+);
+  // Wire declarations
+  logic [1:0]    deq_ptr;
+  logic [1:0]    deq_ptr_inc;
+  logic [1:0]    deq_ptr_next;
+  logic [0:0]    do_deq;
+  logic [0:0]    do_enq;
+  logic [0:0]    empty;
+  logic [1:0]    enq_ptr;
+  logic [1:0]    enq_ptr_inc;
+  logic [1:0]    enq_ptr_next;
+  logic [0:0]    full;
+  logic [0:0]    full_next_cycle;
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 215
+  // @s.update
+  // def comb():
+  // 
+  //   # only enqueue/dequeue if valid and ready
+  // 
+  //   s.do_enq = s.enq_rdy and s.enq_val
+  //   s.do_deq = s.deq_rdy and s.deq_val
+  // 
+  //   # write enable
+  // 
+  //   s.wen     = s.do_enq
+  // 
+  //   # enq ptr incrementer
+  // 
+  //   if s.enq_ptr == s.last_idx: s.enq_ptr_inc = AddrType(0)
+  //   else:                       s.enq_ptr_inc = s.enq_ptr + AddrType(1)
+  // 
+  //   # deq ptr incrementer
+  // 
+  //   if s.deq_ptr == s.last_idx: s.deq_ptr_inc = AddrType(0)
+  //   else:                       s.deq_ptr_inc = s.deq_ptr + AddrType(1)
+  // 
+  //   # set the next ptr value
+  // 
+  //   if s.do_enq: s.enq_ptr_next = s.enq_ptr_inc
+  //   else:        s.enq_ptr_next = s.enq_ptr
+  // 
+  //   if s.do_deq: s.deq_ptr_next = s.deq_ptr_inc
+  //   else:        s.deq_ptr_next = s.deq_ptr
+  // 
+  //   # number of free entries calculation
+  // 
+  //   if   s.reset:
+  //     s.num_free_entries = s.num_entries
+  //   elif s.full:
+  //     s.num_free_entries = AddrType( 0 )
+  //   elif s.empty:
+  //     s.num_free_entries = s.num_entries
+  //   elif s.enq_ptr > s.deq_ptr:
+  //     s.num_free_entries = s.num_entries - ( s.enq_ptr - s.deq_ptr )
+  //   elif s.deq_ptr > s.enq_ptr:
+  //     s.num_free_entries = s.deq_ptr - s.enq_ptr
+  // 
+  //   s.full_next_cycle = (s.do_enq and not s.do_deq and
+  //                             (s.enq_ptr_next == s.deq_ptr))
+  
+  always_comb begin : comb
+    do_enq = enq_rdy && enq_val;
+    do_deq = deq_rdy && deq_val;
+    wen = do_enq;
+    if ( enq_ptr == 2'd2 ) begin
+      enq_ptr_inc = 2'd0;
+    end
+    else
+      enq_ptr_inc = enq_ptr + 2'd1;
+    if ( deq_ptr == 2'd2 ) begin
+      deq_ptr_inc = 2'd0;
+    end
+    else
+      deq_ptr_inc = deq_ptr + 2'd1;
+    if ( do_enq ) begin
+      enq_ptr_next = enq_ptr_inc;
+    end
+    else
+      enq_ptr_next = enq_ptr;
+    if ( do_deq ) begin
+      deq_ptr_next = deq_ptr_inc;
+    end
+    else
+      deq_ptr_next = deq_ptr;
+    if ( reset ) begin
+      num_free_entries = 2'd3;
+    end
+    else if ( full ) begin
+      num_free_entries = 2'd0;
+    end
+    else if ( empty ) begin
+      num_free_entries = 2'd3;
+    end
+    else if ( enq_ptr > deq_ptr ) begin
+      num_free_entries = 2'd3 - ( enq_ptr - deq_ptr );
+    end
+    else if ( deq_ptr > enq_ptr ) begin
+      num_free_entries = deq_ptr - enq_ptr;
+    end
+    full_next_cycle = do_enq && ( !do_deq ) && ( enq_ptr_next == deq_ptr );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 261
+  // @s.update
+  // def up_ctrl_signals():
+  // 
+  //   # set output signals
+  // 
+  //   s.empty   = not s.full and (s.enq_ptr == s.deq_ptr)
+  // 
+  //   s.enq_rdy = not s.full
+  //   s.deq_val = not s.empty
+  // 
+  //   # set control signals
+  // 
+  //   s.waddr   = s.enq_ptr
+  //   s.raddr   = s.deq_ptr
+  
+  always_comb begin : up_ctrl_signals
+    empty = ( !full ) && ( enq_ptr == deq_ptr );
+    enq_rdy = !full;
+    deq_val = !empty;
+    waddr = enq_ptr;
+    raddr = deq_ptr;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, line 276
+  // @s.update_ff
+  // def seq():
+  // 
+  //   if s.reset:
+  //     s.deq_ptr <<= AddrType( 0 )
+  //     s.enq_ptr <<= AddrType( 0 )
+  //   else:
+  //     s.deq_ptr <<= s.deq_ptr_next
+  //     s.enq_ptr <<= s.enq_ptr_next
+  // 
+  //   if   s.reset:               s.full <<= Bits1(0)
+  //   elif s.full_next_cycle:     s.full <<= Bits1(1)
+  //   elif (s.do_deq and s.full): s.full <<= Bits1(0)
+  //   else:                       s.full <<= s.full
+  
+  always_ff @(posedge clk) begin : seq
+    if ( reset ) begin
+      deq_ptr <= 2'd0;
+      enq_ptr <= 2'd0;
+    end
+    else begin
+      deq_ptr <= deq_ptr_next;
+      enq_ptr <= enq_ptr_next;
+    end
+    if ( reset ) begin
+      full <= 1'd0;
+    end
+    else if ( full_next_cycle ) begin
+      full <= 1'd1;
+    end
+    else if ( do_deq && full ) begin
+      full <= 1'd0;
+    end
+    else
+      full <= full;
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component RegisterFile
+// File: /root/package/pymtl3/stdlib/rtl/RegisterFile.py, Line: 4
+// Full name: RegisterFile__Type_Bits32__nregs_3__rd_ports_1__wr_ports_1__const_zero_False
+module RegisterFile__e0c9aeeb5cb4dd50
+(
+  input  logic [0:0]    clk,
+  input  logic [1:0]    raddr__0,
+  output logic [31:0]   rdata__0,
+  input  logic [0:0]    reset,
+  input  logic [1:0]    waddr__0,
+  input  logic [31:0]   wdata__0,
+  input  logic [0:0]    wen__0
+);
+  // Struct/Array ports in the form of wires
+  logic [1:0]    raddr [0:0];
+  logic [31:0]   rdata [0:0];
+  logic [1:0]    waddr [0:0];
+  logic [31:0]   wdata [0:0];
+  logic [0:0]    wen [0:0];
+
+  // Wire declarations
+  logic [31:0]   regs [0:2];
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/RegisterFile.py, line 20
+  // @s.update
+  // def up_rf_read():
+  //   for i in range( rd_ports ):
+  //     s.rdata[i] = s.regs[ s.raddr[i] ]
+  
+  integer __loopvar__up_rf_read_i;
+  
+  always_comb begin : up_rf_read
+    for ( __loopvar__up_rf_read_i = 0; __loopvar__up_rf_read_i < 32'd1; __loopvar__up_rf_read_i = __loopvar__up_rf_read_i + 1 )
+      rdata[__loopvar__up_rf_read_i] = regs[raddr[__loopvar__up_rf_read_i]];
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/RegisterFile.py, line 32
+  // @s.update_ff
+  // def up_rf_write():
+  //   for i in range( wr_ports ):
+  //     if s.wen[i]:
+  //       s.regs[ s.waddr[i] ] <<= s.wdata[i]
+  
+  integer __loopvar__up_rf_write_i;
+  
+  always_ff @(posedge clk) begin : up_rf_write
+    for ( __loopvar__up_rf_write_i = 0; __loopvar__up_rf_write_i < 32'd1; __loopvar__up_rf_write_i = __loopvar__up_rf_write_i + 1 )
+      if ( wen[__loopvar__up_rf_write_i] ) begin
+        regs[waddr[__loopvar__up_rf_write_i]] <= wdata[__loopvar__up_rf_write_i];
+      end
+  end
+
+  // Connections
+  assign raddr[0] = raddr__0;
+  assign rdata__0 = rdata[0];
+  assign waddr[0] = waddr__0;
+  assign wdata[0] = wdata__0;
+  assign wen[0] = wen__0;
+
+endmodule
+
+
+// Definition of PyMTL Component NormalQueueRTLDpath
+// File: /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, Line: 148
+module NormalQueueRTLDpath__num_entries_3__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  output logic [31:0]   deq_bits,
+  input  logic [31:0]   enq_bits,
+  input  logic [1:0]    raddr,
+  input  logic [0:0]    reset,
+  input  logic [1:0]    waddr,
+  input  logic [0:0]    wen
+);
+  // Struct/Array ports of sub-components in the form of wires
+  logic [1:0]    queue__raddr [0:0];
+  logic [31:0]   queue__rdata [0:0];
+  logic [1:0]    queue__waddr [0:0];
+  logic [31:0]   queue__wdata [0:0];
+  logic [0:0]    queue__wen [0:0];
+
+  // Sub-component declarations
+  logic [0:0]    queue__clk;
+  logic [1:0]    queue__raddr__0;
+  logic [31:0]   queue__rdata__0;
+  logic [0:0]    queue__reset;
+  logic [1:0]    queue__waddr__0;
+  logic [31:0]   queue__wdata__0;
+  logic [0:0]    queue__wen__0;
+
+  RegisterFile__e0c9aeeb5cb4dd50 queue
+  (
+    .clk            (         queue__clk        ),
+    .raddr__0       (      queue__raddr__0      ),
+    .rdata__0       (      queue__rdata__0      ),
+    .reset          (        queue__reset       ),
+    .waddr__0       (      queue__waddr__0      ),
+    .wdata__0       (      queue__wdata__0      ),
+    .wen__0         (       queue__wen__0       )
+  );
+
+  // Connect struct/array ports and their wire forms
+  assign queue__raddr__0 = queue__raddr[0];
+  assign queue__rdata[0] = queue__rdata__0;
+  assign queue__waddr__0 = queue__waddr[0];
+  assign queue__wdata__0 = queue__wdata[0];
+  assign queue__wen__0 = queue__wen[0];
+
+  // Connections
+  assign queue__clk = clk;
+  assign queue__reset = reset;
+  assign queue__raddr[0] = raddr;
+  assign deq_bits = queue__rdata[0];
+  assign queue__wen[0] = wen;
+  assign queue__waddr[0] = waddr;
+  assign queue__wdata[0] = enq_bits;
+
+endmodule
+
+
+// Definition of PyMTL Component NormalQueueRTL
+// File: /root/package/pymtl3/stdlib/rtl/valrdy_queues.py, Line: 110
+module NormalQueueRTL__num_entries_3__Type_Bits32
+(
+  input  logic [0:0]    clk,
+  output logic [1:0]    num_free_entries,
+  input  logic [0:0]    reset,
+  output logic [31:0]   deq__msg,
+  input  logic [0:0]    deq__rdy,
+  output logic [0:0]    deq__val,
+  input  logic [31:0]   enq__msg,
+  output logic [0:0]    enq__rdy,
+  input  logic [0:0]    enq__val
+);
+  // Sub-component declarations
+  logic [0:0]    ctrl__clk;
+  logic [0:0]    ctrl__deq_rdy;
+  logic [0:0]    ctrl__deq_val;
+  logic [0:0]    ctrl__enq_rdy;
+  logic [0:0]    ctrl__enq_val;
+  logic [1:0]    ctrl__num_free_entries;
+  logic [1:0]    ctrl__raddr;
+  logic [0:0]    ctrl__reset;
+  logic [1:0]    ctrl__waddr;
+  logic [0:0]    ctrl__wen;
+
+  NormalQueueRTLCtrl__num_entries_3 ctrl
+  (
+    .clk            (         ctrl__clk         ),
+    .deq_rdy        (       ctrl__deq_rdy       ),
+    .deq_val        (       ctrl__deq_val       ),
+    .enq_rdy        (       ctrl__enq_rdy       ),
+    .enq_val        (       ctrl__enq_val       ),
+    .num_free_entries(   ctrl__num_free_entries  ),
+    .raddr          (        ctrl__raddr        ),
+    .reset          (        ctrl__reset        ),
+    .waddr          (        ctrl__waddr        ),
+    .wen            (         ctrl__wen         )
+  );
+
+  logic [0:0]    dpath__clk;
+  logic [31:0]   dpath__deq_bits;
+  logic [31:0]   dpath__enq_bits;
+  logic [1:0]    dpath__raddr;
+  logic [0:0]    dpath__reset;
+  logic [1:0]    dpath__waddr;
+  logic [0:0]    dpath__wen;
+
+  NormalQueueRTLDpath__num_entries_3__Type_Bits32 dpath
+  (
+    .clk            (         dpath__clk        ),
+    .deq_bits       (      dpath__deq_bits      ),
+    .enq_bits       (      dpath__enq_bits      ),
+    .raddr          (        dpath__raddr       ),
+    .reset          (        dpath__reset       ),
+    .waddr          (        dpath__waddr       ),
+    .wen            (         dpath__wen        )
+  );
+
+  // Connections
+  assign ctrl__clk = clk;
+  assign ctrl__reset = reset;
+  assign dpath__clk = clk;
+  assign dpath__reset = reset;
+  assign ctrl__enq_val = enq__val;
+  assign enq__rdy = ctrl__enq_rdy;
+  assign deq__val = ctrl__deq_val;
+  assign ctrl__deq_rdy = deq__rdy;
+  assign num_free_entries = ctrl__num_free_entries;
+  assign dpath__enq_bits = enq__msg;
+  assign deq__msg = dpath__deq_bits;
+  assign dpath__wen = ctrl__wen;
+  assign dpath__waddr = ctrl__waddr;
+  assign dpath__raddr = ctrl__raddr;
+
+endmodule
@@ -0,0 +1,191 @@
+//-------------------------------------------------------------------------
+// RoundRobinArbiter__nreqs_4.sv
+//-------------------------------------------------------------------------
+// This file is generated by PyMTL yosys-SystemVerilog translation pass.
+
+// Definition of PyMTL Component RegEnRst
+// File: /root/package/pymtl3/stdlib/rtl/registers.py, Line: 49
+module RegEnRst__Type_Bits4__reset_value_1
+(
+  input  logic [0:0]    clk,
+  input  logic [0:0]    en,
+  input  logic [3:0]    in_,
+  output logic [3:0]    out,
+  input  logic [0:0]    reset
+);
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/registers.py, line 58
+  // @s.update_ff
+  // def up_regenrst():
+  //   if s.reset: s.out <<= Type( reset_value )
+  //   elif s.en:  s.out <<= s.in_
+  
+  always_ff @(posedge clk) begin : up_regenrst
+    if ( reset ) begin
+      out <= 4'd1;
+    end
+    else if ( en ) begin
+      out <= in_;
+    end
+  end
+
+endmodule
+
+
+// Definition of PyMTL Component RoundRobinArbiter
+// File: /root/package/pymtl3/stdlib/rtl/arbiters.py, Line: 16
+module RoundRobinArbiter__nreqs_4
+(
+  input  logic [0:0]    clk,
+  output logic [3:0]    grants,
+  input  logic [3:0]    reqs,
+  input  logic [0:0]    reset
+);
+  // Wire declarations
+  logic [7:0]    grants_int;
+  logic [8:0]    kills;
+  logic [0:0]    priority_en;
+  logic [7:0]    priority_int;
+  logic [7:0]    reqs_int;
+
+  // Sub-component declarations
+  logic [0:0]    priority_reg__clk;
+  logic [0:0]    priority_reg__en;
+  logic [3:0]    priority_reg__in_;
+  logic [3:0]    priority_reg__out;
+  logic [0:0]    priority_reg__reset;
+
+  RegEnRst__Type_Bits4__reset_value_1 priority_reg
+  (
+    .clk            (     priority_reg__clk     ),
+    .en             (      priority_reg__en     ),
+    .in_            (     priority_reg__in_     ),
+    .out            (     priority_reg__out     ),
+    .reset          (    priority_reg__reset    )
+  );
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arbiters.py, line 57
+  // @s.update
+  // def comb_grants():
+  // 
+  //   # Assign the output ports
+  //   for i in range( nreqs ):
+  //     s.grants[i] = s.grants_int[i] | s.grants_int[nreqs+i]
+  
+  integer __loopvar__comb_grants_i;
+  
+  always_comb begin : comb_grants
+    for ( __loopvar__comb_grants_i = 0; __loopvar__comb_grants_i < 32'd4; __loopvar__comb_grants_i = __loopvar__comb_grants_i + 1 )
+      grants[__loopvar__comb_grants_i] = grants_int[__loopvar__comb_grants_i] | grants_int[32'd4 + __loopvar__comb_grants_i];
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arbiters.py, line 107
+  // @s.update
+  // def comb_grants_int():
+  // 
+  //   for i in range( nreqsX2 ):
+  // 
+  //     # Set internal grants
+  // 
+  //     if s.priority_int[i]:
+  //       s.grants_int[i] = s.reqs_int[i]
+  // 
+  //     else:
+  //       s.grants_int[i] = ~s.kills[i] & s.reqs_int[i]
+  
+  integer __loopvar__comb_grants_int_i;
+  
+  always_comb begin : comb_grants_int
+    for ( __loopvar__comb_grants_int_i = 0; __loopvar__comb_grants_int_i < 32'd8; __loopvar__comb_grants_int_i = __loopvar__comb_grants_int_i + 1 )
+      if ( priority_int[__loopvar__comb_grants_int_i] ) begin
+        grants_int[__loopvar__comb_grants_int_i] = reqs_int[__loopvar__comb_grants_int_i];
+      end
+      else
+        grants_int[__loopvar__comb_grants_int_i] = ( ~kills[__loopvar__comb_grants_int_i] ) & reqs_int[__loopvar__comb_grants_int_i];
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arbiters.py, line 88
+  // @s.update
+  // def comb_kills():
+  // 
+  //   # Set kill signals
+  // 
+  //   s.kills[0] = Bits1(1)
+  // 
+  //   for i in range( nreqsX2 ):
+  // 
+  //     if s.priority_int[i]:
+  //       s.kills[i+1] = s.reqs_int[i]
+  // 
+  //     else:
+  //       s.kills[i+1] = s.kills[i] | ( ~s.kills[i] & s.reqs_int[i] )
+  
+  integer __loopvar__comb_kills_i;
+  
+  always_comb begin : comb_kills
+    kills[0] = 1'd1;
+    for ( __loopvar__comb_kills_i = 0; __loopvar__comb_kills_i < 32'd8; __loopvar__comb_kills_i = __loopvar__comb_kills_i + 1 )
+      if ( priority_int[__loopvar__comb_kills_i] ) begin
+        kills[__loopvar__comb_kills_i + 1] = reqs_int[__loopvar__comb_kills_i];
+      end
+      else
+        kills[__loopvar__comb_kills_i + 1] = kills[__loopvar__comb_kills_i] | ( ( ~kills[__loopvar__comb_kills_i] ) & reqs_int[__loopvar__comb_kills_i] );
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arbiters.py, line 68
+  // @s.update
+  // def comb_priority_en():
+  // 
+  //   # Set the priority enable
+  //   s.priority_en = ( s.grants != Type(0) )
+  
+  always_comb begin : comb_priority_en
+    priority_en = grants != 4'd0;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arbiters.py, line 78
+  // @s.update
+  // def comb_priority_int():
+  // 
+  //   s.priority_int[    0:nreqs  ] = s.priority_reg.out
+  //   s.priority_int[nreqs:nreqsX2] = Type(0)
+  
+  always_comb begin : comb_priority_int
+    priority_int[3:0] = priority_reg__out;
+    priority_int[7:32'd4] = 4'd0;
+  end
+
+  // PYMTL SOURCE:
+  // 
+  // This upblk was generated from an upblk defined in file /root/package/pymtl3/stdlib/rtl/arbiters.py, line 47
+  // @s.update
+  // def comb_reqs_int():
+  // 
+  //   s.reqs_int [    0:nreqs  ] = s.reqs
+  //   s.reqs_int [nreqs:nreqsX2] = s.reqs
+  
+  always_comb begin : comb_reqs_int
+    reqs_int[3:0] = reqs;
+    reqs_int[7:32'd4] = reqs;
+  end
+
+  // Connections
+  assign priority_reg__clk = clk;
+  assign priority_reg__reset = reset;
+  assign priority_reg__en = priority_en;
+  assign priority_reg__in_[3:1] = grants[2:0];
+  assign priority_reg__in_[0:0] = grants[3:3];
+
+endmodule
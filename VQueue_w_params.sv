@@ -0,0 +1,33 @@
+// This is a top-level module that wraps a parametrized module
+// This file is generated by PyMTL SystemVerilog import pass
+`include "/root/package/pymtl3/passes/sverilog/import_/test/VQueue.sv"
+module VQueue_w_params
+(
+  input logic [1-1:0] clk,
+  output logic [1-1:0] count,
+  input logic [1-1:0] deq_en,
+  output logic [32-1:0] deq_msg,
+  output logic [1-1:0] deq_rdy,
+  input logic [1-1:0] enq_en,
+  input logic [32-1:0] enq_msg,
+  output logic [1-1:0] enq_rdy,
+  input logic [1-1:0] reset
+);
+  VQueue
+  #(
+    .data_width( 32 ),
+    .num_entries( 1 ),
+    .count_width( 1 )
+  ) wrapped_module
+  (
+    .clk( clk ),
+    .count( count ),
+    .deq_en( deq_en ),
+    .deq_msg( deq_msg ),
+    .deq_rdy( deq_rdy ),
+    .enq_en( enq_en ),
+    .enq_msg( enq_msg ),
+    .enq_rdy( enq_rdy ),
+    .reset( reset )
+  );
+endmodule
\ No newline at end of file
@@ -1,5 +1,19 @@
-from .datatypes import *
-from .datatypes import _bitwidths
+import sys
+
+from .datatypes import (
+    Bits,
+    _bitwidths,
+    bitstruct,
+    clog2,
+    concat,
+    mk_bits,
+    mk_bitstruct,
+    reduce_and,
+    reduce_or,
+    reduce_xor,
+    sext,
+    zext,
+)
 from .dsl.Component import Component
 from .dsl.ComponentLevel3 import connect
 from .dsl.ComponentLevel5 import method_port
@@ -9,20 +23,37 @@ from .dsl.Connectable import (
     CalleePort,
     CallerPort,
     InPort,
+    InPortArray,
     Interface,
     NonBlockingCalleeIfc,
     NonBlockingCallerIfc,
     OutPort,
+    OutPortArray,
     Wire,
+    WireArray,
 )
 from .dsl.ConstraintTypes import RD, WR, M, U
 from .passes.PassGroups import DynamicSim, SimpleSim, SimulationPass
 
 __version__ = "0.4.0"
 
+# BitsN/bN are only created when they are first accessed (or by
+# "from pymtl3 import *"), see datatypes/bits_import.py
+
+if sys.version_info < (3, 7):
+  from .datatypes import *
+
+def __getattr__( name ):
+  from . import datatypes
+  try:
+    return getattr( datatypes, name )
+  except AttributeError:
+    raise AttributeError( f"module {__name__!r} has no attribute {name!r}" ) from None
+
 __all__ = [
   'U','M','RD','WR',
   'Wire', 'InPort', 'OutPort', 'Interface', 'CallerPort', 'CalleePort',
+  'WireArray', 'InPortArray', 'OutPortArray',
   'connect', 'method_port',
   'non_blocking', 'NonBlockingCalleeIfc', 'NonBlockingCallerIfc', 'blocking',
 
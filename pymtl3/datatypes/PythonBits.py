@@ -8,6 +8,18 @@ Author : Shunning Jiang
 Date   : Oct 31, 2017
 """
 
+# If a simulator enables dirty-set double buffering, objects assigned
+# with <<= are recorded in this list so that the simulator only flips the
+# objects that were actually written in the last cycle. The simulator
+# installs its own list at the beginning of its tick and restores the
+# previous one at the end, so <<= outside of that tick is not recorded.
+_dirty = None
+
+def _set_dirty_list( l ):
+  global _dirty
+  prev, _dirty = _dirty, l
+  return prev
+
 
 class Bits:
   __slots__ = ( "nbits", "value" )
@@ -22,6 +34,8 @@ class Bits:
     except AttributeError:
       raise TypeError(f"Assign {type(x)} to Bits")
     self._next = x.value
+    if _dirty is not None:
+      _dirty.append( self )
     return self
 
   def _flip( self ):
@@ -30,6 +44,16 @@ class Bits:
   def __call__( self ):
     return Bits( self.nbits )
 
+  # A Bits is a value, so all copies only copy the value and not the
+  # pending <<= of the simulation
+  def clone( self ):
+    return Bits( self.nbits, self.value )
+
+  __copy__ = clone
+
+  def __deepcopy__( self, memo ):
+    return Bits( self.nbits, self.value )
+
   # Arithmetics
   def __getitem__( self, idx ):
     sv = int(self.value)
@@ -201,3 +225,240 @@ class Bits:
   def hex( self ):
     str = "{:x}".format(int(self.value)).zfill(((self.nbits-1)>>2)+1)
     return "0x"+str
+
+#-------------------------------------------------------------------------
+# Width-specialized BitsN
+#-------------------------------------------------------------------------
+# bits_import creates the BitsN types with specialize_bits. The mask is
+# bound in the closure and operations between two objects of the same
+# width (or with an int) skip the width merging of the generic operators
+# above. Comparisons return a new Bits1 object every time because a comb
+# block may store the result in a signal and then modify it in place.
+#
+# The methods are closures instead of code generated per bitwidth
+# because compiling the methods for all predefined bitwidths takes a
+# quarter of a second.
+
+_Bits1 = None
+
+_new = object.__new__
+
+def specialize_bits( nbits, mk_bits ):
+  global _Bits1
+
+  _nbits = nbits
+  mask   = (1 << nbits) - 1
+  half   = 1 << (nbits - 1) if nbits else 0
+
+  class BitsN( Bits ):
+    __slots__ = ( "_next", )
+    nbits = _nbits
+    _mask = mask
+
+    def __init__( s, value=0 ):
+      s.value = int(value) & mask
+
+    def __reduce__( s ):
+      try:
+        return ( BitsN, ( s.value, ), ( None, { "_next": s._next } ) )
+      except AttributeError:
+        return ( BitsN, ( s.value, ) )
+
+    __hash__ = Bits.__hash__
+
+    def clone( s ):
+      r = _new( BitsN )
+      r.value = s.value
+      return r
+
+    __copy__ = clone
+
+    def __deepcopy__( s, memo ):
+      r = _new( BitsN )
+      r.value = s.value
+      return r
+
+    # Arithmetics
+
+    def __add__( s, other ):
+      if other.__class__ is BitsN:
+        r = _new( BitsN )
+        r.value = (s.value + other.value) & mask
+        return r
+      if other.__class__ is int:
+        r = _new( BitsN )
+        r.value = (s.value + other) & mask
+        return r
+      return Bits.__add__( s, other )
+
+    def __sub__( s, other ):
+      if other.__class__ is BitsN:
+        r = _new( BitsN )
+        r.value = (s.value - other.value) & mask
+        return r
+      if other.__class__ is int:
+        r = _new( BitsN )
+        r.value = (s.value - other) & mask
+        return r
+      return Bits.__sub__( s, other )
+
+    def __mul__( s, other ):
+      if other.__class__ is BitsN:
+        r = _new( BitsN )
+        r.value = (s.value * other.value) & mask
+        return r
+      if other.__class__ is int:
+        r = _new( BitsN )
+        r.value = (s.value * other) & mask
+        return r
+      return Bits.__mul__( s, other )
+
+    def __and__( s, other ):
+      if other.__class__ is BitsN:
+        r = _new( BitsN )
+        r.value = s.value & other.value
+        return r
+      if other.__class__ is int:
+        r = _new( BitsN )
+        r.value = s.value & other & mask
+        return r
+      return Bits.__and__( s, other )
+
+    def __or__( s, other ):
+      if other.__class__ is BitsN:
+        r = _new( BitsN )
+        r.value = s.value | other.value
+        return r
+      if other.__class__ is int:
+        r = _new( BitsN )
+        r.value = (s.value | other) & mask
+        return r
+      return Bits.__or__( s, other )
+
+    def __xor__( s, other ):
+      if other.__class__ is BitsN:
+        r = _new( BitsN )
+        r.value = s.value ^ other.value
+        return r
+      if other.__class__ is int:
+        r = _new( BitsN )
+        r.value = (s.value ^ other) & mask
+        return r
+      return Bits.__xor__( s, other )
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+    __rand__ = __and__
+    __ror__  = __or__
+    __rxor__ = __xor__
+
+    def __invert__( s ):
+      r = _new( BitsN )
+      r.value = ~s.value & mask
+      return r
+
+    def __lshift__( s, other ):
+      sh = int(other)
+      r = _new( BitsN )
+      r.value = (s.value << sh) & mask if sh < _nbits else 0
+      return r
+
+    def __rshift__( s, other ):
+      r = _new( BitsN )
+      r.value = s.value >> int(other)
+      return r
+
+    def __getitem__( s, idx ):
+      if idx.__class__ is slice:
+        start, stop = int(idx.start), int(idx.stop)
+        assert not idx.step and 0 <= start < stop <= _nbits, \
+              f"Invalid access: [{start}:{stop}] in a Bits{_nbits} instance"
+        return mk_bits( stop - start )( s.value >> start )
+
+      i = int(idx)
+      assert 0 <= i < _nbits
+      r = _new( _Bits1 )
+      r.value = (s.value >> i) & 1
+      return r
+
+    # Comparisons
+
+    def __eq__( s, other ):
+      r = _new( _Bits1 )
+      if other.__class__ is BitsN:
+        r.value = 1 if s.value == other.value else 0
+        return r
+      try:
+        other = int(other)
+      except ValueError:
+        r.value = 0
+        return r
+      r.value = 1 if s.value == other else 0
+      return r
+
+    def __ne__( s, other ):
+      r = _new( _Bits1 )
+      if other.__class__ is BitsN:
+        r.value = 1 if s.value != other.value else 0
+        return r
+      try:
+        other = int(other)
+      except ValueError:
+        r.value = 1
+        return r
+      r.value = 1 if s.value != other else 0
+      return r
+
+    def __lt__( s, other ):
+      r = _new( _Bits1 )
+      if other.__class__ is BitsN:
+        r.value = 1 if s.value < other.value else 0
+      else:
+        r.value = 1 if s.value < int(other) else 0
+      return r
+
+    def __le__( s, other ):
+      r = _new( _Bits1 )
+      if other.__class__ is BitsN:
+        r.value = 1 if s.value <= other.value else 0
+      else:
+        r.value = 1 if s.value <= int(other) else 0
+      return r
+
+    def __gt__( s, other ):
+      r = _new( _Bits1 )
+      if other.__class__ is BitsN:
+        r.value = 1 if s.value > other.value else 0
+      else:
+        r.value = 1 if s.value > int(other) else 0
+      return r
+
+    def __ge__( s, other ):
+      r = _new( _Bits1 )
+      if other.__class__ is BitsN:
+        r.value = 1 if s.value >= other.value else 0
+      else:
+        r.value = 1 if s.value >= int(other) else 0
+      return r
+
+    # Conversions
+
+    def __bool__( s ):
+      return s.value != 0
+
+    def __int__( s ):
+      return s.value
+
+    __index__ = __int__
+    uint      = __int__
+
+    def int( s ):
+      if s.value & half:
+        return s.value - (mask + 1)
+      return s.value
+
+  if nbits == 1:
+    _Bits1 = BitsN
+
+  BitsN.__name__ = BitsN.__qualname__ = f"Bits{nbits}"
+  return BitsN
@@ -1,4 +1,35 @@
-from .bits_import import *
-from .bits_import import _bitwidths
+import sys
+
+from .bits_import import Bits, _bitwidths, mk_bits
 from .bitstructs import bitstruct, is_bitstruct_class, is_bitstruct_inst, mk_bitstruct
 from .helpers import clog2, concat, reduce_and, reduce_or, reduce_xor, sext, zext
+
+# BitsN/bN are created on first access, see bits_import.py. Python < 3.7
+# has no module-level __getattr__, so bits_import creates them eagerly
+# and we import BitsArray right away if numpy is available.
+
+if sys.version_info < (3, 7):
+  from .bits_import import *
+  try:
+    from .bits_array import BitsArray
+  except ImportError: # BitsArray needs numpy
+    pass
+
+__all__ = [
+  'Bits', 'mk_bits',
+  'bitstruct', 'is_bitstruct_class', 'is_bitstruct_inst', 'mk_bitstruct',
+  'clog2', 'concat', 'reduce_and', 'reduce_or', 'reduce_xor', 'sext', 'zext',
+] + [ "Bits{}".format(x) for x in _bitwidths ] \
+  + [ "b{}".format(x) for x in _bitwidths ]
+
+def __getattr__( name ):
+  # BitsArray needs numpy, which is only imported when it is used
+  if name == "BitsArray":
+    from .bits_array import BitsArray
+    return BitsArray
+
+  from . import bits_import
+  try:
+    return getattr( bits_import, name )
+  except AttributeError:
+    raise AttributeError( f"module {__name__!r} has no attribute {name!r}" ) from None
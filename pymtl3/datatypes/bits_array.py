@@ -0,0 +1,342 @@
+"""
+========================================================================
+bits_array.py
+========================================================================
+A compact array of same-width Bits values backed by NumPy, for bulk
+test vectors, memory images and expected outputs.
+
+Each element is stored as ceil(nbits/64) little-endian uint64 words
+(least significant word first) in a numpy array of shape (n, nwords).
+All operations are vectorized over the elements; only the words of a
+single element are looped over in Python.
+
+  a = BitsArray.random( 32, 1000000, seed=0 )
+  b = ( a + 1 ) & 0xffff
+  assert ( b[:, 16:32] == 0 ).all()
+  x = a[3]          # Bits32
+
+Indexing with a single index returns a BitsN, and indexing with a slice
+or an index array returns a BitsArray (a view for slices). A second
+index selects bits of every element like Bits slicing does:
+a[:, 4:8] is a BitsArray of 4-bit values.
+
+Arithmetics wrap around like Bits. Comparisons return a BitsArray of
+width 1, which can be reduced with all() or any(). Operands have to be
+BitsArrays of the same width and length, or a scalar int/Bits.
+
+NumPy is an optional dependency of PyMTL, so this module is only
+imported on "from pymtl3.datatypes import BitsArray".
+"""
+import numpy as np
+
+from .bits_import import Bits, mk_bits
+
+_WORD_DTYPE = np.dtype( "<u8" )
+_WORD_MASK  = (1 << 64) - 1
+
+def _nwords( nbits ):
+  return ( nbits + 63 ) // 64
+
+def _int_to_words( value, nwords ):
+  return np.array( [ ( value >> (64*k) ) & _WORD_MASK for k in range(nwords) ],
+                   dtype=_WORD_DTYPE ).reshape( 1, nwords )
+
+def _words_to_int( row ):
+  value = 0
+  for k in range( len(row)-1, -1, -1 ):
+    value = ( value << 64 ) | int( row[k] )
+  return value
+
+def _shift_words( w, k, nwords ):
+  """ Return w * 2**k (k < 0 shifts right) truncated to nwords words. """
+  out  = np.zeros( (w.shape[0], nwords), dtype=_WORD_DTYPE )
+  q, r = divmod( k, 64 )
+  lo, hi = np.uint64( r ), np.uint64( 64 - r )
+
+  for j in range( nwords ):
+    src = j - q
+    if 0 <= src < w.shape[1]:
+      out[:, j] |= w[:, src] << lo
+    if r and 0 <= src-1 < w.shape[1]:
+      out[:, j] |= w[:, src-1] >> hi
+  return out
+
+def _wrap_masked( nbits, w ):
+  # Clear the bits above nbits in the most significant word
+  top = nbits % 64
+  if top:
+    w[:, -1] &= np.uint64( (1 << top) - 1 )
+  return BitsArray._wrap( nbits, w )
+
+class BitsArray:
+
+  __slots__ = ( "nbits", "_w" )
+
+  def __init__( s, nbits, n=0 ):
+    assert 0 < nbits <= 512, "We don't allow bitwidth to exceed 512."
+    s.nbits = nbits
+    s._w    = np.zeros( (n, _nwords( nbits )), dtype=_WORD_DTYPE )
+
+  @classmethod
+  def _wrap( cls, nbits, w ):
+    ret = cls.__new__( cls )
+    ret.nbits = nbits
+    ret._w    = w
+    return ret
+
+  #-----------------------------------------------------------------------
+  # Constructors and conversions
+  #-----------------------------------------------------------------------
+
+  @classmethod
+  def from_values( cls, nbits, values ):
+    """ Create an array from ints or Bits objects. """
+    values = [ int(x) & ((1 << nbits) - 1) for x in values ]
+    nwords = _nwords( nbits )
+    w = np.empty( (len(values), nwords), dtype=_WORD_DTYPE )
+    for k in range( nwords ):
+      w[:, k] = np.fromiter( ( (x >> (64*k)) & _WORD_MASK for x in values ),
+                             dtype=_WORD_DTYPE, count=len(values) )
+    return cls._wrap( nbits, w )
+
+  @classmethod
+  def random( cls, nbits, n, seed=None ):
+    """ Create an array of n uniformly distributed random values. """
+    rng = np.random.default_rng( seed )
+    w   = rng.integers( 0, 1 << 64, size=(n, _nwords( nbits )),
+                        dtype=np.uint64, endpoint=False ).astype( _WORD_DTYPE, copy=False )
+    return _wrap_masked( nbits, w )
+
+  @classmethod
+  def from_bytes( cls, nbits, buf ):
+    """ Wrap a buffer of little-endian words without copying. The bits
+    above nbits of every element have to be zero. The array is read-only
+    if the buffer is. """
+    w = np.frombuffer( buf, dtype=_WORD_DTYPE ).reshape( -1, _nwords( nbits ) )
+    return cls._wrap( nbits, w )
+
+  def tobytes( s ):
+    return s._w.tobytes()
+
+  def __buffer__( s, flags ):
+    return memoryview( s._w )
+
+  @property
+  def words( s ):
+    """ The underlying numpy array of shape (n, nwords). """
+    return s._w
+
+  def tolist( s ):
+    return list( s )
+
+  #-----------------------------------------------------------------------
+  # Element access
+  #-----------------------------------------------------------------------
+
+  def __len__( s ):
+    return s._w.shape[0]
+
+  def __iter__( s ):
+    BitsN = mk_bits( s.nbits )
+    for row in s._w:
+      yield BitsN( _words_to_int( row ) )
+
+  def __getitem__( s, idx ):
+    if isinstance( idx, tuple ):
+      idx, bit_idx = idx
+      return s._bit_slice( bit_idx )[ idx ]
+
+    if isinstance( idx, (int, np.integer, Bits) ):
+      return mk_bits( s.nbits )( _words_to_int( s._w[ int(idx) ] ) )
+
+    return BitsArray._wrap( s.nbits, s._w[ idx ] )
+
+  def __setitem__( s, idx, value ):
+    if isinstance( value, BitsArray ):
+      assert value.nbits == s.nbits, "Bitwidth mismatch during BitsArray assignment"
+      s._w[ idx ] = value._w
+    elif isinstance( value, (int, Bits) ):
+      s._w[ idx ] = s._scalar( value )
+    else:
+      s._w[ idx ] = BitsArray.from_values( s.nbits, value )._w
+
+  def _bit_slice( s, bit_idx ):
+    if isinstance( bit_idx, slice ):
+      start, stop = int(bit_idx.start), int(bit_idx.stop)
+      assert not bit_idx.step and 0 <= start < stop <= s.nbits, \
+            f"Invalid access: [{start}:{stop}] in a BitsArray of {s.nbits}-bit values"
+    else:
+      start = int(bit_idx)
+      stop  = start + 1
+      assert 0 <= start < s.nbits
+
+    nbits = stop - start
+    return _wrap_masked( nbits, _shift_words( s._w, -start, _nwords( nbits ) ) )
+
+  #-----------------------------------------------------------------------
+  # Operands
+  #-----------------------------------------------------------------------
+
+  def _scalar( s, value ):
+    return _int_to_words( int(value) & ((1 << s.nbits) - 1), s._w.shape[1] )
+
+  def _operand( s, other ):
+    if isinstance( other, BitsArray ):
+      assert other.nbits == s.nbits, \
+        f"Bitwidth mismatch: {s.nbits}-bit and {other.nbits}-bit BitsArray"
+      return other._w
+    return s._scalar( other )
+
+  #-----------------------------------------------------------------------
+  # Arithmetics
+  #-----------------------------------------------------------------------
+
+  def __add__( s, other ):
+    if s._w.shape[1] == 1:
+      return _wrap_masked( s.nbits, s._w + s._operand( other ) )
+
+    a, b  = np.broadcast_arrays( s._w, s._operand( other ) )
+    out   = np.empty( a.shape, dtype=_WORD_DTYPE )
+    carry = np.zeros( a.shape[0], dtype=bool )
+    for k in range( a.shape[1] ):
+      x = a[:, k] + b[:, k]
+      y = x + carry
+      carry = ( x < a[:, k] ) | ( y < x )
+      out[:, k] = y
+    return _wrap_masked( s.nbits, out )
+
+  def __sub__( s, other ):
+    if s._w.shape[1] == 1:
+      return _wrap_masked( s.nbits, s._w - s._operand( other ) )
+
+    a, b   = np.broadcast_arrays( s._w, s._operand( other ) )
+    out    = np.empty( a.shape, dtype=_WORD_DTYPE )
+    borrow = np.zeros( a.shape[0], dtype=bool )
+    for k in range( a.shape[1] ):
+      x = a[:, k] - b[:, k]
+      y = x - borrow
+      borrow = ( a[:, k] < b[:, k] ) | ( x < borrow )
+      out[:, k] = y
+    return _wrap_masked( s.nbits, out )
+
+  def __rsub__( s, other ):
+    return BitsArray._wrap( s.nbits, np.broadcast_to( s._scalar( other ), s._w.shape ) ) - s
+
+  def __and__( s, other ):
+    return BitsArray._wrap( s.nbits, s._w & s._operand( other ) )
+
+  def __or__( s, other ):
+    return BitsArray._wrap( s.nbits, s._w | s._operand( other ) )
+
+  def __xor__( s, other ):
+    return BitsArray._wrap( s.nbits, s._w ^ s._operand( other ) )
+
+  __radd__ = __add__
+  __rand__ = __and__
+  __ror__  = __or__
+  __rxor__ = __xor__
+
+  def __invert__( s ):
+    return _wrap_masked( s.nbits, ~s._w )
+
+  def __lshift__( s, other ):
+    sh = int(other)
+    if sh >= s.nbits:
+      return BitsArray( s.nbits, len(s) )
+    return _wrap_masked( s.nbits, _shift_words( s._w, sh, s._w.shape[1] ) )
+
+  def __rshift__( s, other ):
+    sh = int(other)
+    if sh >= s.nbits:
+      return BitsArray( s.nbits, len(s) )
+    return BitsArray._wrap( s.nbits, _shift_words( s._w, -sh, s._w.shape[1] ) )
+
+  #-----------------------------------------------------------------------
+  # Comparisons
+  #-----------------------------------------------------------------------
+  # The words are compared from the least significant one so that a
+  # more significant word overrides the result of the lower ones.
+
+  def _compare( s, other, word_cmp, eq_result ):
+    a, b = np.broadcast_arrays( s._w, s._operand( other ) )
+    ret = np.full( a.shape[0], eq_result, dtype=bool )
+    for k in range( a.shape[1] ):
+      ret = np.where( a[:, k] == b[:, k], ret, word_cmp( a[:, k], b[:, k] ) )
+    return BitsArray._wrap( 1, ret.astype( _WORD_DTYPE ).reshape( -1, 1 ) )
+
+  def __eq__( s, other ):
+    a, b = np.broadcast_arrays( s._w, s._operand( other ) )
+    ret  = ( a == b ).all( axis=1 )
+    return BitsArray._wrap( 1, ret.astype( _WORD_DTYPE ).reshape( -1, 1 ) )
+
+  def __ne__( s, other ):
+    return ~( s == other )
+
+  def __lt__( s, other ):
+    return s._compare( other, np.less, False )
+
+  def __le__( s, other ):
+    return s._compare( other, np.less, True )
+
+  def __gt__( s, other ):
+    return s._compare( other, np.greater, False )
+
+  def __ge__( s, other ):
+    return s._compare( other, np.greater, True )
+
+  __hash__ = None
+
+  def all( s ):
+    """ True if all elements are nonzero. """
+    return bool( s._w.any( axis=1 ).all() )
+
+  def any( s ):
+    """ True if any element is nonzero. """
+    return bool( s._w.any() )
+
+  def __bool__( s ):
+    raise ValueError( "The truth value of a BitsArray is ambiguous. "
+                      "Use .all() or .any()" )
+
+  #-----------------------------------------------------------------------
+  # Extension and concatenation
+  #-----------------------------------------------------------------------
+
+  def zext( s, new_nbits ):
+    assert s.nbits < new_nbits <= 512
+    return BitsArray._wrap( new_nbits, _shift_words( s._w, 0, _nwords( new_nbits ) ) )
+
+  def sext( s, new_nbits ):
+    assert s.nbits < new_nbits <= 512
+    ret  = s.zext( new_nbits )
+    sign = s._bit_slice( s.nbits - 1 )._w[:, 0].astype( bool )
+    ones = _int_to_words( (1 << new_nbits) - (1 << s.nbits), ret._w.shape[1] )
+    ret._w[ sign ] |= ones[0]
+    return ret
+
+  @staticmethod
+  def concat( *arrays ):
+    """ Concatenate the elements of the given arrays bitwise, the first
+    array being the most significant bits, like concat for Bits. """
+    nbits = sum( x.nbits for x in arrays )
+    assert nbits <= 512, "We don't allow bitwidth to exceed 512."
+    assert len( { len(x) for x in arrays } ) == 1, "BitsArrays of different lengths"
+
+    w = np.zeros( (len(arrays[0]), _nwords( nbits )), dtype=_WORD_DTYPE )
+    begin = 0
+    for x in reversed( arrays ):
+      w |= _shift_words( x._w, begin, w.shape[1] )
+      begin += x.nbits
+    return BitsArray._wrap( nbits, w )
+
+  #-----------------------------------------------------------------------
+  # Print
+  #-----------------------------------------------------------------------
+
+  def __repr__( s ):
+    n = len(s)
+    if n > 6:
+      items = [ *s[:3], "...", *s[n-3:] ]
+    else:
+      items = list( s )
+    return "BitsArray{}( [{}] )".format( s.nbits, ", ".join( str(x) for x in items ) )
@@ -5,13 +5,24 @@ bits_import.py
 Import RPython Bits from PyPy mamba module if the environment variable
 that forces the use of Python Bits is set, and there is actually an
 importable Bits in mamba module. Otherwise import the Pure-Python
-implementation in Bits.py. Then generate a bunch of fixed-width BitsN
-types for PyMTL use.
+implementation in Bits.py, whose BitsN are specialized for their width
+(see specialize_bits in PythonBits.py).
+
+The fixed-width BitsN types are generated on demand: mk_bits compiles
+the template once per bitwidth and caches the type in the globals of
+this module, and the module-level __getattr__ calls mk_bits for names
+like Bits32/b32 that don't exist yet. This keeps "import pymtl3" from
+compiling hundreds of classes that are never used while
+"from pymtl3.datatypes import Bits32" and pickling BitsN objects still
+work as before. Python < 3.7 has no module-level __getattr__ (PEP 562),
+so there all predefined bitwidths are created at import time.
 
 Author : Shunning Jiang
 Date   : Aug 23, 2018
 """
 import os
+import re
+import sys
 
 # This __new__ approach has better performance
 # bits_template = """
@@ -21,18 +32,12 @@ import os
     # return Bits( {nbits}, value )
 
 if os.getenv("PYMTL_BITS") == "1":
-  from .PythonBits import Bits
+  from .PythonBits import Bits, _set_dirty_list, specialize_bits
   # print "[env: PYMTL_BITS=1] Use Python Bits"
-  bits_template = """
-class Bits{0}(Bits):
-  nbits = {0}
-  def __init__( s, value=0 ):
-    return super().__init__( {0}, value )
-_bits_types[{nbits}] = b{nbits} = Bits{nbits}
-"""
 else:
   try:
     from mamba import Bits
+    _set_dirty_list = None # RPython Bits does not record <<=
     # print "[default w/  Mamba] Use Mamba Bits"
     bits_template = """
 class Bits{0}(Bits):
@@ -41,25 +46,47 @@ class Bits{0}(Bits):
     return Bits.__new__( cls, {0}, value )
 _bits_types[{0}] = b{0} = Bits{0}
 """
+    specialize_bits = None
   except ImportError:
-    from .PythonBits import Bits
+    from .PythonBits import Bits, _set_dirty_list, specialize_bits
     # print "[default w/o Mamba] Use Python Bits"
-    bits_template = """
-class Bits{0}(Bits):
-  nbits = {0}
-  def __init__( s, value=0 ):
-    return super().__init__( {0}, value )
-_bits_types[{0}] = b{0} = Bits{0}
-"""
 
+# The bitwidths that are exported by "from pymtl3 import *"
 _bitwidths  = list(range(1, 256)) + [ 384, 512 ]
 _bits_types = dict()
 
-exec(compile( "".join([ bits_template.format(nbits) for nbits in _bitwidths ]),
-              filename="bits_import.py", mode="exec") )
+__all__ = [ 'Bits', 'mk_bits' ] + [ f"Bits{x}" for x in _bitwidths ] \
+                                + [ f"b{x}" for x in _bitwidths ]
+
+_bits_name_re = re.compile( r"(?:Bits|b)([1-9][0-9]*)$" )
 
 def mk_bits( nbits ):
-  assert nbits < 512, "We don't allow bitwidth to exceed 512."
-  if nbits not in _bits_types:
-    exec(compile( bits_template.format(nbits), filename=f"Bits{nbits}", mode="exec" ))
-  return _bits_types[nbits]
+  try:
+    return _bits_types[ nbits ]
+  except KeyError:
+    pass
+
+  assert nbits <= 512, "We don't allow bitwidth to exceed 512."
+  if specialize_bits is None:
+    # Exec in the globals of this module so that BitsN can be found by
+    # pickle and by later lookups
+    exec( compile( bits_template.format(nbits), filename=f"Bits{nbits}", mode="exec" ),
+          globals() )
+  else:
+    t = specialize_bits( nbits, mk_bits )
+    t.__module__ = __name__
+    _bits_types[ nbits ] = globals()[ f"Bits{nbits}" ] = globals()[ f"b{nbits}" ] = t
+  return _bits_types[ nbits ]
+
+def __getattr__( name ):
+  m = _bits_name_re.match( name )
+  if m is None or int( m.group(1) ) > 512:
+    raise AttributeError( f"module {__name__!r} has no attribute {name!r}" )
+  return mk_bits( int( m.group(1) ) )
+
+# Bits1 is needed by the other width-specialized BitsN
+mk_bits(1)
+
+if sys.version_info < (3, 7):
+  for _nbits in _bitwidths:
+    mk_bits( _nbits )
@@ -45,6 +45,25 @@ class Pixel:
   def __str__( self ):
     return f'({self.r},{self.g},{self.b})'
 
+Every bit struct has a to_bits method and a from_bits class method that
+convert between the struct and one BitsN holding all fields. The first
+field occupies the most significant bits, which is the same layout as the
+translated SystemVerilog packed struct.
+
+With @bitstruct( packed=True ), an instance holds all fields in a single
+int and each field is a generated property that shifts and masks it.
+__eq__, __hash__, <<=, to_bits and from_bits then work on one int instead
+of on every field. Since the property returns a new BitsN, modifying the
+returned field in place (e.g. pt.x[0] = 1 or pt.x <<= 1) does not write
+back to the struct; assign the field or the whole struct instead. For a
+signal of a packed struct type, elaboration rejects such writes in update
+blocks, including <<= to a field in update_ff. Packed structs cannot have
+list fields.
+
+clone() returns a copy of a bit struct or Bits object and is what
+copy.copy and copy.deepcopy call. Prefer it over deepcopy in code that
+runs every cycle.
+
 Author : Yanghui Ou, Shunning Jiang
   Date : Oct 19, 2019
 """
@@ -52,9 +71,8 @@ import keyword
 import types
 import warnings
 
-import py
-
-from .bits_import import *
+from . import PythonBits
+from .bits_import import Bits, mk_bits
 
 #-------------------------------------------------------------------------
 # Constants
@@ -93,6 +111,8 @@ _ANTI_CONFLICT_SELF_NAME = '__bitstruct_self__'
 # dataclass implementation!
 
 def _create_fn( fn_name, args_lst, body_lst, _globals=None, class_method=False ):
+  import py
+
   # Assemble argument string and body string
   args = ', '.join(args_lst)
   body = '\n'.join(f'  {statement}' for statement in body_lst)
@@ -320,6 +340,265 @@ def _mk_ff_fn( fields ):
     flip_strs,
   ),
 
+#-------------------------------------------------------------------------
+# _mk_clone_fn
+#-------------------------------------------------------------------------
+# Creates a clone function that copies every field, which is much cheaper
+# than deepcopy since it doesn't go through the memo machinery. For
+# example, if fields contains a field x (Bits4) and a field p
+# ([[Bits4]*3]*2), _mk_clone_fn will return a function that looks like
+# the following:
+#
+# def clone( self ):
+#   s = _new(self.__class__)
+#   s.x = self.x.clone()
+#   s.p = [[e1.clone() for e1 in e0] for e0 in self.p]
+#   return s
+#
+# Bits without a clone method (e.g. the RPython Bits) are copied with
+# their constructor.
+
+def _mk_clone_fn( fields ):
+  _globals = { '_new': object.__new__ }
+
+  def _recursive_generate_expr( expr, type_, depth ):
+    if isinstance( type_, list ):
+      e = f'e{depth}'
+      return f'[{_recursive_generate_expr( e, type_[0], depth+1 )} for {e} in {expr}]'
+    if hasattr( type_, 'clone' ):
+      return f'{expr}.clone()'
+    t = f'_type_{len(_globals)}'
+    _globals[ t ] = type_
+    return f'{t}({expr})'
+
+  return _create_fn(
+    'clone',
+    [ 'self' ],
+    [ 's = _new(self.__class__)' ] +
+    [ f's.{name} = {_recursive_generate_expr( f"self.{name}", type_, 0 )}'
+      for name, type_ in fields.items() ] +
+    [ 'return s' ],
+    _globals = _globals,
+  )
+
+def _deepcopy_by_clone( self, memo ):
+  return self.clone()
+
+#-------------------------------------------------------------------------
+# _get_nbits
+#-------------------------------------------------------------------------
+# Returns the total bitwidth of a field type.
+
+def _get_nbits( type_ ):
+  if isinstance( type_, list ):
+    return len(type_) * _get_nbits( type_[0] )
+  if is_bitstruct_class( type_ ):
+    return type_.__bitstruct_nbits__
+  return type_.nbits
+
+# Bit structs can be wider than the widest BitsN. Their to_bits only
+# fails when it is called.
+
+def _mk_bits_lazy( nbits ):
+  if nbits <= 512:
+    return mk_bits( nbits )
+  return lambda v: mk_bits( nbits )( v )
+
+#-------------------------------------------------------------------------
+# _mk_to_bits_fn
+#-------------------------------------------------------------------------
+# Creates a to_bits function that packs all fields into one int. The first
+# field takes the most significant bits and element 0 of a list takes the
+# least significant bits of that field, which is the layout of the
+# translated packed struct. For example, if fields contains a field x
+# (Bits4) and a field p ([Bits2, Bits2]), _mk_to_bits_fn will return a
+# function that looks like the following:
+#
+# def to_bits( self ):
+#   return _bits( (int(self.x) << 4) | (int(self.p[1]) << 2) | int(self.p[0]) )
+
+def _mk_to_bits_fn( fields, nbits ):
+  terms = []
+
+  def _recursive_generate_terms( expr, type_, lsb ):
+    if isinstance( type_, list ):
+      w = _get_nbits( type_[0] )
+      for i in reversed( range( len(type_) ) ):
+        _recursive_generate_terms( f'{expr}[{i}]', type_[0], lsb + i*w )
+    else:
+      value = f'int({expr}.to_bits())' if is_bitstruct_class( type_ ) else f'int({expr})'
+      terms.append( f'({value} << {lsb})' if lsb else value )
+
+  lsb = nbits
+  for name, type_ in fields.items():
+    lsb -= _get_nbits( type_ )
+    _recursive_generate_terms( f'self.{name}', type_, lsb )
+
+  return _create_fn(
+    'to_bits',
+    [ 'self' ],
+    [ f'return _bits( {" | ".join( terms )} )' ],
+    _globals = { '_bits': _mk_bits_lazy( nbits ) },
+  )
+
+#-------------------------------------------------------------------------
+# _mk_from_bits_fn
+#-------------------------------------------------------------------------
+# Creates a from_bits class method that is the inverse of to_bits. The
+# fields are set directly on a new instance so that a user-defined
+# __init__ is not involved. For the fields above it looks like:
+#
+# @classmethod
+# def from_bits( cls, bits ):
+#   v = int(bits)
+#   s = _new(cls)
+#   s.x = _type_0((v >> 4) & 15)
+#   s.p = [_type_1((v >> 0) & 3), _type_2((v >> 2) & 3)]
+#   return s
+
+def _mk_from_bits_fn( fields, nbits ):
+  _globals = { '_new': object.__new__ }
+
+  def _recursive_generate_expr( type_, lsb ):
+    if isinstance( type_, list ):
+      w = _get_nbits( type_[0] )
+      return f"[{', '.join( _recursive_generate_expr( type_[0], lsb + i*w ) for i in range(len(type_)) )}]"
+
+    t = f'_type_{len(_globals)}'
+    _globals[ t ] = type_
+    value = f'(v >> {lsb}) & {(1 << _get_nbits( type_ )) - 1}'
+    return f'{t}.from_bits({value})' if is_bitstruct_class( type_ ) else f'{t}({value})'
+
+  body = [ 'v = int(bits)', 's = _new(cls)' ]
+  lsb  = nbits
+  for name, type_ in fields.items():
+    lsb -= _get_nbits( type_ )
+    body.append( f's.{name} = {_recursive_generate_expr( type_, lsb )}' )
+
+  return _create_fn(
+    'from_bits',
+    [ 'cls', 'bits' ],
+    body + [ 'return s' ],
+    _globals = _globals,
+    class_method = True,
+  )
+
+#-------------------------------------------------------------------------
+# _mk_packed_fns
+#-------------------------------------------------------------------------
+# Creates the methods of a packed bit struct, whose only state is the int
+# self._v. For example, if fields contains two field x (Bits4) and y
+# (Bits4), the generated getter and setter of x look like the following:
+#
+# def _get_x( self ):
+#   return _type_x((self._v >> 4) & 15)
+#
+# def _set_x( self, v ):
+#   self._v = (self._v & 15) | ((int(v) & 15) << 4)
+#
+# A nested bit struct field is read with _type_x.from_bits and written
+# with v.to_bits(). __init__ combines the arguments in the same way:
+#
+# def __init__( s, x = 0, y = 0 ):
+#   s._v = ((int(x) & 15) << 4) | (int(y) & 15)
+
+def _mk_packed_fns( self_name, fields, nbits ):
+  ret = {}
+  init_terms = []
+
+  lsb = nbits
+  for name, type_ in fields.items():
+    w = _get_nbits( type_ )
+    lsb -= w
+    mask  = (1 << w) - 1
+    clear = ((1 << nbits) - 1) & ~(mask << lsb)
+
+    _globals = { f'_type_{name}': type_ }
+
+    if is_bitstruct_class( type_ ):
+      getter = f'return _type_{name}.from_bits((self._v >> {lsb}) & {mask})'
+      value  = 'int(v.to_bits())'
+      init_value = f'(0 if {name} is None else int({name}.to_bits()))'
+    else:
+      getter = f'return _type_{name}((self._v >> {lsb}) & {mask})'
+      value  = f'(int(v) & {mask})'
+      init_value = f'(int({name}) & {mask})'
+
+    shift = f' << {lsb}' if lsb else ''
+    init_terms.append( f'({init_value}{shift})' )
+
+    ret[ name ] = property(
+      _create_fn( f'_get_{name}', [ 'self' ], [ getter ], _globals = _globals ),
+      _create_fn( f'_set_{name}', [ 'self', 'v' ],
+                  [ f'self._v = (self._v & {clear}) | ({value}{shift})' ],
+                  _globals = _globals ),
+    )
+
+  ret['__init__'] = _create_fn(
+    '__init__',
+    [ self_name ] + [ _mk_init_arg( *field ) for field in fields.items() ],
+    [ f'{self_name}._v = {" | ".join( init_terms )}' ],
+  )
+
+  ret['__eq__'] = _create_fn(
+    '__eq__',
+    [ 'self', 'other' ],
+    [ 'return (other.__class__ is self.__class__) and self._v == other._v' ]
+  )
+
+  ret['__hash__'] = _create_fn(
+    '__hash__',
+    [ 'self' ],
+    [ 'return hash(self._v)' ]
+  )
+
+  # Record self in the dirty list like Bits.__ilshift__ does
+  ret['__ilshift__'] = _create_fn(
+    '__ilshift__',
+    [ 'self', 'o' ],
+    [ 'if o.__class__ is not self.__class__:',
+      '  raise TypeError(f"Assign {type(o)} to {type(self)}")',
+      'self._next = o._v',
+      'if _PythonBits._dirty is not None:',
+      '  _PythonBits._dirty.append( self )',
+      'return self' ],
+    _globals = { '_PythonBits': PythonBits },
+  )
+
+  ret['_flip'] = _create_fn(
+    '_flip',
+    [ 'self' ],
+    [ 'self._v = self._next' ]
+  )
+
+  ret['clone'] = _create_fn(
+    'clone',
+    [ 'self' ],
+    [ 's = _new(self.__class__)',
+      's._v = self._v',
+      'return s' ],
+    _globals = { '_new': object.__new__ },
+  )
+
+  ret['to_bits'] = _create_fn(
+    'to_bits',
+    [ 'self' ],
+    [ 'return _bits(self._v)' ],
+    _globals = { '_bits': _mk_bits_lazy( nbits ) },
+  )
+
+  ret['from_bits'] = _create_fn(
+    'from_bits',
+    [ 'cls', 'bits' ],
+    [ 's = _new(cls)',
+      f's._v = int(bits) & {(1 << nbits) - 1}',
+      'return s' ],
+    _globals = { '_new': object.__new__ },
+    class_method = True,
+  )
+
+  return ret
+
 #-------------------------------------------------------------------------
 # _check_valid_array
 #-------------------------------------------------------------------------
@@ -392,7 +671,7 @@ def _get_self_name( fields ):
 _bitstruct_hash_cache = {}
 
 def _process_class( cls, add_init=True, add_str=True, add_repr=True,
-                    add_hash=True ):
+                    add_hash=True, packed=False ):
 
   # Get annotations of the class
   cls_annotations = cls.__dict__.get('__annotations__', {})
@@ -415,8 +694,16 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
     fields[ a_name ] = a_type
     hashable_fields[ a_name ] = _convert_list_to_tuple( a_type )
 
+  if packed:
+    for name, type_ in fields.items():
+      if isinstance( type_, list ):
+        raise TypeError( "A packed BitStruct cannot have list fields:\n"
+                        f"- Field '{name}' of BitStruct {cls.__name__} is annotated as {type_}." )
+      if name in ( '_v', '_next' ):
+        raise TypeError( f"Field name {name!r} of packed BitStruct {cls.__name__} is reserved." )
+
   cls._hash = _hash = hash( (cls.__name__, *tuple(hashable_fields.items()),
-                             add_init, add_str, add_repr, add_hash) )
+                             add_init, add_str, add_repr, add_hash, packed) )
 
   if _hash in _bitstruct_hash_cache:
     return _bitstruct_hash_cache[ _hash ]
@@ -426,6 +713,17 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
   # Stamp the special attribute so that translation pass can identify it
   # as bit struct.
   setattr( cls, _FIELDS, fields )
+  cls.__bitstruct_nbits__ = nbits = sum( _get_nbits( x ) for x in fields.values() )
+  cls.__bitstruct_packed__ = packed
+
+  # A packed bit struct replaces the fields by properties and only keeps
+  # the int. The class attribute _v makes the properties work in a
+  # user-defined __init__.
+  if packed:
+    packed_fns = _mk_packed_fns( _get_self_name(fields), fields, nbits )
+    cls._v = 0
+    for name in fields:
+      setattr( cls, name, packed_fns[ name ] )
 
   # Add methods to the class
 
@@ -434,7 +732,8 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
   # did not define their own init.
   if add_init:
     if not '__init__' in cls.__dict__:
-      cls.__init__ = _mk_init_fn( _get_self_name(fields), fields )
+      cls.__init__ = packed_fns['__init__'] if packed else \
+                     _mk_init_fn( _get_self_name(fields), fields )
 
   # Create __str__
   if add_str:
@@ -453,7 +752,7 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
   # equal only if all the fields are equal. We always try to add __eq__
 
   if not '__eq__' in cls.__dict__:
-    cls.__eq__ = _mk_eq_fn( fields )
+    cls.__eq__ = packed_fns['__eq__'] if packed else _mk_eq_fn( fields )
   else:
     w_msg = ( f'Overwriting {cls.__qualname__}\'s __eq__ may cause the '
               'translated verilog behaves differently from PyMTL '
@@ -463,12 +762,15 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
   # Create __hash__.
   if add_hash:
     if not '__hash__' in cls.__dict__:
-      cls.__hash__ = _mk_hash_fn( fields )
+      cls.__hash__ = packed_fns['__hash__'] if packed else _mk_hash_fn( fields )
 
   # Shunning: add __ilshift__ and _flip for update_ff
   assert not '__ilshift__' in cls.__dict__ and not '_flip' in cls.__dict__
 
-  cls.__ilshift__, cls._flip = _mk_ff_fn( fields )
+  if packed:
+    cls.__ilshift__, cls._flip = packed_fns['__ilshift__'], packed_fns['_flip']
+  else:
+    cls.__ilshift__, cls._flip = _mk_ff_fn( fields )
 
   assert not 'get_field_type' in cls.__dict__
 
@@ -479,7 +781,24 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
 
   cls.get_field_type = classmethod(get_field_type)
 
-  # TODO: maybe add a to_bits and from bits function.
+  assert not 'to_bits' in cls.__dict__ and not 'from_bits' in cls.__dict__
+
+  if packed:
+    cls.to_bits, cls.from_bits = packed_fns['to_bits'], packed_fns['from_bits']
+  else:
+    cls.to_bits   = _mk_to_bits_fn( fields, nbits )
+    cls.from_bits = _mk_from_bits_fn( fields, nbits )
+
+  # Create clone, and make copy.copy and copy.deepcopy use it. Fields are
+  # values, so copy.copy copies them as well.
+  if not 'clone' in cls.__dict__:
+    cls.clone = packed_fns['clone'] if packed else _mk_clone_fn( fields )
+
+  if not '__copy__' in cls.__dict__:
+    cls.__copy__ = cls.clone
+
+  if not '__deepcopy__' in cls.__dict__:
+    cls.__deepcopy__ = _deepcopy_by_clone
 
   return cls
 
@@ -489,10 +808,11 @@ def _process_class( cls, add_init=True, add_str=True, add_repr=True,
 # The actual class decorator. We add a * in the argument list so that the
 # following argument can only be used as keyword arguments.
 
-def bitstruct( _cls=None, *, add_init=True, add_str=True, add_repr=True, add_hash=True ):
+def bitstruct( _cls=None, *, add_init=True, add_str=True, add_repr=True, add_hash=True,
+               packed=False ):
 
   def wrap( cls ):
-    return _process_class( cls, add_init, add_str, add_repr )
+    return _process_class( cls, add_init, add_str, add_repr, packed=packed )
 
   # Called as @bitstruct(...)
   if _cls is None:
@@ -508,7 +828,7 @@ def bitstruct( _cls=None, *, add_init=True, add_str=True, add_repr=True, add_has
 # TODO: should we add base parameters to support inheritence?
 
 def mk_bitstruct( cls_name, fields, *, namespace=None, add_init=True,
-                   add_str=True, add_repr=True, add_hash=True ):
+                   add_str=True, add_repr=True, add_hash=True, packed=False ):
 
   # copy namespace since  will mutate it
   namespace = {} if namespace is None else namespace.copy()
@@ -527,4 +847,4 @@ def mk_bitstruct( cls_name, fields, *, namespace=None, add_init=True,
   namespace['__annotations__'] = annos
   cls = types.new_class( cls_name, (), {}, lambda ns: ns.update( namespace ) )
   return bitstruct( cls, add_init=add_init, add_str=add_str,
-                    add_repr=add_repr, add_hash=add_hash )
+                    add_repr=add_repr, add_hash=add_hash, packed=packed )
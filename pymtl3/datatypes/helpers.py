@@ -9,24 +9,75 @@ Author : Shunning Jiang
 Date   : Nov 3, 2017
 """
 import math
+from functools import partial
 
-from .bits_import import *
+from .bits_import import Bits, b1, mk_bits
 
+#-------------------------------------------------------------------------
+# Caches
+#-------------------------------------------------------------------------
+# The helpers are called in update blocks every cycle, so everything that
+# only depends on the bitwidths is computed once and cached.
 
-def concat( *args ):
-  nbits = sum( [ x.nbits for x in args ] )
-  concat_bits = Bits( nbits, 0 )
+# BitsN of a bitwidth. Bitwidths that mk_bits doesn't support fall back
+# to the generic Bits( nbits, value ).
+
+class _BitsTypes( dict ):
+  def __missing__( self, nbits ):
+    self[ nbits ] = ret = mk_bits( nbits ) if 0 < nbits <= 512 else partial( Bits, nbits )
+    return ret
+
+_bits_types = _BitsTypes()
+
+class _Masks( dict ):
+  def __missing__( self, nbits ):
+    self[ nbits ] = ret = (1 << nbits) - 1
+    return ret
+
+_masks = _Masks()
+
+# concat functions specialized for a tuple of argument bitwidths. For
+# example, the function for ( 4, 8, 4 ) looks like the following:
+#
+# def concat_4_8_4( a0, a1, a2 ):
+#   return _bits( (int(a0) << 12) | (int(a1) << 4) | int(a2) )
+
+class _ConcatFns( dict ):
+  def __missing__( self, widths ):
+    args  = [ f"a{i}" for i in range(len(widths)) ]
+    terms = []
+    lsb   = sum( widths )
+    for arg, nbits in zip( args, widths ):
+      lsb -= nbits
+      terms.append( f"(int({arg}) << {lsb})" if lsb else f"int({arg})" )
 
-  begin = 0
-  for bits in reversed( args ):
-    concat_bits[ begin : begin+bits.nbits ] = bits
-    begin += bits.nbits
+    name = "concat_" + "_".join( [ str(x) for x in widths ] )
+    src  = f"def {name}( {', '.join( args )} ):\n" \
+           f"  return _bits( {' | '.join( terms ) or '0'} )\n"
+    _globals = { "_bits": _bits_types[ sum( widths ) ] }
+    exec( compile( src, filename=name, mode="exec" ), _globals )
 
-  return concat_bits
+    self[ widths ] = ret = _globals[ name ]
+    return ret
+
+_concat_fns = _ConcatFns()
+
+try:
+  _popcount = int.bit_count
+except AttributeError: # Python < 3.10
+  def _popcount( value ):
+    return bin( value ).count( "1" )
+
+#-------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------
+
+def concat( *args ):
+  return _concat_fns[ tuple( [ x.nbits for x in args ] ) ]( *args )
 
 def zext( value, new_width ):
   assert new_width > value.nbits
-  return Bits( new_width, value )
+  return _bits_types[ new_width ]( value )
 
 def clog2( N ):
   assert N > 0
@@ -34,11 +85,11 @@ def clog2( N ):
 
 def sext( value, new_width ):
   assert new_width > value.nbits
-  return Bits( new_width, value.int() )
+  return _bits_types[ new_width ]( value.int() )
 
 def reduce_and( value ):
   try:
-    return b1( int(value) == (1 << value.nbits) - 1 )
+    return b1( int(value) == _masks[ value.nbits ] )
   except AttributeError:
     raise TypeError("Cannot call reduce_and on int")
 
@@ -50,12 +101,6 @@ def reduce_or( value ):
 
 def reduce_xor( value ):
   try:
-    pop_count = 0
-    value = int(value)
-    while value != 0:
-      pop_count += value & 1
-      value >>= 1
-    return b1( pop_count & 1 )
-
+    return b1( _popcount( int(value) ) & 1 )
   except AttributeError:
     raise TypeError("Cannot call reduce_xor on int")
@@ -0,0 +1,97 @@
+"""
+========================================================================
+bits_array_test.py
+========================================================================
+"""
+import random
+
+import pytest
+
+from pymtl3 import datatypes
+from pymtl3.datatypes import mk_bits, sext
+
+# BitsArray needs numpy
+pytest.importorskip( "numpy" )
+BitsArray = datatypes.BitsArray
+
+
+def _values( arr ):
+  return [ int(x) for x in arr ]
+
+@pytest.mark.parametrize( "nbits", [ 1, 8, 63, 64, 65, 128, 200 ] )
+def test_bits_array_ops( nbits ):
+  rng  = random.Random( nbits )
+  mask = (1 << nbits) - 1
+  xs = [ rng.getrandbits( nbits ) for _ in range(40) ] + [ 0, mask, mask ]
+  ys = [ rng.getrandbits( nbits ) for _ in range(40) ] + [ mask, 0, mask ]
+  a, b = BitsArray.from_values( nbits, xs ), BitsArray.from_values( nbits, ys )
+
+  def ref( f ):
+    return [ f( x, y ) & mask for x, y in zip( xs, ys ) ]
+
+  assert _values( a + b ) == ref( lambda x, y: x + y )
+  assert _values( a - b ) == ref( lambda x, y: x - y )
+  assert _values( a & b ) == ref( lambda x, y: x & y )
+  assert _values( a | b ) == ref( lambda x, y: x | y )
+  assert _values( a ^ b ) == ref( lambda x, y: x ^ y )
+  assert _values( ~a )    == ref( lambda x, y: ~x )
+  assert _values( a + 5 ) == ref( lambda x, y: x + 5 )
+  assert _values( 3 - a ) == ref( lambda x, y: 3 - x )
+  for sh in [ 0, 1, nbits // 2, nbits - 1, nbits, 64, 70 ]:
+    assert _values( a << sh ) == ref( lambda x, y: x << sh )
+    assert _values( a >> sh ) == ref( lambda x, y: x >> sh )
+
+  assert _values( a == b ) == ref( lambda x, y: int( x == y ) )
+  assert _values( a != b ) == ref( lambda x, y: int( x != y ) )
+  assert _values( a <  b ) == ref( lambda x, y: int( x <  y ) )
+  assert _values( a <= b ) == ref( lambda x, y: int( x <= y ) )
+  assert _values( a >  b ) == ref( lambda x, y: int( x >  y ) )
+  assert _values( a >= b ) == ref( lambda x, y: int( x >= y ) )
+  assert ( a == a ).all() and not ( a != a ).any()
+
+  # Element access and bit slicing
+  assert type( a[3] ) is mk_bits( nbits ) and a[3] == xs[3]
+  assert _values( a[1:4] ) == xs[1:4]
+  assert _values( a[:, 0] ) == [ x & 1 for x in xs ]
+  if nbits > 2:
+    assert a[:, 1:nbits-1].nbits == nbits - 2
+    assert _values( a[:, 1:nbits-1] ) == [ (x >> 1) & (mask >> 2) for x in xs ]
+
+  # Extension and concatenation
+  assert _values( a.zext( nbits + 70 ) ) == xs
+  if nbits > 1:
+    assert _values( a.sext( nbits + 70 ) ) == \
+           [ int( sext( mk_bits(nbits)(x), nbits + 70 ) ) for x in xs ]
+  assert _values( BitsArray.concat( a, b ) ) == [ (x << nbits) | y for x, y in zip( xs, ys ) ]
+
+def test_bits_array_buffers():
+  a = BitsArray.random( 100, 1000, seed=0 )
+  assert len(a) == 1000 and a.words.shape == (1000, 2)
+  assert all( x < (1 << 100) for x in _values( a ) )
+
+  b = BitsArray.from_bytes( 100, a.tobytes() )
+  assert ( a == b ).all()
+
+  # from_bytes wraps the buffer without copying
+  buf = bytearray( a.tobytes() )
+  c = BitsArray.from_bytes( 100, buf )
+  c[0] = 7
+  assert BitsArray.from_bytes( 100, buf )[0] == 7
+
+  view = memoryview( a.words )
+  a[1] = 5
+  assert view[1, 0] == 5
+
+  x = BitsArray( 16, 4 )
+  x[0]   = mk_bits(16)( 3 )
+  x[2:4] = [ 7, 8 ]
+  assert _values( x ) == [ 3, 0, 7, 8 ]
+  with pytest.raises( ValueError ):
+    bool( x )
+
+def test_import_from_datatypes():
+  # The documented way to import BitsArray, which also has to work on
+  # Python < 3.7 without a module-level __getattr__
+  from pymtl3.datatypes import BitsArray as T
+  assert T is BitsArray
+  assert T.from_values( 8, [ 1, 2 ] )[1] == mk_bits(8)(2)
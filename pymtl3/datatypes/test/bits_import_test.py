@@ -0,0 +1,135 @@
+"""
+========================================================================
+bits_import_test.py
+========================================================================
+"""
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from pymtl3.datatypes import bits_import, mk_bits
+
+# Python < 3.7 has no module-level __getattr__ and creates BitsN eagerly
+needs_lazy_bits = pytest.mark.skipif( sys.version_info < (3, 7),
+                                      reason="module __getattr__ needs Python 3.7" )
+
+@needs_lazy_bits
+def test_lazy_bits_types():
+  # Bits300 is not one of the predefined bitwidths
+  assert 300 not in bits_import._bitwidths
+
+  from pymtl3 import Bits300
+  from pymtl3.datatypes import b300
+
+  assert Bits300 is b300 is mk_bits(300)
+  assert Bits300.nbits == 300
+  assert Bits300.__module__ == bits_import.__name__
+
+  x = pickle.loads( pickle.dumps( mk_bits(77)(5) ) )
+  assert type(x) is mk_bits(77)
+  assert x == 5
+
+def test_lazy_bits_invalid_names():
+  import pymtl3
+  # Bits0 is left out since other tests may create it with mk_bits(0)
+  for name in [ "Bits00", "Bits600", "b01", "Bitsx", "bits8" ]:
+    with pytest.raises( AttributeError ):
+      getattr( pymtl3, name )
+
+  with pytest.raises( ImportError ):
+    from pymtl3.datatypes import Bits513
+
+@needs_lazy_bits
+def test_import_is_lazy():
+  root = os.path.join( os.path.dirname( __file__ ), "..", "..", ".." )
+  src  = """
+import sys
+sys.path.insert( 0, {!r} )
+import pymtl3
+from pymtl3.datatypes import bits_import
+heavy = [ x for x in [ "graphviz", "greenlet", "py", "cffi", "hypothesis" ]
+          if x in sys.modules ]
+print( len( bits_import._bits_types ), ",".join( heavy ) )
+""".format( root )
+  out = subprocess.check_output( [ sys.executable, "-c", src ],
+                                 universal_newlines=True )
+  nbits_types, heavy = ( out.strip().split(" ") + [ "" ] )[:2]
+  assert int( nbits_types ) < len( bits_import._bitwidths )
+  assert heavy == ""
+
+def test_predefined_bits_types():
+  import pymtl3
+  from pymtl3.datatypes import Bits200, b384
+  assert Bits200 is pymtl3.b200 is mk_bits(200)
+  assert b384 is pymtl3.Bits384
+
+def test_specialized_bits_match_generic():
+  from pymtl3.datatypes import Bits
+  ops = [ lambda x, y: x + y, lambda x, y: x - y, lambda x, y: x * y,
+          lambda x, y: x & y, lambda x, y: x | y, lambda x, y: x ^ y,
+          lambda x, y: x == y, lambda x, y: x != y, lambda x, y: x < y,
+          lambda x, y: x <= y, lambda x, y: x > y, lambda x, y: x >= y ]
+
+  for nbits in [ 1, 7, 32, 64, 512 ]:
+    T = mk_bits( nbits )
+    mask = (1 << nbits) - 1
+    for x, y in [ (0, 0), (1, mask), (mask, mask), (0x5a5a5a5a5a5a & mask, 0x3c3c & mask) ]:
+      a,  b  = T(x), T(y)
+      ga, gb = Bits( nbits, x ), Bits( nbits, y )
+      for op in ops:
+        assert op( a, b ) == op( ga, gb )
+        assert op( a, y ) == op( ga, y )
+        assert op( a, b ).nbits == op( ga, gb ).nbits
+      assert ~a == ~ga
+      assert a << 1 == ga << 1 and a << nbits == 0
+      assert a >> 1 == ga >> 1
+      assert a[0] == ga[0] and a[0:nbits] == ga[0:nbits]
+      assert a.int() == ga.int()
+      assert hash(a) == hash(T(x))
+
+  # Comparisons return a new Bits1 object every time
+  b1 = mk_bits(1)
+  t = T(3) == T(3)
+  assert type(t) is b1 and t is not ( T(5) > T(4) )
+  t[0] = 0
+  assert t == 0 and ( T(3) == T(3) ) == 1
+  t <<= b1(1)
+  t._flip()
+  assert t == 1 and ( T(3) != T(3) ) == 0
+
+  x = mk_bits(8)(1)
+  x <<= mk_bits(8)(7)
+  y = pickle.loads( pickle.dumps( x ) )
+  y._flip()
+  assert x == 1 and y == 7
+
+def test_comparison_result_in_signal():
+  from pymtl3 import Bits1, Bits8, Component, InPort, OutPort, SimpleSim
+
+  # A comb block may store the result of a comparison in a signal and
+  # then modify the signal in place
+  class Top( Component ):
+    def construct( s ):
+      s.a   = InPort ( Bits8 )
+      s.b   = InPort ( Bits8 )
+      s.en  = InPort ( Bits1 )
+      s.out = OutPort( Bits1 )
+
+      @s.update
+      def up_out():
+        s.out = s.a == s.b
+        if s.en:
+          s.out[0] = Bits1(0)
+
+  top = Top()
+  top.apply( SimpleSim )
+  for a, b, en, ref in [ (1, 1, 1, 0), (1, 1, 0, 1), (2, 2, 1, 0), (3, 3, 0, 1) ]:
+    top.a  = Bits8( a )
+    top.b  = Bits8( b )
+    top.en = Bits1( en )
+    top.tick()
+    assert top.out == ref
+  assert ( Bits8(4) == Bits8(4) ) == 1
@@ -7,7 +7,8 @@ Test cases for bitstructs.
 Author : Yanghui Ou
   Date : July 27, 2019
 """
-from copy import deepcopy
+import pickle
+from copy import copy, deepcopy
 
 import pytest
 
@@ -220,12 +221,13 @@ NestedSimple = mk_bitstruct( "NestedSimple", {
 def test_struct():
   pt = StaticPoint( Bits4(2), Bits4(4) )
   print( pt           )
-  # print( pt.to_bits() )
+  print( pt.to_bits() )
   try:
     StaticPoint.__dict__[ 'haha' ]
   except KeyError as e:
     assert str( e ) == "'haha'"
-  # assert pt.to_bits() == 0x24
+  assert pt.to_bits() == 0x24
+  assert StaticPoint.from_bits( 0x24 ) == pt
   assert pt.x == 2
   assert pt.y == 4
 
@@ -474,3 +476,183 @@ def test_mk_high_d_list_struct_inside():
   b = B()
   assert b.x == Bits4(0)
   assert b.y == [ [ [ [ A(), A(), A()] ] for _ in range(6) ] for _ in range(10) ]
+
+#-------------------------------------------------------------------------
+# to_bits/from_bits and packed bit struct tests
+#-------------------------------------------------------------------------
+
+def test_to_bits_list_inside():
+  @bitstruct
+  class A:
+    x: Bits4
+  @bitstruct
+  class B:
+    x: Bits3
+    y: [ [ A, A, A ] ] * 2
+
+  b = B( Bits3(5) )
+  b.y[0][0].x = Bits4(1)
+  b.y[1][2].x = Bits4(0xc)
+  # Element 0 of a list takes the least significant bits
+  assert type( b.to_bits() ) is mk_bits(27)
+  assert b.to_bits() == (5 << 24) | (0xc << 20) | 1
+  assert B.from_bits( b.to_bits() ) == b
+
+@bitstruct( packed=True )
+class PackedPoint:
+  x : Bits4
+  y : Bits4
+
+@bitstruct( packed=True )
+class PackedNested:
+  a  : Bits3
+  pt : PackedPoint
+  b  : Bits9
+
+def test_packed():
+  pt = PackedPoint( 2, 4 )
+  assert pt.x == 2 and type( pt.x ) is Bits4
+  assert pt.y == 4
+  assert str( pt ) == "2:4"
+  assert pt.to_bits() == 0x24 and type( pt.to_bits() ) is Bits8
+  assert PackedPoint.from_bits( Bits8(0x24) ) == pt
+  assert pt != PackedPoint( 2, 5 )
+  assert hash( pt ) == hash( PackedPoint( 2, 4 ) )
+
+  pt.x = Bits4(7)
+  pt.y = 0x1f # truncated like Bits4( 0x1f )
+  assert pt == PackedPoint( 7, 15 )
+
+  n = PackedNested( 1, PackedPoint( 2, 3 ), 300 )
+  assert n.pt == PackedPoint( 2, 3 ) and n.b == 300
+  n.pt = PackedPoint( 5, 6 )
+  assert n.to_bits() == (1 << 17) | (0x56 << 9) | 300
+  assert PackedNested.from_bits( n.to_bits() ) == n
+  assert pickle.loads( pickle.dumps( n ) ) == n
+  assert deepcopy( n ) == n
+
+  # A non-packed struct can hold a packed one and vice versa
+  T = mk_bitstruct( "T", { 'p': PackedPoint, 'q': StaticPoint }, packed=False )
+  t = T( PackedPoint( 1, 2 ), StaticPoint( 3, 4 ) )
+  assert t.to_bits() == 0x1234
+  U = mk_bitstruct( "U", { 'p': PackedPoint, 'q': StaticPoint }, packed=True )
+  u = U.from_bits( 0x1234 )
+  assert u.q == StaticPoint( 3, 4 ) and u.p == PackedPoint( 1, 2 )
+
+  with pytest.raises( TypeError ):
+    mk_bitstruct( "V", { 'x': [ Bits4, Bits4 ] }, packed=True )
+
+def test_packed_component():
+  class A( Component ):
+    def construct( s ):
+      s.in_ = InPort( PackedNested )
+      s.out = OutPort( PackedNested )
+      s.reg = OutPort( PackedNested )
+
+      @s.update
+      def up_packed():
+        s.out = PackedNested( s.in_.a, s.in_.pt, s.in_.b + 1 )
+
+      @s.update_ff
+      def up_packed_ff():
+        s.reg <<= s.in_
+
+  dut = A()
+  dut.elaborate()
+  dut.apply( simple_sim_pass )
+  dut.in_ = PackedNested( 1, PackedPoint( 2, 3 ), 4 )
+  dut.tick()
+  assert dut.out == PackedNested( 1, PackedPoint( 2, 3 ), 5 )
+  dut.tick()
+  assert dut.reg == PackedNested( 1, PackedPoint( 2, 3 ), 4 )
+
+def test_packed_component_field_write():
+  from pymtl3.dsl.errors import SignalTypeError
+
+  class A( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits4 )
+      s.out = OutPort( PackedNested )
+
+      # Assigning a whole field writes back through the property
+      @s.update
+      def up_packed():
+        s.out.a  = Bits3(1)
+        s.out.pt = PackedPoint( s.in_, s.in_ + 1 )
+        s.out.b  = Bits9(2)
+
+  dut = A()
+  dut.elaborate()
+  dut.apply( simple_sim_pass )
+  dut.in_ = Bits4(3)
+  dut.tick()
+  assert dut.out == PackedNested( 1, PackedPoint( 3, 4 ), 2 )
+
+  class B( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits4 )
+      s.out = OutPort( PackedPoint )
+
+      @s.update_ff
+      def up_packed_ff():
+        s.out.x <<= s.in_
+
+  class C( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits4 )
+      s.out = OutPort( PackedNested )
+
+      @s.update
+      def up_packed():
+        s.out = PackedNested()
+        s.out.pt.x = s.in_
+
+  class D( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits4 )
+      s.out = OutPort( PackedPoint )
+
+      @s.update
+      def up_packed():
+        s.out = PackedPoint()
+        s.out.y[0:4] = s.in_
+
+  # These writes would modify the temporary object that the property
+  # returns, so they are rejected during elaboration
+  for cls in [ B, C, D ]:
+    with pytest.raises( SignalTypeError ) as e:
+      cls().elaborate()
+    assert "packed BitStruct" in str( e.value )
+
+def test_clone():
+  @bitstruct
+  class A:
+    x: Bits4
+    y: [ [ Bits4, Bits4, Bits4 ] ] * 2
+    p: PackedPoint
+    n: [ StaticPoint, StaticPoint ]
+
+  a = A( Bits4(1) )
+  a.y[1][2] = Bits4(3)
+  a.p = PackedPoint( 5, 6 )
+  a.n[1].x = Bits4(7)
+
+  for b in [ a.clone(), copy( a ), deepcopy( a ) ]:
+    assert type( b ) is A and b == a
+    assert b.x is not a.x and b.y[1] is not a.y[1] and b.y[1][2] is not a.y[1][2]
+    assert b.n[1] is not a.n[1]
+    b.y[1][2][0] = 0
+    b.n[1].x[0] = 0
+    assert a.y[1][2] == 3 and a.n[1].x == 7
+
+  p = PackedNested( 1, PackedPoint( 2, 3 ), 4 )
+  q = p.clone()
+  q.b = 5
+  assert p.b == 4 and deepcopy( p ) == p
+
+  # The pending value of <<= is not copied
+  x = Bits4( 1 )
+  x <<= Bits4( 2 )
+  y = x.clone()
+  assert type( y ) is Bits4 and y == 1 and not hasattr( y, "_next" )
+  assert type( Bits( 6, 9 ).clone() ) is Bits and Bits( 6, 9 ).clone() == 9
@@ -0,0 +1,58 @@
+"""
+========================================================================
+helpers_test.py
+========================================================================
+"""
+import random
+
+import pytest
+
+from pymtl3.datatypes import (
+    Bits,
+    concat,
+    mk_bits,
+    reduce_and,
+    reduce_or,
+    reduce_xor,
+    sext,
+    zext,
+)
+
+
+def test_concat():
+  rng = random.Random( 0 )
+  for widths in [ (1,), (4, 8, 4), (1, 1, 1, 1, 1), (300, 212), (64, 1, 200), (512, 8) ]:
+    values = [ rng.getrandbits( w ) for w in widths ]
+    ref = 0
+    for w, v in zip( widths, values ):
+      ref = (ref << w) | v
+
+    for args in [ [ mk_bits(w)(v) for w, v in zip( widths, values ) ],
+                  [ Bits( w, v ) for w, v in zip( widths, values ) ] ]:
+      x = concat( *args )
+      assert x.nbits == sum( widths ) and x == ref
+      if sum( widths ) <= 512:
+        assert type( x ) is mk_bits( sum( widths ) )
+
+  with pytest.raises( AttributeError ):
+    concat( mk_bits(4)(1), 3 )
+
+def test_ext():
+  assert zext( mk_bits(4)(0xf), 8 ) == 0x0f
+  assert sext( mk_bits(4)(0xf), 8 ) == 0xff and type( sext( mk_bits(4)(0xf), 8 ) ) is mk_bits(8)
+  assert sext( mk_bits(4)(0x7), 600 ) == 0x7 and sext( mk_bits(4)(0x8), 600 ).nbits == 600
+  assert sext( Bits( 100, 1 << 99 ), 200 ) == ((1 << 200) - 1) ^ ((1 << 99) - 1)
+
+def test_reduce():
+  rng = random.Random( 1 )
+  for nbits in [ 1, 7, 64, 512 ]:
+    mask = (1 << nbits) - 1
+    for v in [ 0, mask, 1, rng.getrandbits( nbits ), rng.getrandbits( nbits ) ]:
+      x = mk_bits(nbits)( v )
+      assert reduce_and( x ) == ( v == mask )
+      assert reduce_or ( x ) == ( v != 0 )
+      assert reduce_xor( x ) == bin( v ).count( "1" ) % 2
+      assert reduce_xor( Bits( nbits, v ) ) == bin( v ).count( "1" ) % 2
+
+  with pytest.raises( TypeError ):
+    reduce_and( 3 )
@@ -0,0 +1,140 @@
+"""
+========================================================================
+AstCache.py
+========================================================================
+An optional on-disk cache of the parsed ASTs of update blocks and the
+reads/writes/calls extracted from them. ComponentLevel2 already caches
+these on the class object, but every new process has to parse every
+update block again. The disk cache is enabled by setting the
+PYMTL_AST_CACHE environment variable (or calling set_cache_dir) to a
+directory.
+
+An entry is keyed by the content hash of the source file, the qualified
+name and first line of the function, and the integer values of the
+global/closure variables the function refers to, since those are used
+to resolve constant indices like s.x[i]. Entries are written to a
+temporary file first and then renamed, so the cache can be shared by
+concurrent processes.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from types import CodeType
+
+from pymtl3.datatypes import Bits
+
+_CACHE_VERSION = 1
+
+_cache_dir = os.environ.get( "PYMTL_AST_CACHE" ) or None
+
+def set_cache_dir( path ):
+  global _cache_dir
+  _cache_dir = path
+
+def get_cache_dir():
+  return _cache_dir
+
+#-------------------------------------------------------------------------
+# Keys
+#-------------------------------------------------------------------------
+
+# (path, mtime, size) -> sha1 of the file content
+_file_hashes = {}
+
+def _file_hash( path ):
+  try:
+    st = os.stat( path )
+  except OSError:
+    return None
+
+  key = ( path, st.st_mtime_ns, st.st_size )
+  if key not in _file_hashes:
+    with open( path, "rb" ) as f:
+      _file_hashes[ key ] = hashlib.sha1( f.read() ).hexdigest()
+  return _file_hashes[ key ]
+
+def _const_value( v ):
+  if isinstance( v, Bits ):
+    return f"{type(v).__name__}({int(v)})"
+  if type(v) in ( int, bool ):
+    return repr(v)
+  return None
+
+def _fingerprint( func ):
+  code = func.__code__
+  fp   = []
+
+  if func.__closure__:
+    for var, cell in zip( code.co_freevars, func.__closure__ ):
+      try:
+        v = _const_value( cell.cell_contents )
+      except ValueError: # empty cell
+        continue
+      if v is not None:
+        fp.append( f"{var}={v}" )
+
+  names = set()
+  stack = [ code ]
+  while stack:
+    c = stack.pop()
+    names.update( c.co_names )
+    stack.extend( x for x in c.co_consts if isinstance( x, CodeType ) )
+
+  for name in sorted( names ):
+    if name in func.__globals__:
+      v = _const_value( func.__globals__[ name ] )
+      if v is not None:
+        fp.append( f"{name}={v}" )
+
+  return ";".join( fp )
+
+def func_key( func, *extra ):
+  if _cache_dir is None:
+    return None
+
+  path = func.__code__.co_filename
+  if not os.path.isfile( path ):
+    return None
+
+  file_hash = _file_hash( path )
+  if file_hash is None:
+    return None
+
+  key = "|".join( str(x) for x in [
+    _CACHE_VERSION, sys.version_info[:2], os.path.abspath( path ), file_hash,
+    func.__qualname__, func.__code__.co_firstlineno, _fingerprint( func ),
+    *extra ] )
+  return hashlib.sha1( key.encode() ).hexdigest()
+
+#-------------------------------------------------------------------------
+# load/store
+#-------------------------------------------------------------------------
+# A corrupted or incompatible entry is treated as a miss.
+
+def load( key ):
+  if key is None or _cache_dir is None:
+    return None
+  try:
+    with open( os.path.join( _cache_dir, key[:2], key ), "rb" ) as f:
+      return pickle.load( f )
+  except Exception:
+    return None
+
+def store( key, obj ):
+  if key is None or _cache_dir is None:
+    return
+  try:
+    dirname = os.path.join( _cache_dir, key[:2] )
+    os.makedirs( dirname, exist_ok=True )
+    fd, tmp = tempfile.mkstemp( dir=dirname, prefix=".tmp" )
+    try:
+      with os.fdopen( fd, "wb" ) as f:
+        pickle.dump( obj, f, protocol=pickle.HIGHEST_PROTOCOL )
+      os.replace( tmp, os.path.join( dirname, key ) )
+    except Exception:
+      os.remove( tmp )
+      raise
+  except Exception:
+    pass
@@ -7,17 +7,33 @@ Add clk/reset signals.
 Author : Yanghui Ou
   Date : Apr 6, 2019
 """
+import gc
+import sys
+import weakref
 from collections import defaultdict
 
-from pymtl3.datatypes import Bits1
+from pymtl3.datatypes import Bits1, bits_import
 
 from .ComponentLevel1 import ComponentLevel1
 from .ComponentLevel7 import ComponentLevel7
-from .Connectable import Const, InPort, Interface, MethodPort, OutPort, Signal, Wire
+from .Connectable import (
+    Const,
+    InPort,
+    Interface,
+    MethodPort,
+    OutPort,
+    Signal,
+    SignalArray,
+    Wire,
+)
 from .errors import InvalidAPICallError, InvalidConnectionError, NotElaboratedError
 from .NamedObject import NamedObject
 from .Placeholder import Placeholder
 
+# Every elaborated top component that is still alive. Components of the
+# same class share the parsed sources/ASTs cached in the class object, so
+# release_elaboration_metadata has to know who else still needs them.
+_elaborated_tops = weakref.WeakSet()
 
 class Component( ComponentLevel7 ):
 
@@ -59,6 +75,11 @@ class Component( ComponentLevel7 ):
 
       s._dsl.constructed = True
 
+  # Override
+  def _elaborate( s ):
+    super()._elaborate()
+    _elaborated_tops.add( s )
+
   # This function deduplicates those checks in each API
   def _check_called_at_elaborate_top( s, func_name ):
     try:
@@ -161,6 +182,7 @@ class Component( ComponentLevel7 ):
       obj._dsl._my_indices  = indices
 
       obj._dsl.elaborate_top = top
+      top._dsl.registry.add( obj, parent )
       top._dsl.elaborate_stack.append( obj )
 
       NamedObject.__setattr__ = NamedObject.__setattr_for_elaborate__
@@ -169,15 +191,18 @@ class Component( ComponentLevel7 ):
 
       top._dsl.elaborate_stack.pop()
 
-    added_components = obj._collect_all_single( lambda x: isinstance( x, Component ) )
+    # The new objects are already registered by the setattr hook
+    registry = top._dsl.registry
+    added_components = { x for x in registry.get_subtree( obj )
+                         if isinstance( x, Component ) }
 
     # First elaborate all functions to spawn more named objects
     for c in added_components:
       c._elaborate_read_write_func()
 
-    added_signals, added_method_ports = \
-      obj._collect_all( [ lambda x: isinstance( x, Signal ), \
-                          lambda x: isinstance( x, MethodPort ) ] )
+    added_objects      = registry.get_subtree( obj )
+    added_signals      = { x for x in added_objects if isinstance( x, Signal ) }
+    added_method_ports = { x for x in added_objects if isinstance( x, MethodPort ) }
 
     top._dsl.all_components    |= added_components
     top._dsl.all_signals       |= added_signals
@@ -266,10 +291,10 @@ class Component( ComponentLevel7 ):
         delattr( parent, foo._dsl.my_name )
 
       # Remove all components, signals, and method ports
-      removed_components, removed_signals, removed_method_ports = \
-        foo._collect_all( [ lambda x: isinstance( x, Component ), \
-                            lambda x: isinstance( x, Signal ), \
-                            lambda x: isinstance( x, MethodPort ) ] )
+      removed_objects      = top._dsl.registry.remove_subtree( foo )
+      removed_components   = { x for x in removed_objects if isinstance( x, Component ) }
+      removed_signals      = { x for x in removed_objects if isinstance( x, Signal ) }
+      removed_method_ports = { x for x in removed_objects if isinstance( x, MethodPort ) }
 
       top._dsl.all_components    -= removed_components
       top._dsl.all_signals       -= removed_signals
@@ -458,14 +483,32 @@ class Component( ComponentLevel7 ):
 
     swapped_signals = defaultdict(list)
 
+    # The <<= below only initializes the next value of the new objects, so
+    # make sure that a simulator with dirty-set double buffering does not
+    # record them and flip them later
+    set_dirty_list = bits_import._set_dirty_list
+    if set_dirty_list is not None:
+      prev_dirty = set_dirty_list( None )
+
     # Swap all Signal objects with actual data
 
     Q = [ (s, s) ]
     while Q:
       current_obj, host = Q.pop()
       if isinstance( current_obj, list ):
-        for i, obj in enumerate( current_obj ):
-          if isinstance( obj, Signal ):
+        # Don't create the signals of a SignalArray that were never
+        # accessed; they simply get the default value.
+        for i, obj in enumerate( list.__iter__( current_obj ) ):
+          if obj is None and isinstance( current_obj, SignalArray ):
+            value = current_obj.default_value()
+            try:
+              value <<= current_obj.default_value()
+            except Exception:
+              pass
+            current_obj[i] = value
+            swapped_signals[ host ].append( (current_obj, i, None, True) )
+
+          elif isinstance( obj, Signal ):
             try:
               current_obj[i] = obj.default_value()
             except Exception as e:
@@ -506,9 +549,18 @@ class Component( ComponentLevel7 ):
             elif isinstance( obj, (Interface, list) ):
               Q.append( (obj, host) )
 
+    if set_dirty_list is not None:
+      set_dirty_list( prev_dirty )
+
     s._dsl.swapped_signals = swapped_signals
     s._dsl.locked_simulation = True
 
+    # Passes may register functions that initialize the simulation state
+    # once the actual data is in place, e.g. constant nets that are taken
+    # out of the schedule.
+    for func in getattr( s._dsl, "lock_in_funcs", [] ):
+      func()
+
   def unlock_simulation( s ):
     s._check_called_at_elaborate_top( "unlock_simulation" )
     try:
@@ -516,6 +568,9 @@ class Component( ComponentLevel7 ):
     except:
       raise AttributeError("Cannot unlock an unlocked/never locked model.")
 
+    if getattr( s._dsl, "released_metadata", False ):
+      raise AttributeError("Cannot unlock a model whose elaboration metadata is released.")
+
     swapped_values  = defaultdict(list)
     for component, records in s._dsl.swapped_signals.items():
       for current_obj, i, obj, is_list in records:
@@ -529,6 +584,87 @@ class Component( ComponentLevel7 ):
     s._dsl.swapped_values = swapped_values
     s._dsl.locked_simulation = False
 
+  # Metadata that a locked simulation doesn't need. We keep the names and
+  # hierarchy of components, their update blocks, and param_tree because
+  # line_trace and the generated tick/vcd functions still use them.
+
+  _released_component_metadata = [
+    "upblk_reads", "upblk_writes", "upblk_calls",
+    "func_reads", "func_writes", "func_calls", "name_func",
+    "U_U_constraints", "RD_U_constraints", "WR_U_constraints", "M_constraints",
+    "adjacency", "connect_order", "consts", "call_kwargs",
+  ]
+
+  _released_top_metadata = [
+    "registry", "all_named_objects", "all_signals", "all_method_ports",
+    "all_adjacency", "all_value_nets", "all_method_nets",
+    "all_upblk_reads", "all_upblk_writes", "all_upblk_calls", "all_upblk_hostobj",
+    "all_U_U_constraints", "all_RD_U_constraints", "all_WR_U_constraints",
+    "all_M_constraints", "swapped_signals", "swapped_values", "lock_in_funcs",
+    "elab_profile",
+  ]
+
+  _released_class_metadata = [ "_name_info", "_name_rd", "_name_wr", "_name_fc" ]
+
+  def release_elaboration_metadata( s, drop_class_cache=False ):
+    """ Drop everything a locked simulation doesn't need: the Signal
+    objects that were swapped out by lock_in_simulation, the nets,
+    constraints and read/write metadata, and the _dag metadata of the
+    passes. tick, sim_reset, line_trace and vcd dumping keep working, but
+    the model cannot be unlocked, mutated or analyzed afterwards.
+
+    If drop_class_cache is set, the parsed sources/ASTs cached in the
+    component classes are dropped too, except for the classes that are
+    still used by another elaborated model that has not released its
+    metadata. They are rebuilt on the next elaboration.
+
+    Return a dict with the number of released signals, the number of
+    freed memory blocks, and the freed bytes if tracemalloc is tracing. """
+    s._check_called_at_elaborate_top( "release_elaboration_metadata" )
+
+    if not getattr( s._dsl, "locked_simulation", False ):
+      raise AttributeError( "Please lock_in_simulation before releasing "
+                            "the elaboration metadata." )
+
+    import tracemalloc
+
+    gc.collect()
+    blocks0 = sys.getallocatedblocks()
+    bytes0  = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    nsignals = len( s._dsl.all_signals )
+
+    classes = set()
+    for c in s._dsl.all_components:
+      for name in s._released_component_metadata:
+        c._dsl.__dict__.pop( name, None )
+      classes.update( c.__class__.__mro__ )
+
+    for name in s._released_top_metadata:
+      s._dsl.__dict__.pop( name, None )
+
+    if drop_class_cache:
+      for top in list( _elaborated_tops ):
+        if top is not s and not getattr( top._dsl, "released_metadata", False ):
+          for c in getattr( top._dsl, "all_components", () ):
+            classes.difference_update( c.__class__.__mro__ )
+
+      for cls in classes:
+        for name in s._released_class_metadata:
+          if name in cls.__dict__:
+            delattr( cls, name )
+
+    s.__dict__.pop( "_dag", None )
+    s._dsl.released_metadata = True
+
+    gc.collect()
+
+    return {
+      "signals" : nsignals,
+      "blocks"  : blocks0 - sys.getallocatedblocks(),
+      "bytes"   : None if bytes0 is None else bytes0 - tracemalloc.get_traced_memory()[0],
+    }
+
   """ APIs that provide local metadata of a component """
 
   def get_component_level( s ):
@@ -572,10 +708,24 @@ class Component( ComponentLevel7 ):
   def get_all_object_filter( s, filt ):
     assert callable( filt )
     try:
-      return { x for x in s._dsl.all_named_objects if filt(x) }
+      return { x for x in s._dsl.registry.host if filt(x) }
     except AttributeError:
       return s._collect_all_single( filt )
 
+  def get_all_object_type( s, types, host=None ):
+    """ Return all named objects that are instances of types, optionally
+    only those whose host component is host. Unlike get_all_object_filter
+    this doesn't scan all objects. """
+    try:
+      s._check_called_at_elaborate_top( "get_all_object_type" )
+      registry = s._dsl.registry
+    except AttributeError:
+      raise NotElaboratedError()
+
+    if host is None:
+      return registry.get_by_type( types )
+    return registry.get_by_host( host, types )
+
   def get_local_object_filter( s, filt ):
     assert callable( filt )
     return s._collect_objects_local( filt )
@@ -20,7 +20,7 @@ from collections import defaultdict
 
 from pymtl3.datatypes import Bits, is_bitstruct_class
 
-from . import AstHelper
+from . import AstCache, AstHelper, ElaborationProfiler
 from .ComponentLevel1 import ComponentLevel1
 from .Connectable import Connectable, Const, InPort, Interface, OutPort, Signal, Wire
 from .ConstraintTypes import RD, WR, U, ValueConstraint
@@ -40,6 +40,23 @@ from .Placeholder import Placeholder
 
 compiled_re = re.compile('( *(@|def))')
 
+# Return the outermost packed bit struct signal that obj is a part of if
+# writing to obj would not write back to that signal, otherwise None. In
+# update blocks, a field of a packed bit struct can be assigned as a whole
+# by its property setter.
+
+def _get_packed_struct_signal( obj, update_ff ):
+  ret    = None
+  direct = not update_ff and obj.is_top_level_signal()
+  obj    = obj.get_top_level_signal()
+  parent = obj.get_parent_object()
+  while parent.is_signal():
+    if getattr( parent._dsl.Type, "__bitstruct_packed__", False ) and not direct:
+      ret = parent
+    direct = False
+    parent = parent.get_parent_object()
+  return ret
+
 class ComponentLevel2( ComponentLevel1 ):
 
   #-----------------------------------------------------------------------
@@ -82,6 +99,13 @@ class ComponentLevel2( ComponentLevel1 ):
 
     if name not in name_info:
       if given is None:
+        # Try the on-disk cache first (see AstCache.py)
+        key    = AstCache.func_key( func, is_update_ff )
+        cached = AstCache.load( key )
+        if cached is not None:
+          name_info[ name ], name_rd[ name ], name_wr[ name ], name_fc[ name ] = cached
+          return
+
         _src, _line = inspect.getsourcelines( func )
         _src = "".join( _src )
         _ast = ast.parse( compiled_re.sub( r'\2', _src ) )
@@ -97,6 +121,9 @@ class ComponentLevel2( ComponentLevel1 ):
       name_fc[ name ]  = _fc   = []
       AstHelper.extract_reads_writes_calls( s, func, _ast, is_update_ff, _rd, _wr, _fc )
 
+      if given is None:
+        AstCache.store( key, ( name_info[ name ], _rd, _wr, _fc ) )
+
   def _elaborate_read_write_func( s ):
 
     # We have parsed AST to extract every read/write variable name.
@@ -413,6 +440,25 @@ class ComponentLevel2( ComponentLevel1 ):
           .format(  repr(obj), repr(host), type(host).__name__,
                     blk.__name__, repr(blk_hostobj), type(blk_hostobj).__name__ ) )
 
+      # A field of a packed bit struct is a property that returns a new
+      # object, so only a whole field can be assigned with = in update.
+      # Writing to a slice or a nested field of it, or <<= to a field in
+      # update_ff, would modify that temporary object.
+
+        if not isinstance( obj, Signal ):
+          continue
+        packed = _get_packed_struct_signal( obj, blk in s._dsl.all_update_ff )
+        if packed is not None:
+          raise SignalTypeError("""[Type 5] Invalid write to a packed BitStruct signal:
+
+- "{}" is written in update block "{}" of {} (class {}),
+  but it is part of "{}" whose type {} is a packed BitStruct.
+
+  Note: Please assign the whole struct, e.g. "{} <<= ..." in update_ff,
+        or declare the BitStruct without packed=True.""" \
+          .format(  repr(obj), blk.__name__, repr(blk_hostobj), type(blk_hostobj).__name__,
+                    repr(packed), packed._dsl.Type.__name__, repr(packed) ) )
+
   # TODO rename
   def _check_valid_dsl_code( s ):
     s._check_upblk_writes()
@@ -509,21 +555,29 @@ class ComponentLevel2( ComponentLevel1 ):
 
   # Override
   def _elaborate_collect_all_vars( s ):
-    for c in s._dsl.all_named_objects:
-      if isinstance( c, Signal ):
-        s._dsl.all_signals.add( c )
-      elif isinstance( c, ComponentLevel1 ):
-        s._dsl.all_components.add( c )
-        s._collect_vars( c )
+    s._dsl.all_signals |= s._dsl.registry.get_by_type( Signal )
+    for c in s._dsl.registry.get_by_type( ComponentLevel1 ):
+      s._dsl.all_components.add( c )
+      s._collect_vars( c )
 
   # Override
   def elaborate( s ):
+    # Time each phase if PYMTL_ELAB_PROFILE is set
+    mode = ElaborationProfiler.env_mode()
+    if mode:
+      profiler = ElaborationProfiler.ElaborationProfiler( memory=( mode == "mem" ) )
+      profiler.run( s )
+      print( f"Elaboration profile of {s.__class__.__name__}:" )
+      print( profiler.report() )
+    else:
+      s._elaborate()
+
+  def _elaborate( s ):
     # Don't directly use the base class elaborate anymore
     s._elaborate_construct()
 
     # First elaborate all functions to spawn more named objects
-    for c in s._collect_all_single( lambda s: isinstance( s, ComponentLevel2 ) ):
-      c._elaborate_read_write_func()
+    s._elaborate_read_write_funcs()
 
     s._elaborate_collect_all_named_objects()
 
@@ -532,6 +586,10 @@ class ComponentLevel2( ComponentLevel1 ):
 
     s._check_valid_dsl_code()
 
+  def _elaborate_read_write_funcs( s ):
+    for c in s._dsl.registry.get_by_type( ComponentLevel2 ):
+      c._elaborate_read_write_func()
+
   #-----------------------------------------------------------------------
   # Post-elaborate public APIs (can only be called after elaboration)
   #-----------------------------------------------------------------------
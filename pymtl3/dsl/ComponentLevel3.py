@@ -19,6 +19,7 @@ from collections import defaultdict
 
 from pymtl3.datatypes import Bits
 
+from . import AstCache
 from .ComponentLevel1 import ComponentLevel1
 from .ComponentLevel2 import ComponentLevel2, compiled_re
 from .Connectable import (
@@ -47,6 +48,24 @@ def connect( o1, o2 ):
   host, o1_connectable, o2_connectable = _connect_check( o1, o2, internal=False )
   host._connect_dispatch( o1, o2, o1_connectable, o2_connectable )
 
+# The code object of a lambda in construct is shared by all instances, so
+# we only look up the source of each //= lambda once per process (and
+# once for all processes if the on-disk AST cache is enabled).
+
+_lambda_sources = {}
+
+def _get_lambda_source( lamb ):
+  code = lamb.__code__
+  if code not in _lambda_sources:
+    key    = AstCache.func_key( lamb, "lambda" )
+    cached = AstCache.load( key )
+    if cached is None:
+      srcs, line = inspect.getsourcelines( lamb )
+      cached = ( srcs, line, inspect.getsourcefile( lamb ) )
+      AstCache.store( key, cached )
+    _lambda_sources[ code ] = cached
+  return _lambda_sources[ code ]
+
 class ComponentLevel3( ComponentLevel2 ):
 
   #-----------------------------------------------------------------------
@@ -104,7 +123,7 @@ class ComponentLevel3( ComponentLevel2 ):
   def _create_assign_lambda( s, o, lamb ):
     assert isinstance( o, Signal ), "You can only assign(//=) a lambda function to a Wire/InPort/OutPort."
 
-    srcs, line = inspect.getsourcelines( lamb )
+    srcs, line, srcfile = _get_lambda_source( lamb )
     assert len(srcs) == 1, "We can only handle single-line lambda connect right now."
 
     src  = compiled_re.sub( r'\2', srcs[0] ).lstrip(' ')
@@ -226,7 +245,7 @@ class ComponentLevel3( ComponentLevel2 ):
     # register the AST/src of the generated block for elaborate or passes
     # to use.
     s._cache_func_meta( blk, is_update_ff=False,
-      given=("".join(srcs), lambda_upblk_module, line, inspect.getsourcefile( lamb )) )
+      given=("".join(srcs), lambda_upblk_module, line, srcfile) )
     return blk
 
   def _connect_signal_const( s, o1, o2 ):
@@ -407,30 +426,69 @@ class ComponentLevel3( ComponentLevel2 ):
 
   @staticmethod
   def _floodfill_nets( signal_list, adjacency ):
-    """ Floodfill to find out connected nets. Return a list of sets. """
+    """ Find out connected nets with a union-find over dense object IDs.
+    Return a list of sets.
+
+    Every object reachable from signal_list gets an ID the first time we
+    see it. An edge is processed from the endpoint with the smaller ID,
+    so each edge is processed exactly once and an edge that connects two
+    objects that are already in the same set closes a loop. """
+
+    ids    = {}
+    objs   = []
+    parent = [] # parent[i] is the parent ID of i, roots point to itself
+    size   = []
 
-    nets = []
-    visited = set()
-    pred    = {} # detect cycle that has >=3 nodes
     for obj in signal_list:
-      # If obj has adjacent signals
-      if obj in adjacency and obj not in visited:
-        net = set()
-        Q   = [ obj ]
-        while Q:
-          u = Q.pop()
-          visited.add( u )
-          net.add( u )
-          for v in adjacency[u]:
-            if v not in visited:
-              pred[v] = u
-              Q.append( v )
-            elif v is not pred[u]:
-              raise InvalidConnectionError(repr(v)+" is in a connection loop.")
-        if len(net) == 1:
-          continue
-        nets.append( net )
-    return nets
+      if obj in adjacency and obj not in ids:
+        ids[ obj ] = len(objs)
+        objs.append( obj )
+        parent.append( len(parent) )
+        size.append( 1 )
+
+    # objs grows as we discover new objects
+    i = 0
+    while i < len(objs):
+      u  = objs[i]
+      for v in adjacency[u]:
+        j = ids.get( v )
+        if j is None:
+          ids[ v ] = j = len(objs)
+          objs.append( v )
+          parent.append( j )
+          size.append( 1 )
+        elif j < i:
+          continue # already processed from v
+
+        # Find with path halving
+        x = i
+        while parent[x] != x:
+          parent[x] = x = parent[ parent[x] ]
+        y = j
+        while parent[y] != y:
+          parent[y] = y = parent[ parent[y] ]
+
+        if x == y:
+          raise InvalidConnectionError(repr(v)+" is in a connection loop.")
+
+        # Union by size
+        if size[x] < size[y]:
+          x, y = y, x
+        parent[y] = x
+        size[x] += size[y]
+      i += 1
+
+    nets = {}
+    for i, obj in enumerate( objs ):
+      x = i
+      while parent[x] != x:
+        parent[x] = x = parent[ parent[x] ]
+      if size[x] > 1:
+        if x not in nets:
+          nets[x] = set()
+        nets[x].add( obj )
+
+    return list( nets.values() )
 
   def _resolve_value_connections( s ):
     """ The case of nested data struct: the writer of a net can be one of
@@ -489,16 +547,32 @@ class ComponentLevel3( ComponentLevel2 ):
            ( isinstance( member, OutPort ) and isinstance( member._dsl.host, Placeholder ) ):
           writer_prop[ member ] = True
 
-    headless = nets
-    headed   = []
+    headed = []
 
     # Convention: we store a net in a tuple ( writer, set([readers]) )
     # The first element is writer; it should be None if there is no
     # writer. The second element is a set of signals including the writer.
 
-    while headless:
-      new_headless = []
-      wcount = len(writer_prop)
+    # Instead of sweeping all headless nets until no more writers show
+    # up, we keep a worklist of nets. When a net is resolved, its readers
+    # become writers and their ancestors are marked in writer_prop, which
+    # can only resolve the nets that contain those ancestors, the
+    # descendants of the readers, or the overlapping sibling slices of
+    # the readers. Only those nets are checked again.
+
+    net_id = {}
+    for i, net in enumerate( nets ):
+      for v in net:
+        net_id[ v ] = i
+
+    resolved = [ False ] * len(nets)
+    queued   = [ True  ] * len(nets)
+    worklist = list( range( len(nets)-1, -1, -1 ) ) # pop() in net order
+
+    while worklist:
+      i = worklist.pop()
+      queued[i] = False
+      net = nets[i]
 
       # For each net, figure out the writer among all vars and their
       # ancestors. Moreover, if x's ancestor has a writer in another net,
@@ -514,73 +588,90 @@ class ComponentLevel3( ComponentLevel2 ):
       # be a unpropagatable writer because we don't want x[5:15] to
       # propagate to x[12:17] later.
 
-      for net in headless:
-        has_writer = False
+      has_writer = False
 
-        for v in net:
-          obj = None
-          try:
-            # Check if itself is a writer or a constant
-            if v in writer_prop or isinstance( v, Const ):
-              assert not has_writer
-              has_writer, writer = True, v
-
-            else:
-              # Check if an ancestor is a propagatable writer
-              obj = v.get_parent_object()
-              while obj.is_signal():
-                if obj in writer_prop and writer_prop[ obj ]:
-                  assert not has_writer
-                  has_writer, writer = True, v
-                  break
-                obj = obj.get_parent_object()
-
-              # Check sibling slices
-              for obj in v.get_sibling_slices():
-                if obj.slice_overlap( v ):
-                  if obj in writer_prop and writer_prop[ obj ]:
-                    assert not has_writer
-                    has_writer, writer = True, v
-                    # Shunning: is breaking out of here enough? If we
-                    # don't break the loop, we might a list here storing
-                    # "why the writer became writer" and do some sibling
-                    # overlap checks when we enter the loop body later
-                    break
-
-          except AssertionError:
-            raise MultiWriterError( \
-            "Two-writer conflict \"{}\"{}, \"{}\" in the following net:\n - {}".format(
-              repr(v), "" if not obj else "(as \"{}\" is written somewhere else)".format( repr(obj) ),
-              repr(writer), "\n - ".join([repr(x) for x in net])) )
-
-        if not has_writer:
-          new_headless.append( net )
-          continue
-
-        # Child s.x.y of some propagatable s.x, or sibling of some
-        # propagatable s[a:b].
-        # This means that at least other variables are able to see s.x/s[a:b]
-        # so it doesn't matter if s.x.y is not in writer_prop
-        if writer not in writer_prop:
-          pass
-
-        for v in net:
-          if v != writer:
-            writer_prop[ v ] = True # The reader becomes new writer
+      for v in net:
+        obj = None
+        try:
+          # Check if itself is a writer or a constant
+          if v in writer_prop or isinstance( v, Const ):
+            assert not has_writer
+            has_writer, writer = True, v
 
+          else:
+            # Check if an ancestor is a propagatable writer
             obj = v.get_parent_object()
             while obj.is_signal():
-              if obj not in writer_prop:
-                writer_prop[ obj ] = False
+              if obj in writer_prop and writer_prop[ obj ]:
+                assert not has_writer
+                has_writer, writer = True, v
+                break
               obj = obj.get_parent_object()
 
-        headed.append( (writer, net) )
-
-      if wcount == len(writer_prop): # no more new writers
-        break
-      headless = new_headless
+            # Check sibling slices
+            for obj in v.get_sibling_slices():
+              if obj.slice_overlap( v ):
+                if obj in writer_prop and writer_prop[ obj ]:
+                  assert not has_writer
+                  has_writer, writer = True, v
+                  # Shunning: is breaking out of here enough? If we
+                  # don't break the loop, we might a list here storing
+                  # "why the writer became writer" and do some sibling
+                  # overlap checks when we enter the loop body later
+                  break
 
-    return headed + [ (None, x) for x in headless ]
+        except AssertionError:
+          raise MultiWriterError( \
+          "Two-writer conflict \"{}\"{}, \"{}\" in the following net:\n - {}".format(
+            repr(v), "" if not obj else "(as \"{}\" is written somewhere else)".format( repr(obj) ),
+            repr(writer), "\n - ".join([repr(x) for x in net])) )
+
+      if not has_writer:
+        continue
+
+      resolved[i] = True
+
+      # Child s.x.y of some propagatable s.x, or sibling of some
+      # propagatable s[a:b].
+      # This means that at least other variables are able to see s.x/s[a:b]
+      # so it doesn't matter if s.x.y is not in writer_prop
+
+      affected = []
+
+      for v in net:
+        if v != writer:
+          writer_prop[ v ] = True # The reader becomes new writer
+
+          obj = v.get_parent_object()
+          while obj.is_signal():
+            if obj not in writer_prop:
+              writer_prop[ obj ] = False
+              affected.append( obj )
+            obj = obj.get_parent_object()
+
+          # Descendants: fields of a struct signal and slices
+          stack = [ v ]
+          while stack:
+            u = stack.pop()
+            if isinstance( u, list ):
+              stack.extend( u )
+            elif isinstance( u, Signal ):
+              affected.append( u )
+              for name, obj in u.__dict__.items():
+                if isinstance( name, tuple ) or name[0] != '_':
+                  stack.append( obj )
+
+          affected.extend( v.get_sibling_slices() )
+
+      for obj in affected:
+        j = net_id.get( obj )
+        if j is not None and not resolved[j] and not queued[j]:
+          queued[j] = True
+          worklist.append( j )
+
+      headed.append( (writer, net) )
+
+    return headed + [ (None, net) for i, net in enumerate( nets ) if not resolved[i] ]
 
   def _check_port_in_nets( s ):
     nets = s._dsl.all_value_nets
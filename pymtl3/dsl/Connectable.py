@@ -7,13 +7,14 @@ Wires, ports, and interfaces, all inherited from Connectable.
 Author : Shunning Jiang
 Date   : Apr 16, 2018
 """
+import sys
 import types
 from collections import deque
 
 from pymtl3.datatypes import Bits, mk_bits
 
 from .errors import InvalidConnectionError
-from .NamedObject import DSLMetadata, NamedObject
+from .NamedObject import DSLMetadata, NamedObject, NamedObjectArray
 from .Placeholder import Placeholder
 
 
@@ -139,7 +140,25 @@ class Const( Connectable ):
   def is_interface( s ):
     return False
 
+# Signals are by far the most common named objects, so their metadata
+# uses fixed slots for the fields every signal has. Other fields go to
+# __dict__, which is only created if some pass needs it.
+
+class SignalMetadata:
+  __slots__ = (
+    # NamedObject
+    'args', 'kwargs', 'constructed', 'param_tree', 'parent_obj', 'level',
+    '_my_name', 'my_name', 'full_name', '_my_indices', 'elaborate_top',
+    # Signal
+    'Type', 'type_instance', 'slice', 'slices', 'top_level_signal',
+    'needs_double_buffer', 'host',
+    '__dict__',
+  )
+
 class Signal( NamedObject, Connectable ):
+  __slots__ = ( '_dsl', )
+
+  _metadata_type = SignalMetadata
 
   def __init__( s, Type ):
     assert isinstance( Type, type ), "Use actual type instead of instance!"
@@ -147,7 +166,7 @@ class Signal( NamedObject, Connectable ):
     s._dsl.type_instance = None
 
     s._dsl.slice  = None # None -- not a slice of some wire by default
-    s._dsl.slices = {}
+    s._dsl.slices = None # lazily created upon the first slice
     s._dsl.top_level_signal = None
 
     s._dsl.needs_double_buffer = False
@@ -208,9 +227,11 @@ class Signal( NamedObject, Connectable ):
           xd.top_level_signal = sd.top_level_signal
           xd.elaborate_top = sd.elaborate_top
 
-          xd.my_name   = name + "".join([ f"[{y}]" for y in indices ])
+          xd.my_name   = sys.intern( name + "".join([ f"[{y}]" for y in indices ]) )
           xd.full_name = f"{sd.full_name}.{xd.my_name}"
 
+          sd.elaborate_top._dsl.registry.add( x, s )
+
         if parent_is_list:
           parent.append( x )
         else:
@@ -241,12 +262,16 @@ class Signal( NamedObject, Connectable ):
 
       sl_str = f"[{sl.start}:{sl.stop}]"
 
-      xd.my_name   = f"{sd.my_name}{sl_str}"
+      xd.my_name   = sys.intern( f"{sd.my_name}{sl_str}" )
       xd.full_name = f"{sd.full_name}{sl_str}"
 
       xd.slice       = sl
+      if sd.slices is None:
+        sd.slices = {}
       s.__dict__[ sl_tuple ] = sd.slices[ sl_tuple ] = x
 
+      sd.elaborate_top._dsl.registry.add( x, s )
+
     return s.__dict__[ sl_tuple ]
 
   def default_value( s ):
@@ -343,6 +368,38 @@ class OutPort( Signal ):
   def is_output_value_port( s ):
     return True
 
+# Arrays of signals of the same type, e.g. s.in_ = InPortArray( Bits32, 64 )
+# behaves like [ InPort( Bits32 ) for _ in range(64) ] except that each
+# port is only created when it is accessed. Wide arrays where only part of
+# the elements are indexed during construction don't pay for the rest.
+
+class SignalArray( NamedObjectArray ):
+
+  def __init__( s, SignalType, Type, n ):
+    assert issubclass( SignalType, Signal )
+    assert isinstance( Type, type ), "Use actual type instead of instance!"
+    super().__init__( n )
+    s._SignalType = SignalType
+    s._Type       = Type
+
+  def _new_element( s, i ):
+    return s._SignalType( s._Type )
+
+  def default_value( s ):
+    return s._Type()
+
+class WireArray( SignalArray ):
+  def __init__( s, Type, n ):
+    super().__init__( Wire, Type, n )
+
+class InPortArray( SignalArray ):
+  def __init__( s, Type, n ):
+    super().__init__( InPort, Type, n )
+
+class OutPortArray( SignalArray ):
+  def __init__( s, Type, n ):
+    super().__init__( OutPort, Type, n )
+
 class Interface( NamedObject, Connectable ):
 
   def inverse( s ):
@@ -0,0 +1,123 @@
+"""
+========================================================================
+ElaborationProfiler.py
+========================================================================
+Time each phase of Component.elaborate, optionally with the memory
+allocated in each phase measured by tracemalloc. The profiler wraps the
+phase methods of the top component with instance attributes, so nested
+phases (e.g. _resolve_value_connections inside
+_elaborate_collect_all_vars) are reported with their parents.
+
+Set PYMTL_ELAB_PROFILE=1 to print a report after every elaboration, or
+PYMTL_ELAB_PROFILE=mem to also track memory. Alternatively:
+
+  profiler = ElaborationProfiler( memory=True )
+  profiler.run( top )   # elaborates top
+  print( profiler.report() )
+"""
+import os
+import tracemalloc
+from time import perf_counter
+
+# Phases in the order they are first entered
+
+PHASES = [
+  "_elaborate_construct",
+  "_elaborate_read_write_funcs",
+  "_elaborate_collect_all_named_objects",
+  "_elaborate_declare_vars",
+  "_elaborate_collect_all_vars",
+  "_resolve_value_connections",
+  "_resolve_method_connections",
+  "_check_valid_dsl_code",
+  "_check_upblk_writes",
+  "_check_port_in_upblk",
+  "_check_port_in_nets",
+]
+
+def env_mode():
+  return os.environ.get( "PYMTL_ELAB_PROFILE" ) or None
+
+class ElaborationProfiler:
+
+  def __init__( s, memory=False ):
+    s.memory  = memory
+    s.records = [] # ( depth, name, seconds, memory delta in bytes )
+    s.total   = 0.0
+    s.peak    = 0
+    s.depth   = 0
+
+  def _wrap( s, name, method ):
+
+    def timed_phase( *args, **kwargs ):
+      idx = len(s.records)
+      s.records.append( None ) # keep the entry order of nested phases
+      s.depth += 1
+      mem0 = tracemalloc.get_traced_memory()[0] if s.memory else 0
+      t0   = perf_counter()
+      try:
+        return method( *args, **kwargs )
+      finally:
+        elapsed = perf_counter() - t0
+        mem1 = tracemalloc.get_traced_memory()[0] if s.memory else 0
+        s.depth -= 1
+        s.records[ idx ] = ( s.depth, name, elapsed, mem1 - mem0 )
+
+    return timed_phase
+
+  def run( s, top ):
+    top_dict = top.__dict__
+
+    for name in PHASES:
+      if hasattr( top, name ):
+        top_dict[ name ] = s._wrap( name, getattr( top, name ) )
+
+    started = False
+    if s.memory and not tracemalloc.is_tracing():
+      tracemalloc.start()
+      started = True
+
+    if s.memory:
+      # reset_peak needs Python 3.9. Without it the peak also covers what
+      # was allocated before if tracemalloc was already tracing.
+      if hasattr( tracemalloc, "reset_peak" ):
+        tracemalloc.reset_peak()
+      mem0 = tracemalloc.get_traced_memory()[0]
+
+    t0 = perf_counter()
+    try:
+      top._elaborate()
+    finally:
+      s.total = perf_counter() - t0
+      if s.memory:
+        s.peak = tracemalloc.get_traced_memory()[1] - mem0
+      if started:
+        tracemalloc.stop()
+      for name in PHASES:
+        top_dict.pop( name, None )
+
+    top._dsl.elab_profile = s
+
+  def as_dict( s ):
+    return {
+      "total"  : s.total,
+      "peak"   : s.peak,
+      "phases" : [ { "depth": d, "name": n, "seconds": t, "memory": m }
+                   for (d, n, t, m) in s.records if n is not None ],
+    }
+
+  def report( s ):
+    strs = [ f"{'phase':<48} {'time(s)':>10} {'%':>6}" +
+             ( f" {'mem(MB)':>10}" if s.memory else "" ) ]
+    total = max( s.total, 1e-9 )
+    for (depth, name, elapsed, mem) in s.records:
+      line = f"{'  '*depth + name:<48} {elapsed:>10.4f} {elapsed*100/total:>6.1f}"
+      if s.memory:
+        line += f" {mem/2**20:>10.2f}"
+      strs.append( line )
+
+    line = f"{'total':<48} {s.total:>10.4f} {100:>6.1f}"
+    if s.memory:
+      line += f" {s.peak/2**20:>10.2f} (peak)"
+    strs.append( line )
+    return "\n".join( strs )
@@ -19,7 +19,8 @@ Author : Shunning Jiang, Yanghui Ou
 Date   : Nov 3, 2018
 """
 import re
-from collections import deque
+import sys
+from collections import defaultdict, deque
 
 from .errors import NotElaboratedError
 
@@ -97,12 +98,194 @@ class ParamTreeNode:
   def __repr__( self ):
     return f"\nleaf:{self.leaf}\nchildren:{self.children}"
 
+# Index of all named objects under an elaborated top, populated by the
+# setattr hook as the objects are constructed instead of walking the
+# hierarchy after construction. Objects are indexed by their exact class
+# and by their host component, i.e. the closest component that contains
+# them, so queries like "all method ports" or "all signals of component x"
+# only cost O(#classes + #results).
+
+class ObjectRegistry:
+  def __init__( s ):
+    s.host     = {}               # object -> host component
+    s.by_class = defaultdict(set) # class  -> objects
+    s.by_host  = defaultdict(set) # host component -> objects
+
+  def __len__( s ):
+    return len(s.host)
+
+  def __contains__( s, obj ):
+    return obj in s.host
+
+  def add( s, obj, parent ):
+    if obj in s.host:
+      s.by_host[ s.host[ obj ] ].discard( obj )
+
+    # A component hosts its fields. Other objects (interfaces, slices,
+    # etc.) are hosted by the host of their parent.
+    host = None
+    if parent is not None:
+      try:
+        is_component = parent.is_component()
+      except NotImplementedError:
+        is_component = False
+      host = parent if is_component else s.host.get( parent )
+
+    s.host[ obj ] = host
+    s.by_class[ obj.__class__ ].add( obj )
+    s.by_host[ host ].add( obj )
+
+  def get_all( s ):
+    return set( s.host )
+
+  def get_by_type( s, types ):
+    ret = set()
+    for cls, objs in s.by_class.items():
+      if issubclass( cls, types ):
+        ret |= objs
+    return ret
+
+  def get_by_host( s, host, types=None ):
+    objs = s.by_host.get( host, () )
+    if types is None:
+      return set( objs )
+    return { x for x in objs if isinstance( x, types ) }
+
+  # Return obj and all named objects under it. A component's subtree is
+  # found through the host index; for other objects we have to check the
+  # parent chain of the objects that share the same host.
+
+  def get_subtree( s, obj ):
+    if obj not in s.host:
+      return set()
+
+    ret = { obj }
+    stack = [ obj ]
+
+    if obj not in s.by_host:
+      for x in s.by_host.get( s.host[ obj ], () ):
+        p = x._dsl.parent_obj
+        while p is not None and p is not obj:
+          p = p._dsl.parent_obj
+        if p is obj:
+          ret.add( x )
+          stack.append( x )
+
+    while stack:
+      for x in s.by_host.get( stack.pop(), () ):
+        ret.add( x )
+        stack.append( x )
+    return ret
+
+  def remove_subtree( s, obj ):
+    removed = s.get_subtree( obj )
+    for x in removed:
+      host = s.host.pop( x )
+      if host not in removed:
+        s.by_host[ host ].discard( x )
+      objs = s.by_class[ x.__class__ ]
+      objs.discard( x )
+      if not objs:
+        del s.by_class[ x.__class__ ]
+    for x in removed:
+      s.by_host.pop( x, None )
+    return removed
+
+# A list of named objects whose elements are only created when they are
+# accessed. The array keeps what its elements share (e.g. the type of a
+# signal) once, and subclasses create element i in _new_element( i ).
+# Iterating over the array creates all elements, so elaboration only pays
+# for the elements that are indexed individually.
+#
+# Elements that are never accessed stay None in the underlying list. We
+# override the list methods that would otherwise expose them.
+
+class NamedObjectArray( list ):
+
+  def __init__( s, n ):
+    super().__init__( [ None ] * n )
+    s._parent  = None
+    s._name    = None
+    s._indices = None
+
+  def _new_element( s, i ):
+    raise NotImplementedError
+
+  def _materialize( s, i ):
+    if i < 0:
+      i += len(s)
+    x = s._new_element( i )
+    list.__setitem__( s, i, x )
+
+    # Name the element if the array is already part of a component
+    if s._parent is not None:
+      s._parent._elaborate_child( x, s._name, s._indices + (i,) )
+      x._construct()
+    return x
+
+  def _attach( s, parent, name, indices ):
+    s._parent  = parent
+    s._name    = name
+    s._indices = indices
+    for i, x in enumerate( list.__iter__( s ) ):
+      if x is not None:
+        parent._elaborate_child( x, name, indices + (i,) )
+        x._construct()
+
+  def __getitem__( s, idx ):
+    if isinstance( idx, slice ):
+      return [ s[i] for i in range( *idx.indices( len(s) ) ) ]
+    x = list.__getitem__( s, idx )
+    if x is None:
+      x = s._materialize( idx )
+    return x
+
+  def __iter__( s ):
+    for i in range( len(s) ):
+      yield s[i]
+
+  def __reversed__( s ):
+    for i in range( len(s)-1, -1, -1 ):
+      yield s[i]
+
+  def __contains__( s, x ):
+    return x is not None and list.__contains__( s, x )
+
+  def __add__( s, other ):
+    return list( s ) + list( other )
+
+  def __radd__( s, other ):
+    return list( other ) + list( s )
+
+  def __eq__( s, other ):
+    return list( s ) == list( other )
+
+  def __ne__( s, other ):
+    return not s == other
+
+  __hash__ = None
+
+  def copy( s ):
+    return list( s )
+
+  def index( s, x, *args ):
+    return list( s ).index( x, *args )
+
+  def count( s, x ):
+    return list.count( s, x ) if x is not None else 0
+
+  def __repr__( s ):
+    return repr( list( s ) )
+
 class NamedObject:
 
+  # Subclasses with many instances can use a more compact metadata class
+  _metadata_type = DSLMetadata
+
   def __new__( cls, *args, **kwargs ):
 
     inst = super().__new__( cls )
-    inst._dsl = DSLMetadata() # TODO an actual object?
+    inst._dsl = cls._metadata_type()
 
     # Save parameters for elaborate
 
@@ -145,6 +328,11 @@ class NamedObject:
     if name[0] != '_': # filter private variables
       sd = s._dsl
 
+      # Unregister the objects we are about to overwrite, e.g. clk/reset
+      # that are redefined in construct
+      if name in s.__dict__ and isinstance( s.__dict__[ name ], (NamedObject, list) ):
+        s._unregister_overwritten( s.__dict__[ name ], obj )
+
       # Shunning: here I optimize for common cases where the object is a NamedObject.
       # I used to push the object directly to a stack to reuse the code across
       # both NamedObject and list cases. Now I basically avoid the stack overheads
@@ -181,6 +369,8 @@ class NamedObject:
         top = sd.elaborate_top
         ud.elaborate_top = top
 
+        top._dsl.registry.add( obj, s )
+
         top._dsl.elaborate_stack.append( obj )
         obj._construct()
         top._dsl.elaborate_stack.pop()
@@ -190,8 +380,11 @@ class NamedObject:
       # can be infinitely iterated and cause infinite loop. Special
       # casing Wire will be a mess around everywhere.
 
+      elif isinstance( obj, NamedObjectArray ):
+        obj._attach( s, name, () )
+
       elif isinstance( obj, list ) and obj and isinstance( obj[0], (NamedObject, list) ):
-        sd = s._dsl
+        top = sd.elaborate_top
 
         Q = deque( (u, (i,)) for i, u in enumerate(obj) )
 
@@ -199,47 +392,71 @@ class NamedObject:
           u, indices = Q.popleft()
 
           if isinstance( u, NamedObject ):
-            ud = u._dsl
-
-            ud.parent_obj = s
-            ud.level      = sd.level + 1
-
-            ud._my_name  = name
-            ud.my_name   = u_name = name + "".join( [ f"[{x}]" for x in indices ] )
-            ud.full_name = f"{sd.full_name}.{u_name}"
-
-            ud._my_indices = indices
-
-            # Iterate through the param_tree and update u
-            if sd.param_tree is not None:
-              if sd.param_tree.children is not None:
-                for comp_name, node in sd.param_tree.children.items():
-                  if comp_name == u_name:
-                    # Lazily create the param tree
-                    if ud.param_tree is None:
-                      ud.param_tree = ParamTreeNode()
-                    ud.param_tree.merge( node )
-
-                  elif node.compiled_re is not None:
-                    if node.compiled_re.match( u_name ):
-                      # Lazily create the param tree
-                      if ud.param_tree is None:
-                        ud.param_tree = ParamTreeNode()
-                      ud.param_tree.merge( node )
-
-            # Point u's top to my top
-            top = sd.elaborate_top
-            ud.elaborate_top = top
+            s._elaborate_child( u, name, indices )
 
             top._dsl.elaborate_stack.append( u )
             u._construct()
             top._dsl.elaborate_stack.pop()
 
+          elif isinstance( u, NamedObjectArray ):
+            u._attach( s, name, indices )
+
           elif isinstance( u, list ):
             Q.extend( (v, indices+(i,)) for i, v in enumerate(u) )
 
     super().__setattr__( name, obj )
 
+  # Set up the metadata of u which is s.name[indices]. We intern the name
+  # because the same names show up in every instance of a component.
+
+  def _elaborate_child( s, u, name, indices ):
+    sd = s._dsl
+    ud = u._dsl
+
+    ud.parent_obj = s
+    ud.level      = sd.level + 1
+
+    ud._my_name  = name
+    ud.my_name   = u_name = sys.intern( name + "".join( [ f"[{x}]" for x in indices ] ) )
+    ud.full_name = f"{sd.full_name}.{u_name}"
+
+    ud._my_indices = indices
+
+    # Iterate through the param_tree and update u
+    if sd.param_tree is not None:
+      if sd.param_tree.children is not None:
+        for comp_name, node in sd.param_tree.children.items():
+          if comp_name == u_name:
+            # Lazily create the param tree
+            if ud.param_tree is None:
+              ud.param_tree = ParamTreeNode()
+            ud.param_tree.merge( node )
+
+          elif node.compiled_re is not None:
+            if node.compiled_re.match( u_name ):
+              # Lazily create the param tree
+              if ud.param_tree is None:
+                ud.param_tree = ParamTreeNode()
+              ud.param_tree.merge( node )
+
+    # Point u's top to my top
+    top = sd.elaborate_top
+    ud.elaborate_top = top
+
+    top._dsl.registry.add( u, s )
+
+  def _unregister_overwritten( s, old, new ):
+    registry = s._dsl.elaborate_top._dsl.registry
+    stack = [ old ]
+    while stack:
+      u = stack.pop()
+      if isinstance( u, NamedObject ):
+        # Only unregister objects that are still owned by this field
+        if u is not new and u in registry and u._dsl.parent_obj is s:
+          registry.remove_subtree( u )
+      elif isinstance( u, list ):
+        stack.extend( list.__iter__( u ) ) # don't create lazy array elements
+
   def _collect_all_single( s, filt=lambda x: isinstance( x, NamedObject ) ):
     ret = set()
     stack = [s]
@@ -358,6 +575,9 @@ class NamedObject:
 
     s._dsl.elaborate_stack = [ s ]
 
+    s._dsl.registry = ObjectRegistry()
+    s._dsl.registry.add( s, None )
+
     # Secret source for letting the child know the field name of itself
     # -- override setattr for elaboration, and remove it afterwards
 
@@ -375,7 +595,7 @@ class NamedObject:
     del s._dsl.elaborate_stack
 
   def _elaborate_collect_all_named_objects( s ):
-    s._dsl.all_named_objects = s._collect_all_single()
+    s._dsl.all_named_objects = s._dsl.registry.get_all()
 
   def elaborate( s ):
     s._elaborate_construct()
@@ -12,14 +12,18 @@ from .Connectable import (
     CallerPort,
     Const,
     InPort,
+    InPortArray,
     Interface,
     MethodPort,
     NonBlockingCalleeIfc,
     NonBlockingCallerIfc,
     NonBlockingInterface,
     OutPort,
+    OutPortArray,
     Signal,
+    SignalArray,
     Wire,
+    WireArray,
 )
 from .ConstraintTypes import RD, WR, M, U
 from .Placeholder import Placeholder
@@ -0,0 +1,92 @@
+"""
+========================================================================
+AstCache_test.py
+========================================================================
+"""
+import inspect
+import os
+
+import pytest
+
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl import AstCache, ComponentLevel3
+from pymtl3.dsl.Component import Component
+from pymtl3.dsl.Connectable import InPort, OutPort
+
+
+class Incr( Component ):
+  def construct( s, k ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @s.update
+    def up_incr():
+      s.out = s.in_ + Bits8( k )
+
+@pytest.fixture
+def cache_dir( tmp_path ):
+  old = AstCache.get_cache_dir()
+  AstCache.set_cache_dir( str(tmp_path) )
+  yield tmp_path
+  AstCache.set_cache_dir( old )
+
+def _num_entries( path ):
+  return len([ x for _, _, files in os.walk( path ) for x in files ])
+
+def _elaborate( k ):
+  # Pretend we are in a new process
+  for attr in [ "_name_info", "_name_rd", "_name_wr", "_name_fc" ]:
+    if attr in Incr.__dict__:
+      delattr( Incr, attr )
+  m = Incr( k )
+  m.elaborate()
+  return m
+
+def test_upblk_cache_hit( cache_dir, monkeypatch ):
+  m = _elaborate( 1 )
+  assert _num_entries( cache_dir ) == 1
+  ref_info = Incr._name_info[ "up_incr" ]
+
+  def no_source( *args, **kwargs ):
+    raise AssertionError( "source should come from the cache" )
+  monkeypatch.setattr( inspect, "getsourcelines", no_source )
+
+  m = _elaborate( 1 )
+  info = Incr._name_info[ "up_incr" ]
+  assert info[:4] == ref_info[:4]
+  assert { repr(x) for x in m._dsl.all_signals } >= { "s.in_", "s.out" }
+
+  upblk, = m.get_all_update_blocks()
+  reads, writes, _ = m.get_all_upblk_metadata()
+  assert { repr(x) for x in reads[ upblk ] }  == { "s.in_" }
+  assert { repr(x) for x in writes[ upblk ] } == { "s.out" }
+
+def test_upblk_cache_key_includes_constants( cache_dir ):
+  _elaborate( 1 )
+  _elaborate( 1 )
+  assert _num_entries( cache_dir ) == 1
+  # k is a closure variable so each value gets its own entry
+  _elaborate( 2 )
+  assert _num_entries( cache_dir ) == 2
+
+def test_lambda_source_cache( cache_dir, monkeypatch ):
+  x = 3
+  lamb = lambda: x + 1
+
+  ComponentLevel3._lambda_sources.clear()
+  srcs, line, srcfile = ComponentLevel3._get_lambda_source( lamb )
+  assert "lambda: x + 1" in srcs[0]
+  assert srcfile == __file__.replace( ".pyc", ".py" )
+
+  monkeypatch.setattr( inspect, "getsourcelines", None )
+  ComponentLevel3._lambda_sources.clear()
+  assert ComponentLevel3._get_lambda_source( lamb ) == ( srcs, line, srcfile )
+
+def test_cache_disabled():
+  old = AstCache.get_cache_dir()
+  AstCache.set_cache_dir( None )
+  try:
+    assert AstCache.func_key( Incr.construct ) is None
+    assert AstCache.load( None ) is None
+  finally:
+    AstCache.set_cache_dir( old )
@@ -6,10 +6,21 @@ ComponentAPI_test.py
 Author : Shunning Jiang
 Date   : June 2, 2019
 """
+import gc
 import random
+import weakref
 
 from pymtl3.datatypes import *
-from pymtl3.dsl import Component, InPort, OutPort, Placeholder, Wire, connect
+from pymtl3.dsl import (
+    Component,
+    InPort,
+    Interface,
+    OutPort,
+    Placeholder,
+    Signal,
+    Wire,
+    connect,
+)
 from pymtl3.dsl.errors import InvalidAPICallError
 
 from .sim_utils import simple_sim_pass
@@ -321,6 +332,165 @@ def test_ctrl_dpath_connected_replaced_both():
   a.tick()
   assert a.out == 10 + 444 * 2
 
+def test_get_all_object_type():
+
+  class Ifc( Interface ):
+    def construct( s ):
+      s.val = InPort( Bits1 )
+      s.msg = InPort( Bits32 )
+
+  class A( Component ):
+    def construct( s ):
+      s.ifc = Ifc()
+      s.out = OutPort( Bits32 )
+      s.out[0:8] //= s.ifc.msg[0:8]
+      s.out[8:32] //= 0
+
+  class B( Component ):
+    def construct( s ):
+      s.reset = InPort( Bits1 ) # overwrite the default reset
+      s.in_ = InPort ( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.a   = [ A() for _ in range(2) ]
+      for x in s.a:
+        x.ifc.msg //= s.in_
+      s.out //= s.a[1].out
+
+  b = B()
+  b.elaborate()
+
+  assert b.get_all_object_type( Component ) == { b, b.a[0], b.a[1] }
+  assert b.get_all_object_type( Interface ) == { b.a[0].ifc, b.a[1].ifc }
+  assert b.get_all_object_type( OutPort, host=b ) == { b.out }
+  assert b.get_all_object_type( InPort, host=b ) == { b.clk, b.reset, b.in_ }
+  assert b.get_all_object_type( InPort, host=b.a[0] ) == \
+         { b.a[0].clk, b.a[0].reset, b.a[0].ifc.val, b.a[0].ifc.msg, b.a[0].ifc.msg[0:8] }
+
+  # The registry covers exactly the objects a full walk finds
+  assert b.get_all_object_filter( lambda x: True ) == b._collect_all_single()
+  assert b.get_all_object_type( Signal ) == b._dsl.all_signals
+
+def test_get_all_object_type_after_replace():
+
+  foo_wrap = Foo_shamt_list_wrap( 32 )
+  foo_wrap.elaborate()
+
+  old = foo_wrap.inner[2]
+  old_in = old.in_
+  foo_wrap.replace_component( foo_wrap.inner[2], Real_shamt )
+  new = foo_wrap.inner[2]
+
+  comps = foo_wrap.get_all_object_type( Component )
+  assert old not in comps and new in comps
+  assert old_in not in foo_wrap.get_all_object_type( Signal )
+  assert foo_wrap.get_all_object_type( InPort, host=new ) == { new.clk, new.reset, new.in_ }
+  assert foo_wrap.get_all_object_filter( lambda x: True ) == foo_wrap._collect_all_single()
+
+def test_release_elaboration_metadata():
+
+  class Acc( Component ):
+    def construct( s ):
+      s.in_ = InPort ( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.acc = Wire( Bits32 )
+
+      @s.update_ff
+      def up_acc():
+        if s.reset:
+          s.acc <<= Bits32(0)
+        else:
+          s.acc <<= s.acc + s.in_
+
+      @s.update
+      def up_out():
+        s.out = s.acc
+
+    def line_trace( s ):
+      return f"{s.in_}>{s.out}"
+
+  class Top( Component ):
+    def construct( s ):
+      s.in_ = InPort ( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.acc = Acc()( in_ = s.in_, out = s.out )
+
+    def line_trace( s ):
+      return s.acc.line_trace()
+
+  from pymtl3 import SimpleSim
+
+  top = Top()
+  top.apply( SimpleSim )
+  signal = weakref.ref( top._dsl.swapped_signals[ top.acc ][0][2] )
+
+  report = top.release_elaboration_metadata( drop_class_cache=True )
+  gc.collect()
+
+  assert report[ "signals" ] == len( top._dsl.all_components ) * 2 + 2 + 3
+  assert signal() is None
+  assert not hasattr( top, "_dag" )
+  assert "_name_info" not in Acc.__dict__
+
+  # The simulation still works the same as a model that keeps everything
+  ref = Top()
+  ref.apply( SimpleSim )
+
+  for m in [ top, ref ]:
+    m.sim_reset()
+    for i in range(5):
+      m.in_ = Bits32(i)
+      m.tick()
+
+  assert top.out == ref.out != 0
+  assert top.line_trace() == ref.line_trace()
+
+  try:
+    top.unlock_simulation()
+  except AttributeError as e:
+    print("{} is thrown\n{}".format( e.__class__.__name__, e ))
+    return
+  raise Exception("Should've thrown AttributeError.")
+
+def test_release_keeps_shared_class_cache():
+  from pymtl3 import SimpleSim
+  from pymtl3.passes.PassGroups import EventDrivenSim, FusedSim
+
+  class Reg( Component ):
+    def construct( s ):
+      s.in_ = InPort ( Bits8 )
+      s.en  = InPort ( Bits1 )
+      s.out = OutPort( Bits8 )
+
+      @s.update_ff
+      def up_reg():
+        if s.reset:
+          s.out <<= Bits8(0)
+        elif s.en:
+          s.out <<= s.in_
+
+  for Sim in [ SimpleSim, EventDrivenSim, FusedSim ]:
+    a, b = Reg(), Reg()
+    a.elaborate()
+    b.elaborate()
+
+    a.apply( SimpleSim )
+    a.release_elaboration_metadata( drop_class_cache=True )
+    # b is still elaborated and needs the cache of Reg
+    assert "_name_info" in Reg.__dict__
+
+    b.apply( Sim )
+    for m in [ a, b ]:
+      m.sim_reset()
+      m.in_ = Bits8(3)
+      m.en  = Bits1(1)
+      m.tick()
+      m.tick()
+    assert a.out == b.out == 3
+
+    # The default keeps the class cache even without other instances
+    b.release_elaboration_metadata()
+    assert "_name_info" in Reg.__dict__
+
 # def test_garbage_collection():
 
   # class X( Component ):
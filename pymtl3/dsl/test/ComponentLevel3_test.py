@@ -894,3 +894,54 @@ def test_connect_slice_int():
     assert str(e).startswith( "'int' object is not subscriptable" )
     return
   raise Exception("Should've thrown TypeError: 'int' object is not subscriptable")
+
+def test_connection_loop():
+
+  class Top( ComponentLevel3 ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.x = Wire( Bits32 )
+      s.y = Wire( Bits32 )
+      s.x //= s.in_
+      s.y //= s.x
+      s.in_ //= s.y
+
+  a = Top()
+  try:
+    a.elaborate()
+  except InvalidConnectionError as e:
+    print("{} is thrown\n{}".format( e.__class__.__name__, e ))
+    assert "connection loop" in str(e)
+    return
+  raise Exception("Should've thrown InvalidConnectionError.")
+
+def test_net_writer_chain_through_slices():
+
+  # The writer of the net of w[i] is only known after the nets of the
+  # slices of w[i] are resolved, which in turn depend on u[i-1]
+
+  class Top( ComponentLevel3 ):
+    def construct( s, n ):
+      s.in_ = InPort ( Bits32 )
+      s.out = OutPort( Bits32 )
+      s.w = [ Wire( Bits32 ) for _ in range(n) ]
+      s.u = [ Wire( Bits32 ) for _ in range(n) ]
+      s.w[0] //= s.in_
+      for i in range(n):
+        s.u[i] //= s.w[i]
+        if i+1 < n:
+          s.w[i+1][0:16]  //= s.u[i][0:16]
+          s.w[i+1][16:32] //= s.u[i][16:32]
+      s.out //= s.u[n-1]
+
+  a = Top( 50 )
+  a.elaborate()
+
+  writers = { frozenset(net): writer for writer, net in a.get_all_value_nets() }
+  assert len(writers) == 50 + 49*2
+
+  assert writers[ frozenset([ a.in_, a.w[0], a.u[0] ]) ] is a.in_
+  assert writers[ frozenset([ a.u[49], a.w[49], a.out ]) ] is a.w[49]
+  for i in range(1, 49):
+    assert writers[ frozenset([ a.u[i], a.w[i] ]) ] is a.w[i]
+    assert writers[ frozenset([ a.u[i-1][0:16], a.w[i][0:16] ]) ] is a.u[i-1][0:16]
@@ -0,0 +1,63 @@
+"""
+========================================================================
+ElaborationProfiler_test.py
+========================================================================
+"""
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl.Component import Component
+from pymtl3.dsl.Connectable import InPort, OutPort
+from pymtl3.dsl.ElaborationProfiler import PHASES, ElaborationProfiler
+
+
+class Incr( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @s.update
+    def up_incr():
+      s.out = s.in_ + Bits8(1)
+
+class Top( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.incr0 = Incr()( in_ = s.in_ )
+    s.incr1 = Incr()( in_ = s.incr0.out, out = s.out )
+
+def test_profiler_phases():
+  m = Top()
+  profiler = ElaborationProfiler( memory=True )
+  profiler.run( m )
+
+  assert len( m._dsl.all_components ) == 3
+  assert m._dsl.elab_profile is profiler
+
+  # The wrappers are removed after elaboration
+  assert not any( name in m.__dict__ for name in PHASES )
+
+  phases = profiler.as_dict()[ "phases" ]
+  names  = [ x["name"] for x in phases ]
+  assert names[0] == "_elaborate_construct"
+  assert "_elaborate_read_write_funcs" in names
+
+  # Nested phases come right after their parents
+  i = names.index( "_resolve_value_connections" )
+  assert phases[i]["depth"] == 1
+  assert names[:i].count( "_elaborate_collect_all_vars" ) == 1
+
+  assert sum( x["seconds"] for x in phases if not x["depth"] ) <= profiler.total
+  assert profiler.peak > 0
+
+  report = profiler.report()
+  assert "_check_port_in_nets" in report
+  assert "(peak)" in report
+
+def test_profiler_env( monkeypatch, capsys ):
+  monkeypatch.setenv( "PYMTL_ELAB_PROFILE", "1" )
+  m = Top()
+  m.elaborate()
+  out = capsys.readouterr().out
+  assert "Elaboration profile of Top" in out
+  assert "_elaborate_construct" in out
+  assert not m._dsl.elab_profile.memory
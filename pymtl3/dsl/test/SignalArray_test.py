@@ -0,0 +1,69 @@
+"""
+========================================================================
+SignalArray_test.py
+========================================================================
+"""
+from pymtl3 import SimpleSim
+from pymtl3.datatypes import Bits8, Bits32
+from pymtl3.dsl import Component, InPortArray, OutPortArray, Wire, WireArray
+
+
+class A( Component ):
+  def construct( s ):
+    s.in_ = InPortArray ( Bits32, 64 )
+    s.out = OutPortArray( Bits32, 64 )
+    s.out[3]  //= s.in_[3]
+    s.out[-1] //= s.in_[63]
+
+def test_signal_array_lazy():
+
+  a = A()
+  a.elaborate()
+
+  # Only the accessed elements exist
+  created = [ i for i, x in enumerate( list.__iter__( a.in_ ) ) if x is not None ]
+  assert created == [ 3, 63 ]
+  assert len(a.in_) == 64
+
+  assert repr(a.in_[3]) == "s.in_[3]"
+  assert repr(a.out[63]) == "s.out[63]"
+  assert a.in_[3] in a._dsl.all_signals
+  assert a.out[-1] is a.out[63]
+
+  nets = { frozenset(net): writer for writer, net in a.get_all_value_nets() }
+  assert nets[ frozenset([ a.in_[3], a.out[3] ]) ] is a.in_[3]
+
+def test_signal_array_nested_and_accessed_before_attached():
+
+  class B( Component ):
+    def construct( s ):
+      x = WireArray( Bits8, 4 )
+      y = x[1]
+      s.x = x
+      s.w = [ WireArray( Bits8, 4 ) for _ in range(2) ]
+      s.w[1][2] //= y
+      s.x[1] //= 0
+
+  b = B()
+  b.elaborate()
+
+  assert isinstance( b.x[1], Wire )
+  assert repr(b.x[1]) == "s.x[1]"
+  assert repr(b.w[1][2]) == "s.w[1][2]"
+  assert b.w[1][2]._dsl._my_indices == (1, 2)
+  assert b.w[1][2].get_host_component() is b
+
+def test_signal_array_simulation():
+
+  a = A()
+  a.apply( SimpleSim )
+
+  a.in_[3]  = Bits32(5)
+  a.in_[63] = Bits32(7)
+  a.tick()
+  assert a.out[3]  == 5
+  assert a.out[63] == 7
+
+  # Never-accessed ports get the default value
+  assert a.in_[10] == 0
+  assert a.out[10] == 0
@@ -126,9 +126,7 @@ class CLLineTracePass( BasePass ):
 
     # Collect all method ports and add some stamps
     all_callees = set()
-    all_method_ports = top.get_all_object_filter(
-      lambda s: isinstance( s, MethodPort )
-    )
+    all_method_ports = top.get_all_object_type( MethodPort )
     for mport in all_method_ports:
       mport.called = False
       mport.saved_args = None
@@ -154,9 +152,7 @@ class CLLineTracePass( BasePass ):
       wrap_callee_method( mport, set() )
 
     # Collecting all non blocking interfaces and replace the str hook
-    all_nblk_ifcs = top.get_all_object_filter(
-      lambda s: isinstance( s, NonBlockingInterface )
-    )
+    all_nblk_ifcs = top.get_all_object_type( NonBlockingInterface )
     for ifc in all_nblk_ifcs:
       if ifc.method.Type is not None:
         trace_len = len( str( ifc.method.Type() ) )
@@ -8,21 +8,30 @@
 import os
 import random
 from collections import deque
+from copy import deepcopy
 
-import py
+from pymtl3.datatypes import Bits, is_bitstruct_class
+from pymtl3.dsl.errors import UpblkCyclicError
 
 from .BasePass import BasePass, PassMetadata
 from .errors import PassOrderError
-from .SimpleSchedulePass import dump_dag, make_double_buffer_func
-from .SimpleTickPass import SimpleTickPass
+from .SimpleSchedulePass import (
+    dump_dag,
+    make_dirty_double_buffer_funcs,
+    make_double_buffer_func,
+)
 
 
 class DynamicSchedulePass( BasePass ):
+  def __init__( self, dirty_double_buffer=False ):
+    self.dirty_double_buffer = dirty_double_buffer
+
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
       raise PassOrderError( "all_constraints" )
 
     top._sched = PassMetadata()
+    top._sched.scc_stats = {}
 
     top._sched.schedule = self.schedule( top )
 
@@ -164,7 +173,13 @@ class DynamicSchedulePass( BasePass ):
     # From now on, we put the schedule in the order of
     # [ flip, normal upblks, update_ffs ]
 
-    schedule = [ make_double_buffer_func( top ) ]
+    restore = None
+    if self.dirty_double_buffer:
+      flip, restore = make_dirty_double_buffer_funcs( top )
+    else:
+      flip = make_double_buffer_func( top )
+
+    schedule = [ flip ]
 
     scc_id = 0
     for i in scc_schedule:
@@ -225,52 +240,111 @@ class DynamicSchedulePass( BasePass ):
           raise Exception("There is a cyclic dependency without involving variables."
                           "Probably a loop that involves update_once:\n{}".format(", ".join( [ x.__name__ for x in scc] )))
 
-        # generate a loop for scc
-        # Shunning: we just simply loop over the whole SCC block
-        # TODO performance optimizations using Mamba techniques within a SCC block
-
-        def gen_wrapped_SCCblk( s, scc, src ):
-          from pymtl3.dsl.errors import UpblkCyclicError
-
-          # TODO mamba?
-          scc_tick_func = SimpleTickPass.gen_tick_function( scc )
-          namespace = {}
-          namespace.update( locals() )
-
-          exec(py.code.Source( src ).compile(), namespace)
-          return namespace['generated_block']
-
-        template = """
-          from copy import deepcopy
-          def wrapped_SCC_{0}():
-            N = 0
-            while True:
-              N += 1
-              if N > 100: raise UpblkCyclicError("Combinational loop detected at runtime in {{{3}}} after 100 iters!")
-              {1}
-              scc_tick_func()
-              if {2}:
-                break
-            # print "SCC block{0} is executed", num_iters, "times"
-          generated_block = wrapped_SCC_{0}
-        """
-
-        copy_srcs  = []
-        check_srcs = []
-        # print_srcs = []
-
-        for j, var in enumerate(variables):
-          copy_srcs .append( "t{} = deepcopy({})".format( j, var ) )
-          check_srcs.append( "{} == t{}".format( var, j ) )
-          # print_srcs.append( "print '{}', {}, _____tmp_{}".format( var, var, j ) )
-
-        scc_block_src = template.format( scc_id,
-                                         "; ".join( copy_srcs ),
-                                         " and ".join( check_srcs ),
-                                         ", ".join( [ x.__name__ for x in scc] ) )
-                                         # "; ".join( print_srcs ) )
-        schedule.append( gen_wrapped_SCCblk( top, tmp_schedule, scc_block_src ) )
+        wrapped, stats = self.gen_wrapped_SCCblk( top, scc_id, tmp_schedule,
+                                                  E, constraint_objs )
+        top._sched.scc_stats[ wrapped.__name__ ] = stats
+        schedule.append( wrapped )
 
     schedule.extend( list(top._dsl.all_update_ff) )
+    if restore is not None:
+      schedule.append( restore )
 
     return schedule
+
+  #-----------------------------------------------------------------------
+  # gen_wrapped_SCCblk
+  #-----------------------------------------------------------------------
+  # Generate a block that iterates the blocks of a non-trivial SCC until
+  # a fixed point is reached. Instead of re-executing the whole SCC and
+  # deep-copying/comparing every involved variable each iteration, we use
+  # a worklist: each block snapshots the variables it propagates to other
+  # blocks of the SCC, and only the blocks that read a changed variable
+  # are marked for re-execution. A marked block that comes later in the
+  # intra-SCC schedule runs in the same sweep, otherwise in the next one.
+  #
+  # wrapped_SCC_1():
+  #   d0 = d1 = True
+  #   N = E = 0
+  #   while d0 or d1:
+  #     N += 1
+  #     if N > 100: raise UpblkCyclicError(...)
+  #     if d0:
+  #       d0 = False; E += 1
+  #       t0 = int(s.x)
+  #       up1()
+  #       if int(s.x) != t0: d1 = True
+  #     if d1:
+  #       ...
+  #   _stats.calls += 1; _stats.iterations += N; _stats.executions += E
+
+  def gen_wrapped_SCCblk( self, s, scc_id, scc, E, constraint_objs ):
+    index = { blk: i for i, blk in enumerate(scc) }
+
+    # For each block, the variables it propagates and the blocks that
+    # need to be re-executed if the variable changes
+
+    succs = [ {} for _ in scc ]
+    for (u, v) in E:
+      if u in index and v in index:
+        for obj in constraint_objs[ (u, v) ]:
+          succs[ index[u] ].setdefault( obj, set() ).add( index[v] )
+
+    # Cheap snapshots for values that are replaced instead of mutated
+    # in-place by update blocks, and clone() for bitstructs. Fall back to
+    # deepcopy otherwise.
+
+    def gen_snapshot( obj ):
+      Type = getattr( obj._dsl, "Type", None ) if obj.is_signal() else None
+      if isinstance( Type, type ) and issubclass( Type, Bits ):
+        return f"int({obj})", "int({0}) != {1}"
+      if Type in ( int, bool ):
+        return f"{obj}", "{0} != {1}"
+      if is_bitstruct_class( Type ):
+        return f"{obj}.clone()", "not ({0} == {1})"
+      return f"_deepcopy({obj})", "not ({0} == {1})"
+
+    n = len(scc)
+    dirty = " or ".join( f"d{i}" for i in range(n) )
+    body  = []
+    t     = 0
+    for i, blk in enumerate(scc):
+      body.append( f"if d{i}:" )
+      body.append( f"  d{i} = False; E += 1" )
+      checks = []
+      for obj, vs in sorted( succs[i].items(), key=lambda x: repr(x[0]) ):
+        snap, cmp = gen_snapshot( obj )
+        body.append( f"  t{t} = {snap}" )
+        marks = " = ".join( f"d{j}" for j in sorted(vs) )
+        checks.append( f"  if {cmp.format( obj, f't{t}' )}: {marks} = True" )
+        t += 1
+      body.append( f"  blk{i}()" )
+      body.extend( checks )
+
+    names = ", ".join( x.__name__ for x in scc )
+    src = """
+def wrapped_SCC_{0}():
+  {1} = True
+  N = E = 0
+  while {2}:
+    N += 1
+    if N > 100: raise UpblkCyclicError("Combinational loop detected at runtime in {{{3}}} after 100 iters!")
+    {4}
+  _stats.calls      += 1
+  _stats.iterations += N
+  _stats.executions += E
+""".format( scc_id, " = ".join( f"d{i}" for i in range(n) ), dirty, names,
+            "\n    ".join( body ) )
+
+    stats = PassMetadata()
+    stats.blocks     = [ x.__name__ for x in scc ]
+    stats.calls      = 0
+    stats.iterations = 0
+    stats.executions = 0
+
+    namespace = { "s": s, "_stats": stats, "_deepcopy": deepcopy,
+                  "UpblkCyclicError": UpblkCyclicError }
+    namespace.update( { f"blk{i}": blk for i, blk in enumerate(scc) } )
+
+    import py
+    exec(py.code.Source( src ).compile(), namespace)
+    return namespace[ f"wrapped_SCC_{scc_id}" ], stats
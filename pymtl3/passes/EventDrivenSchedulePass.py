@@ -0,0 +1,250 @@
+"""
+========================================================================
+EventDrivenSchedulePass.py
+========================================================================
+Generate an activity-based schedule. We still compute a static
+topological order of all update blocks (including the net blocks
+generated by GenDAGPass), but each block only executes when some signal
+in its sensitivity list changed during the current cycle. The whole
+guarded schedule is compiled into a single kernel function so that the
+rest of the simulation passes (CLLineTracePass, VcdGenerationPass,
+SimpleTickPass) can treat it as one normal entry of top._sched.schedule.
+"""
+from collections import defaultdict
+from copy import deepcopy
+from linecache import cache as line_cache
+
+from pymtl3.datatypes import Bits, is_bitstruct_inst
+from pymtl3.dsl import CalleePort, InPort
+
+from .BasePass import BasePass, PassMetadata
+from .errors import PassOrderError
+from .SimpleSchedulePass import (
+    check_schedule,
+    is_pure_upblk,
+    make_double_buffer_func,
+    patch_schedule,
+    root_signal,
+)
+
+#-------------------------------------------------------------------------
+# Value snapshots
+#-------------------------------------------------------------------------
+# We need to keep a private copy of every watched value because Bits and
+# bitstructs are mutable (think of s.out[0:4] = x). The initial snapshot
+# is a sentinel that is different from everything so that all blocks
+# execute in the very first cycle.
+
+class _NeverEqual:
+  def __eq__( self, other ):
+    return False
+  def __ne__( self, other ):
+    return True
+  __hash__ = object.__hash__
+
+def _snapshot( v ):
+  if isinstance( v, Bits ):
+    return Bits( v.nbits, int(v) )
+  if isinstance( v, (int, bool, str) ):
+    return v
+  if is_bitstruct_inst( v ):
+    return v.clone()
+  return deepcopy( v )
+
+class EventDrivenSchedulePass( BasePass ):
+  def __call__( self, top ):
+    if not hasattr( top._dag, "all_constraints" ):
+      raise PassOrderError( "all_constraints" )
+
+    prev = getattr( top, "_sched", None )
+
+    top._sched = PassMetadata()
+
+    self.schedule_topo( top, prev )
+    self.build_sensitivity( top )
+
+    top._sched.schedule = [ make_double_buffer_func( top ),
+                            self.gen_event_driven_kernel( top ) ]
+    top._sched.schedule.extend( top._dsl.all_update_ff )
+
+  #-----------------------------------------------------------------------
+  # schedule_topo
+  #-----------------------------------------------------------------------
+  # The same topological sort as SimpleSchedulePass, but without the
+  # random shuffle so that the kernel is reproducible across runs. The
+  # order of the last run is patched if there is one.
+
+  def schedule_topo( self, top, prev=None ):
+
+    V   = top._dag.final_upblks - top.get_all_update_ff()
+    E   = top._dag.all_constraints
+    Es  = { v: [] for v in V }
+    InD = { v: 0  for v in V }
+
+    for (u, v) in E: # u -> v
+      InD[v] += 1
+      Es [u].append( v )
+
+    update_schedule = None
+    if getattr( prev, "update_schedule", None ) is not None:
+      update_schedule = patch_schedule( prev.update_schedule, V, E )
+
+    if update_schedule is None:
+      update_schedule = []
+
+      Q = sorted( [ v for v in V if not InD[v] ], key=lambda x: x.__name__ )
+      Q.reverse()
+      while Q:
+        u = Q.pop()
+        update_schedule.append( u )
+        for v in Es[u]:
+          InD[v] -= 1
+          if not InD[v]:
+            Q.append( v )
+
+      check_schedule( top, update_schedule, V, E, InD )
+
+    top._sched.update_schedule = update_schedule
+    top._sched.successors      = Es
+
+  #-----------------------------------------------------------------------
+  # build_sensitivity
+  #-----------------------------------------------------------------------
+  # For each block we figure out (1) which objects it writes, so that the
+  # kernel can check them after the block executes, and (2) whether the
+  # block is "pure", i.e. all it reads are signals. A block that reads
+  # plain Python objects (s.input_ deque, s.counter, ...), calls methods,
+  # or reads signals that methods may mutate can change its behavior
+  # without any signal changing, so we always execute it.
+
+  def build_sensitivity( self, top ):
+
+    upblk_reads, upblk_writes, upblk_calls = top.get_all_upblk_metadata()
+    genblk_reads, genblk_writes = top._dag.genblk_reads, top._dag.genblk_writes
+    all_upblks = top.get_all_update_blocks()
+
+    # Signals owned by components that expose callee ports can be written
+    # by a method call at any point of the cycle.
+
+    volatile_hosts = { x.get_host_component() for x in top._dsl.all_method_ports
+                       if isinstance( x, CalleePort ) }
+
+    always_active = set()
+    blk_writes    = {}
+
+    for blk in top._sched.update_schedule:
+      if blk in genblk_writes:
+        reads, writes = genblk_reads.get( blk, [] ), genblk_writes[ blk ]
+      elif blk in all_upblks:
+        reads, writes = upblk_reads[ blk ], upblk_writes[ blk ]
+        hostobj = top.get_update_block_host_component( blk )
+        if upblk_calls[ blk ] or not is_pure_upblk( hostobj, blk.__name__ ):
+          always_active.add( blk )
+      else: # e.g. a greenlet ticker created by WrapGreenletPass
+        always_active.add( blk )
+        continue
+
+      for x in reads:
+        if root_signal( x ).get_host_component() in volatile_hosts:
+          always_active.add( blk )
+          break
+
+      blk_writes[ blk ] = sorted( writes, key=repr )
+
+    # Boundary signals are the ones that change between two consecutive
+    # executions of the combinational kernel: top level input ports that
+    # the test bench pokes, and the signals written by update_ff blocks.
+
+    boundary = { root_signal( x ) for x in top._dsl.all_signals
+                 if isinstance( x, InPort ) and x.get_host_component() is top }
+    for blk in top.get_all_update_ff():
+      boundary.update( root_signal( x ) for x in upblk_writes[ blk ] )
+
+    readers = defaultdict(set)
+    for blk in top._sched.update_schedule:
+      if blk in genblk_writes:
+        reads = genblk_reads.get( blk, [] )
+      elif blk in all_upblks:
+        reads = upblk_reads[ blk ]
+      else:
+        continue
+      for x in reads:
+        readers[ root_signal( x ) ].add( blk )
+
+    top._sched.always_active = always_active
+    top._sched.blk_writes    = blk_writes
+    top._sched.boundary      = { x: readers[x] for x in sorted( boundary, key=repr )
+                                 if readers[x] }
+    top._sched.sensitivity   = { blk: [ v for v in top._sched.successors[ blk ]
+                                        if v not in always_active ]
+                                 for blk in top._sched.update_schedule }
+
+  #-----------------------------------------------------------------------
+  # gen_event_driven_kernel
+  #-----------------------------------------------------------------------
+
+  def gen_event_driven_kernel( self, top ):
+    schedule      = top._sched.update_schedule
+    always_active = top._sched.always_active
+    blk_writes    = top._sched.blk_writes
+    sensitivity   = top._sched.sensitivity
+    blk_id        = { blk: i for i, blk in enumerate( schedule ) }
+
+    snap = []
+    act  = [ True ] * len(schedule)
+
+    def wake( blks ):
+      ids = sorted( { blk_id[x] for x in blks if x not in always_active } )
+      return " = ".join( [ f"act[{i}]" for i in ids ] + [ "True" ] ) if ids else "pass"
+
+    strs = []
+
+    # Check boundary signals first
+    for x, rd_blks in top._sched.boundary.items():
+      k = len(snap)
+      snap.append( _NeverEqual() )
+      strs.append( f"x = {x!r}" )
+      strs.append( f"if snap[{k}] != x:" )
+      strs.append( f"  snap[{k}] = _snapshot( x ); {wake( rd_blks )}" )
+
+    for i, blk in enumerate( schedule ):
+      checks = []
+      if not sensitivity[ blk ]:
+        pass
+      # A net block only executes when its writer changed, and all readers
+      # are then assigned the same new value. No need to check them.
+      elif blk in top._dag.genblks:
+        checks.append( wake( sensitivity[ blk ] ) )
+      else:
+        for x in blk_writes.get( blk, [] ):
+          k = len(snap)
+          snap.append( _NeverEqual() )
+          checks.append( f"x = {x!r}" )
+          checks.append( f"if snap[{k}] != x:" )
+          checks.append( f"  snap[{k}] = _snapshot( x ); {wake( sensitivity[ blk ] )}" )
+
+      if blk in always_active:
+        strs.append( f"update_blk{i}() # {blk.__name__}" )
+        strs.extend( checks )
+      else:
+        strs.append( f"if act[{i}]:" )
+        strs.append( f"  act[{i}] = False" )
+        strs.append( f"  update_blk{i}() # {blk.__name__}" )
+        strs.extend( [ "  " + x for x in checks ] )
+
+    src = """
+def compile_event_driven( s, schedule, snap, act, _snapshot ):
+  {}
+  def event_driven_kernel():
+    {}
+  return event_driven_kernel
+""".format( "; ".join( [ f"update_blk{i}=schedule[{i}]" for i in range(len(schedule)) ] ) or "pass",
+            "\n    ".join( strs ) or "pass" )
+
+    fname = f"Event-driven kernel of {top.__class__.__name__}"
+    l = {}
+    exec( compile( src, filename=fname, mode="exec" ), l )
+    line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
+
+    top._sched.activity = act
+    return l['compile_event_driven']( top, schedule, snap, act, _snapshot )
@@ -5,13 +5,17 @@ GenDAGPass.py
 Generate a DAG of update blocks (including net connection blocks) from
 a model.
 
+If the pass has been applied to the model before, e.g. before a
+replace_component, the net blocks of the nets that are still the same
+and the implicit constraints of the variables whose readers and writers
+didn't change are reused, so only the edited parts are regenerated.
+
 Author : Shunning Jiang
 Date   : Jan 18, 2018
 """
 from collections import defaultdict, deque
 from linecache import cache as line_cache
 
-from pymtl3.datatypes import *
 from pymtl3.dsl import *
 from pymtl3.dsl.errors import LeftoverPlaceholderError
 
@@ -22,19 +26,25 @@ class GenDAGPass( BasePass ):
 
   def __call__( self, top ):
     top.check()
+
+    # The metadata of the last run, if any, is used to only regenerate
+    # what has changed since then
+    prev = getattr( top, "_dag", None )
+    if prev is not None and not hasattr( prev, "net_blks" ):
+      prev = None
+
     top._dag = PassMetadata()
 
-    placeholders = [ x for x in top._dsl.all_named_objects
-                     if isinstance( x, Placeholder ) ]
+    placeholders = top.get_all_object_type( Placeholder )
 
     if placeholders:
       raise LeftoverPlaceholderError( placeholders )
 
-    self._generate_net_blocks( top )
-    self._process_value_constraints( top )
+    self._generate_net_blocks( top, prev )
+    self._process_value_constraints( top, prev )
     self._process_methods( top )
 
-  def _generate_net_blocks( self, top ):
+  def _generate_net_blocks( self, top, prev=None ):
     """ _generate_net_blocks:
     Each net is an update block. Readers are actually "written" here.
       >>> s.net_reader1 = s.net_writer
@@ -44,7 +54,11 @@ class GenDAGPass( BasePass ):
     top._dag.genblk_hostobj = {}
     top._dag.genblk_reads   = {}
     top._dag.genblk_writes  = {}
-    # top._dag.genblk_src     = {}
+    top._dag.genblk_src     = {}
+
+    # ( writer, frozenset of the net ) -> block, used to reuse the blocks
+    # of unchanged nets in the next run
+    top._dag.net_blks = {}
 
     # To reduce the time to compile update blocks, I first group the list
     # of update blocks that have the same host object together and fire
@@ -58,12 +72,36 @@ class GenDAGPass( BasePass ):
     hostobj_allsrc = defaultdict(str)
     hostobj_bits   = defaultdict(set)
     blkname_meta   = {}
+    blkname_src    = {}
     blkname_suffix = {}
 
+    # The generated code only depends on the members of the net, so a net
+    # whose members are all the same objects as in the last run keeps its
+    # block. The names of the kept blocks are reserved for disambiguation.
+
+    prev_blks = {} if prev is None else prev.net_blks
+    used_names = set()
+    new_nets = []
+
     for writer, signals in top.get_all_value_nets():
       if len(signals) == 1:
         continue
 
+      key = ( writer, frozenset( signals ) )
+      blk = prev_blks.get( key )
+      if blk is None:
+        new_nets.append( (writer, signals, key) )
+      else:
+        top._dag.genblks.add( blk )
+        if writer.is_signal():
+          top._dag.genblk_reads[ blk ] = [ writer ]
+        top._dag.genblk_writes [ blk ] = prev.genblk_writes[ blk ]
+        top._dag.genblk_src    [ blk ] = prev.genblk_src[ blk ]
+        top._dag.genblk_hostobj[ blk ] = prev.genblk_hostobj[ blk ]
+        top._dag.net_blks[ key ] = blk
+        used_names.add( blk.__name__ )
+
+    for writer, signals, key in new_nets:
       readers = [ x for x in signals if x is not writer ]
       fanout  = len( readers )
 
@@ -122,11 +160,13 @@ class GenDAGPass( BasePass ):
       # There are cases where the same const drives multiple nets. We
       # basically add a suffix to name each of them differently.
 
-      if upblk_name in blkname_meta:
+      if upblk_name in blkname_meta or upblk_name in used_names:
         if upblk_name in blkname_suffix:
           current = blkname_suffix[ upblk_name ]
         else:
           current = 1
+        while f"{upblk_name}_no_{current}" in used_names:
+          current += 1
         blkname_suffix[ upblk_name ] = current + 1
         upblk_name += f"_no_{current}"
 
@@ -134,7 +174,8 @@ class GenDAGPass( BasePass ):
   def {}():
     {} = {}""".format( upblk_name, " = ".join( rstrs ), wstr )
       hostobj_allsrc[ wr_lca ] += gen_src
-      blkname_meta[ upblk_name ] = (writer, readers)
+      blkname_meta[ upblk_name ] = (writer, readers, key)
+      blkname_src [ upblk_name ] = gen_src
 
     # TODO see if directly compiling AST instead of source can be faster
 
@@ -160,15 +201,18 @@ def compile_upblks( s ):
       for name, blk in ret.items():
         if name != 's':
           top._dag.genblks.add( blk )
-          writer, readers = blkname_meta[ name ]
+          writer, readers, key = blkname_meta[ name ]
           if writer.is_signal():
             top._dag.genblk_reads[ blk ] = [ writer ]
           top._dag.genblk_writes[ blk ] = readers
+          top._dag.genblk_src   [ blk ] = blkname_src[ name ]
+          top._dag.genblk_hostobj[ blk ] = hostobj
+          top._dag.net_blks[ key ] = blk
 
     # Get the final list of update blocks
     top._dag.final_upblks = top.get_all_update_blocks() | top._dag.genblks
 
-  def _process_value_constraints( self, top ):
+  def _process_value_constraints( self, top, prev=None ):
 
     # Query update block metadata from top
 
@@ -240,7 +284,66 @@ def compile_upblks( s ):
     #
     # Implicitly, WR(x) < RD(x), so when U1 writes X and U2 reads x
     # - U1 == WR(x) & U2 == RD(x) --> U1 == WR(x) < RD(x) == U2
+    #
+    # The constraints are kept per variable. If the pass was applied
+    # before, we only redo the variables whose reader/writer blocks
+    # changed since then, plus the descendants and sibling slices of
+    # those because they check the changed variable as an ancestor or an
+    # overlapping slice.
+
+    if prev is None:
+      impl_objs = defaultdict(set) # constraint -> variables
+      obj_impls = {}               # variable -> constraints
+      dirty     = { *read_upblks, *write_upblks }
+    else:
+      impl_objs = prev.impl_constraint_objs
+      obj_impls = prev.obj_impl_constraints
+
+      changed = _get_changed_vars( read_upblks, prev.read_upblks ) | \
+                _get_changed_vars( write_upblks, prev.write_upblks )
+      dirty = set()
+      for obj in changed:
+        stack = [ obj ]
+        while stack:
+          u = stack.pop()
+          if isinstance( u, list ):
+            stack.extend( u )
+          elif isinstance( u, Signal ):
+            dirty.add( u )
+            for name, x in u.__dict__.items():
+              if isinstance( name, tuple ) or name[0] != '_':
+                stack.append( x )
+        if isinstance( obj, Signal ):
+          dirty.update( obj.get_sibling_slices() )
+
+    for obj in dirty:
+      for pair in obj_impls.pop( obj, () ):
+        objs = impl_objs[ pair ]
+        objs.discard( obj )
+        if not objs:
+          del impl_objs[ pair ]
+
+      impls = self._get_implicit_constraints( obj, read_upblks, write_upblks, update_ff )
+      if impls:
+        obj_impls[ obj ] = impls
+        for pair in impls:
+          impl_objs[ pair ].add( obj )
+
+    top._dag.read_upblks  = read_upblks
+    top._dag.write_upblks = write_upblks
+    top._dag.impl_constraint_objs = impl_objs
+    top._dag.obj_impl_constraints = obj_impls
+
+    for pair, objs in impl_objs.items():
+      constraint_objs[ pair ] |= objs
+
+    top._dag.constraint_objs = constraint_objs
+    top._dag.all_constraints = { *U_U }
+    for (x, y) in impl_objs:
+      if (y, x) not in U_U: # no conflicting expl
+        top._dag.all_constraints.add( (x, y) )
 
+  def _get_implicit_constraints( self, obj, read_upblks, write_upblks, update_ff ):
     impl_constraints = set()
 
     # Collect all objs that write the variable whose id is "read"
@@ -248,7 +351,8 @@ def compile_upblks( s ):
     # 2) RD A.b[1:10] - WR A.b[1:10], A.b, A
     # 3) RD A.b[1:10] - WR A.b[0:5], A.b[6], A.b[8:11]
 
-    for obj, rd_blks in read_upblks.items():
+    rd_blks = read_upblks.get( obj )
+    if rd_blks:
       writers = []
 
       # Check parents. Cover 1) and 2)
@@ -271,7 +375,6 @@ def compile_upblks( s ):
               if wr_blk != rd_blk:
                 if rd_blk not in update_ff:
                   impl_constraints.add( (wr_blk, rd_blk) ) # wr < rd default
-                  constraint_objs[ (wr_blk, rd_blk) ].add( obj )
 
     # Collect all objs that read the variable whose id is "write"
     # 1) WR A.b.b.b, A.b.b, A.b, A (detect 2-writer conflict)
@@ -280,7 +383,8 @@ def compile_upblks( s ):
     # 4) WR A.b[1:10], A.b[0:5], A.b[6] (detect 2-writer conflict)
     # "WR A.b[1:10] - RD A.b[0:5], A.b[6], A.b[8:11]" has been discovered
 
-    for obj, wr_blks in write_upblks.items():
+    wr_blks = write_upblks.get( obj )
+    if wr_blks:
       readers = []
 
       # Check parents. Cover 2) and 3). 1) and 4) should be detected in elaboration
@@ -298,13 +402,8 @@ def compile_upblks( s ):
                 if wr_blk != rd_blk:
                   if rd_blk not in update_ff:
                     impl_constraints.add( (wr_blk, rd_blk) ) # wr < rd default
-                    constraint_objs[ (wr_blk, rd_blk) ].add( obj )
 
-    top._dag.constraint_objs = constraint_objs
-    top._dag.all_constraints = { *U_U }
-    for (x, y) in impl_constraints:
-      if (y, x) not in U_U: # no conflicting expl
-        top._dag.all_constraints.add( (x, y) )
+    return impl_constraints
 
   #-----------------------------------------------------------------------
   # Process methods
@@ -324,8 +423,7 @@ def compile_upblks( s ):
     # because all members in the net will eventually point to the same
     # method object.
 
-    top._dsl.top_level_callee_ports = top.get_all_object_filter(
-      lambda x: isinstance(x, CalleePort) and x.get_host_component() is top )
+    top._dsl.top_level_callee_ports = top.get_all_object_type( CalleePort, host=top )
 
     method_is_top_level_callee = set()
 
@@ -558,3 +656,15 @@ def compile_upblks( s ):
     for blocking_method in top._dsl.all_blocking_methods:
       for blk in method_blks[ blocking_method ]:
         top._dag.greenlet_upblks.add( blk )
+
+def _get_changed_vars( new, old ):
+  """ Return the variables whose set of reader/writer blocks differs
+  between two runs. A missing entry is the same as an empty set. """
+  changed = set()
+  for x, blks in new.items():
+    if old.get( x, set() ) != blks:
+      changed.add( x )
+  for x, blks in old.items():
+    if blks and x not in new:
+      changed.add( x )
+  return changed
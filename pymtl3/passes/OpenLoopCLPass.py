@@ -8,7 +8,6 @@
 # Author : Shunning Jiang
 # Date   : Apr 20, 2019
 """
-from graphviz import Digraph
 
 from pymtl3.dsl import CalleePort, NonBlockingCalleeIfc
 from pymtl3.dsl.errors import UpblkCyclicError
@@ -36,11 +35,9 @@ class OpenLoopCLPass( BasePass ):
 
     # We collect all top level callee ports/nonblocking callee interfaces
 
-    top_level_callee_ports = top.get_all_object_filter(
-      lambda x: isinstance(x, CalleePort) and x.get_host_component() is top )
+    top_level_callee_ports = top.get_all_object_type( CalleePort, host=top )
 
-    top_level_nb_ifcs = top.get_all_object_filter(
-      lambda x: isinstance(x, NonBlockingCalleeIfc) and x.get_host_component() is top )
+    top_level_nb_ifcs = top.get_all_object_type( NonBlockingCalleeIfc, host=top )
 
     # We still tell the top level
     method_callee_mapping = {}
@@ -2,9 +2,12 @@ from pymtl3.dsl import Component
 
 from .CLLineTracePass import CLLineTracePass
 from .DynamicSchedulePass import DynamicSchedulePass
+from .EventDrivenSchedulePass import EventDrivenSchedulePass
 from .GenDAGPass import GenDAGPass
 from .LineTraceParamPass import LineTraceParamPass
+from .mamba.FusedTickPass import FusedTickPass
 from .mamba.HeuristicTopoPass import HeuristicTopoPass
+from .mamba.IntegerTickPass import IntegerTickPass
 from .mamba.TraceBreakingSchedTickPass import TraceBreakingSchedTickPass
 from .mamba.UnrollTickPass import UnrollTickPass
 from .OpenLoopCLPass import OpenLoopCLPass
@@ -35,6 +38,17 @@ DynamicSim = [
   Component.lock_in_simulation
 ]
 
+EventDrivenSim = [
+  Component.elaborate,
+  GenDAGPass(),
+  WrapGreenletPass(),
+  EventDrivenSchedulePass(),
+  CLLineTracePass(),
+  SimpleTickPass(),
+  LineTraceParamPass(),
+  Component.lock_in_simulation
+]
+
 # This pass is created to be used for 2019 isca tutorial.
 SimulationPass = [
   GenDAGPass(),
@@ -65,6 +79,25 @@ UnrollSim = [
   Component.lock_in_simulation
 ]
 
+FusedSim = [
+  Component.elaborate,
+  GenDAGPass(),
+  WrapGreenletPass(),
+  SimpleSchedulePass(),
+  CLLineTracePass(),
+  FusedTickPass(),
+  LineTraceParamPass(),
+  Component.lock_in_simulation
+]
+
+IntegerSim = [
+  Component.elaborate,
+  GenDAGPass(),
+  SimpleSchedulePass(),
+  IntegerTickPass(),
+  Component.lock_in_simulation
+]
+
 HeuTopoUnrollSim = [
   Component.elaborate,
   GenDAGPass(),
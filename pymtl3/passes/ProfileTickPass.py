@@ -0,0 +1,202 @@
+"""
+========================================================================
+ProfileTickPass.py
+========================================================================
+Wrap every entry of the schedule generated by some previous pass with
+counters to find out which update blocks, net blocks, SCC wrappers and
+greenlet tickers dominate a cycle. This pass has to be applied after the
+schedule pass and before the tick pass. If CLLineTracePass is applied
+before this pass, its schedule is wrapped as well.
+
+In the exact mode (sample_every=1) every call is timed with
+perf_counter_ns. Otherwise we count every call but only time the calls
+in every Nth cycle, and extrapolate the total time from the samples.
+
+The results are grouped by the class of the host component and can be
+printed with top.profile_report(), or exported as JSON and as the
+collapsed-stack format of flamegraph.pl with top.dump_profile().
+"""
+import json
+from collections import defaultdict
+
+from .BasePass import BasePass, PassMetadata
+from .errors import PassOrderError
+
+try:
+  from time import perf_counter_ns
+except ImportError: # Python < 3.7
+  from time import perf_counter
+  def perf_counter_ns():
+    return int( perf_counter() * 1e9 )
+
+
+class ProfileTickPass( BasePass ):
+
+  def __init__( self, sample_every=1 ):
+    assert sample_every >= 1
+    self.sample_every = sample_every
+
+  def __call__( self, top ):
+    if not hasattr( top, "_sched" ) or not hasattr( top._sched, "schedule" ):
+      raise PassOrderError( "schedule" )
+
+    top._prof = PassMetadata()
+    top._prof.sample_every   = self.sample_every
+    top._prof.ncycles        = 0
+    top._prof.sampled_cycles = 0
+    top._prof.records        = {} # blk -> [ calls, sampled calls, time ]
+
+    wrapped = {}
+    top._sched.schedule = self.wrap_schedule( top, top._sched.schedule, wrapped )
+    if hasattr( top, "_cl_trace" ):
+      top._cl_trace.schedule = self.wrap_schedule( top, top._cl_trace.schedule, wrapped )
+
+    top.profile_report = lambda topn=10: profile_report( top, topn )
+    top.dump_profile   = lambda json_file=None, collapsed_file=None: \
+                           dump_profile( top, json_file, collapsed_file )
+
+  #-----------------------------------------------------------------------
+  # wrap_schedule
+  #-----------------------------------------------------------------------
+  # We add a function at the beginning of the schedule that counts cycles
+  # and decides whether the current cycle is sampled.
+
+  def wrap_schedule( self, top, schedule, wrapped ):
+    prof  = top._prof
+    every = self.sample_every
+
+    def profile_cycle():
+      prof.ncycles += 1
+      prof.sampling = prof.ncycles % every == 0
+      if prof.sampling:
+        prof.sampled_cycles += 1
+
+    prof.sampling = every == 1
+
+    new_schedule = [ profile_cycle ]
+    for blk in schedule:
+      if blk not in wrapped:
+        wrapped[ blk ] = self.wrap_block( prof, blk )
+      new_schedule.append( wrapped[ blk ] )
+    return new_schedule
+
+  def wrap_block( self, prof, blk ):
+    record = prof.records[ blk ] = [ 0, 0, 0 ]
+
+    if self.sample_every == 1:
+      def profiled_block():
+        t0 = perf_counter_ns()
+        blk()
+        record[2] += perf_counter_ns() - t0
+        record[0] += 1
+        record[1] += 1
+
+    else:
+      def profiled_block():
+        record[0] += 1
+        if prof.sampling:
+          t0 = perf_counter_ns()
+          blk()
+          record[2] += perf_counter_ns() - t0
+          record[1] += 1
+        else:
+          blk()
+
+    profiled_block.__name__ = blk.__name__
+    return profiled_block
+
+#-------------------------------------------------------------------------
+# Reporting
+#-------------------------------------------------------------------------
+
+# Return the path of the host component, a list of host component
+# classes from the top to the host of the block, and the name of the
+# block. Greenlet tickers point to the actual update blocks with
+# __wrapped__.
+
+def _block_stack( top, blk ):
+  blk = getattr( blk, "__wrapped__", blk )
+
+  if blk in top._dsl.all_upblk_hostobj:
+    hostobj = top.get_update_block_host_component( blk )
+    path    = repr(hostobj)
+    stack   = []
+    while hostobj is not None:
+      stack.append( hostobj )
+      hostobj = hostobj.get_parent_object()
+    return path, [ x.__class__.__name__ for x in reversed(stack) ], blk.__name__
+
+  if hasattr( top, "_dag" ) and blk in top._dag.genblks:
+    return "s", [ top.__class__.__name__, "<nets>" ], blk.__name__
+
+  return "s", [ top.__class__.__name__ ], blk.__name__
+
+def get_profile( top ):
+  prof = top._prof
+
+  blocks = []
+  for blk, (calls, sampled_calls, time_ns) in prof.records.items():
+    # Extrapolate the time of the calls in cycles that are not sampled
+    if sampled_calls and sampled_calls < calls:
+      time_ns = time_ns * calls // sampled_calls
+
+    path, stack, name = _block_stack( top, blk )
+    blocks.append({
+      "name"    : name,
+      "path"    : path,
+      "host"    : stack[-1],
+      "stack"   : stack,
+      "calls"   : calls,
+      "time_ns" : time_ns,
+    })
+
+  blocks.sort( key=lambda x: ( -x["time_ns"], x["path"], x["name"] ) )
+
+  classes = defaultdict(int)
+  for x in blocks:
+    classes[ x["host"] ] += x["time_ns"]
+
+  return {
+    "ncycles"        : prof.ncycles,
+    "sampled_cycles" : prof.sampled_cycles,
+    "sample_every"   : prof.sample_every,
+    "blocks"         : blocks,
+    "classes"        : dict( sorted( classes.items(), key=lambda x: -x[1] ) ),
+  }
+
+def profile_report( top, topn=10 ):
+  profile = get_profile( top )
+  ncycles = max( 1, profile["ncycles"] )
+  total   = max( 1, sum( x["time_ns"] for x in profile["blocks"] ) )
+
+  strs = [ f"Profile of {top.__class__.__name__} over {profile['ncycles']} cycles "
+           f"({profile['sampled_cycles']} sampled)",
+           "",
+           f"{'time(ms)':>10} {'%':>6} {'calls/cycle':>11}  block" ]
+
+  for x in profile["blocks"][:topn]:
+    strs.append( f"{x['time_ns']/1e6:>10.3f} {x['time_ns']*100/total:>6.2f} "
+                 f"{x['calls']/ncycles:>11.2f}  {x['path']}.{x['name']} ({x['host']})" )
+
+  strs.extend([ "", f"{'time(ms)':>10} {'%':>6}  host component class" ])
+  for cls, time_ns in list( profile["classes"].items() )[:topn]:
+    strs.append( f"{time_ns/1e6:>10.3f} {time_ns*100/total:>6.2f}  {cls}" )
+
+  return "\n".join( strs )
+
+def dump_profile( top, json_file=None, collapsed_file=None ):
+  profile = get_profile( top )
+
+  if json_file:
+    with open( json_file, "w" ) as f:
+      json.dump( profile, f, indent=2 )
+
+  # One line per block: semicolon-separated frames followed by the time
+  # in nanoseconds. Identical stacks are merged by flamegraph.pl.
+  if collapsed_file:
+    with open( collapsed_file, "w" ) as f:
+      for x in profile["blocks"]:
+        if x["time_ns"]:
+          f.write( f"{';'.join( x['stack'] + [ x['name'] ] )} {x['time_ns']}\n" )
+
+  return profile
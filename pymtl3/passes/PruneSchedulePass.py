@@ -0,0 +1,149 @@
+"""
+========================================================================
+PruneSchedulePass.py
+========================================================================
+Remove update blocks that do not need to execute every cycle from the
+schedule generated by some previous pass.
+
+- Constant nets: GenDAGPass generates a net block for every net, even if
+  the writer is a constant. These blocks always write the same values,
+  so we execute them once when the simulation is locked in instead.
+
+- Dead blocks: a combinational block whose writes never reach an output
+  port of the top component, an update_ff block, or a block with side
+  effects cannot change anything observable. We compute liveness
+  backwards from those roots over top level signals and drop every block
+  that is not live.
+
+Note that signals written by dead blocks are no longer updated, so a
+line_trace that shows internal signals may show stale values. Signals
+that have to stay up to date can be passed as `keep`. Dead block
+elimination is skipped for designs with method ports because methods
+can read any signal of their host component.
+"""
+from collections import deque
+
+from pymtl3.dsl import OutPort
+
+from .BasePass import BasePass
+from .errors import PassOrderError
+from .SimpleSchedulePass import is_pure_upblk, root_signal
+
+
+class PruneSchedulePass( BasePass ):
+
+  def __init__( self, keep=None, verbose=False ):
+    self.keep    = keep or []
+    self.verbose = verbose
+
+  def __call__( self, top ):
+    if not hasattr( top, "_sched" ) or not hasattr( top._sched, "schedule" ):
+      raise PassOrderError( "schedule" )
+
+    const_blks = self.fold_const_nets( top )
+    dead_blks  = self.find_dead_blocks( top ) - const_blks
+
+    removed = const_blks | dead_blks
+    top._sched.schedule = [ x for x in top._sched.schedule if x not in removed ]
+
+    top._sched.const_blocks = const_blks
+    top._sched.dead_blocks  = dead_blks
+
+    if self.verbose:
+      print( f"PruneSchedulePass: removed {len(const_blks)} constant net blocks "
+             f"and {len(dead_blks)} dead blocks from the schedule of {top}" )
+
+  #-----------------------------------------------------------------------
+  # fold_const_nets
+  #-----------------------------------------------------------------------
+  # Net blocks of constant nets are the only generated blocks that do not
+  # read a signal. They write plain Bits values so they can only execute
+  # after lock_in_simulation swaps the signals with actual data.
+
+  def fold_const_nets( self, top ):
+    scheduled  = set( top._sched.schedule )
+    const_blks = { x for x in top._dag.genblks
+                   if x not in top._dag.genblk_reads and x in scheduled }
+    if const_blks:
+      blks = sorted( const_blks, key=lambda x: x.__name__ )
+
+      def init_const_nets():
+        for blk in blks:
+          blk()
+
+      if not hasattr( top._dsl, "lock_in_funcs" ):
+        top._dsl.lock_in_funcs = []
+      top._dsl.lock_in_funcs.append( init_const_nets )
+
+    return const_blks
+
+  #-----------------------------------------------------------------------
+  # find_dead_blocks
+  #-----------------------------------------------------------------------
+
+  def find_dead_blocks( self, top ):
+    if top._dsl.all_method_ports:
+      return set()
+
+    upblk_reads, upblk_writes, upblk_calls = top.get_all_upblk_metadata()
+    genblk_reads, genblk_writes = top._dag.genblk_reads, top._dag.genblk_writes
+    all_upblks = top.get_all_update_blocks()
+    update_ff  = top.get_all_update_ff()
+
+    candidates = []
+    live_blks  = set()
+    live_sigs  = { x for x in top._dsl.all_signals
+                   if isinstance( x, OutPort ) and x.get_host_component() is top }
+    live_sigs.update( self.keep )
+    live_sigs  = { root_signal( x ) for x in live_sigs }
+
+    blk_reads  = {}
+    writers_of = {}
+
+    def add_reads( blk, reads ):
+      blk_reads[ blk ] = { root_signal( x ) for x in reads }
+
+    for blk in top._sched.schedule:
+      if blk in genblk_writes:
+        add_reads( blk, genblk_reads.get( blk, [] ) )
+        writes = genblk_writes[ blk ]
+      elif blk in all_upblks:
+        add_reads( blk, upblk_reads[ blk ] )
+        writes = [] if blk in update_ff else upblk_writes[ blk ]
+        hostobj = top.get_update_block_host_component( blk )
+        if blk in update_ff or not writes or upblk_calls[ blk ] or \
+           not is_pure_upblk( hostobj, blk.__name__ ):
+          live_blks.add( blk )
+          continue
+      else: # e.g. the double buffer function
+        continue
+
+      candidates.append( blk )
+      for x in writes:
+        writers_of.setdefault( root_signal( x ), [] ).append( blk )
+
+    # Propagate liveness backwards from the roots
+
+    visited = set()
+    Q = deque()
+
+    def visit( blk ):
+      if blk not in visited:
+        visited.add( blk )
+        Q.append( blk )
+
+    for blk in live_blks:
+      visit( blk )
+    for x in live_sigs:
+      for blk in writers_of.get( x, () ):
+        visit( blk )
+
+    while Q:
+      blk = Q.popleft()
+      for x in blk_reads.get( blk, () ):
+        if x not in live_sigs:
+          live_sigs.add( x )
+          for y in writers_of.get( x, () ):
+            visit( y )
+
+    return { x for x in candidates if x not in visited }
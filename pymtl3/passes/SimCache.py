@@ -0,0 +1,304 @@
+"""
+========================================================================
+SimCache.py
+========================================================================
+An on-disk cache of "compiled" simulators. For large designs,
+elaborating, generating the DAG and scheduling can take much longer than
+a short simulation, so we save what these steps produce for a model
+that went through SimpleSim and rebuild the simulator in a later
+process from a freshly constructed model:
+
+- the generated net blocks, as source grouped by host component
+- the signals that need double buffering
+- the schedule, as (host component, block name) pairs that are rebound
+  to the update blocks of the new model
+- the method nets
+- the values of the signals when the model was saved
+
+Loading only constructs the model; nothing is analyzed again. The cache
+is enabled by setting PYMTL_SIM_CACHE (or calling set_cache_dir) to a
+directory.
+
+  top = get_cached_sim( MyDesign, 32, nports=4 )
+  top.sim_reset()
+
+An entry is keyed by the class, the construct arguments and the source
+file of the class. It also records the content hashes of the source
+files of all classes used in the design and is ignored if any of them
+changes. Models customized with set_parameter are not supported.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from collections import defaultdict
+from linecache import cache as line_cache
+
+from pymtl3.dsl import Component, Signal
+from pymtl3.dsl.AstCache import _file_hash
+
+from .BasePass import PassMetadata
+from .CLLineTracePass import CLLineTracePass
+from .errors import SimCacheError
+from .GenDAGPass import GenDAGPass
+from .LineTraceParamPass import LineTraceParamPass
+from .SimpleSchedulePass import make_double_buffer_func
+from .SimpleTickPass import SimpleTickPass
+from .WrapGreenletPass import wrap_greenlet
+
+_CACHE_VERSION = 1
+
+_cache_dir = os.environ.get( "PYMTL_SIM_CACHE" ) or None
+
+def set_cache_dir( path ):
+  global _cache_dir
+  _cache_dir = path
+
+def get_cache_dir():
+  return _cache_dir
+
+#-------------------------------------------------------------------------
+# Keys
+#-------------------------------------------------------------------------
+
+def _class_file( cls ):
+  try:
+    return os.path.abspath( sys.modules[ cls.__module__ ].__file__ )
+  except (KeyError, AttributeError, TypeError):
+    return None
+
+def sim_key( cls, *args, **kwargs ):
+  path = _class_file( cls )
+  if path is None:
+    return None
+
+  key = "|".join( str(x) for x in [
+    _CACHE_VERSION, sys.version_info[:2], cls.__module__, cls.__qualname__,
+    path, _file_hash( path ), repr(args), repr(sorted( kwargs.items() )) ] )
+  return hashlib.sha1( key.encode() ).hexdigest()
+
+def _design_files( top ):
+  # The code generators are part of the design as well
+  files = { __file__, sys.modules[ make_double_buffer_func.__module__ ].__file__,
+            sys.modules[ GenDAGPass.__module__ ].__file__ }
+
+  for cls in { type(x) for x in top._dsl.registry.host }:
+    for c in cls.__mro__:
+      path = _class_file( c )
+      if path is not None:
+        files.add( path )
+
+  return { os.path.abspath( x ): _file_hash( x ) for x in files }
+
+#-------------------------------------------------------------------------
+# save
+#-------------------------------------------------------------------------
+
+def save( top ):
+  """ Save the simulator of top, which went through SimpleSim, to the
+  cache. Return the key, or None if the cache is disabled. """
+  if _cache_dir is None:
+    return None
+
+  if not getattr( top._dsl, "locked_simulation", False ) or \
+     not hasattr( top._dsl, "swapped_signals" ):
+    raise SimCacheError( top, "the model is not locked in simulation or "
+                              "its elaboration metadata is released" )
+  if not hasattr( top, "_dag" ) or not hasattr( top, "_sched" ):
+    raise SimCacheError( top, "please apply SimpleSim first" )
+
+  for c in top._dsl.all_components:
+    if c._dsl.param_tree is not None:
+      raise SimCacheError( top, f"{c!r} is customized with set_parameter" )
+
+  key = sim_key( top.__class__, *top._dsl.args, **top._dsl.kwargs )
+  if key is None:
+    return None
+
+  dag = top._dag
+
+  genblks = defaultdict(list)
+  for blk, host in dag.genblk_hostobj.items():
+    genblks[ repr(host) ].append( dag.genblk_src[ blk ] )
+
+  # The first block of the schedule is the double buffer function
+
+  schedule = []
+  for blk in top._sched.schedule[1:]:
+    is_greenlet = False
+    if getattr( blk, "__wrapped__", None ) in dag.greenlet_upblks:
+      blk = blk.__wrapped__
+      is_greenlet = True
+
+    if blk in dag.genblk_hostobj:
+      schedule.append( ("genblk", repr(dag.genblk_hostobj[ blk ]), blk.__name__, is_greenlet) )
+    elif blk in top._dsl.all_upblks:
+      host = top.get_update_block_host_component( blk )
+      schedule.append( ("upblk", repr(host), blk.__name__, is_greenlet) )
+    else:
+      raise SimCacheError( top, f"unknown function {blk.__name__} in the schedule" )
+
+  double_buffer = sorted( repr(x) for x in top._dsl.all_signals
+                          if x._dsl.needs_double_buffer )
+
+  method_nets = [ ( None if writer is None else repr(writer), [ repr(x) for x in net ] )
+                  for writer, net in top.get_all_method_nets() ]
+
+  values = []
+  for records in top._dsl.swapped_signals.values():
+    for current_obj, i, obj, is_list in records:
+      if obj is not None:
+        values.append( (repr(obj), current_obj[i] if is_list else getattr( current_obj, i )) )
+
+  # All values are pickled together to keep the aliasing between them
+  try:
+    values = pickle.dumps( values, protocol=pickle.HIGHEST_PROTOCOL )
+  except Exception:
+    values = None
+
+  _store( key, {
+    "version"       : _CACHE_VERSION,
+    "files"         : _design_files( top ),
+    "genblks"       : dict( genblks ),
+    "schedule"      : schedule,
+    "double_buffer" : double_buffer,
+    "method_nets"   : method_nets,
+    "values"        : values,
+  } )
+  return key
+
+#-------------------------------------------------------------------------
+# load
+#-------------------------------------------------------------------------
+
+def load( cls, *args, **kwargs ):
+  """ Return a simulator of cls( *args, **kwargs ) rebuilt from the
+  cache, or None if there is no valid entry. """
+  if _cache_dir is None:
+    return None
+
+  key = sim_key( cls, *args, **kwargs )
+  data = _load( key )
+  if data is None or data.get( "version" ) != _CACHE_VERSION:
+    return None
+
+  for path, file_hash in data[ "files" ].items():
+    if _file_hash( path ) != file_hash:
+      return None
+
+  try:
+    return _rebuild( cls( *args, **kwargs ), data )
+  except Exception: # something the entry refers to is gone
+    return None
+
+def get_cached_sim( cls, *args, **kwargs ):
+  """ Load the simulator of cls( *args, **kwargs ) from the cache, or
+  build it with SimpleSim and save it. """
+  top = load( cls, *args, **kwargs )
+  if top is None:
+    from .PassGroups import SimpleSim
+    top = cls( *args, **kwargs )
+    top.apply( SimpleSim )
+    save( top )
+  return top
+
+def _rebuild( top, data ):
+  top._elaborate_construct()
+
+  registry = top._dsl.registry
+  top._dsl.all_components = registry.get_by_type( Component )
+  top._dsl.all_signals    = registry.get_by_type( Signal )
+
+  namespace = { "s": top }
+  def lookup( path ):
+    return eval( path, namespace )
+
+  # Method nets: point all members to the actual method
+
+  method_nets = []
+  for writer, net in data[ "method_nets" ]:
+    writer = None if writer is None else lookup( writer )
+    net    = [ lookup( x ) for x in net ]
+    if writer is not None:
+      for member in net:
+        if member is not writer:
+          member.method = writer.method
+    method_nets.append( (writer, net) )
+
+  top._dsl.all_method_nets = method_nets
+  top._dsl._has_pending_method_connections = False
+
+  # Compile the net blocks of each host object in one go
+
+  genblks = {}
+  for host_repr, srcs in data[ "genblks" ].items():
+    src = """
+from pymtl3.datatypes import *
+def compile_upblks( s ):
+  {}
+  return locals()
+""".format( "".join( srcs ) )
+
+    fname = f"Generated net at {host_repr}"
+    l = {}
+    exec( compile( src, filename=fname, mode="exec" ), l )
+    line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
+
+    for name, blk in l[ "compile_upblks" ]( lookup( host_repr ) ).items():
+      if name != 's':
+        genblks[ (host_repr, name) ] = blk
+
+  schedule = [ make_double_buffer_func( top, signals=[ lookup( x ) for x in data[ "double_buffer" ] ] ) ]
+  for kind, host_repr, name, is_greenlet in data[ "schedule" ]:
+    if kind == "genblk":
+      blk = genblks[ (host_repr, name) ]
+    else:
+      blk = lookup( host_repr ).get_update_block( name )
+    if is_greenlet:
+      blk = wrap_greenlet( blk )
+    schedule.append( blk )
+
+  top._sched = PassMetadata()
+  top._sched.schedule = schedule
+
+  # The rest of SimpleSim
+
+  CLLineTracePass()( top )
+  SimpleTickPass()( top )
+  LineTraceParamPass()( top )
+  top.lock_in_simulation()
+
+  if data[ "values" ] is not None:
+    namespace[ "_value" ] = None
+    for path, value in pickle.loads( data[ "values" ] ):
+      namespace[ "_value" ] = value
+      exec( f"{path} = _value", namespace )
+
+  return top
+
+#-------------------------------------------------------------------------
+# Files
+#-------------------------------------------------------------------------
+# A corrupted or incompatible entry is treated as a miss. Entries are
+# written to a temporary file first and then renamed.
+
+def _load( key ):
+  if key is None:
+    return None
+  try:
+    with open( os.path.join( _cache_dir, key ), "rb" ) as f:
+      return pickle.load( f )
+  except Exception:
+    return None
+
+def _store( key, obj ):
+  os.makedirs( _cache_dir, exist_ok=True )
+  fd, tmp = tempfile.mkstemp( dir=_cache_dir, prefix=".tmp" )
+  try:
+    with os.fdopen( fd, "wb" ) as f:
+      pickle.dump( obj, f, protocol=pickle.HIGHEST_PROTOCOL )
+    os.replace( tmp, os.path.join( _cache_dir, key ) )
+  except Exception:
+    os.remove( tmp )
+    raise
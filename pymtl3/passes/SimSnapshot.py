@@ -0,0 +1,132 @@
+"""
+========================================================================
+SimSnapshot.py
+========================================================================
+Run many independent simulations of one elaborated, scheduled and
+locked model without paying for construct/elaborate/passes again.
+
+Every run forks the process that holds the model, so the forked process
+starts from a copy-on-write copy of the whole simulator, including the
+generated update blocks and greenlets. The model is reset with
+sim_reset, the given function is called with the model, and the pickled
+return value is sent back through a pipe.
+
+  top.apply( SimpleSim )
+  snap = SimSnapshot( top )
+  results = snap.map( run_test, test_vectors, nprocs=8 )
+
+Note that the runs start from the state of the model in this process,
+so the model should not be ticked here after taking the snapshot. The
+function may be a closure because nothing but the result is pickled.
+"""
+import os
+import pickle
+import traceback
+
+from .errors import ForkedSimulationError, PassOrderError
+
+
+class SimSnapshot:
+
+  def __init__( s, top, reset=True ):
+    if not getattr( top._dsl, "locked_simulation", False ):
+      raise PassOrderError( "_dsl.locked_simulation" )
+    if not hasattr( os, "fork" ):
+      raise NotImplementedError( "SimSnapshot requires os.fork" )
+
+    s.top   = top
+    s.reset = reset
+
+  #-----------------------------------------------------------------------
+  # Public APIs
+  #-----------------------------------------------------------------------
+
+  def run( s, func, *args ):
+    """ Run func( top, *args ) on a fresh copy of the model. """
+    return s._collect( *s._start( func, args ) )
+
+  def map( s, func, items, nprocs=None ):
+    """ Run func( top, item ) on a fresh copy of the model for every item
+    with at most nprocs copies at a time. Return the results in order. """
+    if nprocs is None:
+      nprocs = os.cpu_count() or 1
+    assert nprocs >= 1
+
+    results = []
+    running = []
+    try:
+      for item in items:
+        if len(running) == nprocs:
+          results.append( s._collect( *running.pop(0) ) )
+        running.append( s._start( func, (item,) ) )
+
+      while running:
+        results.append( s._collect( *running.pop(0) ) )
+
+    finally:
+      # Don't leave zombies behind if a run failed
+      for pid, rfd in running:
+        os.close( rfd )
+        os.waitpid( pid, 0 )
+
+    return results
+
+  #-----------------------------------------------------------------------
+  # Forked process
+  #-----------------------------------------------------------------------
+
+  def _start( s, func, args ):
+    rfd, wfd = os.pipe()
+    pid = os.fork()
+
+    if pid:
+      os.close( wfd )
+      return pid, rfd
+
+    # We are in the forked process. Never return from here: os._exit
+    # skips the atexit handlers and finalizers of the parent.
+    status = 1
+    try:
+      os.close( rfd )
+      try:
+        if s.reset:
+          s.top.sim_reset()
+        ret = ( True, func( s.top, *args ) )
+      except BaseException as e:
+        # Only send the exception itself if it survives pickling
+        exc = e
+        try:
+          pickle.loads( pickle.dumps( e ) )
+        except Exception:
+          exc = None
+        ret = ( False, ( exc, traceback.format_exc() ) )
+
+      try:
+        data = pickle.dumps( ret, protocol=pickle.HIGHEST_PROTOCOL )
+      except Exception: # the return value cannot be pickled
+        data = pickle.dumps( ( False, ( None, traceback.format_exc() ) ),
+                             protocol=pickle.HIGHEST_PROTOCOL )
+
+      with os.fdopen( wfd, "wb" ) as f:
+        f.write( data )
+      status = 0
+    finally:
+      os._exit( status )
+
+  def _collect( s, pid, rfd ):
+    with os.fdopen( rfd, "rb" ) as f:
+      data = f.read()
+    _, status = os.waitpid( pid, 0 )
+
+    if not data:
+      raise ForkedSimulationError( f"Forked simulation {pid} died with status {status}" )
+
+    ok, ret = pickle.loads( data )
+    if ok:
+      return ret
+
+    exc, tb = ret
+    error = ForkedSimulationError( f"Forked simulation {pid} failed:\n{tb}" )
+    if exc is None:
+      raise error
+    raise exc from error
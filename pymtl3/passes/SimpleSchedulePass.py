@@ -11,13 +11,19 @@ Date   : Dec 26, 2018
 
 from collections import defaultdict
 
+from pymtl3.datatypes import bits_import
+from pymtl3.dsl import Signal
 from pymtl3.dsl.errors import UpblkCyclicError
 
 from .BasePass import BasePass, PassMetadata
 from .errors import PassOrderError
 
 
-def make_double_buffer_func( s ):
+def make_double_buffer_func( s, signals=None ):
+
+  # By default flip all signals that need double buffering
+  if signals is None:
+    signals = [ x for x in s._dsl.all_signals if x._dsl.needs_double_buffer ]
 
   # To reduce the time to compile the code and the amount of bytecode, I
   # use a heuristic to group signals that belong to
@@ -29,10 +35,9 @@ def make_double_buffer_func( s ):
   #   x.zz._flip()
 
   hostobj_signals = defaultdict(list)
-  for x in reversed(sorted( s._dsl.all_signals, \
+  for x in reversed(sorted( signals, \
       key=lambda x: x.get_host_component().get_component_level() )):
-    if x._dsl.needs_double_buffer:
-      hostobj_signals[ x.get_host_component() ].append( x )
+    hostobj_signals[ x.get_host_component() ].append( x )
 
   done = False
   while not done:
@@ -64,13 +69,18 @@ def make_double_buffer_func( s ):
       for z in sorted(y, key=repr):
         strs.append(f"x.{repr(z)[pos:]}._flip()")
 
+  # Stop recording <<= into the dirty list of another simulator that uses
+  # dirty-set double buffering since we flip everything anyways.
+  if bits_import._set_dirty_list is not None:
+    strs.insert( 0, "_set_dirty_list( None )" )
+
   if not strs:
     def no_double_buffer():
       pass
     return no_double_buffer
 
   src = """
-  def compile_double_buffer( s ):
+  def compile_double_buffer( s, _set_dirty_list ):
     def double_buffer():
       {}
     return double_buffer
@@ -80,18 +90,61 @@ def make_double_buffer_func( s ):
   # print(src)
   l = locals()
   exec(py.code.Source( src ).compile(), l)
-  return l['compile_double_buffer']( s )
+  return l['compile_double_buffer']( s, bits_import._set_dirty_list )
+
+# Instead of flipping every signal that needs double buffering, we only
+# flip the objects that are recorded by <<= in the last cycle. The flip
+# function installs the list of this simulator for the rest of the tick
+# and the restore function, which goes at the end of the schedule, puts
+# back the previous list. This way only the update_ff blocks of this
+# simulator record into it, not <<= in the test bench, lock_in_simulation
+# or other simulators. This pays off for designs with many registers of
+# which only a few are written every cycle. Return the two functions, or
+# None as the restore function if we cannot record <<=.
+
+def make_dirty_double_buffer_funcs( s ):
+
+  set_dirty_list = bits_import._set_dirty_list
+  if set_dirty_list is None:
+    return make_double_buffer_func( s ), None
+
+  if not any( x._dsl.needs_double_buffer for x in s._dsl.all_signals ):
+    def no_double_buffer():
+      pass
+    return no_double_buffer, None
+
+  dirty = []
+  prev  = [ None ]
+
+  def dirty_double_buffer():
+    for x in dirty:
+      x._flip()
+    dirty.clear()
+    prev[0] = set_dirty_list( dirty )
+
+  def restore_dirty_list():
+    set_dirty_list( prev[0] )
+    prev[0] = None
+
+  return dirty_double_buffer, restore_dirty_list
 
 class SimpleSchedulePass( BasePass ):
+  def __init__( self, dirty_double_buffer=False ):
+    self.dirty_double_buffer = dirty_double_buffer
+
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
       raise PassOrderError( "all_constraints" )
 
+    # Patch the order of the last run, e.g. after replace_component,
+    # instead of sorting from scratch
+    prev = getattr( top, "_sched", None )
+
     top._sched = PassMetadata()
 
-    top._sched.schedule = self.schedule( top )
+    top._sched.schedule = self.schedule( top, prev )
 
-  def schedule( self, top ):
+  def schedule( self, top, prev=None ):
 
     # Construct the graph
 
@@ -104,37 +157,173 @@ class SimpleSchedulePass( BasePass ):
     if 'MAMBA_DAG' in os.environ:
       dump_dag( top, V, E )
 
-    for (u, v) in E: # u -> v
-      InD[v] += 1
-      Es [u].append( v )
+    update_schedule = None
+    if getattr( prev, "update_schedule", None ) is not None:
+      update_schedule = patch_schedule( prev.update_schedule, V, E )
+
+    if update_schedule is None:
+      for (u, v) in E: # u -> v
+        InD[v] += 1
+        Es [u].append( v )
 
-    # Perform topological sort for a serial schedule.
+      # Perform topological sort for a serial schedule.
 
-    update_schedule = []
+      update_schedule = []
 
-    Q = [ v for v in V if not InD[v] ]
+      Q = [ v for v in V if not InD[v] ]
 
-    import random
-    while Q:
-      random.shuffle(Q)
-      u = Q.pop()
-      update_schedule.append( u )
-      for v in Es[u]:
-        InD[v] -= 1
-        if not InD[v]:
-          Q.append( v )
+      import random
+      while Q:
+        random.shuffle(Q)
+        u = Q.pop()
+        update_schedule.append( u )
+        for v in Es[u]:
+          InD[v] -= 1
+          if not InD[v]:
+            Q.append( v )
 
-    check_schedule( top, update_schedule, V, E, InD )
+      check_schedule( top, update_schedule, V, E, InD )
+
+    top._sched.update_schedule = update_schedule
 
     # From now on, we put the schedule in the order of
     # [ flip, normal upblks, update_ffs ]
 
-    schedule = [ make_double_buffer_func( top ) ]
+    restore = None
+    if self.dirty_double_buffer:
+      flip, restore = make_dirty_double_buffer_funcs( top )
+    else:
+      flip = make_double_buffer_func( top )
+
+    schedule = [ flip ]
     schedule.extend( update_schedule )
     schedule.extend( top._dsl.all_update_ff )
+    if restore is not None:
+      schedule.append( restore )
 
     return schedule
 
+# A block is pure if it only reads signals and calls other pure functions
+# of its host component, so executing it again with the same inputs gives
+# the same outputs. Accessing s.x.y where s.x is not a signal might reach
+# a Python object with state, so we conservatively treat it as impure.
+# EventDrivenSchedulePass and PruneSchedulePass use this to decide which
+# blocks can be skipped.
+
+def root_signal( obj ):
+  parent = obj.get_parent_object()
+  while parent.is_signal():
+    obj, parent = parent, parent.get_parent_object()
+  return obj
+
+def is_pure_upblk( hostobj, name, visited=None ):
+  if visited is None:
+    visited = set()
+  cls = hostobj.__class__
+  visited.add( name )
+
+  for obj_name, _ in cls._name_rd[ name ]:
+    if obj_name[0][0] == "s" and not _resolves_to_signal( hostobj, obj_name ):
+      return False
+
+  for obj_name, _ in cls._name_fc[ name ]:
+    field = obj_name[0][0]
+    # s.x.y() is either a method call or a call to a Python object
+    if field == "s":
+      return False
+    if field in hostobj._dsl.name_func and field not in visited:
+      if not is_pure_upblk( hostobj, field, visited ):
+        return False
+  return True
+
+def _resolves_to_signal( hostobj, obj_name ):
+  obj = hostobj
+  for field, indices in obj_name[1:]:
+    if isinstance( obj, Signal ):
+      return True # accessing the field of a struct signal
+    obj = getattr( obj, field, None )
+    for _ in indices:
+      if not isinstance( obj, list ):
+        break
+      obj = obj[0] if obj else None
+    if obj is None:
+      return False
+  return isinstance( obj, Signal )
+
+# Patch a topological order of a previous version of the DAG for the new
+# vertices V and edges E. Vertices that are gone are dropped, new ones
+# are appended, and for every edge that goes backwards in the order we
+# only reorder the vertices between its two ends (Pearce and Kelly,
+# "A Dynamic Topological Sort Algorithm for Directed Acyclic Graphs").
+# Return None if the new edges form a cycle so that the caller can fall
+# back to a full sort that reports it.
+
+def patch_schedule( order, V, E ):
+  order = [ v for v in order if v in V ]
+  kept  = set( order )
+  order.extend( v for v in V if v not in kept )
+
+  pos  = { v: i for i, v in enumerate( order ) }
+  succ = { v: [] for v in V }
+  pred = { v: [] for v in V }
+
+  # Start from the edges that the order already satisfies and insert the
+  # violating ones one by one.
+  violated = []
+  for (u, v) in E:
+    if pos[u] < pos[v]:
+      succ[u].append( v )
+      pred[v].append( u )
+    else:
+      violated.append( (u, v) )
+
+  for (u, v) in violated:
+    succ[u].append( v )
+    pred[v].append( u )
+
+    lb, ub = pos[v], pos[u]
+    if lb > ub:
+      continue
+    if lb == ub: # self loop
+      return None
+
+    # Vertices reachable from v that are before u
+    fwd  = [ v ]
+    seen = { v }
+    stack = [ v ]
+    while stack:
+      x = stack.pop()
+      for y in succ[x]:
+        if y is u:
+          return None
+        if y not in seen and pos[y] < ub:
+          seen.add( y )
+          fwd.append( y )
+          stack.append( y )
+
+    # Vertices reaching u that are after v
+    bwd  = [ u ]
+    seen = { u }
+    stack = [ u ]
+    while stack:
+      x = stack.pop()
+      for y in pred[x]:
+        if y not in seen and pos[y] > lb:
+          seen.add( y )
+          bwd.append( y )
+          stack.append( y )
+
+    # Put everything that reaches u before everything v reaches, using
+    # the same positions and keeping the relative order within each side
+    fwd.sort( key=pos.__getitem__ )
+    bwd.sort( key=pos.__getitem__ )
+    slots = sorted( pos[x] for x in fwd + bwd )
+    for x, i in zip( bwd + fwd, slots ):
+      pos[x] = i
+      order[i] = x
+
+  return order
+
 def dump_dag( top, V, E ):
   from graphviz import Digraph
   from pymtl3.dsl import CalleePort
@@ -7,7 +7,6 @@ Generate a simple tick function (no Mamba techniques here)
 Author : Shunning Jiang
 Date   : Dec 26, 2018
 """
-from graphviz import Digraph
 
 from pymtl3.dsl.errors import UpblkCyclicError
 from pymtl3.passes.BasePass import BasePass
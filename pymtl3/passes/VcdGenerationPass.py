@@ -11,8 +11,6 @@ import time
 from collections import defaultdict
 from copy import deepcopy
 
-import py
-
 from pymtl3.dsl import Const
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 
@@ -217,7 +215,7 @@ class VcdGenerationPass( BasePass ):
       except AttributeError as e:
         raise AttributeError( '{{}}\\n - {1} becomes another type. Please check your code.'.format(e) )
       print( 'b{{}} {2}'.format( value_str ), file=vcdmeta.vcd_file )
-      vcdmeta.last_{0} = deepcopy({1})"""
+      vcdmeta.last_{0} = {3}"""
 
     # TODO type check
 
@@ -231,7 +229,9 @@ class VcdGenerationPass( BasePass ):
     for i, net in enumerate( trimmed_value_nets ):
       if i != vcdmeta.clock_net_idx:
         symbol = net_symbol_mapping[i]
-        vcd_srcs.append( dump_vcd_per_signal.format( i, net[0], symbol ) )
+        # Bits.clone is much cheaper than deepcopy
+        copy = f"{net[0]}.clone()" if hasattr( net[0]._dsl.Type, "clone" ) else f"deepcopy({net[0]})"
+        vcd_srcs.append( dump_vcd_per_signal.format( i, net[0], symbol, copy ) )
 
     deepcopy # I have to do this to circumvent the tools
 
@@ -8,8 +8,6 @@ greenlet.
 Author : Shunning Jiang
 Date   : May 20, 2019
 """
-from graphviz import Digraph
-from greenlet import greenlet
 
 from pymtl3.dsl.errors import UpblkCyclicError
 
@@ -17,6 +15,25 @@ from .BasePass import BasePass
 from .errors import PassOrderError
 
 
+def wrap_greenlet( blk ):
+  from greenlet import greenlet
+
+  def greenlet_wrapper():
+    while True:
+      blk()
+      greenlet.getcurrent().parent.switch()
+
+  gl = greenlet( greenlet_wrapper )
+
+  def greenlet_ticker():
+    gl.switch()
+
+  # greenlet_ticker.greenlet = gl
+  greenlet_ticker.__name__ = blk.__name__
+  greenlet_ticker.__wrapped__ = blk
+
+  return greenlet_ticker
+
 class WrapGreenletPass( BasePass ):
   def __call__( self, top ):
     if not hasattr( top, "_dag" ):
@@ -33,23 +50,6 @@ class WrapGreenletPass( BasePass ):
     if not greenlet_upblks:
       return
 
-    def wrap_greenlet( blk ):
-
-      def greenlet_wrapper():
-        while True:
-          blk()
-          greenlet.getcurrent().parent.switch()
-
-      gl = greenlet( greenlet_wrapper )
-
-      def greenlet_ticker():
-        gl.switch()
-
-      # greenlet_ticker.greenlet = gl
-      greenlet_ticker.__name__ = blk.__name__
-
-      return greenlet_ticker
-
     new_upblks  = set()
     wrapped_blk_mapping = {}
 
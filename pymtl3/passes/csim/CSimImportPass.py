@@ -0,0 +1,554 @@
+"""
+========================================================================
+CSimImportPass.py
+========================================================================
+Compile RTL components into native C without going through Verilog and
+import them back as normal PyMTL components.
+
+A component is imported if it has a truthy `csim_import` attribute. We
+elaborate a fresh copy of it and lower its behavioral RTLIR together with
+its resolved nets to C. The machinery is shared with IntegerTickPass:
+every top level Bits signal gets a slot, whole-signal nets are collapsed
+into the same slot, and update blocks are translated by a subclass of
+the integer visitor that spells the same expressions in C. The result is
+one struct of uint64 words that holds the entire state of the design,
+plus three functions:
+
+- init: set up constant nets
+- eval: copy the input ports in, run all combinational blocks, and copy
+  the output ports out
+- tick: run all update_ff blocks and commit the next state
+
+The C code is compiled with the system C compiler (or $CC) into a shared
+library named after the hash of the code, so identical designs are only
+compiled once. The library is opened with cffi and wrapped into a
+component with the same ports and interfaces, one update block that
+calls eval, and one update_ff block that calls tick. Like the sverilog
+import, the value ports of interfaces (and of arrays of them) are
+flattened into fields of the struct, and the wrapper declares the same
+interfaces by calling their classes with the original arguments. Just like ImportPass.do_import, the
+wrapper replaces the original component with replace_component_with_obj,
+or is returned if the top component itself is imported.
+
+Only Bits signals and expressions of at most 64 bits are supported, and
+interfaces cannot have method ports. Division by zero evaluates to zero
+instead of raising an exception.
+"""
+import hashlib
+import heapq
+import os
+import re
+import subprocess
+from linecache import cache as line_cache
+
+from cffi import FFI
+
+from pymtl3.datatypes import mk_bits
+from pymtl3.dsl import Component, InPort, Interface, OutPort
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import ModelTypeError, TranslationError
+from pymtl3.passes.GenDAGPass import GenDAGPass
+from pymtl3.passes.mamba.IntegerTickPass import (
+    BehavioralRTLIRToIntPyVisitor,
+    IntegerTickPass,
+    _nbits,
+)
+from pymtl3.passes.rtlir import BehavioralRTLIR as bir
+from pymtl3.passes.rtlir import RTLIRType as rt
+from pymtl3.passes.SimpleSchedulePass import check_schedule
+
+from .errors import CSimImportError
+
+_c_helpers = """
+static inline uint64_t _csim_parity( uint64_t v ) {
+  v ^= v >> 32; v ^= v >> 16; v ^= v >> 8;
+  v ^= v >> 4;  v ^= v >> 2;  v ^= v >> 1;
+  return v & 1;
+}
+
+static inline uint64_t _csim_pow( uint64_t b, uint64_t e ) {
+  uint64_t r = 1;
+  while ( e ) {
+    if ( e & 1 ) r *= b;
+    b *= b;
+    e >>= 1;
+  }
+  return r;
+}
+
+static inline uint64_t _csim_div( uint64_t l, uint64_t r ) {
+  return r ? l / r : 0;
+}
+
+static inline uint64_t _csim_mod( uint64_t l, uint64_t r ) {
+  return r ? l % r : 0;
+}
+"""
+
+def _c_array( name, obj ):
+  dims, x = "", obj
+  while isinstance( x, tuple ):
+    dims += f"[{len(x)}]"
+    x = x[0]
+
+  def init( x ):
+    if isinstance( x, tuple ):
+      return "{ " + ", ".join( [ init( y ) for y in x ] ) + " }"
+    return f"{x}ULL"
+
+  return f"static const uint64_t {name}{dims} = {init( obj )};"
+
+class CSimImportPass( BasePass ):
+
+  def __call__( s, top ):
+    s.top = top
+    if not top._dsl.constructed:
+      raise CSimImportError( top,
+        f"please elaborate design {top} before applying the import pass!" )
+    ret = s.traverse_hierarchy( top )
+    if ret is None:
+      ret = top
+    return ret
+
+  def traverse_hierarchy( s, m ):
+    if getattr( m, "csim_import", False ):
+      return s.do_import( m )
+    else:
+      for child in m.get_child_components():
+        s.traverse_hierarchy( child )
+
+  def do_import( s, m ):
+    imp = s.get_imported_object( m )
+    if m is s.top:
+      return imp
+    else:
+      s.top.replace_component_with_obj( m, imp )
+
+  #-----------------------------------------------------------------------
+  # get_imported_object
+  #-----------------------------------------------------------------------
+
+  def get_imported_object( s, m ):
+    # The imported component has to be a standalone top for us to use
+    # the elaboration-top APIs, so we work on a fresh copy of it.
+    c = m.__class__( *m._dsl.args, **m._dsl.kwargs )
+    c.elaborate()
+    c.apply( GenDAGPass() )
+
+    if c._dsl.all_method_ports:
+      raise ModelTypeError( "RTL designs without method ports" )
+
+    c._int_sim = PassMetadata()
+    int_pass = IntegerTickPass()
+    int_pass.gen_rtlir( c )
+    int_pass.assign_slots( c )
+
+    if any( x > 64 for x in c._int_sim.nbits ):
+      raise ModelTypeError( "designs whose signals are at most 64 bits wide" )
+
+    ports = s.collect_ports( c )
+    src   = s.gen_c_src( c, int_pass, ports )
+
+    name = f"{m.__class__.__name__}_{hashlib.sha1( src.encode() ).hexdigest()[:16]}"
+    src  = src.replace( "CSIM_NAME", name )
+
+    lib_file = s.create_shared_lib( m, name, src )
+    imp      = s.create_wrapper( c, name, src, lib_file, ports )
+
+    imp._csim = PassMetadata()
+    imp._csim.c_src    = src
+    imp._csim.lib_file = lib_file
+    imp._csim.slot_of  = c._int_sim.slot_of
+    return imp
+
+  #-----------------------------------------------------------------------
+  # collect_ports
+  #-----------------------------------------------------------------------
+  # Return a list of (python name, C field name, port) triples, one for
+  # each port of c with arrays and interfaces flattened, e.g. s.enq.msg
+  # becomes p_enq__msg. clk is not needed because update_ff blocks are
+  # executed by tick.
+
+  def collect_ports( s, c ):
+    ports = []
+
+    def collect( obj, py_name, c_name ):
+      if isinstance( obj, list ):
+        for i, x in enumerate( obj ):
+          collect( x, f"{py_name}[{i}]", f"{c_name}__{i}" )
+      elif isinstance( obj, (InPort, OutPort) ):
+        if obj not in c._int_sim.slot_of:
+          raise ModelTypeError( "components whose ports are all Bits signals" )
+        ports.append( (py_name, c_name, obj) )
+      elif isinstance( obj, Interface ):
+        for name, x in obj.__dict__.items():
+          if not name.startswith( "_" ):
+            collect( x, f"{py_name}.{name}", f"{c_name}__{name}" )
+
+    for name, obj in c.__dict__.items():
+      if not name.startswith( "_" ) and name != "clk":
+        collect( obj, f"s.{name}", f"p_{name}" )
+    return ports
+
+  #-----------------------------------------------------------------------
+  # schedule_topo
+  #-----------------------------------------------------------------------
+  # The C code has to be reproducible for the compiled library to be
+  # reused, so ties are broken by block name and host component instead of
+  # randomly like SimpleSchedulePass does.
+
+  def schedule_topo( s, c ):
+
+    # Net blocks are named after their unique writers
+    def key( blk ):
+      if blk in c._dag.genblks:
+        return (blk.__name__, "")
+      return (blk.__name__, repr( c._dsl.all_upblk_hostobj[ blk ] ))
+
+    V   = c._dag.final_upblks - c.get_all_update_ff()
+    E   = c._dag.all_constraints
+    Es  = { v: [] for v in V }
+    InD = { v: 0  for v in V }
+
+    for (u, v) in E: # u -> v
+      InD[v] += 1
+      Es [u].append( v )
+
+    Q = [ (key(v), v) for v in V if not InD[v] ]
+    heapq.heapify( Q )
+
+    schedule = []
+    while Q:
+      _, u = heapq.heappop( Q )
+      schedule.append( u )
+      for v in Es[u]:
+        InD[v] -= 1
+        if not InD[v]:
+          heapq.heappush( Q, (key(v), v) )
+
+    check_schedule( c, schedule, V, E, InD )
+    return schedule, sorted( c.get_all_update_ff(), key=key )
+
+  #-----------------------------------------------------------------------
+  # gen_c_src
+  #-----------------------------------------------------------------------
+  # The name of the model is left as CSIM_NAME so that the hash of the
+  # code does not depend on it.
+
+  def gen_c_src( s, c, int_pass, ports ):
+    genblks      = c._dag.genblks
+    rtlir_upblks = c._int_sim.rtlir_upblks
+    slot_of      = c._int_sim.slot_of
+
+    consts  = {}
+    visitor = BehavioralRTLIRToCVisitor( slot_of, c._int_sim.nbits, consts )
+
+    def gen_blocks( blks ):
+      lines = []
+      for blk in blks:
+        if blk in genblks:
+          strs = int_pass.gen_net_copy( c, blk )
+          if strs:
+            lines.append( f"// {blk.__name__}" )
+            lines.extend( f"{x};" for x in strs )
+        elif blk in rtlir_upblks:
+          lines.append( f"// {blk.__name__} at {c._dsl.all_upblk_hostobj[ blk ]!r}" )
+          lines.extend( visitor.enter( blk, rtlir_upblks[ blk ] ) )
+        else:
+          raise TranslationError( blk, "is not an RTL update block!" )
+      return [ f"uint64_t {x};" for x in visitor.take_local_vars() ] + lines
+
+    comb_blks, seq_blks = s.schedule_topo( c )
+    comb_body = gen_blocks( comb_blks )
+    seq_body  = gen_blocks( seq_blks )
+
+    fields, copy_in, copy_out = [], [], []
+    for py_name, c_name, x in ports:
+      fields.append( f"uint64_t {c_name};" )
+      if isinstance( x, InPort ):
+        copy_in.append( f"_s[{slot_of[x]}] = _m->{c_name};" )
+      else:
+        copy_out.append( f"_m->{c_name} = _s[{slot_of[x]}];" )
+
+    nslots = max( len(c._int_sim.slots), 1 )
+    fields.append( f"uint64_t s[{nslots}];" )
+    fields.append( f"uint64_t n[{nslots}];" )
+
+    init = []
+    for k, v in enumerate( c._int_sim.slots ):
+      if v:
+        init.append( f"_m->s[{k}] = _m->n[{k}] = {v:#x}ULL;" )
+
+    flip = [ f"_s[{k}] = _n[{k}];" for k in sorted( visitor.ff_slots ) ]
+
+    def body( lines ):
+      return "\n".join( [ f"  {x}" for x in lines ] )
+
+    return f"""\
+// Generated from {c.__class__.__name__}
+
+#include <stdint.h>
+
+typedef struct {{
+{body( fields )}
+}} CSIM_NAME_t;
+{_c_helpers}
+{chr(10).join( _c_array( x, consts[x] ) for x in sorted( consts ) )}
+
+void CSIM_NAME_init( CSIM_NAME_t *_m ) {{
+{body( init )}
+}}
+
+void CSIM_NAME_eval( CSIM_NAME_t *_m ) {{
+  uint64_t *_s = _m->s;
+{body( copy_in + comb_body + copy_out )}
+}}
+
+void CSIM_NAME_tick( CSIM_NAME_t *_m ) {{
+  uint64_t *_s = _m->s, *_n = _m->n;
+{body( seq_body + flip )}
+}}
+"""
+
+  #-----------------------------------------------------------------------
+  # create_shared_lib
+  #-----------------------------------------------------------------------
+
+  def create_shared_lib( s, m, name, src ):
+    c_file   = os.path.abspath( f"{name}.c" )
+    lib_file = os.path.abspath( f"lib{name}.so" )
+
+    # The name includes the hash of the code
+    if os.path.exists( lib_file ):
+      return lib_file
+
+    with open( c_file, "w" ) as f:
+      f.write( src )
+
+    # Compile into a temporary file first so that a concurrent import
+    # never sees a partially written library.
+    tmp_file = f"{lib_file}.{os.getpid()}"
+    cmd = [ os.environ.get( "CC", "cc" ), "-O2", "-fPIC", "-shared", "-o", tmp_file, c_file ]
+    try:
+      subprocess.check_output( cmd, stderr = subprocess.STDOUT )
+    except subprocess.CalledProcessError as e:
+      raise CSimImportError( m, f"fail to compile {c_file}!\n\n"
+                                f"  C compiler command:\n  {' '.join(cmd)}\n\n"
+                                f"  C compiler output:\n{e.output.decode()}" )
+    except OSError as e:
+      raise CSimImportError( m, f"fail to run the C compiler {cmd[0]}: {e}" )
+
+    os.replace( tmp_file, lib_file )
+    return lib_file
+
+  #-----------------------------------------------------------------------
+  # create_wrapper
+  #-----------------------------------------------------------------------
+
+  def create_wrapper( s, c, name, src, lib_file, ports ):
+    ffi = FFI()
+    ffi.cdef( src[ src.index( "typedef struct" ) : src.index( "_t;" )+3 ] + f"""
+      void {name}_init( {name}_t * );
+      void {name}_eval( {name}_t * );
+      void {name}_tick( {name}_t * );
+    """ )
+    lib = ffi.dlopen( lib_file )
+
+    symbols = {}
+    def Bits_name( n ):
+      symbols[ f"_B{n}" ] = mk_bits( n )
+      return f"_B{n}"
+
+    # Interfaces are created with the same class and arguments as in the
+    # original component, which creates the same ports inside.
+    ifcs = []
+    def Ifc_call( ifc ):
+      k = len(ifcs)
+      ifcs.append( ifc )
+      symbols[ f"_I{k}" ] = ifc.__class__
+      symbols[ f"_a{k}" ] = ifc._dsl.args
+      symbols[ f"_k{k}" ] = ifc._dsl.kwargs
+      return f"_I{k}( *_a{k}, **_k{k} )"
+
+    def decl( obj ):
+      if isinstance( obj, list ):
+        return "[ " + ", ".join( [ decl( x ) for x in obj ] ) + " ]"
+      if isinstance( obj, Interface ):
+        return Ifc_call( obj )
+      return f"{obj.__class__.__name__}( {Bits_name( obj._dsl.Type.nbits )} )"
+
+    # s.enq.msg and s.in_[0] are declared as part of s.enq and s.in_
+    port_names = { re.match( r"s\.\w+", x[0] ).group() for x in ports }
+    port_decls = [ f"{x} = {decl( getattr( c, x[2:] ) )}" for x in sorted( port_names )
+                   if x != "s.reset" ]
+
+    set_inputs, set_outputs = [], []
+    for py_name, c_name, x in ports:
+      if isinstance( x, InPort ):
+        set_inputs.append( f"_m.{c_name} = int( {py_name} )" )
+      else:
+        set_outputs.append( f"{py_name} = {Bits_name( x._dsl.Type.nbits )}( _m.{c_name} )" )
+
+    seq_upblk = """
+      @s.update_ff
+      def seq_upblk():
+        _tick( _m )
+""" if c._dsl.all_update_ff else ""
+
+    cls_name  = f"{c.__class__.__name__}_csim"
+    py_src = f"""
+def compile_wrapper( ffi, lib, _types ):
+  {"; ".join( [ f"{x} = _types['{x}']" for x in sorted( symbols ) ] ) or "pass"}
+
+  class {cls_name}( Component ):
+    def construct( s ):
+      {(chr(10) + "      ").join( port_decls ) or "pass"}
+
+      # Keep the model alive as long as the component
+      _m = s._csim_model = ffi.new( "{name}_t *" )
+      lib.{name}_init( _m )
+      _eval = lib.{name}_eval
+      _tick = lib.{name}_tick
+
+      @s.update
+      def comb_upblk():
+        {(chr(10) + "        ").join( set_inputs + [ "_eval( _m )" ] + set_outputs )}
+{seq_upblk}
+    def line_trace( s ):
+      return " ".join( [ {", ".join( [ f"str( {x[0]} )" for x in ports if x[0] != "s.reset" ] )} ] )
+
+  return {cls_name}
+"""
+
+    fname = f"C model wrapper of {name}"
+    l = { "Component": Component, "InPort": InPort, "OutPort": OutPort }
+    exec( compile( py_src, filename=fname, mode="exec" ), l )
+    line_cache[ fname ] = (len(py_src), None, py_src.splitlines( keepends=True ), fname )
+
+    cls = l['compile_wrapper']( ffi, lib, symbols )
+    cls._csim_ffi = ffi
+    cls._csim_lib = lib
+    return cls()
+
+#-------------------------------------------------------------------------
+# BehavioralRTLIRToCVisitor
+#-------------------------------------------------------------------------
+# Translate the behavioral RTLIR of one update block into lines of C code
+# that operate on _s and _n, which point into the state struct. We reuse
+# the integer visitor because most Python expressions over ints are also
+# valid C expressions over uint64_t. This visitor changes how literals,
+# statements, and the few operators that differ are spelled.
+
+class BehavioralRTLIRToCVisitor( BehavioralRTLIRToIntPyVisitor ):
+
+  def __init__( s, slot_of, nbits, consts ):
+    super().__init__( slot_of, nbits, consts )
+    s.local_vars = set()
+
+  def take_local_vars( s ):
+    """ Return the temporaries and loop variables that have to be declared
+    at the beginning of the current function. """
+    ret, s.local_vars = sorted( s.local_vars ), set()
+    return ret
+
+  def num( s, value ):
+    return f"{value}ULL"
+
+  def hex( s, value ):
+    return f"{value:#x}ULL"
+
+  def assign( s, target, value ):
+    return f"{target} = {value};"
+
+  def visit( s, node, *args ):
+    if isinstance( getattr( node, "Type", None ), rt.Signal ) and _nbits( node ) > 64:
+      raise TranslationError( s.blk, "expressions wider than 64 bits are not supported!" )
+    return super().visit( node, *args )
+
+  #-----------------------------------------------------------------------
+  # Statements
+  #-----------------------------------------------------------------------
+
+  def _visit_body( s, body ):
+    lines = []
+    for stmt in body:
+      lines.extend( s.visit( stmt ) )
+    return lines
+
+
+  def visit_If( s, node ):
+    lines = [ f"if ( {s.visit( node.cond )} ) {{" ]
+    lines.extend( "  " + x for x in s._visit_body( node.body ) )
+    if node.orelse:
+      lines.append( "} else {" )
+      lines.extend( "  " + x for x in s._visit_body( node.orelse ) )
+    lines.append( "}" )
+    return lines
+
+  def visit_For( s, node ):
+    var  = s.visit_LoopVar( node.var )
+    step = s._const( node.step )
+    cmp  = ">" if step is not None and step < 0 else "<"
+    lines = [ f"for ( {var} = {s.visit( node.start )}; {var} {cmp} {s.visit( node.end )}; "
+              f"{var} += {s.visit( node.step )} ) {{" ]
+    lines.extend( "  " + x for x in s._visit_body( node.body ) )
+    lines.append( "}" )
+    return lines
+
+  #-----------------------------------------------------------------------
+  # Expressions
+  #-----------------------------------------------------------------------
+
+  def visit_LoopVar( s, node ):
+    name = super().visit_LoopVar( node )
+    s.local_vars.add( name )
+    return name
+
+  def visit_TmpVar( s, node ):
+    name = super().visit_TmpVar( node )
+    s.local_vars.add( name )
+    return name
+
+  def visit_Reduce( s, node ):
+    if isinstance( node.op, bir.BitXor ):
+      return f"_csim_parity( {s.visit( node.value )} )"
+    return super().visit_Reduce( node )
+
+  def visit_IfExp( s, node ):
+    return f"({s.visit( node.cond )} ? {s.visit( node.body )} : {s.visit( node.orelse )})"
+
+  def visit_UnaryOp( s, node ):
+    if isinstance( node.op, bir.Not ):
+      return f"(!{s.visit( node.operand )})"
+    return super().visit_UnaryOp( node )
+
+  def visit_BoolOp( s, node ):
+    op = " && " if isinstance( node.op, bir.And ) else " || "
+    return f"({op.join( [ s.visit( x ) for x in node.values ] )})"
+
+  def visit_BinOp( s, node ):
+    op = node.op
+    if not isinstance( op, (bir.Pow, bir.Div, bir.Mod, bir.ShiftLeft, bir.ShiftRightLogic) ):
+      return super().visit_BinOp( node )
+
+    nbits = _nbits( node )
+    shamt = s._const( node.right )
+
+    # Shifting a uint64_t by 64 or more is undefined behavior in C
+    if isinstance( op, bir.ShiftLeft ) and shamt is not None:
+      return super().visit_BinOp( node )
+
+    if isinstance( op, bir.ShiftRightLogic ) and shamt is not None:
+      return super().visit_BinOp( node ) if shamt < 64 else "0ULL"
+
+    l, r = s.visit( node.left ), s.visit( node.right )
+
+    if isinstance( op, bir.Pow ):
+      return f"(_csim_pow( {l}, {r} ) & {s.mask( nbits )})"
+    if isinstance( op, bir.Div ):
+      return f"_csim_div( {l}, {r} )"
+    if isinstance( op, bir.Mod ):
+      return f"_csim_mod( {l}, {r} )"
+    if isinstance( op, bir.ShiftLeft ):
+      return f"(({r}) < {nbits} ? (({l} << ({r})) & {s.mask( nbits )}) : 0ULL)"
+    return f"(({r}) < 64 ? ({l} >> ({r})) : 0ULL)"
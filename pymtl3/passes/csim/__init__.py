@@ -0,0 +1,2 @@
+from .CSimImportPass import CSimImportPass
+from .errors import CSimImportError
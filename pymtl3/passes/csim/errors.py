@@ -0,0 +1,11 @@
+"""
+========================================================================
+errors.py
+========================================================================
+Exception classes for the native C simulation backend.
+"""
+
+class CSimImportError( Exception ):
+  """ Raise when a component cannot be compiled into C and imported """
+  def __init__( self, obj, msg ):
+    return super().__init__( f"Error trying to import {obj} as a C model:\n- {msg}" )
@@ -0,0 +1,145 @@
+"""
+========================================================================
+CSimImportPass_test.py
+========================================================================
+"""
+import random
+import shutil
+from itertools import product
+
+import pytest
+
+from pymtl3.datatypes import Bits1, Bits8, Bits32, clog2, mk_bits
+from pymtl3.dsl import *
+from pymtl3.passes.csim import CSimImportPass
+from pymtl3.passes.PassGroups import SimpleSim
+from pymtl3.passes.test.IntegerTickPass_test import Top
+from pymtl3.stdlib.ifcs import DeqIfcRTL, EnqIfcRTL
+from pymtl3.stdlib.rtl.queues import BypassQueueRTL, NormalQueueRTL, PipeQueueRTL
+
+pytestmark = pytest.mark.skipif( shutil.which( "cc" ) is None,
+                                 reason="requires a C compiler" )
+
+vectors = [ (1, 2, 0), (200, 100, 1), (255, 255, 0), (3, 7, 1),
+            (128, 1, 1), (0, 0, 0), (17, 33, 0), (250, 6, 1) ]
+
+def _run( m, vectors ):
+  m.apply( SimpleSim )
+  m.sim_reset()
+
+  outs = []
+  for a, b, en in vectors:
+    m.a  = Bits8( a )
+    m.b  = Bits8( b )
+    m.en = Bits1( en )
+    m.tick()
+    outs.append( (int(m.out), int(m.lo), int(m.hi)) )
+  return outs
+
+def test_import_top( tmp_path, monkeypatch ):
+  monkeypatch.chdir( tmp_path )
+
+  m = Top()
+  m.elaborate()
+  m.csim_import = True
+  imp = CSimImportPass()( m )
+
+  assert imp is not m
+  assert "void Top_" in imp._csim.c_src
+  assert _run( imp, vectors ) == _run( Top(), vectors )
+
+def test_import_subcomponents( tmp_path, monkeypatch ):
+  monkeypatch.chdir( tmp_path )
+
+  m = Top()
+  m.elaborate()
+  m.alu.csim_import = True
+  m.acc.csim_import = True
+  alu_lib = CSimImportPass()( m ).alu._csim.lib_file
+
+  assert m.alu.__class__.__name__ == "Alu_csim"
+  assert m.acc.__class__.__name__ == "Acc_csim"
+  assert _run( m, vectors ) == _run( Top(), vectors )
+
+  # The same code is only compiled once
+  m = Top()
+  m.elaborate()
+  m.alu.csim_import = True
+  assert CSimImportPass()( m ).alu._csim.lib_file == alu_lib
+
+def test_interface( tmp_path, monkeypatch ):
+  monkeypatch.chdir( tmp_path )
+
+  class MsgIfc( Interface ):
+    def construct( s, Type ):
+      s.msg = InPort( Type )
+      s.ack = OutPort( Bits1 )
+
+  class Wrap( Component ):
+    def construct( s ):
+      s.in_ = [ MsgIfc( Bits8 ) for _ in range(2) ]
+      s.out = OutPort( Bits8 )
+
+      @s.update
+      def up_wrap():
+        s.out = s.in_[0].msg + s.in_[1].msg
+        s.in_[0].ack = s.in_[0].msg > s.in_[1].msg
+        s.in_[1].ack = s.in_[0].msg < s.in_[1].msg
+
+  m = Wrap()
+  m.elaborate()
+  m.csim_import = True
+  imp = CSimImportPass()( m )
+
+  imp.apply( SimpleSim )
+  assert isinstance( imp.in_[1], MsgIfc )
+  imp.in_[0].msg = Bits8( 3 )
+  imp.in_[1].msg = Bits8( 5 )
+  imp.tick()
+  assert imp.out == 8 and imp.in_[0].ack == 0 and imp.in_[1].ack == 1
+
+#-------------------------------------------------------------------------
+# Queues against SimpleSim
+#-------------------------------------------------------------------------
+
+class QueueTop( Component ):
+  def construct( s, Queue, num_entries ):
+    s.enq   = EnqIfcRTL( Bits32 )
+    s.deq   = DeqIfcRTL( Bits32 )
+    s.count = OutPort( mk_bits( clog2( num_entries+1 ) ) )
+
+    s.q = Queue( Bits32, num_entries )( enq = s.enq, deq = s.deq, count = s.count )
+
+def _run_queue( m, ncycles ):
+  m.apply( SimpleSim )
+  m.sim_reset()
+
+  rng  = random.Random( 0xc51 )
+  outs = []
+  for i in range( ncycles ):
+    m.enq.en  = Bits1( rng.random() < 0.6 )
+    m.enq.msg = Bits32( rng.getrandbits(32) )
+    m.deq.en  = Bits1( rng.random() < 0.5 )
+    m.tick()
+    outs.append( (int(m.enq.rdy), int(m.deq.rdy), int(m.deq.msg), int(m.count)) )
+  return outs
+
+@pytest.mark.parametrize( "Queue, num_entries",
+  product( [ NormalQueueRTL, PipeQueueRTL, BypassQueueRTL ], [ 1, 2, 3 ] ) )
+def test_queue( tmp_path, monkeypatch, Queue, num_entries ):
+  monkeypatch.chdir( tmp_path )
+  ref = _run_queue( Queue( Bits32, num_entries ), 200 )
+
+  # The queue as the top component and as a subcomponent that is
+  # connected through interfaces
+  m = Queue( Bits32, num_entries )
+  m.elaborate()
+  m.csim_import = True
+  assert _run_queue( CSimImportPass()( m ), 200 ) == ref
+
+  m = QueueTop( Queue, num_entries )
+  m.elaborate()
+  m.q.csim_import = True
+  m = CSimImportPass()( m )
+  assert m.q.__class__.__name__ == f"{Queue.__name__}_csim"
+  assert _run_queue( m, 200 ) == ref
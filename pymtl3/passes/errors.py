@@ -32,3 +32,14 @@ class InvalidPassOptionValue( Exception ):
   def __init__( self, opt, val, pas, msg ):
     return super().__init__(f"{val} is not a valid value for option {opt}"
                             f" of pass {pas} because {msg}.")
+
+class ForkedSimulationError( Exception ):
+  """ Raised when a simulation forked from a snapshot fails. The message
+      contains the traceback in the forked process. """
+  def __init__( self, msg ):
+    return super().__init__( msg )
+
+class SimCacheError( Exception ):
+  """ Raised when a simulator cannot be saved to the simulator cache """
+  def __init__( self, top, msg ):
+    return super().__init__( f"Cannot cache the simulator of {top.__class__.__name__}: {msg}" )
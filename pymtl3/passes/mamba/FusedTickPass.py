@@ -0,0 +1,285 @@
+"""
+========================================================================
+FusedTickPass.py
+========================================================================
+Generate a tick function that inlines the bodies of all update blocks in
+the schedule instead of calling them one by one. We start from the ASTs
+that the DSL already cached when parsing update blocks, plus the sources
+of the net blocks generated by GenDAGPass, and splice them into a single
+function. To do so:
+
+- Local variables of block i are renamed to _l{i}_{name} so that blocks
+  cannot clobber each other.
+- Free variables (closure cells and module globals) whose values are
+  constants (None, numbers, strings, and tuples of them) or DSL objects
+  are bound once when the tick is generated and referenced as _v{k} cell
+  variables. Any other free variable may be rebound or replaced later,
+  e.g. a mutable global or a function that a test monkeypatches, so we
+  bind the closure cell or the globals dict instead and look the value
+  up every time: _v{k}.cell_contents or _v{k}["name"].
+- Attribute chains that resolve to a component, an interface, or an
+  array of them (s.x.y, s.comps[2], ...) are evaluated once and hoisted
+  the same way. Only signals are swapped by lock_in_simulation, so these
+  objects stay valid for the entire simulation.
+
+Blocks that cannot be inlined safely (e.g. they contain a return
+statement, nested functions, or are not update blocks at all like the
+double buffer function) are simply called from the fused tick.
+"""
+import ast
+import builtins
+from copy import deepcopy
+from textwrap import dedent
+
+from pymtl3.dsl import Signal
+from pymtl3.dsl.NamedObject import NamedObject
+from pymtl3.passes.BasePass import BasePass
+from pymtl3.passes.errors import PassOrderError
+
+_unsafe_nodes = tuple( getattr( ast, x ) for x in (
+  "Return", "Yield", "YieldFrom", "Await", "Global", "Nonlocal",
+  "FunctionDef", "AsyncFunctionDef", "Lambda", "ClassDef",
+  "Import", "ImportFrom", "Match",
+) if hasattr( ast, x ) )
+
+def _const_index( node ):
+  if isinstance( node, ast.Index ): # Python < 3.9
+    node = node.value
+  if isinstance( node, ast.Constant ):
+    value = node.value
+  elif isinstance( node, ast.Num ):
+    value = node.n
+  else:
+    return None
+  return value if type(value) is int else None
+
+_constant_types = ( type(None), type(Ellipsis), bool, int, float, complex, str, bytes )
+
+def _is_constant( obj ):
+  if type(obj) in ( tuple, frozenset ):
+    return all( _is_constant( x ) for x in obj )
+  return type(obj) in _constant_types
+
+def _is_hoistable( obj ):
+  if isinstance( obj, NamedObject ):
+    return not isinstance( obj, Signal )
+  # Only hoist arrays of DSL objects. lock_in_simulation swaps the
+  # elements of these lists in place but never rebinds the list itself.
+  while isinstance( obj, list ) and obj:
+    obj = obj[0]
+  return isinstance( obj, NamedObject )
+
+class _Bindings:
+  """ The free variables of the fused tick, deduplicated by identity. """
+
+  def __init__( self ):
+    self.objs  = []
+    self.names = {}
+
+  def bind( self, obj ):
+    try:
+      return self.names[ id(obj) ]
+    except KeyError:
+      name = self.names[ id(obj) ] = f"_v{len(self.objs)}"
+      self.objs.append( obj )
+      return name
+
+class _InlineBlock( ast.NodeTransformer ):
+
+  def __init__( self, idx, func, local_names, bindings ):
+    self.idx         = idx
+    self.local_names = local_names
+    self.bindings    = bindings
+
+    self.free  = {}
+    self.cells = {}
+    if func.__closure__:
+      for name, cell in zip( func.__code__.co_freevars, func.__closure__ ):
+        self.free [ name ] = cell.cell_contents
+        self.cells[ name ] = cell
+    self.globals = func.__globals__
+
+  def lookup( self, name ):
+    if name in self.free:
+      return True, self.free[ name ]
+    if name in self.globals:
+      return True, self.globals[ name ]
+    return False, None # builtins stay as they are
+
+  def resolve( self, node ):
+    if isinstance( node, ast.Name ):
+      if node.id in self.local_names:
+        return False, None
+      return self.lookup( node.id )
+
+    if isinstance( node, ast.Attribute ):
+      found, obj = self.resolve( node.value )
+      if found and _is_hoistable( obj ) and not isinstance( obj, list ):
+        try:
+          return True, getattr( obj, node.attr )
+        except AttributeError:
+          pass
+      return False, None
+
+    if isinstance( node, ast.Subscript ):
+      found, obj = self.resolve( node.value )
+      idx = _const_index( node.slice )
+      if found and isinstance( obj, list ) and _is_hoistable( obj ) and \
+         idx is not None and -len(obj) <= idx < len(obj):
+        return True, obj[ idx ]
+      return False, None
+
+    return False, None
+
+  def hoist( self, node ):
+    if isinstance( node.ctx, ast.Load ):
+      found, obj = self.resolve( node )
+      if found and _is_hoistable( obj ):
+        return ast.copy_location( ast.Name( id=self.bindings.bind( obj ), ctx=node.ctx ), node )
+    return self.generic_visit( node )
+
+  visit_Attribute = hoist
+  visit_Subscript = hoist
+
+  def visit_Name( self, node ):
+    if node.id in self.local_names:
+      new_id = f"_l{self.idx}_{node.id}"
+    else:
+      found, obj = self.lookup( node.id )
+      if not found and hasattr( builtins, node.id ):
+        return node
+      if not found or not ( _is_constant( obj ) or _is_hoistable( obj ) ):
+        return ast.copy_location( self.load_free( node.id ), node )
+      new_id = self.bindings.bind( obj )
+    return ast.copy_location( ast.Name( id=new_id, ctx=node.ctx ), node )
+
+  # Look up the current value of a free variable every time. Free
+  # variables are never assigned in an inlined block since global and
+  # nonlocal statements are not allowed.
+
+  def load_free( self, name ):
+    if name in self.cells:
+      src = f"{self.bindings.bind( self.cells[ name ] )}.cell_contents"
+    else:
+      src = f"{self.bindings.bind( self.globals )}[{name!r}]"
+    return ast.parse( src, mode="eval" ).body
+
+  def visit_ExceptHandler( self, node ):
+    self.generic_visit( node )
+    if node.name in self.local_names:
+      node.name = f"_l{self.idx}_{node.name}"
+    return node
+
+class FusedTickPass( BasePass ):
+
+  def __call__( self, top ):
+    if not hasattr( top._sched, "schedule" ):
+      raise PassOrderError( "schedule" )
+
+    if hasattr( top, "_cl_trace" ):
+      schedule = top._cl_trace.schedule
+    else:
+      schedule = top._sched.schedule
+
+    top.tick = self.gen_fused_tick( top, schedule )
+
+  #-----------------------------------------------------------------------
+  # get_block_def
+  #-----------------------------------------------------------------------
+  # Return the FunctionDef node of a net block or an update block, or
+  # None if the block cannot be inlined.
+
+  @staticmethod
+  def get_block_def( top, blk ):
+    genblk_src = getattr( top._dag, "genblk_src", {} )
+
+    if blk in genblk_src:
+      tree = ast.parse( dedent( genblk_src[ blk ] ) )
+
+    elif blk in top._dsl.all_upblk_hostobj:
+      hostobj = top._dsl.all_upblk_hostobj[ blk ]
+      info    = hostobj.get_update_block_info( blk )
+      if info is None:
+        return None
+      tree = info[-1]
+
+    else:
+      return None
+
+    defs = [ x for x in tree.body if isinstance( x, ast.FunctionDef ) ]
+    if len(defs) != 1:
+      return None
+
+    func_def = defs[0]
+    args     = func_def.args
+    if args.args or args.vararg or args.kwonlyargs or args.kwarg:
+      return None
+
+    for stmt in func_def.body:
+      for node in ast.walk( stmt ):
+        if isinstance( node, _unsafe_nodes ):
+          return None
+
+    try:
+      if blk.__closure__:
+        [ x.cell_contents for x in blk.__closure__ ]
+    except ValueError: # empty cell
+      return None
+
+    return func_def
+
+  #-----------------------------------------------------------------------
+  # gen_fused_tick
+  #-----------------------------------------------------------------------
+
+  def gen_fused_tick( self, top, schedule ):
+    bindings = _Bindings()
+    body     = []
+
+    fused, unfused = [], []
+
+    for i, blk in enumerate( schedule ):
+      func_def = self.get_block_def( top, blk )
+
+      if func_def is None:
+        call = ast.Expr( value=ast.Call( func=ast.Name( id=bindings.bind( blk ), ctx=ast.Load() ),
+                                         args=[], keywords=[] ) )
+        body.append( call )
+        unfused.append( blk )
+        continue
+
+      local_names = set()
+      for stmt in func_def.body:
+        for node in ast.walk( stmt ):
+          if isinstance( node, ast.Name ) and not isinstance( node.ctx, ast.Load ):
+            local_names.add( node.id )
+          elif isinstance( node, ast.ExceptHandler ) and node.name:
+            local_names.add( node.name )
+
+      # Never mutate the ASTs cached in the component class
+      inliner = _InlineBlock( i, blk, local_names, bindings )
+      body.extend( inliner.visit( deepcopy( x ) ) for x in func_def.body )
+      fused.append( blk )
+
+    src = """
+def compile_fused( _objs ):
+  {}
+  def fused_tick():
+    pass
+  return fused_tick
+""".format( "".join( [ f"{x}, " for x in bindings.names.values() ] ) + "= _objs"
+            if bindings.objs else "pass" )
+
+    tree     = ast.parse( src )
+    tick_def = tree.body[0].body[-2]
+    if body:
+      tick_def.body = body
+    ast.fix_missing_locations( tree )
+
+    fname = f"Fused tick of {top.__class__.__name__}"
+    l = {}
+    exec( compile( tree, filename=fname, mode="exec" ), l )
+
+    top._sched.fused_blocks   = fused
+    top._sched.unfused_blocks = unfused
+    return l['compile_fused']( bindings.objs )
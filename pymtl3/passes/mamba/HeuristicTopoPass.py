@@ -8,10 +8,10 @@ Date   : Dec 26, 2018
 """
 
 import ast
+import json
+import os
 from queue import PriorityQueue
 
-from graphviz import Digraph
-
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 from pymtl3.passes.errors import PassOrderError
 from pymtl3.passes.SimpleSchedulePass import check_schedule
@@ -51,7 +51,33 @@ class CountBranches( ast.NodeVisitor ):
     for stmt in node.body:
       self.visit( stmt )
 
+#-------------------------------------------------------------------------
+# Block profiles
+#-------------------------------------------------------------------------
+# A profile maps the name of each block to its number of calls, total
+# execution time and branch-outcome entropy recorded during a warm-up
+# run (see TraceBreakingSchedTickPass). Blocks are named by the path of
+# the host component so that a profile can be reused by later runs.
+
+def profile_key( top, blk ):
+  if blk in top._dsl.all_upblk_hostobj:
+    return f"{top.get_update_block_host_component( blk )!r}.{blk.__name__}"
+  return blk.__name__
+
+def load_profile( filename ):
+  with open( filename ) as f:
+    return json.load( f )[ "blocks" ]
+
+def save_profile( filename, profile, ncycles ):
+  tmp = f"{filename}.{os.getpid()}.tmp"
+  with open( tmp, "w" ) as f:
+    json.dump( { "ncycles": ncycles, "blocks": profile }, f, indent=2, sort_keys=True )
+  os.replace( tmp, filename )
+
 class HeuristicTopoPass( BasePass ):
+  def __init__( self, profile=None ):
+    self.profile = profile
+
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
       raise PassOrderError( "all_constraints" )
@@ -83,6 +109,15 @@ class HeuristicTopoPass( BasePass ):
       hostobj = top.get_update_block_host_component( blk )
       branchiness[ blk ] = visitor.enter( hostobj.get_update_block_info( blk )[-1] )
 
+    # Use the branch-outcome entropy of a previous profiled run instead
+
+    if self.profile and os.path.exists( self.profile ):
+      profile = load_profile( self.profile )
+      for blk in V:
+        key = profile_key( top, blk )
+        if key in profile:
+          branchiness[ blk ] = profile[ key ][ "entropy" ]
+
     # Perform topological sort for a serial schedule.
     # Note that here we use a priority queue to get the blocks with small
     # branchiness as early as possible
@@ -0,0 +1,609 @@
+"""
+========================================================================
+IntegerTickPass.py
+========================================================================
+Generate a tick function that simulates an RTL design over plain Python
+ints instead of Bits objects. We reuse the behavioral RTLIR generation
+and type checking passes so that the bitwidth of every expression is
+known statically. Masks and slices then become constant shifts and ands.
+
+All top level Bits signals of the design are stored as ints in a flat
+slot table. Signals that are connected as a whole share the same slot,
+so most net blocks disappear. Values are converted back into Bits only
+at the edges of the design: the input ports of the top component are
+read at the beginning of every tick and the output ports are written at
+the end. Internal signals are written back before line_trace is called,
+or explicitly through top._int_sim.write_back().
+
+The design must be purely RTL: every update block has to pass RTLIR
+type checking and all signals must have Bits types.
+"""
+from linecache import cache as line_cache
+
+from pymtl3.datatypes import Bits, mk_bits
+from pymtl3.dsl import Const, InPort, OutPort, Signal
+from pymtl3.passes.BasePass import BasePass, PassMetadata
+from pymtl3.passes.errors import ModelTypeError, PassOrderError, TranslationError
+from pymtl3.passes.rtlir import BehavioralRTLIR as bir
+from pymtl3.passes.rtlir import BehavioralRTLIRGenPass, BehavioralRTLIRTypeCheckPass
+from pymtl3.passes.rtlir import RTLIRDataType as rdt
+from pymtl3.passes.rtlir import RTLIRType as rt
+
+
+def _mask( nbits ):
+  return hex( (1 << nbits) - 1 )
+
+def _nbits( node ):
+  return int( node.Type.get_dtype().get_length() )
+
+def _is_slice( x ):
+  return isinstance( x, Signal ) and x.is_sliced_signal()
+
+def _is_whole( x ):
+  return isinstance( x, Signal ) and x.is_top_level_signal() and \
+         not isinstance( x.get_parent_object(), Signal )
+
+class IntegerTickPass( BasePass ):
+
+  def __call__( self, top ):
+    if not hasattr( top, "_sched" ) or not hasattr( top._sched, "schedule" ):
+      raise PassOrderError( "schedule" )
+
+    if top._dsl.all_method_ports:
+      raise ModelTypeError( "RTL designs without method ports" )
+
+    top._int_sim = PassMetadata()
+
+    self.gen_rtlir( top )
+    self.assign_slots( top )
+    top.tick = self.gen_int_tick( top )
+
+    # Internal signals are only materialized on demand
+    if hasattr( top, "line_trace" ):
+      line_trace  = top.line_trace
+      write_back  = top._int_sim.write_back
+
+      def int_sim_line_trace( *args, **kwargs ):
+        write_back()
+        return line_trace( *args, **kwargs )
+
+      top.line_trace = int_sim_line_trace
+
+  #-----------------------------------------------------------------------
+  # gen_rtlir
+  #-----------------------------------------------------------------------
+
+  def gen_rtlir( self, top ):
+    top._int_sim.rtlir_upblks = rtlir_upblks = {}
+
+    for m in sorted( top._dsl.all_components, key=repr ):
+      if m.get_update_blocks():
+        m.apply( BehavioralRTLIRGenPass() )
+        m.apply( BehavioralRTLIRTypeCheckPass() )
+        rtlir_upblks.update( m._pass_behavioral_rtlir_gen.rtlir_upblks )
+
+  #-----------------------------------------------------------------------
+  # assign_slots
+  #-----------------------------------------------------------------------
+  # Every top level Bits signal gets a slot. A net whose writer and
+  # readers are all whole signals is collapsed into a single slot with
+  # union-find so that no code is needed to propagate its value.
+
+  def assign_slots( self, top ):
+    signals = sorted( [ x for x in top._dsl.all_signals
+                        if _is_whole( x ) and issubclass( x._dsl.Type, Bits ) ], key=repr )
+
+    parent = { x: x for x in signals }
+
+    def find( x ):
+      while parent[x] is not x:
+        parent[x] = parent[ parent[x] ]
+        x = parent[x]
+      return x
+
+    for writer, net in top.get_all_value_nets():
+      for x in net:
+        if x is not writer and x in parent and writer in parent:
+          parent[ find(x) ] = find( writer )
+
+    slot_of = {}
+    nbits   = []
+    for x in signals:
+      root = find( x )
+      if root not in slot_of:
+        slot_of[ root ] = len(nbits)
+        nbits.append( root._dsl.Type.nbits )
+      slot_of[ x ] = slot_of[ root ]
+
+    top._int_sim.slot_of = slot_of
+    top._int_sim.nbits   = nbits
+    top._int_sim.slots   = [ 0 ] * len(nbits)
+
+    # Constant nets are resolved once and for all here
+
+    for writer, net in top.get_all_value_nets():
+      if isinstance( writer, Const ):
+        value = int( writer._dsl.const )
+        for x in net:
+          if x is not writer:
+            self._init_const( top, x, value )
+
+  def _init_const( self, top, x, value ):
+    slots, slot_of = top._int_sim.slots, top._int_sim.slot_of
+    if x in slot_of:
+      slots[ slot_of[x] ] = value & ((1 << top._int_sim.nbits[ slot_of[x] ]) - 1)
+    elif x.is_sliced_signal() and x.get_parent_object() in slot_of:
+      k, sl = slot_of[ x.get_parent_object() ], x._dsl.slice
+      m     = (1 << (sl.stop - sl.start)) - 1
+      slots[k] = (slots[k] & ~(m << sl.start)) | ((value & m) << sl.start)
+    else:
+      raise ModelTypeError( "designs whose nets only carry Bits signals" )
+
+  #-----------------------------------------------------------------------
+  # gen_net_copy
+  #-----------------------------------------------------------------------
+  # Only nets that involve sliced signals need code.
+
+  def gen_net_copy( self, top, blk ):
+    slot_of = top._int_sim.slot_of
+    if blk not in top._dag.genblk_reads: # constant nets are already set
+      return []
+    writer  = top._dag.genblk_reads[ blk ][0]
+
+    def slot( x ):
+      if x not in slot_of:
+        raise TranslationError( blk, f"{x!r} is not a Bits signal!" )
+      return slot_of[x]
+
+    if _is_slice( writer ):
+      sl  = writer._dsl.slice
+      src = f"(_s[{slot( writer.get_parent_object() )}] >> {sl.start})" if sl.start else \
+            f"_s[{slot( writer.get_parent_object() )}]"
+      src = f"({src} & {_mask( sl.stop - sl.start )})"
+    else:
+      src = f"_s[{slot( writer )}]"
+
+    strs = []
+    for x in top._dag.genblk_writes[ blk ]:
+      if _is_slice( x ):
+        k, sl = slot( x.get_parent_object() ), x._dsl.slice
+        clear = hex( ((1 << top._int_sim.nbits[k]) - 1) ^ (((1 << (sl.stop - sl.start)) - 1) << sl.start) )
+        shifted = f"({src} << {sl.start})" if sl.start else src
+        strs.append( f"_s[{k}] = (_s[{k}] & {clear}) | {shifted}" )
+      elif not _is_slice( writer ) and slot( x ) == slot( writer ):
+        pass # collapsed into the same slot
+      else:
+        strs.append( f"_s[{slot( x )}] = {src}" )
+    return strs
+
+  #-----------------------------------------------------------------------
+  # gen_int_tick
+  #-----------------------------------------------------------------------
+
+  def gen_int_tick( self, top ):
+    schedule     = top._sched.schedule
+    genblks      = top._dag.genblks
+    rtlir_upblks = top._int_sim.rtlir_upblks
+    slot_of      = top._int_sim.slot_of
+    nbits        = top._int_sim.nbits
+
+    consts  = {}
+    visitor = BehavioralRTLIRToIntPyVisitor( slot_of, nbits, consts )
+
+    body = []
+    for i, blk in enumerate( schedule ):
+      if blk in genblks:
+        strs = self.gen_net_copy( top, blk )
+        if strs:
+          body.append( f"# {blk.__name__}" )
+          body.extend( strs )
+      elif blk in rtlir_upblks:
+        body.append( f"# {blk.__name__} at {top._dsl.all_upblk_hostobj[ blk ]!r}" )
+        body.extend( visitor.enter( blk, rtlir_upblks[ blk ] ) )
+      elif i == 0: # the double buffer function of SimpleSchedulePass
+        pass
+      else:
+        raise TranslationError( blk, "is not an RTL update block!" )
+
+    bits_types = {}
+    def Bits_name( n ):
+      bits_types[ f"_B{n}" ] = mk_bits( n )
+      return f"_B{n}"
+
+    # Edges of the design
+
+    edge_in, edge_out, write_back = [], [], []
+    for x, k in sorted( slot_of.items(), key=lambda x: repr(x[0]) ):
+      write_back.append( f"{x!r} = {Bits_name( nbits[k] )}( _s[{k}] )" )
+      if x.get_host_component() is top:
+        if isinstance( x, InPort ):
+          edge_in.append( f"_s[{k}] = int( {x!r} )" )
+        elif isinstance( x, OutPort ):
+          edge_out.append( write_back[-1] )
+
+    flip = [ f"_s[{k}] = _n[{k}]" for k in sorted( visitor.ff_slots ) ]
+
+    tick_src = "\n    ".join( edge_in + flip + body + edge_out ) or "pass"
+    wb_src   = "\n    ".join( write_back ) or "pass"
+
+    src = """
+def compile_int_tick( s, _s, _n, _consts ):
+  {}
+  def int_tick():
+    {}
+  def write_back():
+    {}
+  return int_tick, write_back
+""".format( "; ".join( [ f"{x} = _consts['{x}']" for x in sorted( list(consts) + list(bits_types) ) ] )
+            or "pass", tick_src, wb_src )
+
+    fname = f"Integer tick of {top.__class__.__name__}"
+    l = {}
+    exec( compile( src, filename=fname, mode="exec" ), l )
+    line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
+
+    consts.update( bits_types )
+
+    slots = top._int_sim.slots
+    top._int_sim.next_slots = next_slots = list( slots )
+    top._int_sim.src = src
+
+    tick, top._int_sim.write_back = l['compile_int_tick']( top, slots, next_slots, consts )
+    return tick
+
+#-------------------------------------------------------------------------
+# BehavioralRTLIRToIntPyVisitor
+#-------------------------------------------------------------------------
+# Translate the behavioral RTLIR of one update block into lines of Python
+# code that operate on the slot table _s (current values) and _n (next
+# values of signals written in update_ff blocks). Every expression
+# evaluates to a non-negative int that fits in its RTLIR bitwidth.
+
+class BehavioralRTLIRToIntPyVisitor( bir.BehavioralRTLIRNodeVisitor ):
+
+  def __init__( s, slot_of, nbits, consts ):
+    s.slot_of  = slot_of
+    s.nbits    = nbits
+    s.consts   = consts
+    s.ff_slots = set()
+    s.blk_id   = 0
+
+  def enter( s, blk, rtlir ):
+    s.blk     = blk
+    s.blk_id += 1
+    return s.visit( rtlir )
+
+  def bind( s, obj ):
+    """ Bind a constant tuple of slot indices as a closure variable. """
+    name = f"_a{len(s.consts)}"
+    s.consts[ name ] = obj
+    return name
+
+  # Literals, indexing into bound arrays, and assignments go through these
+  # methods so that a visitor for another target only has to change how
+  # they are spelled.
+
+  def num( s, value ):
+    return str( value )
+
+  def hex( s, value ):
+    return hex( value )
+
+  def mask( s, nbits ):
+    return s.hex( (1 << nbits) - 1 )
+
+  def index( s, name, dyn ):
+    return name + "".join( f"[{x}]" for x in dyn )
+
+  # The mask that clears width bits starting at the non-constant lo of a
+  # nbits-wide signal in a partial assignment
+
+  def clear_mask( s, nbits, width, lo ):
+    return f"~({s.mask( width )} << ({lo}))"
+
+  def assign( s, target, value ):
+    return f"{target} = {value}"
+
+  #-----------------------------------------------------------------------
+  # Signal resolution
+  #-----------------------------------------------------------------------
+  # s.x.y[2].z is resolved statically into the actual PyMTL object. An
+  # index that is not a constant expression is kept as a dynamic index,
+  # and the objects are kept as a nested list to be indexed at runtime.
+
+  def resolve( s, node ):
+    if isinstance( node, bir.Base ):
+      return node.base, []
+
+    if isinstance( node, bir.Attribute ):
+      tree, dyn = s.resolve( node.value )
+      return s._map( tree, len(dyn), lambda x: getattr( x, node.attr ) ), dyn
+
+    if isinstance( node, bir.Index ) and isinstance( node.value.Type, rt.Array ):
+      tree, dyn = s.resolve( node.value )
+      idx = s._const( node.idx )
+      if idx is None:
+        return tree, dyn + [ s.visit( node.idx ) ]
+      return s._map( tree, len(dyn), lambda x: x[ idx ] ), dyn
+
+    raise TranslationError( s.blk, f"cannot resolve {node.__class__.__name__} into a signal!" )
+
+  def _map( s, tree, depth, f ):
+    if depth == 0:
+      return f( tree )
+    return [ s._map( x, depth-1, f ) for x in tree ]
+
+  def _to_slots( s, tree ):
+    if isinstance( tree, list ):
+      return tuple( s._to_slots( x ) for x in tree )
+    if tree not in s.slot_of:
+      raise TranslationError( s.blk, f"{tree!r} is not a Bits signal!" )
+    return s.slot_of[ tree ]
+
+  def _to_consts( s, tree ):
+    if isinstance( tree, list ):
+      return tuple( s._to_consts( x ) for x in tree )
+    return int( tree )
+
+  def signal_ref( s, node ):
+    """ Return the code of s.x.y (slot index), its nbits, and the set of
+    all slots it may refer to. """
+    tree, dyn = s.resolve( node )
+    slots = s._to_slots( tree )
+    if not dyn:
+      return str(slots), s.nbits[ slots ], { slots }
+
+    all_slots = set()
+    def collect( t ):
+      if isinstance( t, tuple ):
+        for x in t: collect( x )
+      else:
+        all_slots.add( t )
+    collect( slots )
+
+    return s.index( s.bind( slots ), dyn ), None, all_slots
+
+  def _const( s, node ):
+    if isinstance( node.Type, rt.Const ) and hasattr( node, "_value" ) and \
+       isinstance( node._value, (int, Bits) ):
+      return int( node._value )
+    return None
+
+  def _is_signal_chain( s, node ):
+    return isinstance( node, (bir.Attribute, bir.Base) ) or \
+           ( isinstance( node, bir.Index ) and isinstance( node.value.Type, rt.Array ) )
+
+  #-----------------------------------------------------------------------
+  # Upblks and statements
+  #-----------------------------------------------------------------------
+  # Statements return a list of lines.
+
+  def visit_CombUpblk( s, node ):
+    s.is_seq = False
+    return s._visit_body( node.body )
+
+  def visit_SeqUpblk( s, node ):
+    s.is_seq = True
+    return s._visit_body( node.body )
+
+  def _visit_body( s, body ):
+    lines = []
+    for stmt in body:
+      lines.extend( s.visit( stmt ) )
+    return lines or [ "pass" ]
+
+  def visit_Assign( s, node ):
+    value  = s.visit( node.value )
+    target = node.target
+
+    if isinstance( target, bir.TmpVar ):
+      return [ s.assign( s.visit( target ), value ) ]
+
+    if node.blocking == s.is_seq:
+      raise TranslationError( s.blk, "blocking assignments to signals are only "
+                                     "allowed in update and <<= only in update_ff!" )
+    table = "_n" if s.is_seq else "_s"
+
+    if s._is_signal_chain( target ):
+      ref, _, slots = s.signal_ref( target )
+      if s.is_seq:
+        s.ff_slots |= slots
+      return [ s.assign( f"{table}[{ref}]", value ) ]
+
+    # Partial assignments: s.x[3] = ... and s.x[0:4] = ...
+    if s.is_seq:
+      raise TranslationError( s.blk, "partial <<= assignments are not supported!" )
+
+    if isinstance( target, bir.Slice ):
+      base, lower, width = target.value, target.lower, _nbits( target )
+    elif isinstance( target, bir.Index ):
+      base, lower, width = target.value, target.idx, 1
+    else:
+      raise TranslationError( s.blk, f"cannot assign to {target.__class__.__name__}!" )
+
+    if not s._is_signal_chain( base ):
+      raise TranslationError( s.blk, "nested partial assignments are not supported!" )
+
+    ref, base_nbits, _ = s.signal_ref( base )
+    m  = (1 << width) - 1
+    lo = s._const( lower )
+    if lo is not None and base_nbits is not None:
+      clear = s.hex( ((1 << base_nbits) - 1) ^ (m << lo) )
+      return [ s.assign( f"_s[{ref}]", f"(_s[{ref}] & {clear}) | (({value}) << {lo})" ) ]
+    lo    = s.visit( lower )
+    clear = s.clear_mask( _nbits( base ), width, lo )
+    return [ s.assign( f"_s[{ref}]", f"(_s[{ref}] & {clear}) | (({value}) << ({lo}))" ) ]
+
+  def visit_If( s, node ):
+    lines = [ f"if {s.visit( node.cond )}:" ]
+    lines.extend( "  " + x for x in s._visit_body( node.body ) )
+    if node.orelse:
+      lines.append( "else:" )
+      lines.extend( "  " + x for x in s._visit_body( node.orelse ) )
+    return lines
+
+  def visit_For( s, node ):
+    var = f"_i{s.blk_id}_{node.var.name}"
+    lines = [ f"for {var} in range( {s.visit( node.start )}, {s.visit( node.end )}, "
+              f"{s.visit( node.step )} ):" ]
+    lines.extend( "  " + x for x in s._visit_body( node.body ) )
+    return lines
+
+  #-----------------------------------------------------------------------
+  # Expressions
+  #-----------------------------------------------------------------------
+  # Expressions return a single string.
+
+  def visit_Number( s, node ):
+    return s.num( s._const( node ) if hasattr( node, "_value" ) else node.value )
+
+  def visit_FreeVar( s, node ):
+    value = s._const( node )
+    if value is None:
+      raise TranslationError( s.blk, f"free variable {node.name} is not a constant!" )
+    return s.num( value & ((1 << _nbits( node )) - 1) )
+
+  def visit_LoopVar( s, node ):
+    return f"_i{s.blk_id}_{node.name}"
+
+  def visit_TmpVar( s, node ):
+    return f"_t{s.blk_id}_{node.name}"
+
+  def visit_Base( s, node ):
+    raise TranslationError( s.blk, "a component cannot be used as a value!" )
+
+  def visit_Attribute( s, node ):
+    if not isinstance( node.Type, rt.Signal ) or \
+       not isinstance( node.Type.get_dtype(), (rdt.Vector, rdt.Bool) ):
+      raise TranslationError( s.blk, f"attribute {node.attr} is not a Bits signal!" )
+
+    if isinstance( node.Type, rt.Const ):
+      tree, dyn = s.resolve( node )
+      if not dyn:
+        return s.num( int( tree ) )
+      return s.index( s.bind( s._to_consts( tree ) ), dyn )
+
+    ref, _, _ = s.signal_ref( node )
+    return f"_s[{ref}]"
+
+  def visit_Index( s, node ):
+    if isinstance( node.value.Type, rt.Array ):
+      if isinstance( node.Type, rt.Const ):
+        tree, dyn = s.resolve( node )
+        if not dyn:
+          return s.num( int( tree ) )
+        return s.index( s.bind( s._to_consts( tree ) ), dyn )
+      ref, _, _ = s.signal_ref( node )
+      return f"_s[{ref}]"
+
+    if not isinstance( node.value.Type.get_dtype(), rdt.Vector ):
+      raise TranslationError( s.blk, "only bit selection on Bits signals is supported!" )
+
+    value = s.visit( node.value )
+    idx   = s._const( node.idx )
+    if idx is not None:
+      return f"(({value} >> {idx}) & 1)"
+    return f"(({value} >> ({s.visit( node.idx )})) & 1)"
+
+  def visit_Slice( s, node ):
+    value = s.visit( node.value )
+    mask  = s.mask( _nbits( node ) )
+    lo    = s._const( node.lower )
+    if lo == 0:
+      return f"({value} & {mask})"
+    if lo is not None:
+      return f"(({value} >> {lo}) & {mask})"
+    return f"(({value} >> ({s.visit( node.lower )})) & {mask})"
+
+  def visit_Concat( s, node ):
+    parts, shamt = [], 0
+    for child in reversed( node.values ):
+      v = s.visit( child )
+      parts.append( f"({v} << {shamt})" if shamt else v )
+      shamt += _nbits( child )
+    return "(" + " | ".join( reversed( parts ) ) + ")"
+
+  def visit_ZeroExt( s, node ):
+    return s.visit( node.value )
+
+  def visit_SignExt( s, node ):
+    sign = s.hex( 1 << (_nbits( node.value ) - 1) )
+    return f"((({s.visit( node.value )} ^ {sign}) - {sign}) & {s.mask( _nbits( node ) )})"
+
+  def visit_Reduce( s, node ):
+    value = s.visit( node.value )
+    if isinstance( node.op, bir.BitAnd ):
+      return f"({value} == {s.mask( _nbits( node.value ) )})"
+    if isinstance( node.op, bir.BitOr ):
+      return f"({value} != 0)"
+    if isinstance( node.op, bir.BitXor ):
+      return f"(bin( {value} ).count( '1' ) & 1)"
+    raise TranslationError( s.blk, f"unrecognized reduce operator {node.op}!" )
+
+  def visit_SizeCast( s, node ):
+    value = s._const( node )
+    if value is not None:
+      return s.num( value & ((1 << node.nbits) - 1) )
+    if node.nbits < _nbits( node.value ):
+      return f"({s.visit( node.value )} & {s.mask( node.nbits )})"
+    return s.visit( node.value )
+
+  def visit_StructInst( s, node ):
+    raise TranslationError( s.blk, "bitstructs are not supported!" )
+
+  def visit_IfExp( s, node ):
+    return f"({s.visit( node.body )} if {s.visit( node.cond )} else {s.visit( node.orelse )})"
+
+  def visit_UnaryOp( s, node ):
+    operand = s.visit( node.operand )
+    if isinstance( node.op, bir.Invert ):
+      return f"({operand} ^ {s.mask( _nbits( node ) )})"
+    if isinstance( node.op, bir.Not ):
+      return f"(not {operand})"
+    if isinstance( node.op, bir.UAdd ):
+      return operand
+    if isinstance( node.op, bir.USub ):
+      return f"(-{operand} & {s.mask( _nbits( node ) )})"
+    raise TranslationError( s.blk, f"unrecognized unary operator {node.op}!" )
+
+  def visit_BoolOp( s, node ):
+    op = " and " if isinstance( node.op, bir.And ) else " or "
+    values = [ s.visit( x ) if _nbits( x ) == 1 else f"({s.visit( x )} != 0)"
+               for x in node.values ]
+    return f"({op.join( values )})"
+
+  _binops = {
+    bir.Add : "+", bir.Sub : "-", bir.Mult : "*", bir.Div : "//", bir.Mod : "%",
+    bir.BitAnd : "&", bir.BitOr : "|", bir.BitXor : "^", bir.ShiftRightLogic : ">>",
+  }
+
+  def visit_BinOp( s, node ):
+    l, r  = s.visit( node.left ), s.visit( node.right )
+    nbits = _nbits( node )
+    mask  = s.mask( nbits )
+    op    = node.op
+
+    if isinstance( op, (bir.Add, bir.Sub, bir.Mult) ):
+      return f"(({l} {s._binops[ type(op) ]} {r}) & {mask})"
+
+    if isinstance( op, bir.Pow ):
+      return f"pow( {l}, {r}, {hex( 1 << nbits )} )"
+
+    if isinstance( op, bir.ShiftLeft ):
+      shamt = s._const( node.right )
+      if shamt is None:
+        return f"((({l} << {r}) & {mask}) if {r} < {nbits} else 0)"
+      return f"(({l} << {shamt}) & {mask})" if shamt < nbits else "0"
+
+    if type(op) in s._binops:
+      return f"({l} {s._binops[ type(op) ]} {r})"
+
+    raise TranslationError( s.blk, f"unrecognized binary operator {op}!" )
+
+  _cmpops = {
+    bir.Eq : "==", bir.NotEq : "!=", bir.Lt : "<",
+    bir.LtE : "<=", bir.Gt : ">", bir.GtE : ">=",
+  }
+
+  def visit_Compare( s, node ):
+    return f"({s.visit( node.left )} {s._cmpops[ type(node.op) ]} {s.visit( node.right )})"
@@ -0,0 +1,344 @@
+"""
+========================================================================
+LaneSimPass.py
+========================================================================
+Simulate many independent instances of the same RTL design at once. We
+build on IntegerTickPass: the slot table becomes a NumPy uint64 matrix
+with one row per slot and one column per instance ("lane"), and the
+behavioral RTLIR of every update block is translated into vectorized
+NumPy expressions that operate on whole rows.
+
+Lanes may take different paths through if/else statements, so control
+flow is turned into masked selects. The condition of every if statement
+is evaluated into a boolean lane mask, and every assignment executed
+under a mask only updates the lanes where the mask is set:
+
+  x = _where( mask, new_value, x )
+
+Loops are still Python loops because their bounds are constants. Signal
+arrays indexed by a per-lane value are gathered from and scattered to
+the slot matrix with fancy indexing.
+
+The testbench drives the lanes through batched APIs added to the top
+component instead of the ports:
+
+  m.lane_poke( "in_", values ) # one value per lane or a scalar
+  m.lane_peek( "out" )         # NumPy array with one value per lane
+
+Signals are named relative to the top component, e.g. "alu.out". The
+regular Bits signals are only written back from one lane, by default
+lane 0, before line_trace is called. NumPy is only required when this
+pass is applied. Division by zero evaluates to zero in every lane.
+"""
+from linecache import cache as line_cache
+
+from pymtl3.datatypes import mk_bits
+from pymtl3.passes.BasePass import PassMetadata
+from pymtl3.passes.errors import ModelTypeError, PassOrderError, TranslationError
+from pymtl3.passes.rtlir import BehavioralRTLIR as bir
+
+from .IntegerTickPass import BehavioralRTLIRToIntPyVisitor, IntegerTickPass, _nbits
+
+
+def _lane_helpers( np ):
+
+  def _u( x ):
+    return np.asarray( x, dtype=np.uint64 )
+
+  def _parity( v ):
+    v = _u( v )
+    for shamt in ( 32, 16, 8, 4, 2, 1 ):
+      v = v ^ (v >> shamt)
+    return v & 1
+
+  def _pow( l, r ):
+    return np.power( _u( l ), _u( r ) )
+
+  def _div( l, r ):
+    r = _u( r )
+    return np.where( r != 0, l // np.maximum( r, 1 ), 0 )
+
+  def _mod( l, r ):
+    r = _u( r )
+    return np.where( r != 0, l % np.maximum( r, 1 ), 0 )
+
+  return { "_u": _u, "_parity": _parity, "_pow": _pow, "_div": _div, "_mod": _mod,
+           "_where": np.where, "_asarray": np.asarray }
+
+class LaneSimPass( IntegerTickPass ):
+
+  def __init__( self, nlanes=64 ):
+    self.nlanes = nlanes
+
+  def __call__( self, top ):
+    import numpy as np
+
+    if not hasattr( top, "_sched" ) or not hasattr( top._sched, "schedule" ):
+      raise PassOrderError( "schedule" )
+
+    if top._dsl.all_method_ports:
+      raise ModelTypeError( "RTL designs without method ports" )
+
+    top._int_sim = PassMetadata()
+
+    self.gen_rtlir( top )
+    self.assign_slots( top )
+
+    if any( x > 64 for x in top._int_sim.nbits ):
+      raise ModelTypeError( "designs whose signals are at most 64 bits wide" )
+
+    top._lane_sim = PassMetadata()
+    top._lane_sim.nlanes     = self.nlanes
+    top._lane_sim.trace_lane = 0
+
+    top.tick = self.gen_lane_tick( top, np )
+    self.gen_testbench_apis( top, np )
+
+  #-----------------------------------------------------------------------
+  # gen_lane_tick
+  #-----------------------------------------------------------------------
+
+  def gen_lane_tick( self, top, np ):
+    schedule     = top._sched.schedule
+    genblks      = top._dag.genblks
+    rtlir_upblks = top._int_sim.rtlir_upblks
+    slot_of      = top._int_sim.slot_of
+    nbits        = top._int_sim.nbits
+
+    consts  = {}
+    visitor = BehavioralRTLIRToLanePyVisitor( slot_of, nbits, consts )
+
+    body = []
+    for i, blk in enumerate( schedule ):
+      if blk in genblks:
+        strs = self.gen_net_copy( top, blk )
+        if strs:
+          body.append( f"# {blk.__name__}" )
+          body.extend( strs )
+      elif blk in rtlir_upblks:
+        body.append( f"# {blk.__name__} at {top._dsl.all_upblk_hostobj[ blk ]!r}" )
+        body.extend( visitor.enter( blk, rtlir_upblks[ blk ] ) )
+      elif i == 0: # the double buffer function of SimpleSchedulePass
+        pass
+      else:
+        raise TranslationError( blk, "is not an RTL update block!" )
+
+    bits_types = {}
+    def Bits_name( n ):
+      bits_types[ f"_B{n}" ] = mk_bits( n )
+      return f"_B{n}"
+
+    write_back = [ f"{x!r} = {Bits_name( nbits[k] )}( int( _s[{k}, lane] ) )"
+                   for x, k in sorted( slot_of.items(), key=lambda x: repr(x[0]) ) ]
+
+    # Signals written by update_ff blocks are committed all at once
+    flip = [ "_s[_ff] = _n[_ff]" ] if visitor.ff_slots else []
+
+    helpers = _lane_helpers( np )
+    consts  = { x: np.array( y, dtype=np.uint64 ) for x, y in consts.items() }
+
+    tick_src = "\n    ".join( flip + body ) or "pass"
+    wb_src   = "\n    ".join( write_back ) or "pass"
+
+    src = """
+def compile_lane_tick( s, _s, _n, _ff, _lane, _consts ):
+  {}
+  def lane_tick():
+    {}
+  def write_back( lane ):
+    {}
+  return lane_tick, write_back
+""".format( "; ".join( [ f"{x} = _consts['{x}']" for x in
+                         sorted( list(consts) + list(bits_types) + list(helpers) ) ] ),
+            tick_src, wb_src )
+
+    fname = f"Lane tick of {top.__class__.__name__}"
+    l = {}
+    exec( compile( src, filename=fname, mode="exec" ), l )
+    line_cache[ fname ] = (len(src), None, src.splitlines(), fname )
+
+    consts.update( bits_types )
+    consts.update( helpers )
+
+    nlanes = top._lane_sim.nlanes
+    slots  = np.zeros( (len(nbits), nlanes), dtype=np.uint64 )
+    if nbits:
+      slots[:] = np.array( top._int_sim.slots, dtype=np.uint64 )[:, None]
+
+    top._lane_sim.slots      = slots
+    top._lane_sim.next_slots = next_slots = slots.copy()
+    top._lane_sim.masks      = np.array( [ (1 << n) - 1 for n in nbits ], dtype=np.uint64 )
+    top._lane_sim.src        = src
+
+    ff = np.array( sorted( visitor.ff_slots ), dtype=np.int64 )
+    tick, top._lane_sim.write_back = l['compile_lane_tick']( top, slots, next_slots, ff,
+                                                             np.arange( nlanes ), consts )
+    return tick
+
+  #-----------------------------------------------------------------------
+  # gen_testbench_apis
+  #-----------------------------------------------------------------------
+
+  def gen_testbench_apis( self, top, np ):
+    slots = top._lane_sim.slots
+    masks = top._lane_sim.masks
+    tick  = top.tick
+
+    # "s.alu.out" -> "alu.out"
+    slot_of = { repr(x)[2:]: k for x, k in top._int_sim.slot_of.items() }
+
+    def get_slot( name ):
+      try:
+        return slot_of[ name ]
+      except KeyError:
+        raise KeyError( f"{name} is not a Bits signal of {top}" )
+
+    def lane_poke( name, values ):
+      k = get_slot( name )
+      slots[k] = np.asarray( values ).astype( np.uint64 ) & masks[k]
+
+    def lane_peek( name ):
+      return slots[ get_slot( name ) ].copy()
+
+    def lane_sim_reset():
+      lane_poke( "reset", 1 )
+      tick() # Tick twice to propagate the reset signal
+      tick()
+      lane_poke( "reset", 0 )
+
+    top.lane_poke = lane_poke
+    top.lane_peek = lane_peek
+    top.sim_reset = lane_sim_reset
+
+    if hasattr( top, "line_trace" ):
+      line_trace = top.line_trace
+      write_back = top._lane_sim.write_back
+
+      def lane_sim_line_trace( *args, **kwargs ):
+        write_back( top._lane_sim.trace_lane )
+        return line_trace( *args, **kwargs )
+
+      top.line_trace = lane_sim_line_trace
+
+#-------------------------------------------------------------------------
+# BehavioralRTLIRToLanePyVisitor
+#-------------------------------------------------------------------------
+# Translate the behavioral RTLIR of one update block into vectorized
+# NumPy code. Rows of the slot matrix support the same operators as the
+# ints of the integer visitor, so we only change how assignments under
+# control flow, bound arrays, and operators without a NumPy counterpart
+# are spelled. Booleans are converted to uint64 right away because NumPy
+# promotes mixed bool/int arithmetic to signed types.
+
+class BehavioralRTLIRToLanePyVisitor( BehavioralRTLIRToIntPyVisitor ):
+
+  def enter( s, blk, rtlir ):
+    s.pred   = None
+    s.npreds = 0
+    s.tmps   = set()
+    s.masked_tmps = set()
+    lines = super().enter( blk, rtlir )
+
+    # A temporary written under a mask needs a value in the other lanes
+    return [ f"{x} = 0" for x in sorted( s.masked_tmps ) ] + lines
+
+  def index( s, name, dyn ):
+    return f"{name}[{', '.join( dyn )}]"
+
+  def signal_ref( s, node ):
+    ref, nbits, slots = super().signal_ref( node )
+    if nbits is None: # one slot per lane
+      ref += ", _lane"
+    return ref, nbits, slots
+
+  # ~ of a Python int is negative and cannot be combined with uint64
+  def clear_mask( s, nbits, width, lo ):
+    return f"_u( {s.mask( nbits )} ^ ({s.mask( width )} << ({lo})) )"
+
+  def assign( s, target, value ):
+    if s.pred is None:
+      return f"{target} = {value}"
+    if target in s.tmps:
+      s.masked_tmps.add( target )
+    return f"{target} = _where( {s.pred}, {value}, {target} )"
+
+  #-----------------------------------------------------------------------
+  # Statements
+  #-----------------------------------------------------------------------
+
+  def visit_If( s, node ):
+    s.npreds += 1
+    k     = f"{s.blk_id}_{s.npreds}"
+    outer = s.pred
+    lines = [ f"_c{k} = _asarray( {s.visit( node.cond )} != 0 )" ]
+
+    def branch( cond, name, body ):
+      if outer is None:
+        s.pred = cond
+      else:
+        lines.append( f"{name} = {outer} & {cond}" )
+        s.pred = name
+      lines.extend( s._visit_body( body ) )
+
+    branch( f"_c{k}", f"_p{k}", node.body )
+    if node.orelse:
+      branch( f"~_c{k}", f"_q{k}", node.orelse )
+
+    s.pred = outer
+    return lines
+
+  #-----------------------------------------------------------------------
+  # Expressions
+  #-----------------------------------------------------------------------
+
+  def visit_TmpVar( s, node ):
+    name = super().visit_TmpVar( node )
+    s.tmps.add( name )
+    return name
+
+  def visit_Reduce( s, node ):
+    if isinstance( node.op, bir.BitXor ):
+      return f"_parity( {s.visit( node.value )} )"
+    return f"_u{super().visit_Reduce( node )}"
+
+  def visit_IfExp( s, node ):
+    return f"_where( {s.visit( node.cond )} != 0, {s.visit( node.body )}, {s.visit( node.orelse )} )"
+
+  def visit_UnaryOp( s, node ):
+    if isinstance( node.op, bir.Not ):
+      return f"_u( {s.visit( node.operand )} == 0 )"
+    return super().visit_UnaryOp( node )
+
+  def visit_BoolOp( s, node ):
+    op = " & " if isinstance( node.op, bir.And ) else " | "
+    return f"_u( {op.join( [ f'({s.visit( x )} != 0)' for x in node.values ] )} )"
+
+  def visit_Compare( s, node ):
+    return f"_u{super().visit_Compare( node )}"
+
+  def visit_BinOp( s, node ):
+    op = node.op
+    if not isinstance( op, (bir.Pow, bir.Div, bir.Mod, bir.ShiftLeft, bir.ShiftRightLogic) ):
+      return super().visit_BinOp( node )
+
+    nbits = _nbits( node )
+    shamt = s._const( node.right )
+
+    # NumPy does not define shifts of uint64 by 64 or more
+    if isinstance( op, bir.ShiftLeft ) and shamt is not None:
+      return super().visit_BinOp( node )
+
+    if isinstance( op, bir.ShiftRightLogic ) and shamt is not None:
+      return super().visit_BinOp( node ) if shamt < 64 else "0"
+
+    l, r = s.visit( node.left ), s.visit( node.right )
+
+    if isinstance( op, bir.Pow ):
+      return f"(_pow( {l}, {r} ) & {s.mask( nbits )})"
+    if isinstance( op, bir.Div ):
+      return f"_div( {l}, {r} )"
+    if isinstance( op, bir.Mod ):
+      return f"_mod( {l}, {r} )"
+    if isinstance( op, bir.ShiftLeft ):
+      return f"_where( {r} < {nbits}, ({l} << {r}) & {s.mask( nbits )}, 0 )"
+    return f"_where( {r} < 64, {l} >> {r}, 0 )"
@@ -4,53 +4,123 @@ TraceBreakingSchedTickPas.py
 -------------------------------------------------------------------------
 Generate the schedule and tick with trace breaking + heuristic toposort.
 
+By default the branchiness of each update block is estimated statically
+by counting branches in its AST. In the profile-guided mode the pass
+first installs an instrumented tick that runs for `warmup` cycles and
+records the execution time and the distribution of control-flow paths
+of every block. The entropy of the path distribution replaces the static
+estimate: a block full of branches that always takes the same path is
+as good as a straight-line block for a tracing JIT. After the warm-up
+the meta blocks are re-formed and the trace-breaking tick replaces the
+instrumented one. The profile can be saved to and loaded from a file.
+
 Author : Shunning Jiang
 Date   : Dec 26, 2018
 """
-import py
-from graphviz import Digraph
+import math
+import os
+import sys
+from collections import Counter
+from heapq import heappop, heappush
 
 from pymtl3.dsl import *
 from pymtl3.passes.BasePass import BasePass, PassMetadata
 from pymtl3.passes.errors import PassOrderError
-from pymtl3.passes.SimpleSchedulePass import check_schedule
+from pymtl3.passes.SimpleSchedulePass import check_schedule, make_double_buffer_func
+
+from .HeuristicTopoPass import CountBranches, load_profile, profile_key, save_profile
 
-from .HeuristicTopoPass import CountBranches
+try:
+  from time import perf_counter_ns
+except ImportError: # Python < 3.7
+  from time import perf_counter
+  def perf_counter_ns():
+    return int( perf_counter() * 1e9 )
 
 
 class TraceBreakingSchedTickPass( BasePass ):
+
+  def __init__( self, profile=None, warmup=0, branchiness_factor=8,
+                branchy_block_factor=4 ):
+    # Branchiness factor is the bound of branchiness in a meta block.
+    self.branchiness_factor   = branchiness_factor
+    # Block factor is the bound of the number of branchy blocks in a
+    # meta block.
+    self.branchy_block_factor = branchy_block_factor
+
+    self.profile = profile
+    self.warmup  = warmup
+
   def __call__( self, top ):
     if not hasattr( top._dag, "all_constraints" ):
       raise PassOrderError( "all_constraints" )
 
     top._sched = PassMetadata()
 
-    self.meta_schedule( top )
-    self.trace_breaking_tick( top )
+    profile = None
+    if not self.warmup and self.profile and os.path.exists( self.profile ):
+      profile = load_profile( self.profile )
 
-  def meta_schedule( self, top ):
+    self.meta_schedule( top, profile )
 
-    # Construct the graph
+    if self.warmup:
+      self.profiling_tick( top )
+    else:
+      self.trace_breaking_tick( top )
 
-    V   = top._dag.final_upblks
-    E   = top._dag.all_constraints
-    Es  = { v: [] for v in V }
-    InD = { v: 0  for v in V }
-
-    for (u, v) in E: # u -> v
-      InD[v] += 1
-      Es [u].append( v )
+  #-----------------------------------------------------------------------
+  # get_branchiness
+  #-----------------------------------------------------------------------
+  # Profiled branchiness is the entropy (in bits) of the control-flow
+  # paths taken by the block, so it is in the same unit as the static
+  # count where each branch contributes at most one bit.
 
-    # Extract branchiness
+  def get_branchiness( self, top, V, profile=None ):
 
     # Initialize all generated net block to 0 branchiness
     branchiness = { x: 0 for x in top._dag.genblks }
+    cost = { x: 0 for x in V }
 
     visitor = CountBranches()
     for blk in top.get_all_update_blocks():
       hostobj = top.get_update_block_host_component( blk )
       branchiness[ blk ] = visitor.enter( hostobj.get_update_block_info( blk )[-1] )
 
+    if profile is not None:
+      for blk in V:
+        key = profile_key( top, blk )
+        if key in profile:
+          branchiness[ blk ] = profile[ key ][ "entropy" ]
+          cost       [ blk ] = profile[ key ][ "time_ns" ] / max( 1, profile[ key ][ "calls" ] )
+
+    return branchiness, cost
+
+  #-----------------------------------------------------------------------
+  # meta_schedule
+  #-----------------------------------------------------------------------
+
+  def meta_schedule( self, top, profile=None ):
+
+    # Construct the graph. The update_ff blocks always go to the end of
+    # the tick after the double buffer flip and combinational blocks.
+
+    update_ff = top.get_all_update_ff()
+
+    V   = top._dag.final_upblks - update_ff
+    E   = top._dag.all_constraints
+    Es  = { v: [] for v in V }
+    InD = { v: 0  for v in V }
+
+    for (u, v) in E: # u -> v
+      if u in V and v in V:
+        InD[v] += 1
+        Es [u].append( v )
+
+    # Extract branchiness and the profiled per-call cost, which is used
+    # to break ties between blocks of the same branchiness
+
+    branchiness, cost = self.get_branchiness( top, V, profile )
+
     # Shunning: now we make the scheduling aware of meta blocks
     # Basically we enhance the topological sort to choose
     # branchy/unbranchy block based on the progress of the current meta
@@ -59,32 +129,15 @@ class TraceBreakingSchedTickPass( BasePass ):
     # block, we then append a couple of branchy blocks till the
     # branchiness bound is reached, after which we break the trace.
     #
-    # TODO now I'm using binary-search. Ideally a double-ended
-    # priority queue or a balanced binary search tree (AVL/Treap/RB) can
-    # reduce it to O(nlogn). I didn't find any efficient python impl.
-
-    def insert_sortedlist( arr, priority, item ):
-      left, right = 0, len(arr)
-      while left < right-1:
-        mid = (left + right) >> 1
-        if priority <= arr[mid][0]:
-          right = mid
-        else:
-          left = mid
-      arr.insert( right, (priority, item) )
+    # We use a double-ended priority queue to keep it O(nlogn).
 
-    Q = []
+    Q = DoubleEndedPriorityQueue()
     for v in V:
       if not InD[v]:
-        br = branchiness[ v ]
-        insert_sortedlist( Q, br, v )
+        Q.push( (branchiness[ v ], cost[ v ]), v )
 
-    # Branchiness factor is the bound of branchiness in a meta block.
-    branchiness_factor = 8
-
-    # Block factor is the bound of the number of branchy blocks in a
-    # meta block.
-    branchy_block_factor = 4
+    branchiness_factor   = self.branchiness_factor
+    branchy_block_factor = self.branchy_block_factor
 
     schedule = []
 
@@ -95,7 +148,7 @@ class TraceBreakingSchedTickPass( BasePass ):
     while Q:
       # If currently there is no branchiness, append less branchy block
       if current_branchiness == 0:
-        (br, u) = Q.pop(0)
+        (br, _), u = Q.pop_min()
 
         # Update the current
         current_blk_count += 1
@@ -110,7 +163,7 @@ class TraceBreakingSchedTickPass( BasePass ):
       # We already append a branchy block
       else:
         # Find the most branchy block
-        (br, u) = Q.pop()
+        (br, _), u = Q.pop_max()
 
         # If no branchy block available, directly start a new metablock
 
@@ -141,24 +194,32 @@ class TraceBreakingSchedTickPass( BasePass ):
       for v in Es[u]:
         InD[v] -= 1
         if not InD[v]:
-          insert_sortedlist( Q, branchiness[ v ], v )
+          Q.push( (branchiness[ v ], cost[ v ]), v )
 
     # Append the last meta block
     if current_meta:
       metas.append( current_meta )
 
+    check_schedule( top, schedule, V, [ (u, v) for (u, v) in E
+                                        if u in V and v in V ], InD )
+
+    # Put the double buffer flip in front and update_ff blocks at the end
+
+    metas.insert( 0, [ make_double_buffer_func( top ) ] )
+    if update_ff:
+      metas.append( sorted( update_ff, key=lambda x: profile_key( top, x ) ) )
+
     print("num_metablks:", len(metas))
 
     for meta in metas:
       print("---------------")
       for blk in meta:
-        print(" - {}: {}".format( blk.__name__, branchiness[ blk ] ))
+        print(" - {}: {}".format( blk.__name__, branchiness.get( blk, 0 ) ))
 
     top._sched.meta_schedule = metas
+    top._sched.schedule      = [ x for meta in metas for x in meta ]
     self.branchiness = branchiness
 
-    check_schedule( top, schedule, V, E, InD )
-
   def trace_breaking_tick( self, top ):
     metas = top._sched.meta_schedule
 
@@ -177,7 +238,7 @@ class TraceBreakingSchedTickPass( BasePass ):
       for j in range( len(meta) ):
         blk = meta[j]
         schedule_names[ (i, j) ] = "[br: {}] {}" \
-          .format( self.branchiness[ blk ], blk.__name__ )
+          .format( self.branchiness.get( blk, 0 ), blk.__name__ )
 
         # Copy the scheduled functions to update_blkX__Y
         gen_tick_src += "update_blk{0}__{1} = metas[{0}][{1}];".format( i, j )
@@ -200,8 +261,144 @@ class TraceBreakingSchedTickPass( BasePass ):
     gen_tick_src += "\ndef tick_top():\n  "
     gen_tick_src += "; ".join( [ "meta_blk{}()".format(i) for i in range(len(metas)) ] )
 
+    import py
     local = locals()
     exec(py.code.Source( gen_tick_src ).compile(), local )
 
     #  print gen_tick_src
     top.tick = local["tick_top"]
+
+  #-----------------------------------------------------------------------
+  # profiling_tick
+  #-----------------------------------------------------------------------
+  # Even cycles time every block, odd cycles record the lines executed by
+  # the blocks that have branches. We don't do both in the same cycle
+  # since tracing distorts the timing.
+
+  def profiling_tick( self, top ):
+    schedule = top._sched.schedule
+    update_blocks = top.get_all_update_blocks()
+    traced = [ x for x in schedule
+               if x in update_blocks and self.branchiness.get( x, 0 ) > 0 ]
+
+    calls   = { x: 0 for x in schedule }
+    time_ns = { x: 0 for x in schedule }
+    paths   = { x: Counter() for x in traced }
+    ncycles = 0
+
+    def tick_timed():
+      for blk in schedule:
+        t0 = perf_counter_ns()
+        blk()
+        time_ns[ blk ] += perf_counter_ns() - t0
+        calls  [ blk ] += 1
+
+    def tick_traced():
+      for blk in schedule:
+        if blk in paths:
+          paths[ blk ][ trace_lines( blk ) ] += 1
+        else:
+          blk()
+
+    def profiling_tick():
+      nonlocal ncycles
+      if ncycles >= self.warmup:
+        return top.tick()
+
+      if ncycles & 1: tick_traced()
+      else:           tick_timed()
+      ncycles += 1
+
+      if ncycles == self.warmup:
+        profile = {}
+        for blk in schedule:
+          if blk in update_blocks or blk in top._dag.genblks:
+            profile[ profile_key( top, blk ) ] = {
+              "calls"   : calls[ blk ],
+              "time_ns" : time_ns[ blk ],
+              "entropy" : path_entropy( paths[ blk ] ) if blk in paths else 0,
+            }
+
+        top._sched.profile = profile
+        if self.profile:
+          save_profile( self.profile, profile, ncycles )
+
+        self.meta_schedule( top, profile )
+        self.trace_breaking_tick( top )
+
+    top.tick = profiling_tick
+
+#-------------------------------------------------------------------------
+# Helpers for the profile-guided mode
+#-------------------------------------------------------------------------
+
+# Return the line numbers executed by one call to the block as the
+# signature of the control-flow path it took. Functions called by the
+# block are not traced.
+
+def trace_lines( blk ):
+  code  = blk.__code__
+  lines = []
+
+  def local_trace( frame, event, arg ):
+    if event == "line":
+      lines.append( frame.f_lineno )
+    return local_trace
+
+  def global_trace( frame, event, arg ):
+    if frame.f_code is code:
+      return local_trace
+    return None
+
+  old_trace = sys.gettrace()
+  sys.settrace( global_trace )
+  try:
+    blk()
+  finally:
+    sys.settrace( old_trace )
+  return tuple( lines )
+
+def path_entropy( paths ):
+  total = sum( paths.values() )
+  if not total:
+    return 0
+  return max( 0.0, -sum( n / total * math.log2( n / total ) for n in paths.values() ) )
+
+#-------------------------------------------------------------------------
+# DoubleEndedPriorityQueue
+#-------------------------------------------------------------------------
+# Two heaps with lazy deletion. Items of the same priority are popped in
+# insertion order from both ends for a deterministic schedule.
+
+class DoubleEndedPriorityQueue:
+
+  def __init__( s ):
+    s.min_heap = []
+    s.max_heap = []
+    s.popped   = set()
+    s.count    = 0
+    s.size     = 0
+
+  def __len__( s ):
+    return s.size
+
+  def push( s, priority, item ):
+    s.count += 1
+    s.size  += 1
+    heappush( s.min_heap, ( priority, s.count, item ) )
+    heappush( s.max_heap, ( tuple( -x for x in priority ), s.count, item ) )
+
+  def _pop( s, heap ):
+    while True:
+      priority, idx, item = heappop( heap )
+      if idx not in s.popped:
+        s.popped.add( idx )
+        s.size -= 1
+        return priority, item
+
+  def pop_min( s ):
+    return s._pop( s.min_heap )
+
+  def pop_max( s ):
+    priority, item = s._pop( s.max_heap )
+    return tuple( -x for x in priority ), item
@@ -8,8 +8,6 @@ Author : Shunning Jiang
 Date   : Dec 26, 2018
 """
 
-import py
-
 from pymtl3.passes.BasePass import BasePass
 from pymtl3.passes.errors import PassOrderError
 
@@ -35,6 +33,7 @@ class UnrollTickPass( BasePass ):
                         range( len( schedule ) ) ) ),
                         "\n          ".join( strs ) )
 
+    import py
     l = {}
     exec(py.code.Source( gen_tick_src ).compile(), l)
     return l['compile_unroll']( schedule )
@@ -82,8 +82,6 @@ class BehavioralRTLIRNodeVisitor:
 
 import os
 
-from graphviz import Digraph
-
 from pymtl3.passes.BasePass import BasePass
 from pymtl3.passes.rtlir.rtype.RTLIRType import BaseRTLIRType
 
@@ -112,6 +110,8 @@ class BehavioralRTLIRVisualizationVisitor( BehavioralRTLIRNodeVisitor ):
     s.table_trail = ' </TABLE>>'
 
   def init( s, name ):
+    # graphviz is only needed when something is visualized
+    from graphviz import Digraph
     s.g = Digraph(
       comment = 'BehavioralRTLIR Visualization of ' + name,
       node_attr = { 'shape' : 'plaintext' }
@@ -9,8 +9,6 @@ format.  This file is automatically generated by BehavioralRTLIRImplGen.py.
 
 import os
 
-from graphviz import Digraph
-
 from pymtl3.passes.BasePass import BasePass
 from pymtl3.passes.rtlir.rtype.RTLIRType import BaseRTLIRType
 
@@ -34,6 +32,8 @@ class BehavioralRTLIRVisualizationVisitor( BehavioralRTLIRNodeVisitor ):
     s.table_trail = ' </TABLE>>'
 
   def init( s, name ):
+    # graphviz is only needed when something is visualized
+    from graphviz import Digraph
     s.g = Digraph(
       comment = 'BehavioralRTLIR Visualization of ' + name,
       node_attr = { 'shape' : 'plaintext' }
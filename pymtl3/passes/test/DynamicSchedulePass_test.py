@@ -202,3 +202,134 @@ def test_connect_slice_int():
     assert str(e).startswith( "'int' object is not subscriptable" )
     return
   raise Exception("Should've thrown TypeError: 'int' object is not subscriptable")
+
+def test_dirty_double_buffer():
+  from pymtl3.datatypes import Bits8, PythonBits, bitstruct
+
+  @bitstruct
+  class Pair:
+    lo: Bits8
+    hi: Bits8
+
+  class Top( Component ):
+
+    def construct( s ):
+      s.en  = InPort( Bits8 )
+      s.cnt = Wire( Bits8 )
+      s.acc = Wire( Bits8 )
+      s.pair = Wire( Pair )
+      s.out = OutPort( Bits8 )
+
+      @s.update_ff
+      def up_cnt():
+        s.cnt <<= s.cnt + Bits8(1)
+
+      # Only written every other cycle
+      @s.update_ff
+      def up_acc():
+        if s.en:
+          s.acc  <<= s.acc + s.cnt
+          s.pair <<= Pair( s.cnt, s.acc )
+
+      @s.update
+      def up_out():
+        s.out = s.acc + s.pair.lo + s.pair.hi
+
+  def run( sched_pass ):
+    A = Top()
+    A.elaborate()
+    A.apply( GenDAGPass() )
+    A.apply( sched_pass )
+    A.apply( SimpleTickPass() )
+    A.lock_in_simulation()
+    return A
+
+  for cls in [ SimpleSchedulePass, DynamicSchedulePass ]:
+    ref = run( cls() )
+    # Interleave two simulators with dirty-set double buffering and one
+    # without to make sure they do not flip each other's registers
+    A   = run( cls( dirty_double_buffer=True ) )
+    B   = run( cls( dirty_double_buffer=True ) )
+    assert A._sched.schedule[0].__name__ == "dirty_double_buffer"
+
+    for i in range(20):
+      ref.en = A.en = B.en = Bits8( i % 2 )
+      ref.tick()
+      A.tick()
+      B.tick()
+      assert A.out == B.out == ref.out
+      assert A.cnt == B.cnt == ref.cnt
+    assert ref.out > 0
+
+    # Neither <<= in the test bench nor a model that is locked in while
+    # another one is being simulated may end up in a dirty list
+    assert PythonBits._dirty is None
+    x = Bits8( 0 )
+    x <<= Bits8( 5 )
+
+    foreign = []
+    prev = PythonBits._set_dirty_list( foreign )
+    C    = run( cls( dirty_double_buffer=True ) )
+    assert PythonBits._set_dirty_list( prev ) is foreign
+    assert not foreign
+    ref2 = run( cls() )
+
+    for i in range(20):
+      ref.en = ref2.en = A.en = B.en = C.en = Bits8( i % 3 == 0 )
+      A.tick()
+      C.tick()
+      ref2.tick()
+      B.tick()
+      ref.tick()
+      assert A.out == B.out == ref.out
+      assert C.out == ref2.out
+      assert C.cnt == ref2.cnt
+    assert x == 0
+
+def test_scc_worklist_fixed_point():
+
+  class Top( Component ):
+
+    def construct( s ):
+      s.a = Wire( int )
+      s.b = Wire( int )
+      s.c = Wire( int )
+      s.d = Wire( Bits32 )
+
+      @s.update
+      def up_a():
+        s.a = s.b + 1 if s.b < 5 else s.b
+
+      @s.update
+      def up_b():
+        s.b = s.a
+
+      @s.update
+      def up_c():
+        s.c = s.a + 1
+
+      @s.update
+      def up_d():
+        s.d = Bits32( s.c ) + Bits32( 1 )
+
+  A = Top()
+  A.elaborate()
+  A.apply( GenDAGPass() )
+  A.apply( DynamicSchedulePass() )
+  A.apply( SimpleTickPass() )
+  A.lock_in_simulation()
+
+  A.tick()
+  assert A.a == A.b == 5 and A.c == 6 and A.d == 7
+
+  # Only up_a and up_b form a loop
+  (stats,) = A._sched.scc_stats.values()
+  assert sorted( stats.blocks ) == [ "up_a", "up_b" ]
+  assert stats.calls == 1
+  assert stats.iterations == 6
+  # up_b is skipped in the last sweep if it is scheduled after up_a
+  assert stats.executions in ( 11, 12 )
+
+  A.tick()
+  assert stats.calls == 2
+  assert stats.iterations == 6 + 1
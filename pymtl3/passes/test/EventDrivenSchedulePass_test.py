@@ -0,0 +1,139 @@
+"""
+========================================================================
+EventDrivenSchedulePass_test.py
+========================================================================
+"""
+from collections import deque
+
+from pymtl3.datatypes import Bits1, Bits8, Bits32
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import EventDrivenSim, SimpleSim
+from pymtl3.stdlib.rtl import RegEn
+
+
+class AddOne( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+
+    @s.update
+    def up_add():
+      s.out = s.in_ + 1
+
+class Mux2( Component ):
+  def construct( s ):
+    s.in0 = InPort( Bits32 )
+    s.in1 = InPort( Bits32 )
+    s.sel = InPort( Bits1 )
+    s.out = OutPort( Bits32 )
+
+    @s.update
+    def up_mux():
+      if s.sel: s.out = s.in1
+      else:     s.out = s.in0
+
+class Chain( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.en  = InPort( Bits1 )
+    s.sel = InPort( Bits1 )
+    s.out = OutPort( Bits32 )
+
+    s.add0 = AddOne()( in_ = s.in_ )
+    s.add1 = AddOne()( in_ = s.add0.out )
+    s.reg  = RegEn( Bits32 )( in_ = s.add1.out, en = s.en )
+    s.mux  = Mux2()( in0 = s.add1.out, in1 = s.reg.out, sel = s.sel )
+    s.mux.out //= s.out
+
+  def line_trace( s ):
+    return f"{s.in_} {s.en} {s.sel} > {s.out}"
+
+def _run( cls, Sim, vectors ):
+  m = cls()
+  m.apply( Sim )
+  m.sim_reset()
+
+  outs = []
+  for in_, en, sel in vectors:
+    m.in_ = Bits32( in_ )
+    m.en  = Bits1( en )
+    m.sel = Bits1( sel )
+    m.tick()
+    outs.append( int(m.out) )
+    print( m.line_trace() )
+  return m, outs
+
+def test_event_driven_matches_simple():
+  vectors = [ (1, 1, 0), (1, 0, 1), (1, 0, 1), (5, 0, 0),
+              (5, 1, 1), (5, 0, 1), (7, 0, 1), (7, 1, 0) ]
+  _, ref = _run( Chain, SimpleSim, vectors )
+  m, out = _run( Chain, EventDrivenSim, vectors )
+  assert out == ref
+
+def test_idle_blocks_are_skipped():
+
+  counter = []
+
+  class Counted( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits8 )
+
+      @s.update
+      def up_counted():
+        counter.append( s.in_ )
+        s.out = s.in_ + 1
+
+  m = Counted()
+  m.apply( EventDrivenSim )
+  m.sim_reset()
+
+  counter.clear()
+  for i in range(10):
+    m.in_ = Bits8( 3 )
+    m.tick()
+    assert m.out == 4
+
+  # The input never changed after the first tick
+  assert len(counter) == 1
+
+  m.in_ = Bits8( 9 )
+  m.tick()
+  assert m.out == 10
+  assert len(counter) == 2
+
+def test_impure_block_always_active():
+
+  class Src( Component ):
+    def construct( s ):
+      s.out = OutPort( Bits8 )
+      s.msgs = deque( [ Bits8(x) for x in range(8) ] )
+
+      @s.update
+      def up_src():
+        if s.msgs:
+          s.out = s.msgs.popleft()
+
+  class Sink( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits8 )
+
+      @s.update
+      def up_sink():
+        s.out = s.in_ + 1
+
+  class Top( Component ):
+    def construct( s ):
+      s.src = Src()
+      s.add = Sink()( in_ = s.src.out )
+
+  m = Top()
+  m.apply( EventDrivenSim )
+  assert [ x.__name__ for x in m._sched.always_active ] == [ "up_src" ]
+
+  outs = []
+  for i in range(8):
+    m.tick()
+    outs.append( int(m.add.out) )
+  assert outs == list(range(1, 9))
@@ -0,0 +1,145 @@
+"""
+========================================================================
+FusedTickPass_test.py
+========================================================================
+"""
+import sys
+
+from pymtl3.datatypes import Bits1, Bits8, Bits32
+from pymtl3.dsl import *
+from pymtl3.passes.PassGroups import FusedSim, SimpleSim
+
+
+class Scale( Component ):
+  def construct( s, k ):
+    s.in_ = InPort( Bits32 )
+    s.out = OutPort( Bits32 )
+
+    @s.update
+    def up_scale():
+      tmp = s.in_
+      for i in range( k - 1 ):
+        tmp = tmp + s.in_
+      s.out = tmp
+
+class Acc( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.en  = InPort( Bits1 )
+    s.out = OutPort( Bits32 )
+
+    @s.update_ff
+    def up_acc():
+      if s.en:
+        s.out <<= s.out + s.in_
+
+class Top( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits32 )
+    s.en  = InPort( Bits1 )
+    s.out = OutPort( Bits32 )
+
+    s.scale0 = Scale( 2 )( in_ = s.in_ )
+    s.scale1 = Scale( 3 )( in_ = s.in_ )
+    s.acc = Acc()( en = s.en )
+
+    @s.update
+    def up_sum():
+      tmp = s.scale0.out
+      s.acc.in_ = tmp + s.scale1.out
+
+    @s.update
+    def up_out():
+      tmp = s.acc.out
+      s.out = tmp
+
+  def line_trace( s ):
+    return f"{s.in_} {s.en} > {s.out}"
+
+def _run( Sim, vectors ):
+  m = Top()
+  m.apply( Sim )
+  m.sim_reset()
+
+  outs = []
+  for in_, en in vectors:
+    m.in_ = Bits32( in_ )
+    m.en  = Bits1( en )
+    m.tick()
+    outs.append( int(m.out) )
+    print( m.line_trace() )
+  return m, outs
+
+def test_fused_matches_simple():
+  vectors = [ (1, 1), (2, 1), (3, 0), (4, 1), (0, 1), (7, 0) ]
+  _, ref = _run( SimpleSim, vectors )
+  m, out = _run( FusedSim, vectors )
+  assert out == ref
+
+  # Every update block and net block is inlined
+  upblks = m.get_all_update_blocks() | m._dag.genblks
+  assert len(m._sched.fused_blocks) == len(upblks)
+  assert not any( x in upblks for x in m._sched.unfused_blocks )
+
+def test_unsafe_block_is_called():
+
+  class Saturate( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits8 )
+      s.out = OutPort( Bits8 )
+
+      @s.update
+      def up_saturate():
+        if s.in_ > 100:
+          s.out = Bits8( 100 )
+          return
+        s.out = s.in_
+
+  m = Saturate()
+  m.apply( FusedSim )
+  assert [ x.__name__ for x in m._sched.unfused_blocks
+           if x in m.get_all_update_blocks() ] == [ "up_saturate" ]
+
+  for in_, ref in [ (3, 3), (101, 100), (100, 100) ]:
+    m.in_ = Bits8( in_ )
+    m.tick()
+    assert m.out == ref
+
+# Bits objects are mutable, so the fused tick has to look these up every
+# time instead of binding the values when it is generated
+
+_offset = Bits32( 10 )
+
+def test_free_variables_are_looked_up( monkeypatch ):
+
+  class Offset( Component ):
+    def construct( s ):
+      s.in_ = InPort( Bits32 )
+      s.out = OutPort( Bits32 )
+
+      k = Bits32( 2 )
+
+      @s.update
+      def up_offset():
+        s.out = s.in_ + k + _offset
+
+      def set_k( v ):
+        nonlocal k
+        k = v
+      s.set_k = set_k
+
+  for Sim in [ SimpleSim, FusedSim ]:
+    m = Offset()
+    m.apply( Sim )
+    if Sim is FusedSim:
+      assert len(m._sched.fused_blocks) == len(m._sched.schedule) - 1
+
+    m.in_ = Bits32( 1 )
+    m.tick()
+    assert m.out == 13
+
+    m.set_k( Bits32( 3 ) )
+    monkeypatch.setattr( sys.modules[ __name__ ], "_offset", Bits32( 20 ) )
+    m.tick()
+    assert m.out == 24
+    monkeypatch.undo()
@@ -0,0 +1,118 @@
+"""
+========================================================================
+LaneSimPass_test.py
+========================================================================
+"""
+import random
+
+import pytest
+
+from pymtl3.datatypes import Bits1, Bits2, Bits3, Bits4, Bits8
+from pymtl3.dsl import Component, InPort, OutPort
+from pymtl3.passes.GenDAGPass import GenDAGPass
+from pymtl3.passes.mamba.LaneSimPass import LaneSimPass
+from pymtl3.passes.PassGroups import SimpleSim
+from pymtl3.passes.SimpleSchedulePass import SimpleSchedulePass
+from pymtl3.passes.test.IntegerTickPass_test import Top
+
+np = pytest.importorskip( "numpy" )
+
+def _run_simple( vectors ):
+  m = Top()
+  m.apply( SimpleSim )
+  m.sim_reset()
+
+  outs = []
+  for a, b, en in vectors:
+    m.a  = Bits8( a )
+    m.b  = Bits8( b )
+    m.en = Bits1( en )
+    m.tick()
+    outs.append( (int(m.out), int(m.lo), int(m.hi), int(m.reg.out)) )
+  return outs
+
+def _lane_sim( nlanes, Top=Top ):
+  m = Top()
+  m.elaborate()
+  m.apply( GenDAGPass() )
+  m.apply( SimpleSchedulePass() )
+  m.apply( LaneSimPass( nlanes ) )
+  m.lock_in_simulation()
+  return m
+
+def test_lanes_match_simple():
+  rng     = random.Random( 0xdeadbeef )
+  nlanes  = 16
+  ncycles = 12
+  vectors = [ [ (rng.randrange(256), rng.randrange(256), rng.randrange(2))
+                for _ in range(ncycles) ] for _ in range(nlanes) ]
+
+  m = _lane_sim( nlanes )
+  m.sim_reset()
+
+  outs = []
+  for i in range( ncycles ):
+    m.lane_poke( "a",  [ x[i][0] for x in vectors ] )
+    m.lane_poke( "b",  [ x[i][1] for x in vectors ] )
+    m.lane_poke( "en", [ x[i][2] for x in vectors ] )
+    m.tick()
+    outs.append( list( zip( m.lane_peek( "out" ), m.lane_peek( "lo" ),
+                            m.lane_peek( "hi" ), m.lane_peek( "reg.out" ) ) ) )
+
+  for lane in range( nlanes ):
+    ref = _run_simple( vectors[lane] )
+    assert [ tuple( int(y) for y in x[lane] ) for x in outs ] == ref
+
+def test_poke_scalar_and_line_trace():
+  m = _lane_sim( 4 )
+  m.sim_reset()
+
+  m.lane_poke( "a", 3 )
+  m.lane_poke( "b", [ 1, 2, 5, -1 ] ) # negative values wrap around
+  m.lane_poke( "en", 0 )
+  m.tick()
+
+  assert list( m.lane_peek( "b" ) ) == [ 1, 2, 5, 255 ]
+  assert list( m.lane_peek( "hi" ) ) == [ 0x50 ] * 4
+
+  # The line trace shows the selected lane
+  m._lane_sim.trace_lane = 3
+  assert m.line_trace().startswith( "03 ff 0" )
+
+  with pytest.raises( KeyError ):
+    m.lane_peek( "nonexistent" )
+
+class DynamicPartial( Component ):
+  def construct( s ):
+    s.idx = InPort( Bits2 )
+    s.sel = InPort( Bits3 )
+    s.x   = InPort( Bits4 )
+    s.out = [ OutPort( Bits8 ) for _ in range(4) ]
+
+    @s.update
+    def up_dynamic_partial():
+      for i in range(4):
+        s.out[i] = Bits8(0)
+      s.out[s.idx][0:4] = s.x
+      s.out[s.idx][s.sel] = Bits1(1)
+
+def test_dynamic_partial_assign():
+  rng     = random.Random( 0xcafe )
+  nlanes  = 8
+  vectors = [ (rng.randrange(4), rng.randrange(8), rng.randrange(16)) for _ in range(nlanes) ]
+
+  m = _lane_sim( nlanes, DynamicPartial )
+  m.lane_poke( "idx", [ x[0] for x in vectors ] )
+  m.lane_poke( "sel", [ x[1] for x in vectors ] )
+  m.lane_poke( "x",   [ x[2] for x in vectors ] )
+  m.tick()
+
+  for lane, (idx, sel, x) in enumerate( vectors ):
+    ref = DynamicPartial()
+    ref.apply( SimpleSim )
+    ref.idx = Bits2( idx )
+    ref.sel = Bits3( sel )
+    ref.x   = Bits4( x )
+    ref.tick()
+    assert [ int( m.lane_peek( f"out[{i}]" )[lane] ) for i in range(4) ] == \
+           [ int( ref.out[i] ) for i in range(4) ]
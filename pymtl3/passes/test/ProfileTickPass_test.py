@@ -0,0 +1,116 @@
+"""
+========================================================================
+ProfileTickPass_test.py
+========================================================================
+"""
+import json
+
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl import *
+from pymtl3.passes.CLLineTracePass import CLLineTracePass
+from pymtl3.passes.DynamicSchedulePass import DynamicSchedulePass
+from pymtl3.passes.GenDAGPass import GenDAGPass
+from pymtl3.passes.ProfileTickPass import ProfileTickPass
+from pymtl3.passes.SimpleSchedulePass import SimpleSchedulePass
+from pymtl3.passes.SimpleTickPass import SimpleTickPass
+
+
+class Incr( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @s.update
+    def up_incr():
+      s.out = s.in_ + Bits8(1)
+
+class Top( Component ):
+  def construct( s ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    s.incr0 = Incr()( in_ = s.in_ )
+    s.incr1 = Incr()( in_ = s.incr0.out )
+
+    s.reg = Wire( Bits8 )
+
+    @s.update_ff
+    def up_reg():
+      s.reg <<= s.incr1.out
+
+    @s.update
+    def up_out():
+      s.out = s.reg
+
+def _sim( m, sched_pass, prof_pass ):
+  m.elaborate()
+  m.apply( GenDAGPass() )
+  m.apply( sched_pass )
+  m.apply( CLLineTracePass() )
+  m.apply( prof_pass )
+  m.apply( SimpleTickPass() )
+  m.lock_in_simulation()
+  return m
+
+def test_exact( tmp_path ):
+  m = _sim( Top(), SimpleSchedulePass(), ProfileTickPass() )
+  for i in range(10):
+    m.in_ = Bits8( i )
+    m.tick()
+    assert i == 0 or m.out == i + 1
+
+  json_file      = str( tmp_path / "prof.json" )
+  collapsed_file = str( tmp_path / "prof.txt" )
+  profile = m.dump_profile( json_file, collapsed_file )
+
+  assert profile[ "ncycles" ] == profile[ "sampled_cycles" ] == 10
+
+  blocks = { (x["path"], x["name"]): x for x in profile["blocks"] }
+  assert blocks[ ("s.incr0", "up_incr") ]["calls"] == 10
+  assert blocks[ ("s.incr1", "up_incr") ]["calls"] == 10
+  assert blocks[ ("s", "up_reg") ]["calls"] == 10
+  assert blocks[ ("s", "up_reg") ]["stack"] == [ "Top" ]
+  assert blocks[ ("s.incr0", "up_incr") ]["stack"] == [ "Top", "Incr" ]
+  assert all( x["time_ns"] > 0 for x in profile["blocks"] )
+  assert set( profile["classes"] ) >= { "Top", "Incr", "<nets>" }
+
+  with open( json_file ) as f:
+    assert json.load( f ) == profile
+
+  with open( collapsed_file ) as f:
+    lines = f.read().splitlines()
+  assert len(lines) == len(profile["blocks"])
+  assert any( line.startswith( "Top;Incr;up_incr " ) for line in lines )
+
+  report = m.profile_report( topn=3 )
+  assert "over 10 cycles" in report
+  assert "up_incr (Incr)" in report
+
+def test_sampled_scc():
+
+  class Loop( Component ):
+    def construct( s ):
+      s.a = Wire( int )
+      s.b = Wire( int )
+
+      @s.update
+      def up_a():
+        s.a = s.b + 1 if s.b < 3 else s.b
+
+      @s.update
+      def up_b():
+        s.b = s.a
+
+  m = _sim( Loop(), DynamicSchedulePass(), ProfileTickPass( sample_every=4 ) )
+  for i in range(10):
+    m.tick()
+
+  profile = m.dump_profile()
+  assert profile[ "ncycles" ] == 10
+  assert profile[ "sampled_cycles" ] == 2
+
+  # The SCC is profiled as a single block
+  blocks = { x["name"]: x for x in profile["blocks"] }
+  assert "up_a" not in blocks
+  assert blocks[ "wrapped_SCC_1" ]["calls"] == 10
+  assert blocks[ "wrapped_SCC_1" ]["time_ns"] > 0
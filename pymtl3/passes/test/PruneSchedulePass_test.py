@@ -0,0 +1,92 @@
+"""
+========================================================================
+PruneSchedulePass_test.py
+========================================================================
+"""
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl import *
+from pymtl3.passes.GenDAGPass import GenDAGPass
+from pymtl3.passes.PassGroups import SimpleSim
+from pymtl3.passes.PruneSchedulePass import PruneSchedulePass
+from pymtl3.passes.SimpleSchedulePass import SimpleSchedulePass
+from pymtl3.passes.SimpleTickPass import SimpleTickPass
+
+
+class Adder( Component ):
+  def construct( s ):
+    s.in0 = InPort( Bits8 )
+    s.in1 = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @s.update
+    def up_add():
+      s.out = s.in0 + s.in1
+
+class Top( Component ):
+  def construct( s, log ):
+    s.in_ = InPort( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    # in1 of both adders is tied off
+    s.add0 = Adder()( in0 = s.in_, in1 = Bits8(3) )
+    s.add1 = Adder()( in0 = s.add0.out, in1 = Bits8(4) )
+    s.add1.out //= s.out
+
+    # Nobody reads the output of this adder
+    s.unused = Adder()( in0 = s.in_, in1 = s.add0.out )
+
+    s.dead = Wire( Bits8 )
+
+    @s.update
+    def up_dead():
+      s.dead = s.unused.out + s.in_
+
+    @s.update
+    def up_log():
+      log.append( s.unused.out )
+
+def _sim( m, *passes ):
+  m.elaborate()
+  m.apply( GenDAGPass() )
+  m.apply( SimpleSchedulePass() )
+  for p in passes:
+    m.apply( p )
+  m.apply( SimpleTickPass() )
+  m.lock_in_simulation()
+  return m
+
+def test_prune_const_and_dead_blocks():
+  log = []
+  m = _sim( Top( log ), PruneSchedulePass() )
+
+  assert len(m._sched.const_blocks) == 2
+  # Besides up_dead, only the net blocks of clk/reset are unused since
+  # no update block reads them
+  dead_upblks = m._sched.dead_blocks - m._dag.genblks
+  assert { x.__name__ for x in dead_upblks } == { "up_dead" }
+  for x in m._sched.const_blocks | m._sched.dead_blocks:
+    assert x not in m._sched.schedule
+
+  ref_log = []
+  ref = Top( ref_log )
+  ref.apply( SimpleSim )
+
+  for i in range(5):
+    m.in_   = Bits8( i )
+    ref.in_ = Bits8( i )
+    m.tick()
+    ref.tick()
+    assert m.out == ref.out == i + 7
+
+  # up_log has side effects so everything it reads is still computed
+  assert log == ref_log == [ 2*i + 3 for i in range(5) ]
+
+def test_keep_signal():
+  m = Top( [] )
+  m.elaborate()
+  _sim( m, PruneSchedulePass( keep=[ m.dead ] ) )
+  assert not ( m._sched.dead_blocks - m._dag.genblks )
+
+  m.in_ = Bits8( 2 )
+  m.tick()
+  assert m.dead == 7 + 2
@@ -0,0 +1,99 @@
+"""
+========================================================================
+SimCache_test.py
+========================================================================
+"""
+import pytest
+
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl import *
+from pymtl3.passes import SimCache
+from pymtl3.passes.errors import SimCacheError
+from pymtl3.passes.PassGroups import SimpleSim
+
+
+class Stage( Component ):
+  def construct( s, incr ):
+    s.in_ = InPort ( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.reg = Wire( Bits8 )
+
+    @s.update_ff
+    def up_reg():
+      s.reg <<= s.in_ + Bits8(incr)
+
+    @s.update
+    def up_out():
+      s.out = s.reg
+
+class Pipe( Component ):
+  def construct( s, n, incr=1 ):
+    s.in_ = InPort ( Bits8 )
+    s.out = OutPort( Bits8 )
+    s.stages = [ Stage( incr ) for _ in range(n) ]
+    s.stages[0].in_ //= s.in_
+    for i in range(1, n):
+      s.stages[i].in_ //= s.stages[i-1].out
+    s.stages[n-1].out //= s.out
+
+  def line_trace( s ):
+    return f"{s.in_}>{s.out}"
+
+def _run( top, reset=True ):
+  if reset:
+    top.sim_reset()
+  trace = []
+  for i in range(6):
+    top.in_ = Bits8(i)
+    top.tick()
+    trace.append( top.line_trace() )
+  return trace
+
+@pytest.fixture
+def cache_dir( tmpdir ):
+  old = SimCache.get_cache_dir()
+  SimCache.set_cache_dir( str(tmpdir) )
+  yield str(tmpdir)
+  SimCache.set_cache_dir( old )
+
+def test_sim_cache_save_load( cache_dir ):
+  assert SimCache.load( Pipe, 3, incr=2 ) is None
+
+  top = SimCache.get_cached_sim( Pipe, 3, incr=2 )
+  assert hasattr( top, "_dag" ) # built from scratch
+
+  loaded = SimCache.load( Pipe, 3, incr=2 )
+  assert loaded is not None
+  assert not hasattr( loaded, "_dag" ) # nothing was analyzed
+  assert _run( loaded ) == _run( top )
+
+  # Different parameters don't hit
+  assert SimCache.load( Pipe, 3, incr=1 ) is None
+  assert SimCache.load( Pipe, 4, incr=2 ) is None
+
+def test_sim_cache_saves_values( cache_dir ):
+  top = Pipe( 2 )
+  top.apply( SimpleSim )
+  top.sim_reset()
+  top.in_ = Bits8(7)
+  top.tick()
+  top.tick()
+  SimCache.save( top )
+
+  # The loaded model continues from the saved state
+  loaded = SimCache.load( Pipe, 2 )
+  assert loaded.out == top.out
+  assert loaded.stages[0].reg == top.stages[0].reg == 8
+  assert _run( loaded, reset=False ) == _run( top, reset=False )
+
+def test_sim_cache_invalid( cache_dir ):
+  top = Pipe( 2 )
+  top.elaborate()
+  with pytest.raises( SimCacheError ):
+    SimCache.save( top )
+
+  top = Pipe( 2 )
+  top.set_param( "top.construct", incr=3 )
+  top.apply( SimpleSim )
+  with pytest.raises( SimCacheError ):
+    SimCache.save( top )
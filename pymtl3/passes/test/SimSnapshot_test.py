@@ -0,0 +1,89 @@
+"""
+========================================================================
+SimSnapshot_test.py
+========================================================================
+"""
+import os
+
+import pytest
+
+from pymtl3.datatypes import Bits8
+from pymtl3.dsl import *
+from pymtl3.passes.errors import ForkedSimulationError, PassOrderError
+from pymtl3.passes.PassGroups import SimpleSim
+from pymtl3.passes.SimSnapshot import SimSnapshot
+
+
+class Accumulator( Component ):
+  def construct( s ):
+    s.in_ = InPort ( Bits8 )
+    s.out = OutPort( Bits8 )
+
+    @s.update_ff
+    def up_acc():
+      if s.reset:
+        s.out <<= Bits8(0)
+      else:
+        s.out <<= s.out + s.in_
+
+def _run( top, n ):
+  top.in_ = Bits8(n)
+  for _ in range(n):
+    top.tick()
+  return int(top.out), os.getpid()
+
+def test_snapshot_map():
+  top = Accumulator()
+  top.apply( SimpleSim )
+  snap = SimSnapshot( top )
+
+  results = snap.map( _run, [ 1, 2, 3, 4, 5 ], nprocs=2 )
+
+  # Every run starts from a fresh copy, so nothing accumulates across runs
+  ref = Accumulator()
+  ref.apply( SimpleSim )
+  expected = []
+  for n in [ 1, 2, 3, 4, 5 ]:
+    ref.sim_reset()
+    expected.append( _run( ref, n )[0] )
+
+  assert [ x for x, _ in results ] == expected
+  assert os.getpid() not in { pid for _, pid in results }
+  assert top.out == 0
+
+def test_snapshot_run_closure():
+  top = Accumulator()
+  top.apply( SimpleSim )
+  snap = SimSnapshot( top )
+
+  seen = []
+  def run( top ):
+    seen.append( 1 ) # only happens in the forked process
+    return _run( top, 3 )[0]
+
+  x = snap.run( run )
+  assert x > 0
+  assert snap.run( run ) == x
+  assert seen == []
+
+def test_snapshot_errors():
+  top = Accumulator()
+  top.elaborate()
+  with pytest.raises( PassOrderError ):
+    SimSnapshot( top )
+
+  top = Accumulator()
+  top.apply( SimpleSim )
+  snap = SimSnapshot( top )
+
+  def fail( top, x ):
+    assert x < 2, "too large"
+    return x
+
+  with pytest.raises( AssertionError ) as e:
+    snap.map( fail, [ 0, 1, 2, 3 ] )
+  assert isinstance( e.value.__cause__, ForkedSimulationError )
+  assert "too large" in str( e.value.__cause__ )
+
+  with pytest.raises( ForkedSimulationError ):
+    snap.run( lambda top: lambda: 0 ) # the result cannot be pickled
@@ -0,0 +1,118 @@
+"""
+========================================================================
+TraceBreakingSchedTickPass_test.py
+========================================================================
+"""
+import json
+
+from pymtl3.datatypes import Bits1, Bits8
+from pymtl3.dsl import *
+from pymtl3.passes.GenDAGPass import GenDAGPass
+from pymtl3.passes.mamba.TraceBreakingSchedTickPass import (
+    DoubleEndedPriorityQueue,
+    TraceBreakingSchedTickPass,
+)
+from pymtl3.passes.PassGroups import SimpleSim
+
+
+class Top( Component ):
+  def construct( s ):
+    s.in_  = InPort( Bits8 )
+    s.mode = InPort( Bits1 )
+    s.out  = OutPort( Bits8 )
+
+    s.acc = Wire( Bits8 )
+    s.tmp = Wire( Bits8 )
+
+    # Lots of branches but always takes the same path
+    @s.update
+    def up_biased():
+      if s.in_ > Bits8(200):
+        if s.in_ > Bits8(250):
+          s.tmp = s.in_ + Bits8(2)
+        else:
+          s.tmp = s.in_ + Bits8(3)
+      else:
+        s.tmp = s.in_ + Bits8(1)
+
+    # One branch that flips every cycle
+    @s.update
+    def up_random():
+      if s.mode:
+        s.out = s.tmp + s.acc
+      else:
+        s.out = s.tmp - s.acc
+
+    @s.update_ff
+    def up_acc():
+      s.acc <<= s.acc + s.in_
+
+def _run( m, n ):
+  outs = []
+  for i in range(n):
+    m.in_  = Bits8( i )
+    m.mode = Bits1( (i >> 1) & 1 )
+    m.tick()
+    outs.append( int(m.out) )
+  return outs
+
+def _trace_breaking_sim( m, p ):
+  m.elaborate()
+  m.apply( GenDAGPass() )
+  m.apply( p )
+  m.lock_in_simulation()
+  return m
+
+def test_double_ended_priority_queue():
+  Q = DoubleEndedPriorityQueue()
+  for i, x in enumerate([ 3, 1, 4, 1, 5, 9, 2, 6 ]):
+    Q.push( (x, 0), i )
+
+  assert Q.pop_min() == ( (1, 0), 1 )
+  assert Q.pop_max() == ( (9, 0), 5 )
+  assert Q.pop_min() == ( (1, 0), 3 )
+  assert Q.pop_max() == ( (6, 0), 7 )
+  assert len(Q) == 4
+  assert sorted( Q.pop_min()[1] for _ in range(4) ) == [ 0, 2, 4, 6 ]
+  assert not Q
+
+def test_static():
+  ref = Top()
+  ref.apply( SimpleSim )
+  m = _trace_breaking_sim( Top(), TraceBreakingSchedTickPass() )
+  assert _run( m, 20 ) == _run( ref, 20 )
+  assert m._sched.meta_schedule[0][0].__name__ == "double_buffer"
+
+def test_profile_guided( tmp_path ):
+  filename = str( tmp_path / "profile.json" )
+
+  ref = Top()
+  ref.apply( SimpleSim )
+  ref_outs = _run( ref, 20 )
+
+  m = _trace_breaking_sim( Top(), TraceBreakingSchedTickPass( profile=filename, warmup=8 ) )
+  assert _run( m, 20 ) == ref_outs
+
+  profile = m._sched.profile
+  biased  = profile[ "s.up_biased" ]
+  random  = profile[ "s.up_random" ]
+
+  assert biased[ "calls" ] == random[ "calls" ] == 4
+  assert biased[ "entropy" ] == 0.0
+  assert random[ "entropy" ] == 1.0
+
+  # update_ff blocks are always at the end of the tick
+  assert [ x.__name__ for x in m._sched.meta_schedule[-1] ] == [ "up_acc" ]
+
+  with open( filename ) as f:
+    saved = json.load( f )
+  assert saved[ "ncycles" ] == 8
+  assert saved[ "blocks" ] == profile
+
+  # A later run reuses the saved profile without warm-up
+  p = TraceBreakingSchedTickPass( profile=filename )
+  m = _trace_breaking_sim( Top(), p )
+  br = { x.__name__: p.branchiness[ x ] for x in m.get_all_update_blocks() }
+  assert br[ "up_biased" ] == 0.0
+  assert br[ "up_random" ] == 1.0
+  assert _run( m, 20 ) == ref_outs
@@ -18,7 +18,8 @@ class DelayPipeDeqCL( Component ):
   @non_blocking( lambda s: s.pipeline[0] is None )
   def enq( s, msg ):
     assert s.pipeline[0] is None
-    s.pipeline[0] = deepcopy(msg)
+    # Bits and bitstructs have a much cheaper clone than deepcopy
+    s.pipeline[0] = msg.clone() if hasattr( msg, "clone" ) else deepcopy(msg)
 
   @non_blocking( lambda s: s.pipeline[-1] is not None )
   def deq( s ):
@@ -74,7 +75,7 @@ class DelayPipeSendCL( Component ):
 
   def enq_pipe( s, msg ):
     assert s.pipeline[0] is None
-    s.pipeline[0] = deepcopy(msg)
+    s.pipeline[0] = msg.clone() if hasattr( msg, "clone" ) else deepcopy(msg)
 
   def enq_rdy_pipe( s ):
     return s.pipeline[0] is None
@@ -221,7 +221,7 @@ class RecvCL2SendRTL( Component ):
 
   @non_blocking( lambda s : s.entry is None )
   def recv( s, msg ):
-    s.entry = deepcopy(msg)
+    s.entry = msg.clone() if hasattr( msg, "clone" ) else deepcopy(msg)
 
   def line_trace( s ):
     return "{}(){}".format( s.recv, s.send )